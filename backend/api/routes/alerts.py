@@ -0,0 +1,76 @@
+"""
+Alerts API: server-sent events feed of alert status transitions
+"""
+import asyncio
+from typing import List, Optional
+
+from fastapi import APIRouter, Header, HTTPException, Query
+from fastapi.responses import StreamingResponse
+
+from utils.alert_feed import ALERT_METHODS, SEVERITY_FILTERS, get_alert_feed, sse_frame
+from utils.aggregates import ALERT_LEVELS
+from utils.config import settings
+
+router = APIRouter()
+
+RETRY_MS = 3000
+
+
+@router.get("/alerts/stream")
+async def alert_stream(
+    level: Optional[List[str]] = Query(None, description="adm1 and/or adm2 (default both)"),
+    method: Optional[List[str]] = Query(None, description="static and/or dynamic (default both)"),
+    region: Optional[List[str]] = Query(None),
+    label: Optional[List[str]] = Query(None),
+    severity: str = Query("alert", description="alert (Alert-high and up), alarm (Alarm-high only) or all"),
+    snapshot: bool = Query(False, description="Start with the currently active alerts"),
+    last_event_id: Optional[int] = Header(None, alias="Last-Event-ID"),
+):
+    """
+    Stream status transitions as they are detected after each ingestion run.
+
+    Each `alert` event carries the series (level, method, region, label), the
+    month, previous and new status and a severity (the higher of the two, so
+    clearing an alarm reaches alarm subscribers). Reconnecting clients send
+    Last-Event-ID and receive the events they missed from the replay history.
+    """
+    if level and set(level) - set(ALERT_LEVELS):
+        raise HTTPException(status_code=400, detail=f"level must be one of: {', '.join(ALERT_LEVELS)}")
+    if method and set(method) - set(ALERT_METHODS):
+        raise HTTPException(status_code=400, detail=f"method must be one of: {', '.join(ALERT_METHODS)}")
+    if severity not in SEVERITY_FILTERS:
+        raise HTTPException(status_code=400, detail=f"severity must be one of: {', '.join(SEVERITY_FILTERS)}")
+
+    feed = get_alert_feed()
+    sub, backlog = feed.subscribe(last_event_id, levels=level, methods=method, regions=region, labels=label,
+                                  min_severity=SEVERITY_FILTERS[severity])
+    initial = feed.snapshot(sub) if snapshot else None
+
+    async def events():
+        try:
+            yield f"retry: {RETRY_MS}\n\n".encode()
+            if initial is not None:
+                yield sse_frame("snapshot", {"dataset_version": feed.version, "alerts": initial})
+            for frame in backlog:
+                yield frame
+            while True:
+                try:
+                    frame = await asyncio.wait_for(sub.queue.get(), settings.ALERT_FEED_HEARTBEAT_SECONDS)
+                except asyncio.TimeoutError:
+                    yield b": keep-alive\n\n"
+                    continue
+                if frame is None:
+                    break
+                yield frame
+        finally:
+            feed.unsubscribe(sub)
+
+    # identity encoding keeps the gzip middleware from buffering events
+    headers = {"Cache-Control": "no-cache", "X-Accel-Buffering": "no", "Content-Encoding": "identity"}
+    return StreamingResponse(events(), media_type="text/event-stream", headers=headers)
+
+
+@router.get("/alerts/stream/stats")
+async def alert_stream_stats():
+    """Subscriber and event counts for the alert feed"""
+    return get_alert_feed().stats()
@@ -0,0 +1,165 @@
+"""
+Analytics API: monthly series, cross-tabs and alert statuses from pre-aggregated data
+
+Every response carries an ETag derived from the response cache key (dataset
+version, cache generation and request), so clients and proxies can
+revalidate with If-None-Match and get a 304 until the data changes.
+"""
+import hashlib
+import json
+from datetime import date
+from typing import Callable, List, Optional
+
+from fastapi import APIRouter, HTTPException, Query, Request, Response
+from fastapi.concurrency import run_in_threadpool
+
+try:
+    import orjson
+
+    def dumps(obj) -> bytes:
+        return orjson.dumps(obj)
+except ImportError:  # pragma: no cover - orjson is optional
+    def dumps(obj) -> bytes:
+        return json.dumps(obj, default=str).encode()
+
+from utils.aggregates import get_aggregate_store
+from utils.cache import cache_key, get_cache
+from utils.config import settings
+from utils.database import database_ready, search_positions
+from utils.dataset import FACET_COLUMNS, get_article_index
+
+router = APIRouter()
+
+CACHE_CONTROL = "public, max-age=300, stale-while-revalidate=60"
+
+
+async def cached_response(request: Request, build: Callable[..., dict]) -> Response:
+    """Serve a cached body with ETag/Cache-Control, or 304 if the client copy is current."""
+    key = await cache_key(request)
+    etag = f'"{hashlib.blake2b(key.encode(), digest_size=12).hexdigest()}"'
+    headers = {"ETag": etag, "Cache-Control": CACHE_CONTROL}
+    if etag in request.headers.get("if-none-match", ""):
+        return Response(status_code=304, headers=headers)
+
+    def render() -> bytes:
+        store = get_aggregate_store()
+        return dumps({**build(store), "dataset_version": store.version})
+
+    body = await get_cache().get_or_compute(key, lambda: run_in_threadpool(render), settings.CACHE_TTL_SECONDS)
+    return Response(content=body, media_type="application/json", headers=headers)
+
+
+def collect_filters(source, sentiment, label, adm1, adm2) -> dict:
+    return {
+        dim: tuple(values)
+        for dim, values in (("source", source), ("sentiment", sentiment), ("label", label),
+                            ("adm1", adm1), ("adm2", adm2))
+        if values
+    }
+
+
+def check_dimension(name: Optional[str], param: str):
+    if name is not None and name not in FACET_COLUMNS:
+        raise HTTPException(status_code=400, detail=f"{param} must be one of: {', '.join(FACET_COLUMNS)}")
+
+
+@router.get("/analytics/timeseries")
+async def timeseries(
+    request: Request,
+    group_by: Optional[str] = Query(None, description="source, sentiment, label, adm1 or adm2"),
+    source: Optional[List[str]] = Query(None),
+    sentiment: Optional[List[str]] = Query(None),
+    label: Optional[List[str]] = Query(None),
+    adm1: Optional[List[str]] = Query(None),
+    adm2: Optional[List[str]] = Query(None),
+    start_date: Optional[date] = Query(None),
+    end_date: Optional[date] = Query(None),
+):
+    """Monthly article counts and mean sentiment"""
+    check_dimension(group_by, "group_by")
+    filters = collect_filters(source, sentiment, label, adm1, adm2)
+    return await cached_response(request, lambda store: {
+        "group_by": group_by,
+        "series": store.timeseries(group_by, filters, start_date and str(start_date), end_date and str(end_date)),
+    })
+
+
+@router.get("/analytics/crosstab")
+async def crosstab(
+    request: Request,
+    rows: str = Query("adm1", description="Row dimension, e.g. adm1 or adm2"),
+    cols: str = Query("label", description="Column dimension"),
+    top_n: Optional[int] = Query(None, ge=1, le=500),
+    include_unknown: bool = Query(False, description="Keep Unknown Region / Unknown County rows"),
+    source: Optional[List[str]] = Query(None),
+    sentiment: Optional[List[str]] = Query(None),
+    label: Optional[List[str]] = Query(None),
+    adm1: Optional[List[str]] = Query(None),
+    adm2: Optional[List[str]] = Query(None),
+    start_date: Optional[date] = Query(None),
+    end_date: Optional[date] = Query(None),
+):
+    """Count heatmap tables (the Label x ADM1/ADM2 tables on the Overview page)"""
+    check_dimension(rows, "rows")
+    check_dimension(cols, "cols")
+    if rows == cols:
+        raise HTTPException(status_code=400, detail="rows and cols must differ")
+    filters = collect_filters(source, sentiment, label, adm1, adm2)
+    return await cached_response(request, lambda store: {
+        "rows_dimension": rows,
+        "cols_dimension": cols,
+        **store.crosstab(rows, cols, filters, start_date and str(start_date), end_date and str(end_date), top_n,
+                         include_unknown),
+    })
+
+
+@router.get("/analytics/summary")
+async def summary(
+    request: Request,
+    source: Optional[List[str]] = Query(None),
+    sentiment: Optional[List[str]] = Query(None),
+    label: Optional[List[str]] = Query(None),
+    adm1: Optional[List[str]] = Query(None),
+    adm2: Optional[List[str]] = Query(None),
+    start_date: Optional[date] = Query(None),
+    end_date: Optional[date] = Query(None),
+    keyword: Optional[str] = Query(None, description="Title/text search; use OR for alternatives"),
+):
+    """Headline metrics for a filtered slice: count, month span, top source and label"""
+    filters = collect_filters(source, sentiment, label, adm1, adm2)
+    if not (keyword and keyword.strip()):
+        return await cached_response(request, lambda store: {
+            "summary": store.summary(filters, start_date and str(start_date), end_date and str(end_date)),
+        })
+
+    # Keyword slices are counted from article rows rather than the monthly cube
+    index = await run_in_threadpool(get_article_index)
+    restrict = None
+    if database_ready():
+        restrict = await search_positions(index, keyword)
+        if restrict is not None:
+            keyword = None
+    return await cached_response(request, lambda store: {
+        "summary": index.summary(filters, start=start_date, end=end_date, keyword=keyword, restrict=restrict),
+    })
+
+
+@router.get("/analytics/alerts")
+async def alerts(
+    request: Request,
+    level: str = Query("adm1", description="adm1 or adm2"),
+    method: str = Query("static", description="static (full-span) or dynamic (12-month rolling)"),
+    region: Optional[List[str]] = Query(None),
+    label: Optional[List[str]] = Query(None),
+    latest_only: bool = Query(False, description="Only the most recent month of each series"),
+):
+    """Alert/Alarm statuses for every region x label monthly series"""
+    if level not in ("adm1", "adm2"):
+        raise HTTPException(status_code=400, detail="level must be adm1 or adm2")
+    if method not in ("static", "dynamic"):
+        raise HTTPException(status_code=400, detail="method must be static or dynamic")
+    return await cached_response(request, lambda store: {
+        "level": level,
+        "method": method,
+        "statuses": store.alert_statuses(level, method, region, label, latest_only),
+    })
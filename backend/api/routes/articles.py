@@ -0,0 +1,220 @@
+"""
+Articles API: filtered, keyset-paginated listing over the processed dataset
+"""
+import base64
+import binascii
+from datetime import date
+from typing import List, Optional
+
+import pandas as pd
+from fastapi import APIRouter, HTTPException, Query, Request
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import JSONResponse, StreamingResponse
+
+try:
+    import orjson  # noqa: F401
+    from fastapi.responses import ORJSONResponse as FastJSONResponse
+except ImportError:  # pragma: no cover - orjson is optional
+    FastJSONResponse = JSONResponse
+
+from utils.cache import cached
+from utils.database import database_ready, search_positions
+from utils.dataset import ARTICLE_COLUMNS, DEFAULT_FIELDS, get_article_index
+from utils.export import EXPORT_BATCH_SIZE, EXPORT_FORMATS, stream_export
+
+router = APIRouter()
+
+MAX_PAGE_SIZE = 500
+
+
+def encode_cursor(cursor) -> Optional[str]:
+    if cursor is None:
+        return None
+    date_ns, article_id = cursor
+    return base64.urlsafe_b64encode(f"{date_ns}:{article_id}".encode()).decode().rstrip("=")
+
+
+def decode_cursor(token: Optional[str]):
+    if not token:
+        return None
+    try:
+        raw = base64.urlsafe_b64decode(token + "=" * (-len(token) % 4)).decode()
+        date_ns, article_id = raw.split(":", 1)
+        return int(date_ns), article_id
+    except (ValueError, binascii.Error, UnicodeDecodeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def parse_fields(fields: Optional[str]) -> List[str]:
+    if not fields:
+        return DEFAULT_FIELDS
+    requested = [f.strip() for f in fields.split(",") if f.strip()]
+    unknown = [f for f in requested if f not in ARTICLE_COLUMNS]
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown fields: {', '.join(unknown)}")
+    # article_id and date are always returned: they make up the cursor
+    return ["article_id", "date"] + [f for f in requested if f not in ("article_id", "date")]
+
+
+def to_records(rows: pd.DataFrame, fields: List[str]) -> list:
+    out = rows[[f for f in fields if f in rows.columns]].copy()
+    if "date" in out.columns:
+        out["date"] = out["date"].dt.strftime("%Y-%m-%dT%H:%M:%S")
+    out = out.astype(object).where(out.notna(), None)
+    return out.to_dict("records")
+
+
+def facet_filters(source, sentiment, label, adm1, adm2) -> dict:
+    return {
+        dim: tuple(values)
+        for dim, values in (("source", source), ("sentiment", sentiment), ("label", label),
+                            ("adm1", adm1), ("adm2", adm2))
+        if values
+    }
+
+
+@router.get("/articles")
+@cached()
+async def list_articles(
+    request: Request,
+    source: Optional[List[str]] = Query(None, description="News source (repeatable)"),
+    start_date: Optional[date] = Query(None),
+    end_date: Optional[date] = Query(None),
+    sentiment: Optional[List[str]] = Query(None, description="positive / neutral / negative (repeatable)"),
+    label: Optional[List[str]] = Query(None, description="Topic label (repeatable)"),
+    adm1: Optional[List[str]] = Query(None, description="ADM1 state (repeatable)"),
+    adm2: Optional[List[str]] = Query(None, description="ADM2 county (repeatable)"),
+    keyword: Optional[str] = Query(None, description="Title/text search; use OR for alternatives"),
+    fields: Optional[str] = Query(None, description="Comma-separated columns to return"),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
+    limit: int = Query(50, ge=1, le=MAX_PAGE_SIZE),
+):
+    """
+    List articles newest first, filtered like the dashboard sidebar.
+
+    Pages are keyed on (date, article_id), so following `next_cursor` stays
+    fast and stable however deep you go. Keywords are matched through the
+    SQLite full-text index when the database is up.
+    """
+    index = await run_in_threadpool(get_article_index)
+    filters = facet_filters(source, sentiment, label, adm1, adm2)
+    selected = parse_fields(fields)
+    restrict = None
+    if keyword and keyword.strip() and database_ready():
+        restrict = await search_positions(index, keyword)
+        if restrict is not None:
+            keyword = None
+    rows, next_cursor, total = await run_in_threadpool(
+        index.page, filters, start=start_date, end=end_date, keyword=keyword,
+        cursor=decode_cursor(cursor), limit=limit, restrict=restrict,
+    )
+    return FastJSONResponse({
+        "items": to_records(rows, selected),
+        "count": len(rows),
+        "total": total,
+        "next_cursor": encode_cursor(next_cursor),
+        "dataset_version": index.version,
+    })
+
+
+@router.get("/articles/top")
+@cached()
+async def top_articles(
+    request: Request,
+    query: Optional[str] = Query(None, description="Topic to rank by; newest first when empty"),
+    top_k: int = Query(15, ge=1, le=MAX_PAGE_SIZE),
+    source: Optional[List[str]] = Query(None),
+    start_date: Optional[date] = Query(None),
+    end_date: Optional[date] = Query(None),
+    sentiment: Optional[List[str]] = Query(None),
+    label: Optional[List[str]] = Query(None),
+    adm1: Optional[List[str]] = Query(None),
+    adm2: Optional[List[str]] = Query(None),
+    keyword: Optional[str] = Query(None),
+    fields: Optional[str] = Query(None, description="Comma-separated columns to return"),
+):
+    """
+    The top_k filtered articles most relevant to `query`, for RAG retrieval.
+
+    Ranked on the server the same way as the dashboard's retrieve_top_k, so
+    only the selected articles' text crosses the wire.
+    """
+    index = await run_in_threadpool(get_article_index)
+    filters = facet_filters(source, sentiment, label, adm1, adm2)
+    selected = parse_fields(fields)
+    restrict = None
+    if keyword and keyword.strip() and database_ready():
+        restrict = await search_positions(index, keyword)
+        if restrict is not None:
+            keyword = None
+    rows = await run_in_threadpool(
+        index.top_k, filters, start=start_date, end=end_date, query=query, k=top_k, keyword=keyword,
+        restrict=restrict,
+    )
+    return FastJSONResponse({
+        "items": to_records(rows, selected),
+        "count": len(rows),
+        "dataset_version": index.version,
+    })
+
+
+@router.get("/articles/facets")
+@cached()
+def article_facets(request: Request):
+    """Available values for each filter dimension"""
+    index = get_article_index()
+    return FastJSONResponse({
+        "facets": {dim: index.facet_values(dim) for dim in index.facets},
+        "date_range": {
+            "min": str(index.df["date"].min().date()) if index.size else None,
+            "max": str(index.df["date"].max().date()) if index.size else None,
+        },
+        "dataset_version": index.version,
+    })
+
+
+@router.get("/articles/export")
+async def export_articles(
+    format: str = Query("arrow", pattern="^(arrow|parquet|csv)$", description="arrow (IPC stream), parquet or csv"),
+    source: Optional[List[str]] = Query(None),
+    start_date: Optional[date] = Query(None),
+    end_date: Optional[date] = Query(None),
+    sentiment: Optional[List[str]] = Query(None),
+    label: Optional[List[str]] = Query(None),
+    adm1: Optional[List[str]] = Query(None),
+    adm2: Optional[List[str]] = Query(None),
+    keyword: Optional[str] = Query(None),
+    fields: Optional[str] = Query(None, description="Comma-separated columns (default: all)"),
+):
+    """
+    Stream every article matching the filters, newest first.
+
+    Rows are encoded chunk by chunk as they are read, so exports of any
+    size use bounded memory on both ends.
+    """
+    index = await run_in_threadpool(get_article_index)
+    filters = facet_filters(source, sentiment, label, adm1, adm2)
+    columns = [c for c in (parse_fields(fields) if fields else ARTICLE_COLUMNS) if c in index.df.columns]
+    restrict = None
+    if keyword and keyword.strip() and database_ready():
+        restrict = await search_positions(index, keyword)
+        if restrict is not None:
+            keyword = None
+    chunks = index.iter_positions(filters, start=start_date, end=end_date, keyword=keyword,
+                                  restrict=restrict, batch_size=EXPORT_BATCH_SIZE)
+    media_type, extension = EXPORT_FORMATS[format]
+    headers = {"Content-Disposition": f'attachment; filename="articles-{date.today():%Y%m%d}.{extension}"'}
+    if format != "csv":
+        # Already zstd-compressed per chunk; keep the gzip middleware off it
+        headers["Content-Encoding"] = "identity"
+    return StreamingResponse(stream_export(index.df, chunks, columns, format), media_type=media_type, headers=headers)
+
+
+@router.get("/articles/{article_id}")
+def get_article(article_id: str, fields: Optional[str] = Query(None)):
+    """Single article by id"""
+    row = get_article_index().get(article_id)
+    if row is None:
+        raise HTTPException(status_code=404, detail="Article not found")
+    selected = parse_fields(fields) if fields else ARTICLE_COLUMNS
+    return FastJSONResponse(to_records(row.to_frame().T.infer_objects(), selected)[0])
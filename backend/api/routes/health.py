@@ -0,0 +1,35 @@
+"""
+Health and metrics endpoints
+"""
+from pathlib import Path
+
+from fastapi import APIRouter, Response
+
+from utils.alert_feed import get_alert_feed
+from utils.cache import get_cache
+from utils.config import settings
+from utils.database import database_ready
+from utils.dataset import dataset_version, loaded_article_index
+from utils.metrics import CONTENT_TYPE_LATEST, render_metrics
+
+router = APIRouter()
+
+
+@router.get("/health")
+async def health():
+    """Liveness plus the state of storage, cache and the loaded dataset"""
+    index = loaded_article_index()
+    return {
+        "status": "ok",
+        "environment": settings.ENVIRONMENT,
+        "database": database_ready(),
+        "cache_backend": get_cache().backend.name,
+        "dataset_version": dataset_version(Path(settings.DATA_PATH)),
+        "index_version": index.version if index else None,
+        "alert_subscribers": get_alert_feed().stats()["subscribers"],
+    }
+
+
+async def metrics():
+    """Prometheus text exposition of every registered metric"""
+    return Response(content=render_metrics(), media_type=CONTENT_TYPE_LATEST)
@@ -0,0 +1,96 @@
+"""
+Bulk ingestion API: push NDJSON or Arrow IPC batches into article storage
+"""
+import time
+from typing import Dict
+
+from fastapi import APIRouter, HTTPException, Query, Request
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import JSONResponse
+
+from utils.bulk_ingest import (
+    ARROW_FILE_TYPES, ARROW_STREAM_TYPES, NDJSON_TYPES, BulkFormatError, BulkPartition, arrow_batches,
+    ndjson_batches, prepare_batch
+)
+from utils.cache import invalidate_all
+from utils.config import settings
+from utils.database import connect, database_ready, insert_new_articles
+
+router = APIRouter()
+
+MAX_BATCH_SIZE = 50000
+
+
+@router.post("/articles:bulk")
+async def bulk_ingest(
+    request: Request,
+    batch_size: int = Query(10000, ge=1, le=MAX_BATCH_SIZE, description="Rows per transaction"),
+):
+    """
+    Ingest articles from an NDJSON (application/x-ndjson) or Arrow IPC
+    (application/vnd.apache.arrow.stream / .file) body.
+
+    Each batch is committed in one transaction. Articles whose normalized URL
+    or title + text is already stored are skipped and counted as duplicates.
+    Rows without url, title or a parseable date are counted as invalid.
+    Accepted articles are also written to a partition that the article index
+    picks up on its next version check.
+
+    A body that turns out to be malformed partway through returns 400 with
+    the results of the batches that were already committed.
+    """
+    if not database_ready():
+        raise HTTPException(status_code=503, detail="Article storage is not available")
+    content_type = request.headers.get("content-type", "").split(";")[0].strip().lower()
+
+    if content_type in NDJSON_TYPES:
+        source = ndjson_batches(request.stream(), batch_size)
+    elif content_type in ARROW_STREAM_TYPES | ARROW_FILE_TYPES:
+        body = await request.body()
+        frames = arrow_batches(body, batch_size, file_format=content_type in ARROW_FILE_TYPES)
+
+        async def arrow_source():
+            for frame in frames:
+                yield frame, 0
+
+        source = arrow_source()
+    else:
+        raise HTTPException(
+            status_code=415,
+            detail=f"Unsupported content type '{content_type}'; send NDJSON or Arrow IPC",
+        )
+
+    started = time.perf_counter()
+    batches = []
+    totals: Dict[str, int] = {"received": 0, "accepted": 0, "duplicate_url": 0, "duplicate_content": 0, "invalid": 0}
+    partition = BulkPartition(settings.PARTITIONS_DIR)
+    error = None
+    try:
+        async with connect() as conn:
+            async for frame, malformed in source:
+                rows, invalid = await run_in_threadpool(prepare_batch, frame)
+                counts, accepted = await insert_new_articles(conn, rows)
+                await run_in_threadpool(partition.write, accepted)
+                result = {"batch": len(batches), "received": len(frame) + malformed, **counts,
+                          "invalid": invalid + malformed}
+                batches.append(result)
+                for key in totals:
+                    totals[key] += result[key]
+    except BulkFormatError as e:
+        error = str(e)
+    finally:
+        # Whatever was committed before a failure is published and retires the cache
+        await run_in_threadpool(partition.close)
+        if totals["accepted"]:
+            await invalidate_all()
+
+    elapsed = time.perf_counter() - started
+    result = {
+        "batches": batches,
+        "totals": totals,
+        "elapsed_seconds": round(elapsed, 3),
+        "articles_per_second": round(totals["received"] / elapsed) if elapsed > 0 else None,
+    }
+    if error is not None:
+        return JSONResponse(status_code=400, content={"detail": error, **result})
+    return result
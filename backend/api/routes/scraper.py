@@ -0,0 +1,48 @@
+"""
+Scraper API: trigger scrape cycles and inspect their throughput
+"""
+from fastapi import APIRouter, HTTPException
+
+from utils.config import settings
+from utils.crawl_scheduler import CrawlScheduler, get_crawl_scheduler
+from utils.scraper import get_scraper_service, load_sources
+
+router = APIRouter()
+
+
+@router.get("/scraper/sources")
+async def list_sources():
+    """Configured sources and their feeds"""
+    return {"sources": [s.__dict__ for s in load_sources()]}
+
+
+@router.post("/scraper/run", status_code=202)
+async def run_scraper():
+    """Start one scrape cycle in the background"""
+    service = get_scraper_service()
+    if not service.start():
+        raise HTTPException(status_code=409, detail="A scrape cycle is already running")
+    return {"status": "started"}
+
+
+@router.get("/scraper/status")
+async def scraper_status():
+    """Whether a cycle is running, plus stats of recent cycles"""
+    service = get_scraper_service()
+    return {
+        "running": service.running,
+        "last_cycle": service.history[-1] if service.history else None,
+        "history": service.history,
+        "last_error": service.last_error,
+    }
+
+
+@router.get("/scraper/schedule")
+async def scraper_schedule():
+    """Adaptive schedule per source: interval, estimated rate, wasted polls and freshness lag"""
+    if settings.SCRAPE_SCHEDULER_ENABLED:
+        scheduler = get_crawl_scheduler()
+    else:
+        # Driven by Celery beat (or not at all): report the persisted state
+        scheduler = CrawlScheduler.from_settings(bootstrap=False)
+    return {"running": scheduler.running, **scheduler.stats()}
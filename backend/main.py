@@ -5,12 +5,17 @@ import logging
 from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
 from fastapi.responses import JSONResponse
 import uvicorn
 
-from api.routes import articles, analytics, scraper, health
+from api.routes import alerts, articles, analytics, ingest, scraper, health
+from utils.alert_feed import start_alert_feed, stop_alert_feed
+from utils.cache import init_cache
 from utils.config import settings
-from utils.database import init_db
+from utils.crawl_scheduler import start_crawl_scheduler, stop_crawl_scheduler
+from utils.database import close_db, init_db
+from utils.metrics import MetricsMiddleware
 
 # Configure logging
 logging.basicConfig(
@@ -28,10 +33,16 @@ async def lifespan(app: FastAPI):
     # Initialize database
     await init_db()
     logger.info("Database initialized")
+    await init_cache()
+    await start_alert_feed()
+    await start_crawl_scheduler()
     
     yield
     
     logger.info("Shutting down News Analytics Platform API...")
+    await stop_crawl_scheduler()
+    await stop_alert_feed()
+    await close_db()
 
 
 # Create FastAPI app
@@ -51,11 +62,20 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Compress large JSON pages
+app.add_middleware(GZipMiddleware, minimum_size=1024)
+
+# Request latency and in-flight metrics (outermost, so compression time is included)
+app.add_middleware(MetricsMiddleware)
+
 # Include routers
 app.include_router(health.router, prefix="/api/v1", tags=["health"])
 app.include_router(articles.router, prefix="/api/v1", tags=["articles"])
+app.include_router(ingest.router, prefix="/api/v1", tags=["ingest"])
 app.include_router(analytics.router, prefix="/api/v1", tags=["analytics"])
+app.include_router(alerts.router, prefix="/api/v1", tags=["alerts"])
 app.include_router(scraper.router, prefix="/api/v1", tags=["scraper"])
+app.add_api_route("/metrics", health.metrics, include_in_schema=False)
 
 
 @app.get("/")
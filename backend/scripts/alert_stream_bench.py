@@ -0,0 +1,261 @@
+"""
+Load-test the alert SSE feed: delivery latency and concurrent subscribers.
+
+Starts the alerts API in a child process on a free port, connects a growing
+number of SSE subscribers, then publishes synthetic transitions straight
+into the feed and measures, per subscriber, the time from publication to
+receipt. The ramp stops at the first step with connection errors, missed
+events or a p95 latency above --max-p95-ms. With the real watcher, add up
+to ALERT_FEED_POLL_SECONDS plus the aggregate rebuild to these numbers.
+
+Before the ramp, a fixture series is replayed month by month through the
+watcher's incremental path (AggregateStore.extended, latest_statuses,
+diff_statuses) and its dynamic statuses are checked against the insight
+pages' rolling rule.
+
+Usage (from backend/):
+    python scripts/alert_stream_bench.py
+    python scripts/alert_stream_bench.py --steps 100,1000,5000,10000 --events 5
+"""
+
+import argparse
+import asyncio
+import json
+import multiprocessing
+import resource
+import socket
+import sys
+import threading
+import time
+from pathlib import Path
+
+import aiohttp
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+# Monthly counts of the replayed series; None is a month without articles
+REPLAY_COUNTS = [4, 5, 3, 6, 4, 5, 14, 4, None, 5, 3, 22, 4, 6, 5, None, 30, 4, 3, 5, 4, 18, 6, 5, 40, 4]
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def raise_fd_limit():
+    soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    resource.setrlimit(resource.RLIMIT_NOFILE, (hard, hard))
+    return hard
+
+
+def bench_events(count, sent_at):
+    return [{
+        "level": "adm1", "method": "dynamic", "region": "Bench Region", "label": "Bench",
+        "yearmon": "2099-01", "article_count": i, "previous_status": "Normal", "status": "Alarm-high",
+        "severity": 2, "z": 2.5, "dataset_version": "bench", "raised_at": sent_at,
+    } for i in range(count)]
+
+
+def page_dynamic_statuses(counts):
+    """The insight pages' dynamic rule (dynamic_thresholds in the dashboard's utils/alert_helpers.py)."""
+    counts = pd.Series(counts, dtype=float)
+    rolling = counts.rolling(window=12, min_periods=1)
+    mean, std = rolling.mean(), rolling.std()
+    status = pd.Series("Normal", index=counts.index)
+    status[counts > mean + std] = "Alert-high"
+    status[counts > mean + 2 * std] = "Alarm-high"
+    return status.tolist()
+
+
+def replay_rows(month, count):
+    yearmon = str(pd.Period("2020-01", freq="M") + month)
+    return pd.DataFrame({
+        "article_id": [f"replay-{month}-{i}" for i in range(count)], "yearmon": yearmon,
+        "retrieve_source": "replay", "sentiment_label": "Negative", "Label": "Replay",
+        "adm1_name_final": "Replay Region", "adm2_name_final": "Replay County", "sentiment_score": -0.5,
+    })
+
+
+def check_replayed_series():
+    """Feed the fixture series one month per version; returns the months whose dynamic status
+    (latest status, and the transition event when one is raised) differs from the page rule."""
+    from utils.aggregates import AggregateStore
+    from utils.alert_feed import diff_statuses, latest_statuses
+
+    months = [(m, c) for m, c in enumerate(REPLAY_COUNTS) if c is not None]
+    expected = page_dynamic_statuses([c for _, c in months])
+    store = AggregateStore(replay_rows(*months[0]), version="replay-0", partitions=["0"])
+    statuses = latest_statuses(store)
+    mismatches = []
+    for step, (month, count) in enumerate(months):
+        if step:
+            store = store.extended(replay_rows(month, count), f"replay-{step}", [str(i) for i in range(step + 1)])
+            updated = latest_statuses(store, store.changed)
+            events = diff_statuses(statuses, updated, store.version)
+            statuses = updated
+        else:
+            events = diff_statuses(statuses.iloc[:0], statuses, store.version)
+        dynamic = statuses[(statuses["level"] == "adm1") & (statuses["method"] == "dynamic")].iloc[0]
+        raised = [e["status"] for e in events if e["level"] == "adm1" and e["method"] == "dynamic"]
+        if dynamic["status"] != expected[step] or any(status != expected[step] for status in raised):
+            mismatches.append((dynamic["yearmon"], count, dynamic["status"], expected[step]))
+    return len(months), mismatches
+
+
+def serve(port, conn):
+    """Child process: the alerts router alone, with a pipe for publishing synthetic events."""
+    import uvicorn
+    from fastapi import FastAPI
+
+    from api.routes import alerts
+    from utils.alert_feed import get_alert_feed
+
+    app = FastAPI()
+    app.include_router(alerts.router, prefix="/api/v1")
+    feed = get_alert_feed()
+
+    async def run():
+        loop = asyncio.get_running_loop()
+
+        def listen():
+            while True:
+                message = conn.recv()
+                if message is None:
+                    break
+                count, sent_at = message
+                loop.call_soon_threadsafe(feed.publish, bench_events(count, sent_at))
+
+        threading.Thread(target=listen, daemon=True).start()
+        config = uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning", backlog=4096)
+        await uvicorn.Server(config).serve()
+
+    asyncio.run(run())
+
+
+async def subscriber(session, url, connected, expected, latencies):
+    """Read the stream until `expected` alert events arrive; record their latencies."""
+    async with session.get(url) as resp:
+        resp.raise_for_status()
+        seen = 0
+        async for line in resp.content:
+            if line.startswith(b"retry:"):
+                connected.release()
+            elif line.startswith(b"data:"):
+                latencies.append(time.time() - json.loads(line[5:])["raised_at"])
+                seen += 1
+                if seen == expected:
+                    return
+
+
+async def run_step(base_url, n, events, conn, timeout):
+    url = f"{base_url}/alerts/stream?severity=alarm&region=Bench+Region"
+    connected = asyncio.Semaphore(0)
+    latencies = []
+    connector = aiohttp.TCPConnector(limit=0)
+    async with aiohttp.ClientSession(connector=connector, timeout=aiohttp.ClientTimeout(total=None)) as session:
+        started = time.time()
+        tasks = [asyncio.create_task(subscriber(session, url, connected, events, latencies)) for _ in range(n)]
+        ready = 0
+        deadline = started + timeout
+        while ready < n and time.time() < deadline and not all(t.done() for t in tasks):
+            try:
+                await asyncio.wait_for(connected.acquire(), max(0.01, deadline - time.time()))
+                ready += 1
+            except asyncio.TimeoutError:
+                break
+        connect_time = time.time() - started
+
+        conn.send((events, time.time()))
+        done, pending = await asyncio.wait(tasks, timeout=timeout)
+        for task in pending:
+            task.cancel()
+        await asyncio.gather(*pending, return_exceptions=True)
+    errors = sum(1 for t in done if t.exception() is not None)
+    lat_ms = np.array(latencies) * 1000
+    return {
+        "subscribers": n,
+        "connected": ready,
+        "connect_s": connect_time,
+        "errors": errors,
+        "missed": n * events - len(latencies),
+        "p50": float(np.percentile(lat_ms, 50)) if len(lat_ms) else float("nan"),
+        "p95": float(np.percentile(lat_ms, 95)) if len(lat_ms) else float("nan"),
+        "max": float(lat_ms.max()) if len(lat_ms) else float("nan"),
+    }
+
+
+async def run(args, port, conn):
+    base_url = f"http://127.0.0.1:{port}/api/v1"
+    async with aiohttp.ClientSession() as session:
+        for _ in range(100):
+            try:
+                async with session.get(f"{base_url}/alerts/stream/stats") as resp:
+                    if resp.status == 200:
+                        break
+            except aiohttp.ClientError:
+                await asyncio.sleep(0.1)
+
+    print(f"\n   {'Subs':>7} {'Connected':>9} {'Connect s':>9} {'Errors':>6} {'Missed':>6} "
+          f"{'p50 ms':>8} {'p95 ms':>8} {'max ms':>8}")
+    held = 0
+    for n in args.steps:
+        result = await run_step(base_url, n, args.events, conn, args.timeout)
+        print(f"   {n:>7,} {result['connected']:>9,} {result['connect_s']:>9.2f} {result['errors']:>6} "
+              f"{result['missed']:>6} {result['p50']:>8.1f} {result['p95']:>8.1f} {result['max']:>8.1f}")
+        if result["errors"] or result["missed"] or result["connected"] < n or result["p95"] > args.max_p95_ms:
+            break
+        held = n
+    return held
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Alert SSE feed load test")
+    parser.add_argument("--steps", default="10,100,500,1000,2000,5000",
+                        help="Comma-separated subscriber counts to ramp through")
+    parser.add_argument("--events", type=int, default=3, help="Events published per step")
+    parser.add_argument("--timeout", type=float, default=60.0, help="Seconds to wait for connects / deliveries")
+    parser.add_argument("--max-p95-ms", type=float, default=1000.0, help="Stop when p95 latency exceeds this")
+    args = parser.parse_args()
+    args.steps = [int(s) for s in args.steps.split(",") if s.strip()]
+
+    print("=" * 60)
+    print("Alert Stream Benchmark")
+    print("=" * 60)
+
+    replayed, mismatches = check_replayed_series()
+    for yearmon, count, status, expected in mismatches:
+        print(f"   {yearmon}: {count} articles, feed {status}, page {expected}")
+    if mismatches:
+        print(f"\n❌ Feed dynamic statuses differ from the page rule in {len(mismatches)} of {replayed} months")
+        return False
+    print(f"\n✅ Feed dynamic statuses match the page rule over {replayed} replayed months")
+
+    fd_limit = raise_fd_limit()
+    if max(args.steps) + 100 > fd_limit:
+        print(f"⚠️  Open file limit is {fd_limit:,}; steps above that will fail to connect")
+
+    port = free_port()
+    parent_conn, child_conn = multiprocessing.Pipe()
+    server = multiprocessing.Process(target=serve, args=(port, child_conn), daemon=True)
+    server.start()
+    print(f"\n🚀 Alerts API on port {port} (pid {server.pid}), {args.events} events per step")
+    try:
+        held = asyncio.run(run(args, port, parent_conn))
+    finally:
+        parent_conn.send(None)
+        server.terminate()
+        server.join()
+
+    if not held:
+        print("\n❌ No step passed")
+        return False
+    print(f"\n✅ One process held {held:,} concurrent subscribers within {args.max_p95_ms:.0f} ms p95")
+    return True
+
+
+if __name__ == "__main__":
+    success = main()
+    exit(0 if success else 1)
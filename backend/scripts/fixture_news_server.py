@@ -0,0 +1,188 @@
+"""
+Local fixture news sites for testing the scraper offline.
+
+Serves a few synthetic sources, each with an RSS feed, a sitemap index of
+monthly sitemaps and HTML article pages. Feeds and sitemaps send ETag and
+Last-Modified and answer conditional requests with 304, and new articles
+appear over time, so incremental cycles can be checked end to end.
+
+Usage (from backend/):
+    python scripts/fixture_news_server.py --port 8766 --sources 3 --articles 200 --new-every 5
+
+Then scrape it with the example sources file:
+    python scripts/run_scraper.py --sources-file config/sources.example.yaml --delay 0
+"""
+
+import argparse
+import hashlib
+import random
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+REGIONS = ["Juba", "Malakal", "Bor", "Wau", "Bentiu", "Yambio", "Torit", "Aweil", "Rumbek", "Kuajok"]
+TOPICS = ["flooding", "displacement", "cattle raiding", "food prices", "cholera", "peace talks", "road repairs"]
+EPOCH = datetime(2024, 1, 1)
+
+
+class Site:
+    def __init__(self, name, initial, new_every, started):
+        self.name = name
+        self.initial = initial
+        self.new_every = new_every
+        self.started = started
+
+    def count(self):
+        if not self.new_every:
+            return self.initial
+        return self.initial + int((time.time() - self.started) / self.new_every)
+
+    def published(self, n):
+        # Articles are spaced six hours apart, newest last
+        return EPOCH + timedelta(hours=6 * n)
+
+    def article(self, n):
+        rng = random.Random(f"{self.name}:{n}")
+        region, topic = rng.choice(REGIONS), rng.choice(TOPICS)
+        title = f"{topic.capitalize()} reported in {region} ({self.name} #{n})"
+        paragraphs = [
+            f"Residents of {region} described {topic} affecting several communities this week, local officials said.",
+            f"Humanitarian partners in {region} are assessing needs after reports of {topic} spread across the area.",
+            f"Authorities urged calm and said further updates on the {topic} situation would follow in coming days.",
+        ]
+        return title, self.published(n), paragraphs
+
+
+class FixtureHandler(BaseHTTPRequestHandler):
+    sites = {}
+    verbose = False
+    latency = 0.0
+    lock = threading.Lock()
+    stats = {"requests": 0, "not_modified": 0, "bytes": 0}
+
+    def log_message(self, fmt, *args):
+        if self.verbose:
+            super().log_message(fmt, *args)
+
+    def _send(self, status, body=b"", content_type="text/html; charset=utf-8", last_modified=None):
+        if self.latency:
+            time.sleep(self.latency)
+        etag = f'"{hashlib.md5(body).hexdigest()}"' if body else None
+        if status == 200 and etag:
+            inm = self.headers.get("If-None-Match")
+            ims = self.headers.get("If-Modified-Since")
+            fresh = inm == etag if inm else (
+                ims is not None and last_modified is not None and parsedate_to_datetime(ims) >= last_modified
+            )
+            if fresh:
+                status, body = 304, b""
+        with self.lock:
+            self.stats["requests"] += 1
+            self.stats["bytes"] += len(body)
+            self.stats["not_modified"] += status == 304
+        self.send_response(status)
+        if etag:
+            self.send_header("ETag", etag)
+        if last_modified is not None:
+            self.send_header("Last-Modified", format_datetime(last_modified, usegmt=True))
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        if body:
+            self.wfile.write(body)
+
+    def do_GET(self):
+        parts = self.path.strip("/").split("/")
+        site = self.sites.get(parts[0])
+        if site is None or len(parts) < 2:
+            return self._send(404)
+        base = f"http://{self.headers.get('Host')}/{site.name}"
+        total = site.count()
+        last_modified = site.published(total - 1).replace(tzinfo=timezone.utc)
+        resource = "/".join(parts[1:])
+
+        if resource == "rss.xml":
+            items = "".join(
+                f"<item><title>{site.article(n)[0]}</title><link>{base}/article/{n}.html</link>"
+                f"<pubDate>{format_datetime(site.published(n).replace(tzinfo=timezone.utc), usegmt=True)}</pubDate></item>"
+                for n in range(total - 1, max(-1, total - 51), -1)
+            )
+            body = f'<?xml version="1.0"?><rss version="2.0"><channel><title>{site.name}</title>{items}</channel></rss>'
+            return self._send(200, body.encode(), "application/rss+xml", last_modified)
+
+        if resource == "sitemap_index.xml":
+            months = sorted({site.published(n).strftime("%Y-%m") for n in range(total)})
+            entries = "".join(
+                f"<sitemap><loc>{base}/sitemap-{m}.xml</loc><lastmod>{self._month_lastmod(site, total, m)}</lastmod></sitemap>"
+                for m in months
+            )
+            body = f'<?xml version="1.0"?><sitemapindex xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">{entries}</sitemapindex>'
+            return self._send(200, body.encode(), "application/xml", last_modified)
+
+        if resource.startswith("sitemap-") and resource.endswith(".xml"):
+            month = resource[len("sitemap-"):-len(".xml")]
+            urls = "".join(
+                f"<url><loc>{base}/article/{n}.html</loc><lastmod>{site.published(n).isoformat()}Z</lastmod></url>"
+                for n in range(total) if site.published(n).strftime("%Y-%m") == month
+            )
+            body = f'<?xml version="1.0"?><urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">{urls}</urlset>'
+            return self._send(200, body.encode(), "application/xml", last_modified)
+
+        if resource.startswith("article/") and resource.endswith(".html"):
+            try:
+                n = int(resource[len("article/"):-len(".html")])
+            except ValueError:
+                return self._send(404)
+            if not 0 <= n < total:
+                return self._send(404)
+            title, published, paragraphs = site.article(n)
+            body = (
+                f"<html><head><title>{title} | {site.name}</title>"
+                f'<meta property="og:title" content="{title}">'
+                f'<meta property="article:published_time" content="{published.isoformat()}Z"></head>'
+                f"<body><nav><p>Home | News | Sport</p></nav><article><h1>{title}</h1>"
+                + "".join(f"<p>{p}</p>" for p in paragraphs)
+                + "</article></body></html>"
+            )
+            return self._send(200, body.encode())
+
+        return self._send(404)
+
+    @staticmethod
+    def _month_lastmod(site, total, month):
+        latest = max(n for n in range(total) if site.published(n).strftime("%Y-%m") == month)
+        return site.published(latest).isoformat() + "Z"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local fixture news sites for scraper testing")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8766)
+    parser.add_argument("--sources", type=int, default=3, help="Number of fixture sites")
+    parser.add_argument("--articles", type=int, default=200, help="Articles per site at start")
+    parser.add_argument("--new-every", type=float, default=0.0, help="Seconds between new articles per site (0 = static)")
+    parser.add_argument("--latency", type=float, default=0.0, help="Seconds added to every response")
+    parser.add_argument("--verbose", action="store_true")
+    args = parser.parse_args()
+
+    started = time.time()
+    FixtureHandler.sites = {
+        f"fixture{i + 1}": Site(f"fixture{i + 1}", args.articles, args.new_every, started) for i in range(args.sources)
+    }
+    FixtureHandler.verbose = args.verbose
+    FixtureHandler.latency = args.latency
+
+    server = ThreadingHTTPServer((args.host, args.port), FixtureHandler)
+    print(f"📰 Fixture news sites on http://{args.host}:{args.port}/ ({', '.join(FixtureHandler.sites)})")
+    print("   Feeds: /<site>/rss.xml  /<site>/sitemap_index.xml   (Ctrl+C to stop)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        stats = FixtureHandler.stats
+        print(f"\nServed {stats['requests']:,} requests, {stats['not_modified']:,} not modified, {stats['bytes']:,} bytes")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+"""
+Import the processed Parquet dataset into the SQLite database.
+
+init_db() and the API import DATA_PATH and new partitions automatically
+(see imported_files in utils/database.py); run this script to load a
+different file. Existing articles are updated in place (matched on article_id).
+
+Usage (from backend/):
+    python scripts/import_parquet.py
+    python scripts/import_parquet.py --data-path ../data/processed/all_clean_df.parquet
+"""
+
+import argparse
+import asyncio
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from utils.config import settings
+from utils.database import article_count, create_schema, database_path, import_parquet
+
+
+async def run(data_path, db_path):
+    await create_schema(db_path)
+    before = await article_count(db_path)
+    imported = await import_parquet(data_path, db_path)
+    after = await article_count(db_path)
+    return before, imported, after
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Bulk-import Parquet articles into SQLite")
+    parser.add_argument("--data-path", default=settings.DATA_PATH)
+    parser.add_argument("--database-url", default=settings.DATABASE_URL)
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print("Parquet → SQLite Import")
+    print("=" * 60)
+
+    if not Path(args.data_path).exists():
+        print(f"❌ Error: {args.data_path} not found")
+        return False
+
+    db_path = database_path(args.database_url)
+    start_time = time.time()
+    before, imported, after = asyncio.run(run(args.data_path, db_path))
+    elapsed = time.time() - start_time
+
+    print(f"\n📊 Results:")
+    print(f"   Rows read:          {imported:,}")
+    print(f"   Articles before:    {before:,}")
+    print(f"   Articles after:     {after:,}")
+    print(f"   Elapsed:            {elapsed:.1f} s ({imported / elapsed if elapsed else 0:,.0f} rows/s)")
+    print(f"\nDatabase: {db_path.absolute()}")
+    return True
+
+
+if __name__ == "__main__":
+    success = main()
+    exit(0 if success else 1)
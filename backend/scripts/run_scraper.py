@@ -0,0 +1,104 @@
+"""
+Run scrape cycles from the command line and report throughput.
+
+Usage (from backend/):
+    python scripts/run_scraper.py                              # one cycle, config/sources.yaml
+    python scripts/run_scraper.py --cycles 3 --interval 10     # repeat, showing incremental cycles
+    python scripts/run_scraper.py --sources-file config/sources.example.yaml --delay 0
+    python scripts/run_scraper.py --adaptive                   # poll each source on its own schedule
+"""
+
+import argparse
+import asyncio
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from utils.config import settings
+from utils.crawl_scheduler import SCHEDULE_FILE, CrawlScheduler, dataset_arrivals, published_by_source
+from utils.scraper import Scraper, load_sources
+
+
+def print_stats(cycle, stats):
+    print(f"\n📊 Cycle {cycle}:")
+    print(f"   Articles:           {stats.articles:,}  ({stats.articles_per_minute:,.0f}/min)")
+    print(f"   Requests:           {stats.requests:,}  ({stats.not_modified:,} not modified, {stats.errors:,} errors)")
+    print(f"   Bytes transferred:  {stats.bytes:,}")
+    print(f"   Feed entries seen:  {stats.entries_seen:,}")
+    print(f"   Elapsed:            {stats.elapsed:.2f} s")
+    for name, count in sorted(stats.per_source.items()):
+        print(f"   - {name}: {count}")
+
+
+async def run(args, sources):
+    scraper = Scraper(sources, raw_dir=args.raw_dir, per_host=args.per_host, delay=args.delay)
+    for cycle in range(1, args.cycles + 1):
+        if cycle > 1:
+            await asyncio.sleep(args.interval)
+        _, stats = await scraper.run_cycle()
+        print_stats(cycle, stats)
+
+
+async def run_adaptive(args, sources):
+    cycle = 0
+
+    async def fetch(due):
+        nonlocal cycle
+        cycle += 1
+        articles, stats = await Scraper(due, raw_dir=args.raw_dir, per_host=args.per_host, delay=args.delay).run_cycle()
+        print_stats(cycle, stats)
+        return published_by_source(articles, due)
+
+    scheduler = CrawlScheduler(sources, fetch, Path(args.raw_dir) / SCHEDULE_FILE)
+    arrivals, end = dataset_arrivals()
+    if end is not None:
+        scheduler.bootstrap(arrivals, end)
+    print("\n🗓️  Intervals:")
+    for name, s in scheduler.stats()["sources"].items():
+        print(f"   - {name}: {s['interval_seconds']:,} s ({s['articles_per_day']:g} articles/day)")
+    try:
+        await scheduler.run()
+    finally:
+        totals = scheduler.stats()["totals"]
+        print(f"\n🗓️  {totals['polls']:,} polls, {totals['wasted_polls']:,} wasted, lag p50 {totals['lag_p50_seconds']} s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Async news scraper")
+    parser.add_argument("--sources-file", default=settings.SCRAPER_SOURCES_FILE)
+    parser.add_argument("--raw-dir", default=settings.RAW_DATA_DIR)
+    parser.add_argument("--cycles", type=int, default=1)
+    parser.add_argument("--interval", type=float, default=float(settings.SCRAPE_INTERVAL), help="Seconds between cycles")
+    parser.add_argument("--per-host", type=int, default=settings.SCRAPER_PER_HOST_CONCURRENCY)
+    parser.add_argument("--delay", type=float, default=settings.SCRAPER_POLITENESS_DELAY, help="Seconds between requests to one host")
+    parser.add_argument("--adaptive", action="store_true",
+                        help="Poll each source on its adaptive schedule until interrupted (ignores --cycles/--interval)")
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print("News Scraper")
+    print("=" * 60)
+
+    sources = load_sources(args.sources_file)
+    if not sources:
+        print(f"❌ Error: no sources configured in {args.sources_file}")
+        return False
+    print(f"\n📰 {len(sources)} sources: {', '.join(s.name for s in sources)}")
+
+    start_time = time.time()
+    if args.adaptive:
+        try:
+            asyncio.run(run_adaptive(args, sources))
+        except KeyboardInterrupt:
+            pass
+    else:
+        asyncio.run(run(args, sources))
+    print(f"\n✅ Done in {time.time() - start_time:.1f} s. Raw articles: {Path(args.raw_dir).absolute()}")
+    return True
+
+
+if __name__ == "__main__":
+    success = main()
+    exit(0 if success else 1)
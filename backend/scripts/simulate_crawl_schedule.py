@@ -0,0 +1,149 @@
+"""
+Replay the adaptive crawl scheduler against synthetic sources on a simulated clock.
+
+Each source publishes as a Poisson process (optionally with a day/night cycle
+or a change of pace halfway through). The scheduler is bootstrapped from the
+preceding weeks of publications, then polls for --days of simulated time.
+The same sources are also polled at the fixed SCRAPE_INTERVAL. The report
+compares polls, wasted polls (nothing new) and freshness lag (publication to
+fetch) for both.
+
+Usage (from backend/):
+    python scripts/simulate_crawl_schedule.py
+    python scripts/simulate_crawl_schedule.py --days 60 --target 0.5 --min-interval 600
+"""
+
+import argparse
+import asyncio
+import bisect
+import math
+import random
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from utils.config import settings
+from utils.crawl_scheduler import CrawlScheduler, SimulatedClock
+from utils.scraper import Source
+
+DAY = 86400.0
+
+# name -> (articles per day, diurnal amplitude 0..1, rate multiplier for the second half)
+PROFILES = {
+    "wire_service": (30.0, 0.8, 1.0),
+    "national_daily": (6.0, 0.5, 1.0),
+    "regional_weekly": (1 / 7, 0.0, 1.0),
+    "ngo_updates": (0.5, 0.0, 1.0),
+    "speeding_up": (1.0, 0.3, 8.0),
+    "going_quiet": (8.0, 0.3, 0.1),
+}
+
+
+def publications(rng, per_day, diurnal, change, start, end, midpoint):
+    """Poisson arrivals by thinning, with a daily cycle peaking at midday."""
+    peak = per_day / DAY * (1 + diurnal) * max(1.0, change)
+    times, t = [], start
+    while True:
+        t += rng.expovariate(peak)
+        if t >= end:
+            return times
+        rate = per_day / DAY * (1 + diurnal * math.sin(2 * math.pi * (t % DAY) / DAY - math.pi / 2))
+        if t >= midpoint:
+            rate *= change
+        if rng.random() * peak < rate:
+            times.append(t)
+
+
+class SimulatedSites:
+    """fetch() for the scheduler: returns what each source published since it was last polled."""
+
+    def __init__(self, arrivals, clock):
+        self.arrivals = arrivals
+        self.clock = clock
+        self.polled_at = {}
+
+    async def fetch(self, sources):
+        now = self.clock.now()
+        found = {}
+        for s in sources:
+            times = self.arrivals[s.name]
+            since = self.polled_at.get(s.name, now - DAY)
+            found[s.name] = times[bisect.bisect_right(times, since):bisect.bisect_right(times, now)]
+            self.polled_at[s.name] = now
+        return found
+
+
+def simulate(args, arrivals, start, end, adaptive):
+    clock = SimulatedClock(start)
+    sites = SimulatedSites(arrivals, clock)
+    sources = [Source(name=name, feeds=[]) for name in arrivals]
+    if adaptive:
+        scheduler = CrawlScheduler(sources, sites.fetch, clock=clock, min_interval=args.min_interval,
+                                   max_interval=args.max_interval, target=args.target, seed=args.seed)
+        scheduler.bootstrap({n: [t for t in ts if t < start] for n, ts in arrivals.items()}, start)
+    else:
+        scheduler = CrawlScheduler(sources, sites.fetch, clock=clock, min_interval=args.interval,
+                                   max_interval=args.interval, jitter=0.0)
+    asyncio.run(scheduler.run(until=end))
+    return scheduler.stats()
+
+
+def fmt_lag(seconds):
+    if seconds is None:
+        return "-"
+    return f"{seconds / 3600:.1f} h" if seconds >= 3600 else f"{seconds / 60:.0f} min"
+
+
+def print_report(title, stats):
+    print(f"\n📊 {title}:")
+    print(f"   {'Source':<17} {'Interval':>9} {'Polls':>6} {'Wasted':>7} {'Articles':>8} {'Lag p50':>8} {'Lag p95':>8}")
+    for name, s in stats["sources"].items():
+        print(f"   {name:<17} {fmt_lag(s['interval_seconds']):>9} {s['polls']:>6,} {s['wasted_ratio'] or 0:>7.0%} "
+              f"{s['articles']:>8,} {fmt_lag(s['lag_p50_seconds']):>8} {fmt_lag(s['lag_p95_seconds']):>8}")
+    t = stats["totals"]
+    print(f"   {'TOTAL':<17} {'':>9} {t['polls']:>6,} {t['wasted_ratio'] or 0:>7.0%} {t['articles']:>8,} "
+          f"{fmt_lag(t['lag_p50_seconds']):>8} {fmt_lag(t['lag_p95_seconds']):>8}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Simulate the adaptive crawl scheduler")
+    parser.add_argument("--days", type=float, default=30.0, help="Simulated days of polling")
+    parser.add_argument("--history-days", type=float, default=float(settings.SCRAPE_RATE_WINDOW_DAYS),
+                        help="Days of publications used to bootstrap rates")
+    parser.add_argument("--interval", type=float, default=float(settings.SCRAPE_INTERVAL), help="Fixed baseline interval")
+    parser.add_argument("--min-interval", type=float, default=float(settings.SCRAPE_MIN_INTERVAL))
+    parser.add_argument("--max-interval", type=float, default=float(settings.SCRAPE_MAX_INTERVAL))
+    parser.add_argument("--target", type=float, default=settings.SCRAPE_TARGET_NEW_PER_POLL,
+                        help="New articles per poll the schedule aims for")
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print("Crawl Schedule Simulation")
+    print("=" * 60)
+
+    rng = random.Random(args.seed)
+    start = args.history_days * DAY
+    end = start + args.days * DAY
+    midpoint = start + args.days * DAY / 2
+    arrivals = {name: publications(rng, per_day, diurnal, change, 0.0, end, midpoint)
+                for name, (per_day, diurnal, change) in PROFILES.items()}
+    print(f"\n📰 {len(arrivals)} sources, {args.days:.0f} days "
+          f"({sum(len(t) for t in arrivals.values()):,} publications incl. {args.history_days:.0f} days of history)")
+
+    fixed = simulate(args, arrivals, start, end, adaptive=False)
+    adaptive = simulate(args, arrivals, start, end, adaptive=True)
+    print_report(f"Fixed interval ({fmt_lag(args.interval)})", fixed)
+    print_report(f"Adaptive ({fmt_lag(args.min_interval)} to {fmt_lag(args.max_interval)}, "
+                 f"target {args.target:g} new per poll)", adaptive)
+
+    f, a = fixed["totals"], adaptive["totals"]
+    print(f"\n✅ Polls {f['polls']:,} -> {a['polls']:,}, wasted {f['wasted_polls']:,} -> {a['wasted_polls']:,}, "
+          f"lag p50 {fmt_lag(f['lag_p50_seconds'])} -> {fmt_lag(a['lag_p50_seconds'])}")
+    return True
+
+
+if __name__ == "__main__":
+    success = main()
+    exit(0 if success else 1)
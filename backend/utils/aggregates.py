@@ -0,0 +1,238 @@
+"""
+Pre-aggregated analytics built once per dataset version.
+
+A monthly count cube over every filter dimension answers time series and
+cross-tab queries without touching article rows, and alert statuses for
+each (region, label) monthly series are computed up front with the same
+rules as the dashboard's ADM1/ADM2 insight pages (static_thresholds and
+dynamic_thresholds in its utils/alert_helpers.py): a count above mean + 1
+or 2 sample SD, over the whole series or over its last 12 months with
+articles, the current one included. scripts/check_alert_parity.py compares
+the two. When a new version only appends partitions, their rows are folded
+into the previous version's aggregates and only the alert series they fall
+in are recomputed.
+"""
+import logging
+import threading
+import time
+from pathlib import Path
+from typing import Dict, List, Optional, Set, Tuple
+
+import numpy as np
+import pandas as pd
+
+from utils.config import settings
+from utils.dataset import FACET_COLUMNS, ArticleIndex, get_article_index, make_article_ids, summarize
+from utils.metrics import DATASET_LOAD_SECONDS
+
+logger = logging.getLogger(__name__)
+
+CUBE_DIMENSIONS = ["yearmon", *FACET_COLUMNS.values()]
+ALERT_LEVELS = {"adm1": "adm1_name_final", "adm2": "adm2_name_final"}
+UNKNOWN_REGIONS = {"Unknown Region", "Unknown County"}
+DYNAMIC_WINDOW_MONTHS = 12
+
+
+def static_status(counts: np.ndarray) -> tuple:
+    """Full-span thresholds as on the insight pages: mean + 1/2 sample SD."""
+    mean = counts.mean()
+    std = counts.std(ddof=1) if len(counts) > 1 else np.nan
+    status = np.full(len(counts), "Normal", dtype=object)
+    if not np.isnan(std):
+        status[counts > mean + std] = "Alert-high"
+        status[counts > mean + 2 * std] = "Alarm-high"
+    return np.full(len(counts), mean), np.full(len(counts), std), status
+
+
+def dynamic_status(counts: np.ndarray, window: int = DYNAMIC_WINDOW_MONTHS) -> tuple:
+    """Rolling thresholds as on the insight pages: mean + 1/2 sample SD over the last `window` points."""
+    rolling = pd.Series(counts).rolling(window=window, min_periods=1)
+    mu = rolling.mean().to_numpy()
+    sd = rolling.std().to_numpy()
+    with np.errstate(divide="ignore", invalid="ignore"):
+        z = np.where(sd > 0, (counts - mu) / sd, 0.0)
+    status = np.full(len(counts), "Normal", dtype=object)
+    status[counts > mu + sd] = "Alert-high"
+    status[counts > mu + 2 * sd] = "Alarm-high"
+    return mu, sd, z, status
+
+
+class AggregateStore:
+    """Count cube plus precomputed alert tables for one dataset version."""
+
+    def __init__(self, df: pd.DataFrame, version: str = "", partitions: List[str] = ()):
+        self.version = version
+        self.partitions = list(partitions)
+        self.cube = self._cube(df)
+        self.alerts = {level: self._series_alerts(self._monthly(df, column)) for level, column in ALERT_LEVELS.items()}
+        # Set by extended(): the version it was built from and the series it recomputed per level
+        self.previous_version: Optional[str] = None
+        self.changed: Optional[Dict[str, Set[Tuple[str, str]]]] = None
+
+    @staticmethod
+    def _cube(df: pd.DataFrame) -> pd.DataFrame:
+        return (
+            df.groupby(CUBE_DIMENSIONS, observed=True, dropna=False)
+            .agg(count=("article_id", "size"), sentiment_sum=("sentiment_score", "sum"))
+            .reset_index()
+        )
+
+    @staticmethod
+    def _monthly(df: pd.DataFrame, region_col: str) -> pd.DataFrame:
+        return (
+            df[~df[region_col].isin(UNKNOWN_REGIONS)]
+            .groupby([region_col, "Label", "yearmon"]).size().reset_index(name="article_count")
+            .rename(columns={region_col: "region", "Label": "label"})
+        )
+
+    @staticmethod
+    def _series_alerts(monthly: pd.DataFrame) -> pd.DataFrame:
+        """Static and dynamic status for every month of each (region, label) series in `monthly`."""
+        period = pd.PeriodIndex(monthly["yearmon"], freq="M")
+        monthly = monthly.assign(month_ord=period.year * 12 + period.month - 1)
+        monthly = monthly.sort_values(["region", "label", "month_ord"]).reset_index(drop=True)
+
+        parts = []
+        for (region, label), group in monthly.groupby(["region", "label"], sort=False):
+            counts = group["article_count"].to_numpy(dtype=float)
+            s_mean, s_std, s_status = static_status(counts)
+            d_mu, d_sd, d_z, d_status = dynamic_status(counts)
+            parts.append(pd.DataFrame({
+                "region": region, "label": label, "yearmon": group["yearmon"].to_numpy(),
+                "article_count": group["article_count"].to_numpy(),
+                "static_mean": s_mean, "static_sd": s_std, "static_status": s_status,
+                "dynamic_mean": d_mu, "dynamic_sd": d_sd, "dynamic_z": d_z, "dynamic_status": d_status,
+            }))
+        if not parts:
+            return pd.DataFrame(columns=["region", "label", "yearmon", "article_count"])
+        return pd.concat(parts, ignore_index=True)
+
+    def extended(self, rows: pd.DataFrame, version: str, partitions: List[str]) -> "AggregateStore":
+        """A new store with `rows` (the articles of appended partitions) added to this one.
+
+        Only the alert series the rows fall in are recomputed; `changed` lists them.
+        """
+        store = AggregateStore.__new__(AggregateStore)
+        store.version, store.partitions, store.previous_version = version, list(partitions), self.version
+        store.cube = (
+            pd.concat([self.cube, self._cube(rows)], ignore_index=True)
+            .groupby(CUBE_DIMENSIONS, observed=True, dropna=False)[["count", "sentiment_sum"]].sum()
+            .reset_index()
+        )
+        store.alerts, store.changed = {}, {}
+        for level, column in ALERT_LEVELS.items():
+            table, new = self.alerts[level], self._monthly(rows, column)
+            keys = new[["region", "label"]].drop_duplicates()
+            touched = (table.merge(keys.assign(touched=True), on=["region", "label"], how="left")["touched"]
+                       .notna().to_numpy())
+            monthly = (
+                pd.concat([table.loc[touched, ["region", "label", "yearmon", "article_count"]], new])
+                .groupby(["region", "label", "yearmon"], as_index=False)["article_count"].sum()
+            )
+            store.alerts[level] = (
+                pd.concat([table[~touched], self._series_alerts(monthly)], ignore_index=True)
+                .sort_values(["region", "label", "yearmon"], kind="stable").reset_index(drop=True)
+            )
+            store.changed[level] = set(keys.itertuples(index=False, name=None))
+        return store
+
+    # -- queries ----------------------------------------------------------------
+
+    def _filtered_cube(self, filters: Dict[str, tuple], start: Optional[str], end: Optional[str]) -> pd.DataFrame:
+        cube = self.cube
+        mask = np.ones(len(cube), dtype=bool)
+        for dim, values in filters.items():
+            mask &= cube[FACET_COLUMNS[dim]].isin(values).to_numpy()
+        if start:
+            mask &= (cube["yearmon"] >= start[:7]).to_numpy()
+        if end:
+            mask &= (cube["yearmon"] <= end[:7]).to_numpy()
+        return cube[mask]
+
+    def timeseries(self, group_by: Optional[str], filters: Dict[str, tuple], start=None, end=None) -> List[dict]:
+        """Monthly article counts and mean sentiment, optionally split by one dimension."""
+        cube = self._filtered_cube(filters, start, end)
+        keys = ["yearmon"] + ([FACET_COLUMNS[group_by]] if group_by else [])
+        out = cube.groupby(keys, observed=True).agg(count=("count", "sum"), sentiment_sum=("sentiment_sum", "sum")).reset_index()
+        out["mean_sentiment"] = (out.pop("sentiment_sum") / out["count"]).round(4)
+        if group_by:
+            out = out.rename(columns={FACET_COLUMNS[group_by]: group_by})
+        return out.sort_values(keys if not group_by else ["yearmon", group_by]).to_dict("records")
+
+    def crosstab(self, rows: str, cols: str, filters: Dict[str, tuple], start=None, end=None,
+                 top_n: Optional[int] = None, include_unknown: bool = False) -> dict:
+        """Label x region style count tables (long format), top_n rows by total."""
+        cube = self._filtered_cube(filters, start, end)
+        row_col, col_col = FACET_COLUMNS[rows], FACET_COLUMNS[cols]
+        if not include_unknown:
+            cube = cube[~cube[row_col].isin(UNKNOWN_REGIONS)]
+        table = cube.groupby([row_col, col_col], observed=True)["count"].sum().reset_index()
+        totals = table.groupby(row_col)["count"].sum().sort_values(ascending=False)
+        if top_n:
+            totals = totals.head(top_n)
+            table = table[table[row_col].isin(totals.index)]
+        table = table.rename(columns={row_col: rows, col_col: cols})
+        return {
+            "rows": totals.index.tolist(),
+            "cells": table.sort_values([rows, cols]).to_dict("records"),
+        }
+
+    def summary(self, filters: Dict[str, tuple], start=None, end=None) -> dict:
+        """Article count, first/last month and most common source and label."""
+        return summarize(self._filtered_cube(filters, start, end), "count")
+
+    def alert_statuses(self, level: str, method: str = "static", regions=None, labels=None,
+                       latest_only: bool = False) -> List[dict]:
+        table = self.alerts[level]
+        if regions:
+            table = table[table["region"].isin(regions)]
+        if labels:
+            table = table[table["label"].isin(labels)]
+        if latest_only and not table.empty:
+            table = table.groupby(["region", "label"], sort=False).tail(1)
+        cols = ["region", "label", "yearmon", "article_count", f"{method}_mean", f"{method}_sd", f"{method}_status"]
+        if method == "dynamic":
+            cols.insert(-1, "dynamic_z")
+        out = table[cols].rename(columns=lambda c: c.replace(f"{method}_", ""))
+        out = out.round(4).astype(object).where(out.notna(), None)
+        return out.to_dict("records")
+
+
+_store: Optional[AggregateStore] = None
+_store_lock = threading.Lock()
+
+
+def appended_rows(store: Optional[AggregateStore], index: ArticleIndex) -> Optional[pd.DataFrame]:
+    """Index rows from partitions appended since `store` was built, or None if the dataset changed otherwise."""
+    if store is None or store.version.split("+")[0] != index.version.split("+")[0]:
+        return None
+    known = set(store.partitions)
+    if not known <= set(index.partitions):
+        return None
+    new = [Path(settings.PARTITIONS_DIR) / name for name in index.partitions if name not in known]
+    if not new:
+        return None
+    ids = pd.concat([make_article_ids(pd.read_parquet(p, columns=["url", "title"])) for p in new])
+    return index.df.iloc[index.positions_for(ids.tolist())]
+
+
+def get_aggregate_store(refresh: bool = False) -> AggregateStore:
+    """Process-wide aggregates, rebuilt (or extended, for appended partitions) when the index changes version."""
+    global _store
+    index = get_article_index(refresh)
+    if _store is not None and _store.version == index.version:
+        return _store
+    with _store_lock:
+        if _store is None or _store.version != index.version:
+            started = time.perf_counter()
+            rows = appended_rows(_store, index)
+            if rows is not None:
+                _store = _store.extended(rows, index.version, index.partitions)
+                action = f"extended with {len(rows):,} articles"
+            else:
+                _store = AggregateStore(index.df, version=index.version, partitions=index.partitions)
+                action = "built"
+            elapsed = time.perf_counter() - started
+            DATASET_LOAD_SECONDS.labels("aggregates").observe(elapsed)
+            logger.info(f"Aggregates {action}: {len(_store.cube):,} cube cells in {elapsed:.2f}s")
+        return _store
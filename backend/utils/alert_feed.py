@@ -0,0 +1,292 @@
+"""
+Live feed of alert status transitions for server-sent events.
+
+A background watcher polls the dataset version and, when an ingestion run
+has changed it, diffs the latest-month status of each (level, method,
+region, label) series against the previous state. When the new version only
+appended partitions, just the series those articles fall in are recomputed
+and diffed. Only series whose status changed produce events. Each event is
+encoded once and fanned out to bounded per-subscriber queues; a subscriber
+that falls too far behind is disconnected and can resume from the replay
+history with Last-Event-ID. Event ids are persisted, so they keep increasing
+across restarts.
+"""
+import asyncio
+import json
+import logging
+import os
+import time
+from collections import deque
+from pathlib import Path
+from typing import Deque, Dict, List, Optional, Set, Tuple
+
+import pandas as pd
+from fastapi.concurrency import run_in_threadpool
+
+from utils.aggregates import ALERT_LEVELS, AggregateStore, get_aggregate_store
+from utils.config import settings
+
+logger = logging.getLogger(__name__)
+
+ALERT_METHODS = ("static", "dynamic")
+SEVERITY = {"Normal": 0, "Alert-high": 1, "Alarm-high": 2}
+SEVERITY_FILTERS = {"all": 0, "alert": 1, "alarm": 2}
+SERIES_KEY = ["level", "method", "region", "label"]
+
+
+def latest_statuses(store: AggregateStore, series: Optional[Dict[str, Set[Tuple[str, str]]]] = None) -> pd.DataFrame:
+    """Most recent month of every alert series, one row per (level, method, region, label).
+
+    `series` limits it to the given (region, label) pairs per level.
+    """
+    parts = []
+    for level in ALERT_LEVELS:
+        table = store.alerts[level]
+        if series is not None:
+            keys = pd.DataFrame(sorted(series.get(level, ())), columns=["region", "label"])
+            table = table.merge(keys, on=["region", "label"])
+        if table.empty or "static_status" not in table.columns:
+            continue
+        latest = table.groupby(["region", "label"], sort=False).tail(1)
+        for method in ALERT_METHODS:
+            parts.append(pd.DataFrame({
+                "level": level, "method": method,
+                "region": latest["region"].to_numpy(), "label": latest["label"].to_numpy(),
+                "yearmon": latest["yearmon"].to_numpy(), "article_count": latest["article_count"].to_numpy(),
+                "status": latest[f"{method}_status"].to_numpy(),
+                "z": latest["dynamic_z"].to_numpy() if method == "dynamic" else float("nan"),
+            }))
+    if not parts:
+        return pd.DataFrame(columns=SERIES_KEY + ["yearmon", "article_count", "status", "z"])
+    return pd.concat(parts, ignore_index=True)
+
+
+def diff_statuses(previous: pd.DataFrame, current: pd.DataFrame, version: str = "") -> List[dict]:
+    """Transition events for series whose latest (month, status) changed.
+
+    A series that moves to a new month counts as a transition unless it was
+    and still is Normal. Severity is the higher of the old and new status, so
+    an alarm clearing reaches the subscribers that saw it raised.
+    """
+    merged = current.merge(previous[SERIES_KEY + ["yearmon", "status"]], on=SERIES_KEY, how="left",
+                           suffixes=("", "_prev"))
+    prev_status = merged["status_prev"].fillna("Normal")
+    changed = (merged["status"] != prev_status) | (
+        (merged["yearmon"] != merged["yearmon_prev"]) & (merged["status"] != "Normal")
+    )
+    merged = merged[changed.to_numpy()]
+    raised_at = time.time()
+    events = []
+    for row, old in zip(merged.itertuples(index=False), prev_status[changed].tolist()):
+        events.append({
+            "level": row.level, "method": row.method, "region": row.region, "label": row.label,
+            "yearmon": row.yearmon, "article_count": int(row.article_count),
+            "previous_status": old, "status": row.status,
+            "severity": max(SEVERITY[old], SEVERITY[row.status]),
+            "z": None if pd.isna(row.z) else round(float(row.z), 4),
+            "dataset_version": version, "raised_at": raised_at,
+        })
+    return events
+
+
+def sse_frame(event: str, data: dict, event_id: Optional[int] = None) -> bytes:
+    head = f"id: {event_id}\n" if event_id is not None else ""
+    return f"{head}event: {event}\ndata: {json.dumps(data, separators=(',', ':'))}\n\n".encode()
+
+
+class Subscription:
+    """One client's filters and pending frames."""
+
+    def __init__(self, levels=None, methods=None, regions=None, labels=None, min_severity: int = 1,
+                 maxsize: int = 256):
+        self.levels = set(levels) if levels else None
+        self.methods = set(methods) if methods else None
+        self.regions = set(regions) if regions else None
+        self.labels = set(labels) if labels else None
+        self.min_severity = min_severity
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=maxsize)
+        self.overflowed = False
+
+    def matches(self, event: dict) -> bool:
+        return (event["severity"] >= self.min_severity
+                and (self.levels is None or event["level"] in self.levels)
+                and (self.methods is None or event["method"] in self.methods)
+                and (self.regions is None or event["region"] in self.regions)
+                and (self.labels is None or event["label"] in self.labels))
+
+    def close(self):
+        """Drop pending frames and wake the reader with the end-of-stream marker."""
+        while not self.queue.empty():
+            self.queue.get_nowait()
+        self.queue.put_nowait(None)
+
+
+class AlertFeed:
+    """Diffs alert states on each new dataset version and fans transitions out to subscribers."""
+
+    def __init__(self, history: int = 1000, queue_size: int = 256, state_path: Optional[str] = None):
+        self.subscribers: Set[Subscription] = set()
+        self.history: Deque[Tuple[int, dict, bytes]] = deque(maxlen=history)
+        self.queue_size = queue_size
+        self.statuses: Optional[pd.DataFrame] = None
+        self.version: Optional[str] = None
+        self.state_path = Path(state_path) if state_path else None
+        self.last_id = self._load_last_id()
+        self.published = 0
+        self.disconnected = 0
+        self._task: Optional[asyncio.Task] = None
+        self._last_error: Optional[str] = None
+
+    # -- event ids --------------------------------------------------------------
+
+    def _load_last_id(self) -> int:
+        if self.state_path is None or not self.state_path.exists():
+            return 0
+        try:
+            return int(json.loads(self.state_path.read_text(encoding="utf-8"))["last_id"])
+        except (OSError, ValueError, KeyError) as e:
+            logger.warning(f"Alert feed state unreadable, event ids restart at 0: {e}")
+            return 0
+
+    def _save_last_id(self):
+        if self.state_path is None:
+            return
+        try:
+            self.state_path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = self.state_path.with_suffix(".tmp")
+            tmp.write_text(json.dumps({"last_id": self.last_id}), encoding="utf-8")
+            os.replace(tmp, self.state_path)
+        except OSError as e:
+            logger.warning(f"Could not save alert feed state: {e}")
+
+    # -- subscribers ------------------------------------------------------------
+
+    def subscribe(self, last_event_id: Optional[int] = None, **filters) -> Tuple[Subscription, List[bytes]]:
+        """Register a subscriber; returns it with the matching frames after last_event_id."""
+        sub = Subscription(maxsize=self.queue_size, **filters)
+        self.subscribers.add(sub)
+        backlog = []
+        if last_event_id is not None:
+            backlog = [frame for event_id, event, frame in self.history
+                       if event_id > last_event_id and sub.matches(event)]
+        return sub, backlog
+
+    def unsubscribe(self, sub: Subscription):
+        self.subscribers.discard(sub)
+
+    def publish(self, events: List[dict]):
+        """Number events, keep them for replay and queue them for matching subscribers."""
+        for event in events:
+            self.last_id += 1
+            event["id"] = self.last_id
+            frame = sse_frame("alert", event, self.last_id)
+            self.history.append((self.last_id, event, frame))
+            for sub in list(self.subscribers):
+                if not sub.matches(event):
+                    continue
+                try:
+                    sub.queue.put_nowait(frame)
+                except asyncio.QueueFull:
+                    sub.overflowed = True
+                    sub.close()
+                    self.subscribers.discard(sub)
+                    self.disconnected += 1
+        self.published += len(events)
+        if events:
+            self._save_last_id()
+
+    def snapshot(self, sub: Subscription) -> List[dict]:
+        """Current non-Normal latest statuses that the subscriber's filters accept."""
+        if self.statuses is None:
+            return []
+        active = self.statuses[self.statuses["status"] != "Normal"]
+        rows = []
+        for row in active.itertuples(index=False):
+            event = {**row._asdict(), "severity": SEVERITY[row.status]}
+            if sub.matches(event):
+                event["article_count"] = int(event["article_count"])
+                event["z"] = None if pd.isna(event["z"]) else round(float(event["z"]), 4)
+                rows.append(event)
+        return rows
+
+    # -- watcher ----------------------------------------------------------------
+
+    async def check(self) -> List[dict]:
+        """Refresh aggregates if the dataset changed and publish the status transitions."""
+        store = await run_in_threadpool(get_aggregate_store, True)
+        if store.version == self.version:
+            return []
+        if self.statuses is not None and store.changed is not None and store.previous_version == self.version:
+            # Appended partitions only: no other series can have changed
+            updated = await run_in_threadpool(latest_statuses, store, store.changed)
+            events = diff_statuses(self.statuses, updated, store.version)
+            stale = self.statuses.merge(updated[SERIES_KEY].assign(stale=True), on=SERIES_KEY,
+                                        how="left")["stale"].notna().to_numpy()
+            current = pd.concat([self.statuses[~stale], updated], ignore_index=True)
+        else:
+            current = await run_in_threadpool(latest_statuses, store)
+            events = [] if self.statuses is None else diff_statuses(self.statuses, current, store.version)
+        self.statuses, self.version = current, store.version
+        if events:
+            self.publish(events)
+            logger.info(f"Alert feed: {len(events)} transitions for {store.version} "
+                        f"to {len(self.subscribers)} subscribers")
+        return events
+
+    async def watch(self, interval: float):
+        while True:
+            try:
+                await self.check()
+                self._last_error = None
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                if str(e) != self._last_error:
+                    logger.warning(f"Alert feed check failed: {e}")
+                self._last_error = str(e)
+            await asyncio.sleep(interval)
+
+    def start(self, interval: float):
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self.watch(interval), name="alert-feed")
+
+    async def stop(self):
+        for sub in list(self.subscribers):
+            sub.close()
+        self.subscribers.clear()
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def stats(self) -> Dict[str, object]:
+        return {
+            "subscribers": len(self.subscribers),
+            "published": self.published,
+            "last_event_id": self.last_id,
+            "disconnected_slow": self.disconnected,
+            "dataset_version": self.version,
+        }
+
+
+_feed: Optional[AlertFeed] = None
+
+
+def get_alert_feed() -> AlertFeed:
+    global _feed
+    if _feed is None:
+        _feed = AlertFeed(history=settings.ALERT_FEED_HISTORY, queue_size=settings.ALERT_FEED_QUEUE_SIZE,
+                          state_path=settings.ALERT_FEED_STATE_PATH)
+    return _feed
+
+
+async def start_alert_feed():
+    get_alert_feed().start(settings.ALERT_FEED_POLL_SECONDS)
+
+
+async def stop_alert_feed():
+    if _feed is not None:
+        await _feed.stop()
@@ -0,0 +1,186 @@
+"""
+Parsing and hashing for bulk article ingestion.
+
+Request bodies are NDJSON (one article per line) or an Arrow IPC stream,
+read in batches. Each batch is normalized into storage columns and given
+64-bit hashes of its normalized URL and of its title + text, which the
+database's dedup index is checked against. Accepted rows are also appended
+to a Parquet partition, which the article index and the dashboard read.
+"""
+import hashlib
+import json
+import os
+import re
+import uuid
+from datetime import datetime
+from pathlib import Path
+from typing import AsyncIterator, Iterator, List, Optional, Tuple
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.ipc as ipc
+import pyarrow.parquet as pq
+
+from utils.dataset import ARTICLE_COLUMNS, make_article_ids
+
+NDJSON_TYPES = {"application/x-ndjson", "application/ndjson", "application/jsonl", "application/json-lines"}
+ARROW_STREAM_TYPES = {"application/vnd.apache.arrow.stream"}
+ARROW_FILE_TYPES = {"application/vnd.apache.arrow.file"}
+
+REQUIRED_FIELDS = ["url", "title", "date"]
+TRACKING_PARAMS = re.compile(r"^(utm_\w+|fbclid|gclid|mc_cid|mc_eid)$", re.IGNORECASE)
+PARTITION_SCHEMA = pa.schema(
+    [(col, pa.timestamp("ns") if col == "date" else pa.float32() if col == "sentiment_score" else pa.string())
+     for col in ARTICLE_COLUMNS]
+)
+
+_URL = re.compile(r"https?://\S+|www\.\S+")
+_WORD = re.compile(r"[a-z]+")
+
+
+class BulkFormatError(ValueError):
+    """Request body cannot be parsed in the declared format."""
+
+
+def normalize_url(url: str) -> str:
+    """Lowercase scheme/host, drop fragment, tracking parameters and trailing slash."""
+    parts = urlsplit(url.strip())
+    query = urlencode(sorted((k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True)
+                             if not TRACKING_PARAMS.match(k)))
+    host = parts.netloc.lower()
+    if host.startswith("www."):
+        host = host[4:]
+    return urlunsplit((parts.scheme.lower(), host, parts.path.rstrip("/") or "/", query, ""))
+
+
+def hash64(text: str) -> int:
+    """Signed 64-bit hash (fits an SQLite INTEGER)."""
+    return int.from_bytes(hashlib.blake2b(text.encode("utf-8"), digest_size=8).digest(), "big", signed=True)
+
+
+def url_hash(url: str) -> int:
+    return hash64(normalize_url(url))
+
+
+def content_hash(title, paragraphs) -> int:
+    """Hash of whitespace- and case-normalized title and body."""
+    return hash64(" ".join(f"{title or ''}\n{paragraphs or ''}".lower().split()))
+
+
+def clean_text(text) -> str:
+    if not isinstance(text, str):
+        return ""
+    return " ".join(_WORD.findall(_URL.sub(" ", text.lower())))
+
+
+def prepare_batch(df: pd.DataFrame) -> Tuple[pd.DataFrame, int]:
+    """Storage-ready rows with article_id and dedup hashes; returns (rows, invalid count)."""
+    received = len(df)
+    for col in REQUIRED_FIELDS:
+        if col not in df.columns:
+            df[col] = None
+    df["date"] = pd.to_datetime(df["date"], errors="coerce", utc=True).dt.tz_localize(None)
+    df = df[df["url"].notna() & (df["url"].astype(str).str.strip() != "")
+            & df["title"].notna() & df["date"].notna()].copy()
+    df["url"] = df["url"].astype(str).str.strip()
+    if "paragraphs" not in df.columns:
+        df["paragraphs"] = None
+    if "paragraphs_cleaned" not in df.columns or df["paragraphs_cleaned"].isna().any():
+        cleaned = df["paragraphs"].map(clean_text)
+        df["paragraphs_cleaned"] = df["paragraphs_cleaned"].fillna(cleaned) if "paragraphs_cleaned" in df.columns else cleaned
+    df["yearmon"] = df["date"].dt.to_period("M").astype(str)
+    df["article_id"] = make_article_ids(df)
+    df["url_hash"] = [url_hash(u) for u in df["url"]]
+    df["content_hash"] = [content_hash(t, p) for t, p in zip(df["title"], df["paragraphs"])]
+    return df, received - len(df)
+
+
+def _records_frame(records: List[dict]) -> pd.DataFrame:
+    return pd.DataFrame.from_records(records) if records else pd.DataFrame(columns=REQUIRED_FIELDS)
+
+
+async def ndjson_batches(chunks: AsyncIterator[bytes], batch_size: int) -> AsyncIterator[Tuple[pd.DataFrame, int]]:
+    """Batches of (frame, malformed line count) from a streamed NDJSON body."""
+    buffer = b""
+    records: List[dict] = []
+    malformed = 0
+
+    def parse(line: bytes):
+        nonlocal malformed
+        line = line.strip()
+        if not line:
+            return
+        try:
+            record = json.loads(line)
+        except ValueError:
+            malformed += 1
+            return
+        if isinstance(record, dict):
+            records.append(record)
+        else:
+            malformed += 1
+
+    async for chunk in chunks:
+        buffer += chunk
+        *lines, buffer = buffer.split(b"\n")
+        for line in lines:
+            parse(line)
+            if len(records) >= batch_size:
+                yield _records_frame(records), malformed
+                records, malformed = [], 0
+    parse(buffer)
+    if records or malformed:
+        yield _records_frame(records), malformed
+
+
+def arrow_batches(body: bytes, batch_size: int, file_format: bool = False) -> Iterator[pd.DataFrame]:
+    """Frames of at most batch_size rows from an Arrow IPC stream or file."""
+    try:
+        reader = ipc.open_file(pa.py_buffer(body)) if file_format else ipc.open_stream(pa.py_buffer(body))
+        batches = (reader.get_batch(i) for i in range(reader.num_record_batches)) if file_format else reader
+        for batch in batches:
+            for offset in range(0, batch.num_rows, batch_size):
+                yield batch.slice(offset, batch_size).to_pandas()
+    except (pa.ArrowInvalid, pa.ArrowIOError) as e:  # ArrowIOError: truncated body
+        raise BulkFormatError(f"Invalid Arrow IPC body: {e}")
+
+
+class BulkPartition:
+    """Rows accepted by one bulk request, appended batch by batch to a Parquet partition.
+
+    The file is written under a hidden temporary name and renamed to
+    bulk-*.parquet in the partitions directory on close, which is when
+    utils.dataset.partition_paths (and the dashboard) start reading it.
+    """
+
+    def __init__(self, partitions_dir: str):
+        self.partitions_dir = Path(partitions_dir)
+        self.name = f"bulk-{datetime.now().strftime('%Y%m%dT%H%M%S')}-{uuid.uuid4().hex[:8]}.parquet"
+        self.rows = 0
+        self._tmp = self.partitions_dir / f".{self.name}.tmp"
+        self._writer: Optional[pq.ParquetWriter] = None
+
+    def write(self, df: pd.DataFrame):
+        if df.empty:
+            return
+        out = df.reindex(columns=ARTICLE_COLUMNS)
+        for col in ARTICLE_COLUMNS:
+            if col == "sentiment_score":
+                out[col] = pd.to_numeric(out[col], errors="coerce").astype("float32")
+            elif col != "date":
+                out[col] = out[col].astype("string")
+        if self._writer is None:
+            self.partitions_dir.mkdir(parents=True, exist_ok=True)
+            self._writer = pq.ParquetWriter(self._tmp, PARTITION_SCHEMA)
+        self._writer.write_table(pa.Table.from_pandas(out, schema=PARTITION_SCHEMA, preserve_index=False))
+        self.rows += len(out)
+
+    def close(self) -> Optional[str]:
+        """Publish the partition; returns its name, or None when nothing was written."""
+        if self._writer is None:
+            return None
+        self._writer.close()
+        self._writer = None
+        os.replace(self._tmp, self.partitions_dir / self.name)
+        return self.name
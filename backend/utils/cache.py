@@ -0,0 +1,273 @@
+"""
+Response cache for API routes.
+
+Uses Redis at settings.REDIS_URL when it is reachable and an in-process LRU
+otherwise. Keys combine a cache generation, the version of the article index
+being served, the route path and the normalized query string, so a rebuilt
+index or a call to invalidate_all() (after ingestion) retires every cached
+response at once.
+Concurrent misses for the same key are collapsed behind a per-key lock, so
+a hot query is computed once and everyone else gets a single cache read.
+"""
+import asyncio
+import functools
+import hashlib
+import inspect
+import logging
+import time
+from collections import OrderedDict
+from typing import Awaitable, Callable, Dict, Optional
+
+from fastapi import Request, Response
+from fastapi.concurrency import run_in_threadpool
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+
+from utils.config import settings
+from utils.dataset import get_article_index
+
+logger = logging.getLogger(__name__)
+
+KEY_PREFIX = "newsapi:cache"
+GENERATION_KEY = f"{KEY_PREFIX}:generation"
+LOCK_TIMEOUT_SECONDS = 30
+LOCK_POLL_SECONDS = 0.05
+
+
+class LRUBackend:
+    """In-process LRU with per-entry TTL."""
+
+    name = "memory"
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._data: "OrderedDict[str, tuple[float, bytes]]" = OrderedDict()
+        self._generation = 0
+
+    async def get(self, key: str) -> Optional[bytes]:
+        entry = self._data.get(key)
+        if entry is None:
+            return None
+        expires, value = entry
+        if expires < time.monotonic():
+            self._data.pop(key, None)
+            return None
+        self._data.move_to_end(key)
+        return value
+
+    async def set(self, key: str, value: bytes, ttl: int):
+        self._data[key] = (time.monotonic() + ttl, value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.max_entries:
+            self._data.popitem(last=False)
+
+    async def generation(self) -> int:
+        return self._generation
+
+    async def bump_generation(self) -> int:
+        self._generation += 1
+        self._data.clear()
+        return self._generation
+
+    async def acquire(self, key: str) -> bool:
+        return True  # per-key asyncio locks already serialize misses in-process
+
+    async def release(self, key: str):
+        pass
+
+
+class RedisBackend:
+    """Shared cache across workers; a SET NX lock collapses misses between processes."""
+
+    name = "redis"
+
+    def __init__(self, client):
+        self.client = client
+
+    async def get(self, key: str) -> Optional[bytes]:
+        return await self.client.get(key)
+
+    async def set(self, key: str, value: bytes, ttl: int):
+        await self.client.set(key, value, ex=ttl)
+
+    async def generation(self) -> int:
+        return int(await self.client.get(GENERATION_KEY) or 0)
+
+    async def bump_generation(self) -> int:
+        return int(await self.client.incr(GENERATION_KEY))
+
+    async def acquire(self, key: str) -> bool:
+        return bool(await self.client.set(f"{key}:lock", b"1", nx=True, ex=LOCK_TIMEOUT_SECONDS))
+
+    async def release(self, key: str):
+        await self.client.delete(f"{key}:lock")
+
+
+class ResponseCache:
+    def __init__(self, backend):
+        self.backend = backend
+        self._locks: Dict[str, list] = {}  # key -> [lock, waiters]
+        self.stats = {"hits": 0, "misses": 0, "coalesced": 0, "errors": 0}
+
+    async def get_or_compute(self, key: str, compute: Callable[[], Awaitable[bytes]], ttl: int) -> bytes:
+        """Cached bytes for key, computing them at most once per key at a time."""
+        value = await self._safe_get(key)
+        if value is not None:
+            self.stats["hits"] += 1
+            return value
+
+        entry = self._locks.setdefault(key, [asyncio.Lock(), 0])
+        entry[1] += 1
+        try:
+            async with entry[0]:
+                # Whoever held the lock before us has usually filled the cache
+                value = await self._safe_get(key)
+                if value is not None:
+                    self.stats["coalesced"] += 1
+                    return value
+                return await self._compute_once(key, compute, ttl)
+        finally:
+            entry[1] -= 1
+            if entry[1] == 0:
+                self._locks.pop(key, None)
+
+    async def _compute_once(self, key, compute, ttl) -> bytes:
+        # Another worker may be computing the same key: wait for its result
+        deadline = time.monotonic() + LOCK_TIMEOUT_SECONDS
+        while not await self._safe_acquire(key):
+            await asyncio.sleep(LOCK_POLL_SECONDS)
+            value = await self._safe_get(key)
+            if value is not None:
+                self.stats["coalesced"] += 1
+                return value
+            if time.monotonic() > deadline:
+                break
+        try:
+            self.stats["misses"] += 1
+            value = await compute()
+            try:
+                await self.backend.set(key, value, ttl)
+            except Exception as e:
+                self.stats["errors"] += 1
+                logger.warning(f"Cache write failed: {e}")
+            return value
+        finally:
+            try:
+                await self.backend.release(key)
+            except Exception:
+                pass
+
+    async def _safe_get(self, key: str) -> Optional[bytes]:
+        try:
+            return await self.backend.get(key)
+        except Exception as e:
+            self.stats["errors"] += 1
+            logger.warning(f"Cache read failed: {e}")
+            return None
+
+    async def _safe_acquire(self, key: str) -> bool:
+        try:
+            return await self.backend.acquire(key)
+        except Exception:
+            return True
+
+    async def key_prefix(self) -> str:
+        try:
+            generation = await self.backend.generation()
+        except Exception:
+            generation = 0
+        # The version the routes will actually serve: the index only rechecks the
+        # file every VERSION_CHECK_SECONDS, so the file's own version can run ahead of it
+        index = await run_in_threadpool(get_article_index)
+        return f"{KEY_PREFIX}:{generation}:{index.version}"
+
+    async def invalidate_all(self) -> int:
+        generation = await self.backend.bump_generation()
+        logger.info(f"Response cache invalidated (generation {generation})")
+        return generation
+
+
+_cache: Optional[ResponseCache] = None
+
+
+async def init_cache() -> ResponseCache:
+    """Connect to Redis if configured and reachable, else use the in-process LRU."""
+    global _cache
+    backend = None
+    if settings.REDIS_URL:
+        try:
+            import redis.asyncio as redis
+
+            client = redis.from_url(settings.REDIS_URL, socket_connect_timeout=1)
+            await client.ping()
+            backend = RedisBackend(client)
+        except Exception as e:
+            logger.warning(f"Redis unavailable ({e}); using in-process response cache")
+    _cache = ResponseCache(backend or LRUBackend(settings.CACHE_MAX_ENTRIES))
+    logger.info(f"Response cache backend: {_cache.backend.name}")
+    return _cache
+
+
+def get_cache() -> ResponseCache:
+    global _cache
+    if _cache is None:
+        _cache = ResponseCache(LRUBackend(settings.CACHE_MAX_ENTRIES))
+    return _cache
+
+
+async def invalidate_all() -> int:
+    """Drop every cached response; call after new data is ingested."""
+    return await get_cache().invalidate_all()
+
+
+def normalized_query(request: Request) -> str:
+    """Sorted, de-duplicated query items without empty values."""
+    items = sorted({(k, v) for k, v in request.query_params.multi_items() if v != ""})
+    return "&".join(f"{k}={v}" for k, v in items)
+
+
+async def cache_key(request: Request) -> str:
+    raw = f"{request.url.path}?{normalized_query(request)}"
+    digest = hashlib.blake2b(raw.encode(), digest_size=16).hexdigest()
+    return f"{await get_cache().key_prefix()}:{digest}"
+
+
+class _Uncacheable(Exception):
+    """Carries a non-200 response past the cache unchanged."""
+
+    def __init__(self, response: Response):
+        self.response = response
+
+
+def cached(ttl: Optional[int] = None, media_type: str = "application/json"):
+    """
+    Cache a route's 200 response bodies. The endpoint must take `request: Request`
+    and return a Response or JSON-serializable data.
+    """
+    def decorator(func):
+        is_async = inspect.iscoroutinefunction(func)
+
+        @functools.wraps(func)
+        async def wrapper(*args, **kwargs):
+            request = kwargs.get("request") or next((a for a in args if isinstance(a, Request)), None)
+            if request is None:
+                raise TypeError(f"{func.__name__} must accept a `request: Request` argument to be cached")
+
+            async def compute() -> bytes:
+                result = await func(*args, **kwargs) if is_async else await run_in_threadpool(func, *args, **kwargs)
+                if not isinstance(result, Response):
+                    result = JSONResponse(jsonable_encoder(result))
+                if result.status_code != 200:
+                    raise _Uncacheable(result)
+                return result.body
+
+            try:
+                body = await get_cache().get_or_compute(
+                    await cache_key(request), compute, ttl or settings.CACHE_TTL_SECONDS
+                )
+            except _Uncacheable as e:
+                return e.response
+            return Response(content=body, media_type=media_type)
+
+        return wrapper
+    return decorator
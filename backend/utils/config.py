@@ -11,14 +11,34 @@ class Settings(BaseSettings):
     # Database
     DATABASE_URL: str = "sqlite:///./data/database/news.db"
     
+    # Processed dataset served by the read API (relative to backend/)
+    DATA_PATH: str = "../data/processed/all_clean_df.parquet"
+    PARTITIONS_DIR: str = "../data/processed/partitions"
+    # Sidecars from the relabel / geotag / rescore scripts, applied like the dashboard does
+    LABELS_PATH: str = "../data/processed/article_labels.parquet"
+    GEOTAGS_PATH: str = "../data/processed/article_geotags.parquet"
+    SENTIMENT_PATH: str = "../data/processed/article_sentiment.parquet"
+    
     # API Keys
     NEWS_API_KEY: str = ""
     OPENAI_API_KEY: str = ""
     
     # Scraping
-    SCRAPE_INTERVAL: int = 3600
+    SCRAPE_INTERVAL: int = 3600  # poll interval for sources with no publication history
+    SCRAPE_MIN_INTERVAL: int = 300
+    SCRAPE_MAX_INTERVAL: int = 86400
+    SCRAPE_TARGET_NEW_PER_POLL: float = 1.0
+    SCRAPE_RATE_HALFLIFE_HOURS: float = 72.0
+    SCRAPE_RATE_WINDOW_DAYS: int = 28
+    SCRAPE_JITTER: float = 0.1
+    SCRAPE_SCHEDULER_ENABLED: bool = False  # run the adaptive scheduler inside the API process
+    SCRAPE_SCHEDULER_TICK_SECONDS: float = 60.0  # Celery beat tick
     MAX_ARTICLES_PER_SOURCE: int = 100
     USER_AGENT: str = "NewsAnalyticsPlatform/1.0"
+    SCRAPER_SOURCES_FILE: str = "config/sources.yaml"
+    SCRAPER_PER_HOST_CONCURRENCY: int = 2
+    SCRAPER_POLITENESS_DELAY: float = 1.0
+    RAW_DATA_DIR: str = "../data/raw"
     
     # Server
     API_HOST: str = "0.0.0.0"
@@ -27,6 +47,15 @@ class Settings(BaseSettings):
     
     # Redis
     REDIS_URL: str = "redis://localhost:6379/0"
+    CACHE_TTL_SECONDS: int = 300
+    CACHE_MAX_ENTRIES: int = 2048
+    
+    # Alert feed (server-sent events)
+    ALERT_FEED_POLL_SECONDS: float = 2.0
+    ALERT_FEED_HISTORY: int = 1000
+    ALERT_FEED_QUEUE_SIZE: int = 256
+    ALERT_FEED_HEARTBEAT_SECONDS: float = 15.0
+    ALERT_FEED_STATE_PATH: str = "../data/processed/alert_feed_state.json"  # last event id, kept across restarts
     
     # Security
     SECRET_KEY: str = "your-secret-key-change-in-production"
@@ -0,0 +1,331 @@
+"""
+Adaptive per-source crawl scheduling.
+
+Each source's publication rate is estimated from article arrival times. It
+is first bootstrapped from the publication dates already in the dataset and
+then updated after every poll with the number of new articles found since
+the previous one. Observations decay with SCRAPE_RATE_HALFLIFE_HOURS, so a
+source that speeds up or goes quiet is tracked within days. The poll interval
+aims at SCRAPE_TARGET_NEW_PER_POLL new articles per poll, bounded by
+SCRAPE_MIN_INTERVAL and SCRAPE_MAX_INTERVAL. A source without history is
+polled every SCRAPE_INTERVAL. Due times carry random jitter so sources drift
+apart, and the sources that fall due together are scraped concurrently in one
+cycle.
+
+Schedule state and poll statistics (wasted polls, freshness lag from
+publication to fetch) persist as JSON next to the scraper state, so the same
+schedule can be driven by the in-process loop or by a Celery beat tick
+(utils/celery_app.py). Time comes from a clock object; with SimulatedClock a
+month of polling replays in well under a second.
+"""
+import asyncio
+import json
+import logging
+import math
+import random
+import time
+from dataclasses import asdict, dataclass, field
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Awaitable, Callable, Dict, Iterable, List, Optional, Tuple
+
+import pandas as pd
+
+from utils.config import settings
+from utils.dataset import partition_paths
+from utils.scraper import Scraper, Source, get_scraper_service, load_sources
+
+logger = logging.getLogger(__name__)
+
+SCHEDULE_FILE = "crawl_schedule.json"
+LAG_SAMPLES = 500
+MIN_SLEEP_SECONDS = 1.0
+
+# fetch(sources) -> {source name: [publication time (epoch s, None if unknown) of each new article]}
+Fetch = Callable[[List[Source]], Awaitable[Dict[str, List[Optional[float]]]]]
+
+
+class SystemClock:
+    def now(self) -> float:
+        return time.time()
+
+    async def sleep(self, seconds: float):
+        await asyncio.sleep(seconds)
+
+
+class SimulatedClock:
+    """Clock that jumps forward when slept on, for replaying a schedule quickly."""
+
+    def __init__(self, start: float = 0.0):
+        self.t = start
+
+    def now(self) -> float:
+        return self.t
+
+    async def sleep(self, seconds: float):
+        self.t += max(0.0, seconds)
+        await asyncio.sleep(0)
+
+
+@dataclass
+class SourceSchedule:
+    events: float = 0.0  # decayed count of articles observed
+    exposure: float = 0.0  # decayed seconds of observation
+    interval: float = 0.0
+    next_due: float = 0.0
+    last_poll: Optional[float] = None
+    polls: int = 0
+    wasted_polls: int = 0
+    articles: int = 0
+    lags: List[float] = field(default_factory=list)  # seconds from publication to fetch, most recent last
+
+
+def _percentile(values: List[float], q: float) -> Optional[float]:
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+def _iso(ts: Optional[float]) -> Optional[str]:
+    if ts is None:
+        return None
+    return datetime.fromtimestamp(ts, timezone.utc).replace(tzinfo=None).isoformat(timespec="seconds")
+
+
+def _epoch(value: Optional[str]) -> Optional[float]:
+    """Epoch seconds of the scraper's naive-UTC ISO dates."""
+    if not value:
+        return None
+    try:
+        return datetime.fromisoformat(value).replace(tzinfo=timezone.utc).timestamp()
+    except ValueError:
+        return None
+
+
+def dataset_arrivals() -> Tuple[Dict[str, List[float]], Optional[float]]:
+    """Publication times per source in the dataset (plus partitions), and the end of the latest day."""
+    path = Path(settings.DATA_PATH)
+    paths = ([path] if path.exists() else []) + partition_paths()
+    if not paths:
+        return {}, None
+    df = pd.concat([pd.read_parquet(p, columns=["retrieve_source", "date"]) for p in paths], ignore_index=True)
+    df["date"] = pd.to_datetime(df["date"], errors="coerce")
+    df = df.dropna()
+    if df.empty:
+        return {}, None
+    seconds = (df["date"] - pd.Timestamp(0)) // pd.Timedelta(seconds=1)
+    arrivals = {name: group.tolist() for name, group in seconds.groupby(df["retrieve_source"])}
+    # dates are day-granular, so the observation window runs to the end of the last day
+    return arrivals, float(seconds.max() + 86400)
+
+
+class CrawlScheduler:
+    """Decides when each source is next polled and keeps per-source poll statistics."""
+
+    def __init__(self, sources: List[Source], fetch: Fetch, state_path: Optional[Path] = None, clock=None,
+                 base_interval: Optional[float] = None, min_interval: Optional[float] = None,
+                 max_interval: Optional[float] = None, target: Optional[float] = None,
+                 halflife_hours: Optional[float] = None, jitter: Optional[float] = None, seed: Optional[int] = None):
+        self.sources = {s.name: s for s in sources}
+        self.fetch = fetch
+        self.state_path = Path(state_path) if state_path else None
+        self.clock = clock or SystemClock()
+        self.base_interval = float(settings.SCRAPE_INTERVAL if base_interval is None else base_interval)
+        self.min_interval = float(settings.SCRAPE_MIN_INTERVAL if min_interval is None else min_interval)
+        self.max_interval = float(settings.SCRAPE_MAX_INTERVAL if max_interval is None else max_interval)
+        self.target = settings.SCRAPE_TARGET_NEW_PER_POLL if target is None else target
+        self.halflife = 3600 * (settings.SCRAPE_RATE_HALFLIFE_HOURS if halflife_hours is None else halflife_hours)
+        self.jitter = settings.SCRAPE_JITTER if jitter is None else jitter
+        self.rng = random.Random(seed)
+        self.schedules: Dict[str, SourceSchedule] = {}
+        self._task: Optional[asyncio.Task] = None
+
+        if self.state_path is not None and self.state_path.exists():
+            saved = json.loads(self.state_path.read_text(encoding="utf-8")).get("sources", {})
+            self.schedules = {name: SourceSchedule(**s) for name, s in saved.items()}
+        now = self.clock.now()
+        for name in self.sources:
+            schedule = self.schedules.setdefault(name, SourceSchedule(next_due=now))  # new sources poll at once
+            self._retune(schedule)
+
+    @classmethod
+    def from_settings(cls, fetch: Optional[Fetch] = None, bootstrap: bool = True) -> "CrawlScheduler":
+        """Scheduler over the configured sources, with state under RAW_DATA_DIR."""
+        scheduler = cls(load_sources(), fetch or scrape_sources, Path(settings.RAW_DATA_DIR) / SCHEDULE_FILE)
+        if bootstrap and any(s.polls == 0 and s.exposure == 0 for s in scheduler.active()):
+            arrivals, end = dataset_arrivals()
+            if end is not None:
+                scheduler.bootstrap(arrivals, end)
+        return scheduler
+
+    def active(self) -> List[SourceSchedule]:
+        return [self.schedules[name] for name in self.sources]
+
+    # -- rate estimate ---------------------------------------------------------------
+
+    def rate(self, schedule: SourceSchedule) -> float:
+        """Articles per second; the prior is `target` articles per SCRAPE_INTERVAL."""
+        return (schedule.events + self.target) / (schedule.exposure + self.base_interval)
+
+    def _retune(self, schedule: SourceSchedule):
+        schedule.interval = min(self.max_interval, max(self.min_interval, self.target / self.rate(schedule)))
+
+    def _observe(self, schedule: SourceSchedule, count: int, elapsed: float):
+        decay = 0.5 ** (elapsed / self.halflife)
+        schedule.events = schedule.events * decay + count
+        schedule.exposure = schedule.exposure * decay + elapsed
+
+    def bootstrap(self, arrivals: Dict[str, Iterable[float]], end: float, window_days: Optional[int] = None):
+        """Seed sources that have no history yet from past publication times (epoch seconds up to `end`)."""
+        window = 86400 * (settings.SCRAPE_RATE_WINDOW_DAYS if window_days is None else window_days)
+        for name, times in arrivals.items():
+            schedule = self.schedules.get(name)
+            if name not in self.sources or schedule.polls or schedule.exposure:
+                continue
+            schedule.events = sum(0.5 ** ((end - t) / self.halflife) for t in times if end - window < t <= end)
+            schedule.exposure = self.halflife / math.log(2) * (1 - 0.5 ** (window / self.halflife))
+            self._retune(schedule)
+
+    # -- polling ---------------------------------------------------------------------
+
+    def _record(self, schedule: SourceSchedule, published: List[Optional[float]], now: float):
+        schedule.polls += 1
+        schedule.articles += len(published)
+        if not published:
+            schedule.wasted_polls += 1
+        # The first poll also picks up the feed's backlog, which says nothing about the rate
+        if schedule.last_poll is not None:
+            self._observe(schedule, len(published), now - schedule.last_poll)
+            lags = [now - t for t in published if t is not None and t > schedule.last_poll]
+            schedule.lags = (schedule.lags + lags)[-LAG_SAMPLES:]
+        schedule.last_poll = now
+        self._retune(schedule)
+        schedule.next_due = now + schedule.interval * (1 + self.rng.uniform(-self.jitter, self.jitter))
+
+    async def run_due(self) -> List[str]:
+        """Poll every source that is due, concurrently; returns their names."""
+        now = self.clock.now()
+        due = [self.sources[name] for name, s in self.schedules.items() if name in self.sources and s.next_due <= now]
+        if not due:
+            return []
+        try:
+            found = await self.fetch(due)
+        except Exception as e:
+            logger.error(f"Scheduled scrape of {', '.join(s.name for s in due)} failed: {e}", exc_info=True)
+            for source in due:
+                schedule = self.schedules[source.name]
+                schedule.next_due = now + schedule.interval
+            self.save()
+            return []
+        done = self.clock.now()
+        for source in due:
+            self._record(self.schedules[source.name], found.get(source.name, []), done)
+        self.save()
+        return [s.name for s in due]
+
+    def next_due(self) -> float:
+        return min((s.next_due for s in self.active()), default=self.clock.now() + self.base_interval)
+
+    async def run(self, until: Optional[float] = None):
+        """Poll sources as they fall due, until `until` (clock time) or cancelled."""
+        while until is None or self.clock.now() < until:
+            await self.run_due()
+            wake = self.next_due() if until is None else min(self.next_due(), until)
+            await self.clock.sleep(max(MIN_SLEEP_SECONDS, wake - self.clock.now()))
+
+    def start(self):
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self.run(), name="crawl-scheduler")
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def save(self):
+        if self.state_path is None:
+            return
+        self.state_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.state_path.with_suffix(".json.tmp")
+        tmp.write_text(json.dumps({"sources": {name: asdict(s) for name, s in self.schedules.items()}}),
+                       encoding="utf-8")
+        tmp.replace(self.state_path)
+
+    def stats(self) -> dict:
+        """Per-source interval, estimated rate, wasted polls and freshness lag, plus totals."""
+        sources = {}
+        for name in sorted(self.sources):
+            s = self.schedules[name]
+            sources[name] = {
+                "interval_seconds": round(s.interval),
+                "articles_per_day": round(self.rate(s) * 86400, 2),
+                "next_due": _iso(s.next_due),
+                "last_poll": _iso(s.last_poll),
+                "polls": s.polls,
+                "wasted_polls": s.wasted_polls,
+                "wasted_ratio": round(s.wasted_polls / s.polls, 3) if s.polls else None,
+                "articles": s.articles,
+                "lag_p50_seconds": _percentile(s.lags, 0.5),
+                "lag_p95_seconds": _percentile(s.lags, 0.95),
+            }
+        active = self.active()
+        polls = sum(s.polls for s in active)
+        wasted = sum(s.wasted_polls for s in active)
+        lags = [lag for s in active for lag in s.lags]
+        return {
+            "sources": sources,
+            "totals": {
+                "polls": polls,
+                "wasted_polls": wasted,
+                "wasted_ratio": round(wasted / polls, 3) if polls else None,
+                "articles": sum(s.articles for s in active),
+                "lag_p50_seconds": _percentile(lags, 0.5),
+                "lag_p95_seconds": _percentile(lags, 0.95),
+            },
+        }
+
+
+async def scrape_sources(sources: List[Source]) -> Dict[str, List[Optional[float]]]:
+    """Fetch: one scrape cycle over `sources`, serialized with manually triggered cycles."""
+    service = get_scraper_service()
+    async with service.lock:
+        articles, stats = await Scraper(sources).run_cycle()
+    service.record(stats)
+    return published_by_source(articles, sources)
+
+
+def published_by_source(articles: List[dict], sources: List[Source]) -> Dict[str, List[Optional[float]]]:
+    """Publication times of scraped articles, grouped by source (empty lists for sources with none)."""
+    found: Dict[str, List[Optional[float]]] = {s.name: [] for s in sources}
+    for a in articles:
+        found[a["retrieve_source"]].append(_epoch(a.get("date")))
+    return found
+
+
+_scheduler: Optional[CrawlScheduler] = None
+
+
+def get_crawl_scheduler() -> CrawlScheduler:
+    global _scheduler
+    if _scheduler is None:
+        _scheduler = CrawlScheduler.from_settings()
+    return _scheduler
+
+
+async def start_crawl_scheduler():
+    if settings.SCRAPE_SCHEDULER_ENABLED:
+        get_crawl_scheduler().start()
+
+
+async def stop_crawl_scheduler():
+    if _scheduler is not None:
+        await _scheduler.stop()
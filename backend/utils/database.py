@@ -0,0 +1,525 @@
+"""
+Async SQLite storage for articles.
+
+The database runs in WAL mode so readers never wait on the writer. Titles
+and raw text are indexed with FTS5 trigrams for search without scans: the same
+case-insensitive substring match the dashboard's keyword filter does. Covering
+indexes serve the (region, label, date) queries behind the dashboards. All
+writes go through one BatchWriter task that groups queued rows into a single
+transaction per batch; bulk ingestion commits each request batch in one
+transaction, checked against a persistent URL/content hash index.
+
+The imported_files table records the dataset file (by name, size and mtime)
+and the partitions already imported. When the article index sees a new
+dataset version, the missing partitions (or a replaced dataset file) are
+imported in the background; until the database covers the index's version,
+keyword search falls back to scanning the index.
+"""
+import asyncio
+import json
+import logging
+import re
+import time
+from contextlib import asynccontextmanager
+from pathlib import Path
+from typing import AsyncIterator, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import aiosqlite
+import numpy as np
+import pandas as pd
+import pyarrow.parquet as pq
+
+from utils.bulk_ingest import content_hash, url_hash
+from utils.config import settings
+from utils.dataset import dataset_version, file_signature, make_article_ids, partition_paths
+
+logger = logging.getLogger(__name__)
+
+ARTICLE_COLUMNS = [
+    "article_id", "date", "title", "url", "retrieve_source", "yearmon",
+    "adm1_name_final", "adm2_name_final", "Label", "sentiment_label", "sentiment_score",
+    "paragraphs", "paragraphs_cleaned",
+]
+
+WRITE_BATCH_SIZE = 500
+WRITE_FLUSH_SECONDS = 0.05
+IMPORT_BATCH_SIZE = 5000
+MIN_FTS_TERM = 3  # trigram index: shorter terms fall back to scanning text
+DATASET_IMPORT = "dataset"  # imported_files key of DATA_PATH; partitions are keyed by file name
+
+PRAGMAS = [
+    "PRAGMA journal_mode=WAL",
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA busy_timeout=5000",
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA mmap_size=268435456",
+    "PRAGMA cache_size=-65536",
+]
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS articles (
+    article_id TEXT PRIMARY KEY,
+    date TEXT NOT NULL,
+    title TEXT,
+    url TEXT,
+    retrieve_source TEXT,
+    yearmon TEXT,
+    adm1_name_final TEXT,
+    adm2_name_final TEXT,
+    Label TEXT,
+    sentiment_label TEXT,
+    sentiment_score REAL,
+    paragraphs TEXT,
+    paragraphs_cleaned TEXT
+);
+
+-- Covering indexes: monthly counts and sentiment per region x label never touch the table
+CREATE INDEX IF NOT EXISTS idx_articles_adm1_label_date
+    ON articles (adm1_name_final, Label, date, sentiment_score);
+CREATE INDEX IF NOT EXISTS idx_articles_adm2_label_date
+    ON articles (adm2_name_final, Label, date, sentiment_score);
+CREATE INDEX IF NOT EXISTS idx_articles_date ON articles (date, article_id);
+
+-- Dedup index for bulk ingestion: 64-bit hashes of the normalized URL and of title + text
+CREATE TABLE IF NOT EXISTS url_hashes (hash INTEGER PRIMARY KEY, article_id TEXT NOT NULL);
+CREATE TABLE IF NOT EXISTS content_hashes (hash INTEGER PRIMARY KEY, article_id TEXT NOT NULL);
+
+-- Dataset file and partitions imported into articles, with the signature they had then
+CREATE TABLE IF NOT EXISTS imported_files (name TEXT PRIMARY KEY, signature TEXT NOT NULL);
+
+CREATE VIRTUAL TABLE IF NOT EXISTS articles_fts USING fts5(
+    title, paragraphs,
+    content='articles', content_rowid='rowid',
+    tokenize='trigram'
+);
+"""
+
+FTS_TRIGGERS = """
+CREATE TRIGGER IF NOT EXISTS articles_fts_insert AFTER INSERT ON articles BEGIN
+    INSERT INTO articles_fts (rowid, title, paragraphs)
+    VALUES (new.rowid, new.title, new.paragraphs);
+END;
+CREATE TRIGGER IF NOT EXISTS articles_fts_delete AFTER DELETE ON articles BEGIN
+    INSERT INTO articles_fts (articles_fts, rowid, title, paragraphs)
+    VALUES ('delete', old.rowid, old.title, old.paragraphs);
+END;
+CREATE TRIGGER IF NOT EXISTS articles_fts_update AFTER UPDATE ON articles BEGIN
+    INSERT INTO articles_fts (articles_fts, rowid, title, paragraphs)
+    VALUES ('delete', old.rowid, old.title, old.paragraphs);
+    INSERT INTO articles_fts (rowid, title, paragraphs)
+    VALUES (new.rowid, new.title, new.paragraphs);
+END;
+"""
+
+DROP_FTS_TRIGGERS = """
+DROP TRIGGER IF EXISTS articles_fts_insert;
+DROP TRIGGER IF EXISTS articles_fts_delete;
+DROP TRIGGER IF EXISTS articles_fts_update;
+"""
+
+UPSERT_SQL = (
+    f"INSERT INTO articles ({', '.join(ARTICLE_COLUMNS)}) "
+    f"VALUES ({', '.join('?' for _ in ARTICLE_COLUMNS)}) "
+    f"ON CONFLICT(article_id) DO UPDATE SET "
+    + ", ".join(f"{c}=excluded.{c}" for c in ARTICLE_COLUMNS if c != "article_id")
+)
+
+INSERT_NEW_SQL = (
+    f"INSERT OR IGNORE INTO articles ({', '.join(ARTICLE_COLUMNS)}) "
+    f"VALUES ({', '.join('?' for _ in ARTICLE_COLUMNS)})"
+)
+EXISTING_HASHES_SQL = "SELECT hash FROM {table} WHERE hash IN (SELECT value FROM json_each(?))"
+
+
+def database_path(url: Optional[str] = None) -> Path:
+    """Filesystem path from a sqlite:/// URL."""
+    url = url or settings.DATABASE_URL
+    if not url.startswith("sqlite:///"):
+        raise ValueError(f"Only sqlite:/// URLs are supported, got {url!r}")
+    return Path(url[len("sqlite:///"):])
+
+
+async def _configure(conn: aiosqlite.Connection, readonly: bool = False):
+    for pragma in PRAGMAS:
+        if readonly and "journal_mode" in pragma:
+            continue
+        await conn.execute(pragma)
+
+
+@asynccontextmanager
+async def connect(path: Optional[Path] = None, readonly: bool = False) -> AsyncIterator[aiosqlite.Connection]:
+    """Open a tuned connection; read-only connections cannot take the write lock."""
+    path = path or database_path()
+    if readonly:
+        conn = await aiosqlite.connect(f"file:{path}?mode=ro", uri=True)
+        await conn.execute("PRAGMA query_only=ON")
+    else:
+        conn = await aiosqlite.connect(path)
+    conn.row_factory = aiosqlite.Row
+    try:
+        await _configure(conn, readonly)
+        yield conn
+    finally:
+        await conn.close()
+
+
+def row_tuple(record: Dict) -> tuple:
+    """Order a record's values as ARTICLE_COLUMNS; dates are stored as ISO text."""
+    values = []
+    for col in ARTICLE_COLUMNS:
+        value = record.get(col)
+        if value is not None and col == "date" and hasattr(value, "isoformat"):
+            value = value.isoformat(sep=" ") if hasattr(value, "hour") else value.isoformat()
+        elif isinstance(value, float) and value != value:  # NaN
+            value = None
+        values.append(value)
+    return tuple(values)
+
+
+def frame_tuples(df: pd.DataFrame) -> List[tuple]:
+    """Vectorized row_tuple for a whole frame with a datetime `date` column."""
+    out = df.reindex(columns=ARTICLE_COLUMNS)
+    out["date"] = out["date"].dt.strftime("%Y-%m-%d %H:%M:%S")
+    out = out.astype(object).where(out.notna(), None)
+    return list(out.itertuples(index=False, name=None))
+
+
+class BatchWriter:
+    """Single writer task: queued rows are committed in batched transactions."""
+
+    def __init__(self, path: Optional[Path] = None, batch_size: int = WRITE_BATCH_SIZE,
+                 flush_seconds: float = WRITE_FLUSH_SECONDS):
+        self.path = path or database_path()
+        self.batch_size = batch_size
+        self.flush_seconds = flush_seconds
+        self._queue: "asyncio.Queue[tuple]" = asyncio.Queue()
+        self._task: Optional[asyncio.Task] = None
+        self.stats = {"rows": 0, "transactions": 0, "errors": 0}
+
+    async def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._run(), name="sqlite-batch-writer")
+
+    async def stop(self):
+        if self._task is not None:
+            await self._queue.join()
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def write(self, records: Iterable[Dict]) -> int:
+        """Queue records and wait until they are committed. Returns the row count."""
+        rows = [row_tuple(r) for r in records]
+        if not rows:
+            return 0
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((rows, future))
+        return await future
+
+    async def _run(self):
+        async with connect(self.path) as conn:
+            while True:
+                batch = [await self._queue.get()]
+                n_rows = len(batch[0][0])
+                deadline = time.monotonic() + self.flush_seconds
+                while n_rows < self.batch_size:
+                    timeout = deadline - time.monotonic()
+                    if timeout <= 0:
+                        break
+                    try:
+                        item = await asyncio.wait_for(self._queue.get(), timeout)
+                    except asyncio.TimeoutError:
+                        break
+                    batch.append(item)
+                    n_rows += len(item[0])
+                await self._commit(conn, batch)
+
+    async def _commit(self, conn: aiosqlite.Connection, batch: List[tuple]):
+        try:
+            await conn.execute("BEGIN IMMEDIATE")
+            for rows, _ in batch:
+                await conn.executemany(UPSERT_SQL, rows)
+            await conn.commit()
+            self.stats["transactions"] += 1
+            for rows, future in batch:
+                self.stats["rows"] += len(rows)
+                if not future.done():
+                    future.set_result(len(rows))
+        except Exception as e:
+            await conn.rollback()
+            self.stats["errors"] += 1
+            logger.error(f"Batch write failed: {e}")
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+        finally:
+            for _ in batch:
+                self._queue.task_done()
+
+
+_writer: Optional[BatchWriter] = None
+_covered_version: Optional[str] = None  # dataset version whose files are all in the database
+_sync_task: Optional[asyncio.Task] = None
+
+
+def database_ready() -> bool:
+    return _writer is not None
+
+
+def get_writer() -> BatchWriter:
+    if _writer is None:
+        raise RuntimeError("Database not initialized; call init_db() first")
+    return _writer
+
+
+async def create_schema(path: Optional[Path] = None):
+    path = path or database_path()
+    path.parent.mkdir(parents=True, exist_ok=True)
+    async with connect(path) as conn:
+        async with conn.execute("SELECT sql FROM sqlite_master WHERE name = 'articles_fts'") as cur:
+            existing = await cur.fetchone()
+        outdated = existing is not None and "trigram" not in existing[0]
+        if outdated:
+            # Earlier schema indexed paragraphs_cleaned with word tokens; reindex the raw text
+            await conn.executescript(DROP_FTS_TRIGGERS + "DROP TABLE articles_fts;")
+        await conn.executescript(SCHEMA + FTS_TRIGGERS)
+        if outdated:
+            started = time.perf_counter()
+            await conn.execute("INSERT INTO articles_fts (articles_fts) VALUES ('rebuild')")
+            logger.info(f"Rebuilt the full-text index in {time.perf_counter() - started:.1f}s")
+        await conn.commit()
+
+
+async def article_count(path: Optional[Path] = None) -> int:
+    async with connect(path, readonly=True) as conn:
+        async with conn.execute("SELECT COUNT(*) FROM articles") as cur:
+            return (await cur.fetchone())[0]
+
+
+async def init_db():
+    """Create the schema, import the dataset files the database does not hold yet and start the writer."""
+    global _writer, _covered_version
+    path = database_path()
+    await create_schema(path)
+    _covered_version = await sync_imports(path)
+    await backfill_hashes(path)
+    _writer = BatchWriter(path)
+    await _writer.start()
+
+
+async def close_db():
+    global _writer, _sync_task
+    if _sync_task is not None:
+        _sync_task.cancel()
+        _sync_task = None
+    if _writer is not None:
+        await _writer.stop()
+        _writer = None
+
+
+async def import_parquet(data_path, path: Optional[Path] = None, batch_size: int = IMPORT_BATCH_SIZE,
+                         rebuild_fts: bool = True) -> int:
+    """Bulk-load a Parquet dataset: plain inserts, then one FTS rebuild at the end.
+
+    With rebuild_fts off the triggers index each row as it is written, which
+    is cheaper for a partition that is small next to the table.
+    """
+    path = path or database_path()
+    started = time.perf_counter()
+    parquet = pq.ParquetFile(data_path)
+    available = set(parquet.schema_arrow.names)
+    columns = [c for c in ARTICLE_COLUMNS if c in available]
+    total = 0
+    async with connect(path) as conn:
+        if rebuild_fts:
+            await conn.executescript(DROP_FTS_TRIGGERS)
+        try:
+            for batch in parquet.iter_batches(batch_size=batch_size, columns=columns):
+                df = batch.to_pandas()
+                if "article_id" not in df.columns:
+                    df["article_id"] = make_article_ids(df)
+                if "yearmon" not in df.columns:
+                    df["yearmon"] = pd.to_datetime(df["date"], errors="coerce").dt.to_period("M").astype(str)
+                df = df.dropna(subset=["date"])
+                await conn.execute("BEGIN")
+                await conn.executemany(UPSERT_SQL, [row_tuple(r) for r in df.to_dict("records")])
+                await conn.commit()
+                total += len(df)
+            if rebuild_fts:
+                await conn.execute("INSERT INTO articles_fts (articles_fts) VALUES ('rebuild')")
+                await conn.execute("ANALYZE")
+                await conn.commit()
+        finally:
+            if rebuild_fts:
+                await conn.executescript(FTS_TRIGGERS)
+                await conn.commit()
+    logger.info(f"Imported {total:,} articles from {data_path} in {time.perf_counter() - started:.1f}s")
+    return total
+
+
+async def sync_imports(path: Optional[Path] = None) -> str:
+    """Import the dataset file if it changed since it was imported, and partitions not imported yet.
+
+    Rows are upserted on article_id, so importing a file again is harmless.
+    Returns the dataset version the database now covers.
+    """
+    path = path or database_path()
+    data_path = Path(settings.DATA_PATH)
+    partitions = partition_paths()
+    version = dataset_version(data_path, partitions)
+    async with connect(path, readonly=True) as conn:
+        async with conn.execute("SELECT name, signature FROM imported_files") as cur:
+            imported = {row[0]: row[1] for row in await cur.fetchall()}
+    pending = [(p.name, p, False) for p in partitions if p.name not in imported]
+    if data_path.exists() and imported.get(DATASET_IMPORT) != file_signature(data_path):
+        pending.insert(0, (DATASET_IMPORT, data_path, True))
+    for name, file, rebuild_fts in pending:
+        signature = file_signature(file)
+        await import_parquet(file, path, rebuild_fts=rebuild_fts)
+        async with connect(path) as conn:
+            await conn.execute("INSERT OR REPLACE INTO imported_files VALUES (?, ?)", (name, signature))
+            await conn.commit()
+    if pending:
+        await backfill_hashes(path)
+    return version
+
+
+async def _sync_covered():
+    global _covered_version
+    try:
+        _covered_version = await sync_imports()
+    except Exception as e:
+        logger.error(f"Importing new dataset files failed: {e}")
+
+
+def database_covers(version: str) -> bool:
+    """Whether every file of dataset `version` is in the database; if not, start importing them."""
+    global _sync_task
+    if version == _covered_version:
+        return True
+    if _sync_task is None or _sync_task.done():
+        _sync_task = asyncio.create_task(_sync_covered(), name="sqlite-import-sync")
+    return False
+
+
+async def backfill_hashes(path: Optional[Path] = None, batch_size: int = IMPORT_BATCH_SIZE) -> int:
+    """Fill the dedup index for articles stored before it existed (or imported in bulk)."""
+    path = path or database_path()
+    async with connect(path) as conn:
+        async with conn.execute(
+            "SELECT (SELECT COUNT(*) FROM articles) - (SELECT COUNT(*) FROM url_hashes)"
+        ) as cur:
+            if (await cur.fetchone())[0] <= 0:
+                return 0
+        started = time.perf_counter()
+        total = 0
+        async with conn.execute(
+            "SELECT article_id, url, title, paragraphs FROM articles "
+            "WHERE article_id NOT IN (SELECT article_id FROM url_hashes)"
+        ) as cur:
+            while rows := await cur.fetchmany(batch_size):
+                await conn.executemany("INSERT OR IGNORE INTO url_hashes VALUES (?, ?)",
+                                       [(url_hash(r[1] or ""), r[0]) for r in rows])
+                await conn.executemany("INSERT OR IGNORE INTO content_hashes VALUES (?, ?)",
+                                       [(content_hash(r[2], r[3]), r[0]) for r in rows])
+                total += len(rows)
+        await conn.commit()
+    logger.info(f"Indexed {total:,} articles for dedup in {time.perf_counter() - started:.1f}s")
+    return total
+
+
+async def _existing_hashes(conn: aiosqlite.Connection, table: str, hashes: Sequence[int]) -> set:
+    async with conn.execute(EXISTING_HASHES_SQL.format(table=table), (json.dumps(list(hashes)),)) as cur:
+        return {row[0] for row in await cur.fetchall()}
+
+
+async def insert_new_articles(conn: aiosqlite.Connection, df: pd.DataFrame) -> Tuple[Dict[str, int], pd.DataFrame]:
+    """Insert rows whose URL and content are not stored yet, in one transaction.
+
+    df needs the storage columns plus url_hash and content_hash (see
+    utils.bulk_ingest.prepare_batch). The dedup check runs under the write
+    lock, so concurrent bulk requests cannot both accept the same article.
+    Returns the counts and the accepted rows.
+    """
+    counts = {"accepted": 0, "duplicate_url": 0, "duplicate_content": 0}
+    if df.empty:
+        return counts, df
+    await conn.execute("BEGIN IMMEDIATE")
+    try:
+        seen_urls = await _existing_hashes(conn, "url_hashes", df["url_hash"].tolist())
+        seen_content = await _existing_hashes(conn, "content_hashes", df["content_hash"].tolist())
+        keep = []
+        for i, (u, c) in enumerate(zip(df["url_hash"], df["content_hash"])):
+            if u in seen_urls:
+                counts["duplicate_url"] += 1
+            elif c in seen_content:
+                counts["duplicate_content"] += 1
+            else:
+                keep.append(i)
+                seen_urls.add(u)
+                seen_content.add(c)
+        new = df.iloc[keep]
+        await conn.executemany(INSERT_NEW_SQL, frame_tuples(new))
+        await conn.executemany("INSERT OR IGNORE INTO url_hashes VALUES (?, ?)",
+                               zip(new["url_hash"].tolist(), new["article_id"]))
+        await conn.executemany("INSERT OR IGNORE INTO content_hashes VALUES (?, ?)",
+                               zip(new["content_hash"].tolist(), new["article_id"]))
+        await conn.commit()
+    except Exception:
+        await conn.rollback()
+        raise
+    counts["accepted"] = len(keep)
+    return counts, new
+
+
+def fts_query(keyword: str) -> Optional[str]:
+    """Dashboard keyword syntax ("a OR b") as an FTS5 query of quoted substrings.
+
+    None when a term is shorter than MIN_FTS_TERM: the trigram index cannot
+    match it, so the caller has to scan text instead.
+    """
+    terms = [t.strip().strip('"').strip("'") for t in re.split(r"\s+OR\s+", keyword.strip(), flags=re.IGNORECASE)]
+    terms = [t for t in terms if t]
+    if not terms or any(len(t) < MIN_FTS_TERM for t in terms):
+        return None
+    return " OR ".join('"' + t.replace('"', '""') + '"' for t in terms)
+
+
+async def search_article_ids(keyword: str, limit: Optional[int] = None, path: Optional[Path] = None,
+                             ranked: bool = True) -> List[str]:
+    """Article ids matching a keyword query via the FTS index, best match first unless `ranked` is off."""
+    query = fts_query(keyword)
+    if not query:
+        return []
+    sql = "SELECT a.article_id FROM articles_fts f JOIN articles a ON a.rowid = f.rowid WHERE articles_fts MATCH ?"
+    if ranked:
+        sql += " ORDER BY bm25(articles_fts)"
+    params: Sequence = (query,)
+    if limit:
+        sql += " LIMIT ?"
+        params = (query, limit)
+    async with connect(path, readonly=True) as conn:
+        async with conn.execute(sql, params) as cur:
+            return [row[0] for row in await cur.fetchall()]
+
+
+async def search_positions(index, keyword: str) -> Optional[np.ndarray]:
+    """Index positions of the articles matching `keyword`, or None if the FTS index cannot serve it
+    (a term too short for trigrams, or a dataset version not fully imported yet).
+
+    The id set is fetched once per keyword and kept in the index's cache, so
+    paging through results does not repeat the search. A new dataset version
+    brings a new index, which starts with an empty cache.
+    """
+    query = fts_query(keyword)
+    if query is None or not database_covers(index.version):
+        return None
+    key = ("fts", query.lower())
+    positions = index.cache_get(key)
+    if positions is None:
+        positions = index.positions_for(await search_article_ids(keyword, ranked=False))
+        index.cache_put(key, positions)
+    return positions
@@ -0,0 +1,384 @@
+"""
+In-memory article index over the Parquet dataset.
+
+Rows are held sorted by (date, article_id) with an inverted index per filter
+dimension, so a query intersects small position arrays instead of scanning
+the frame, and keyset pagination is a binary search on the sort key.
+"""
+import json
+import logging
+import re
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from utils.config import settings
+from utils.metrics import DATASET_LOAD_SECONDS
+
+logger = logging.getLogger(__name__)
+
+# Filter dimension -> dataset column (same dimensions as the dashboard's apply_filters)
+FACET_COLUMNS = {
+    "source": "retrieve_source",
+    "sentiment": "sentiment_label",
+    "label": "Label",
+    "adm1": "adm1_name_final",
+    "adm2": "adm2_name_final",
+}
+
+TEXT_COLUMNS = ["paragraphs", "paragraphs_cleaned"]
+ARTICLE_COLUMNS = [
+    "article_id", "date", "title", "url", "retrieve_source", "yearmon", "year_quarter",
+    "adm1_name_final", "adm2_name_final", "Label", "Labels", "sentiment_label", "sentiment_score",
+    "paragraphs", "paragraphs_cleaned",
+]
+DEFAULT_FIELDS = [c for c in ARTICLE_COLUMNS if c not in TEXT_COLUMNS]
+
+KEYWORD_SCAN_CHUNK = 512
+FILTER_CACHE_SIZE = 256
+
+
+def partition_paths() -> List[Path]:
+    """Partitions committed by the ingestion pipeline, oldest first, then those written by bulk ingestion."""
+    partitions_dir = Path(settings.PARTITIONS_DIR)
+    checkpoint = partitions_dir / "_checkpoint.json"
+    names = json.loads(checkpoint.read_text(encoding="utf-8")).get("partitions", []) if checkpoint.exists() else []
+    paths = [partitions_dir / name for name in names if (partitions_dir / name).exists()]
+    return paths + sorted(partitions_dir.glob("bulk-*.parquet"))
+
+
+def sidecar_paths() -> List[Path]:
+    return [Path(p) for p in (settings.LABELS_PATH, settings.GEOTAGS_PATH, settings.SENTIMENT_PATH)]
+
+
+def file_signature(path: Path) -> str:
+    stat = path.stat()
+    return f"{path.name}:{stat.st_size}:{int(stat.st_mtime)}"
+
+
+def dataset_version(path: Path, partitions: Optional[List[Path]] = None) -> str:
+    """Fingerprint (name, size, mtime) of the dataset file and its sidecars, plus its ingested partitions."""
+    if not path.exists():
+        return "missing"
+    version = ";".join(file_signature(p) for p in [path, *sidecar_paths()] if p.exists())
+    partitions = partition_paths() if partitions is None else partitions
+    if partitions:
+        version += f"+{len(partitions)}p:{partitions[-1].stem}"
+    return version
+
+
+def make_article_ids(df: pd.DataFrame) -> pd.Series:
+    """Stable 16-hex-digit ids hashed from URL and title (matches the dashboard)."""
+    hashed = pd.util.hash_pandas_object(df[["url", "title"]].astype(str), index=False)
+    return hashed.map("{:016x}".format)
+
+
+def load_articles(path: Path, partitions: Optional[List[Path]] = None) -> pd.DataFrame:
+    """Read and normalize the dataset (plus partitions) the same way the dashboard's load_data does."""
+    df = pd.read_parquet(path)
+    partitions = partition_paths() if partitions is None else partitions
+    if partitions:
+        df = pd.concat([df, *(pd.read_parquet(p) for p in partitions)], ignore_index=True)
+    df["date"] = pd.to_datetime(df["date"], errors="coerce")
+    df["adm1_name_final"] = df["adm1_name_final"].fillna("Unknown Region")
+    df["adm2_name_final"] = df["adm2_name_final"].fillna("Unknown County")
+    df["Label"] = df["Label"].fillna("Uncategorized")
+    df["yearmon"] = df["date"].dt.to_period("M").astype(str)
+    df["sentiment_score"] = pd.to_numeric(df["sentiment_score"], errors="coerce")
+    df = df.dropna(subset=["date", "sentiment_score"])
+    df["article_id"] = make_article_ids(df)
+
+    # Prefer labels from the latest taxonomy run over the stored ones
+    if Path(settings.LABELS_PATH).exists():
+        labels = pd.read_parquet(settings.LABELS_PATH, columns=["article_id", "Label", "Labels"])
+        df = df.drop(columns=["Labels"], errors="ignore").merge(labels, on="article_id", how="left", suffixes=("", "_new"))
+        df["Label"] = df.pop("Label_new").fillna(df["Label"])
+        df["Labels"] = df["Labels"].fillna(df["Label"])
+
+    # Gazetteer state and county replace the stored pair wherever the gazetteer found a state
+    if Path(settings.GEOTAGS_PATH).exists():
+        geo = pd.read_parquet(settings.GEOTAGS_PATH, columns=["article_id", "adm1_name_final", "adm2_name_final"])
+        df = df.merge(geo, on="article_id", how="left", suffixes=("", "_geo"))
+        found = df["adm1_name_final_geo"].notna() & (df["adm1_name_final_geo"] != "Unknown Region")
+        df["adm1_name_final"] = df["adm1_name_final"].where(~found, df["adm1_name_final_geo"])
+        df["adm2_name_final"] = df["adm2_name_final"].where(~found, df["adm2_name_final_geo"].fillna("Unknown County"))
+        df = df.drop(columns=["adm1_name_final_geo", "adm2_name_final_geo"])
+
+    # Rescored sentiment replaces the stored scores
+    if Path(settings.SENTIMENT_PATH).exists():
+        scored = pd.read_parquet(settings.SENTIMENT_PATH, columns=["article_id", "sentiment_label", "sentiment_score"])
+        df = df.merge(scored, on="article_id", how="left", suffixes=("", "_new"))
+        for col in ("sentiment_label", "sentiment_score"):
+            df[col] = df.pop(f"{col}_new").fillna(df[col])
+    return df
+
+
+def summarize(rows: pd.DataFrame, weight: Optional[str] = None) -> dict:
+    """Summary metrics of article rows, or of cube cells when `weight` names their count column."""
+    counts = rows[weight] if weight else pd.Series(1, index=rows.index)
+    rows = rows[(counts > 0).to_numpy()]
+    if rows.empty:
+        return {"total": 0, "first_month": None, "last_month": None, "top_source": None, "top_label": None}
+    counts = counts.loc[rows.index]
+
+    def top(column: str) -> str:
+        return str(counts.groupby(rows[column].to_numpy()).sum().idxmax())
+
+    return {
+        "total": int(counts.sum()),
+        "first_month": str(rows["yearmon"].min()),
+        "last_month": str(rows["yearmon"].max()),
+        "top_source": top(FACET_COLUMNS["source"]),
+        "top_label": top(FACET_COLUMNS["label"]),
+    }
+
+
+class ArticleIndex:
+    """Read-only, thread-safe index of the dataset sorted by (date, article_id) ascending."""
+
+    def __init__(self, df: pd.DataFrame, version: str = "", partitions: Sequence[str] = ()):
+        self.version = version
+        self.partitions = list(partitions)  # names of the ingested partitions included
+        df = df.sort_values(["date", "article_id"], kind="stable").reset_index(drop=True)
+        self.df = df
+        self.size = len(df)
+        self.dates = df["date"].values.astype("datetime64[ns]").astype(np.int64)
+        self.ids = df["article_id"].to_numpy(dtype=object)
+        self.positions_by_id = {aid: i for i, aid in enumerate(self.ids)}
+        self.facets: Dict[str, Dict[str, np.ndarray]] = {}
+        for dim, column in FACET_COLUMNS.items():
+            if column not in df.columns:
+                continue
+            codes, uniques = pd.factorize(df[column], sort=False)
+            order = np.argsort(codes, kind="stable")
+            bounds = np.searchsorted(codes[order], np.arange(len(uniques) + 1))
+            self.facets[dim] = {
+                str(value): order[bounds[i]:bounds[i + 1]].astype(np.int64)
+                for i, value in enumerate(uniques)
+            }
+        self._cache: "OrderedDict[tuple, np.ndarray]" = OrderedDict()
+        self._cache_lock = threading.Lock()
+
+    # -- filtering ------------------------------------------------------------
+
+    def facet_values(self, dim: str) -> List[str]:
+        return sorted(self.facets.get(dim, {}))
+
+    def _date_bounds(self, start: Optional[pd.Timestamp], end: Optional[pd.Timestamp]) -> Tuple[int, int]:
+        lo, hi = 0, self.size
+        if start is not None:
+            lo = int(np.searchsorted(self.dates, pd.Timestamp(start).value, side="left"))
+        if end is not None:
+            # Inclusive end date: everything before the following midnight
+            end_ns = (pd.Timestamp(end).normalize() + pd.Timedelta(days=1)).value
+            hi = int(np.searchsorted(self.dates, end_ns, side="left"))
+        return lo, max(lo, hi)
+
+    def cache_get(self, key) -> Optional[np.ndarray]:
+        """Position array cached under `key` (filter sets, full-text search hits), or None."""
+        with self._cache_lock:
+            hit = self._cache.get(key)
+            if hit is not None:
+                self._cache.move_to_end(key)
+            return hit
+
+    def cache_put(self, key, positions: np.ndarray):
+        with self._cache_lock:
+            self._cache[key] = positions
+            if len(self._cache) > FILTER_CACHE_SIZE:
+                self._cache.popitem(last=False)
+
+    def _candidates(self, filters: Dict[str, Tuple[str, ...]], start, end) -> np.ndarray:
+        """Sorted positions matching the facet and date filters (cached per filter set)."""
+        key = (tuple(sorted(filters.items())), start, end)
+        hit = self.cache_get(key)
+        if hit is not None:
+            return hit
+
+        lo, hi = self._date_bounds(start, end)
+        result: Optional[np.ndarray] = None
+        for dim, values in filters.items():
+            postings = [self.facets.get(dim, {}).get(v) for v in values]
+            postings = [p for p in postings if p is not None]
+            merged = np.unique(np.concatenate(postings)) if postings else np.empty(0, dtype=np.int64)
+            result = merged if result is None else np.intersect1d(result, merged, assume_unique=True)
+        if result is None:
+            result = np.arange(lo, hi, dtype=np.int64)
+        else:
+            result = result[(result >= lo) & (result < hi)]
+
+        self.cache_put(key, result)
+        return result
+
+    def _position_before(self, cursor: Tuple[int, str]) -> int:
+        """Number of rows whose (date, id) sorts strictly before the cursor."""
+        date_ns, article_id = cursor
+        lo = int(np.searchsorted(self.dates, date_ns, side="left"))
+        hi = int(np.searchsorted(self.dates, date_ns, side="right"))
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self.ids[mid] < article_id:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+
+    @staticmethod
+    def _keyword_terms(keyword: Optional[str]) -> List[str]:
+        if not keyword or not keyword.strip():
+            return []
+        parts = re.split(r"\s+OR\s+", keyword.strip(), flags=re.IGNORECASE)
+        return [t.strip().strip('"').strip("'").lower() for t in parts if t.strip().strip('"').strip("'")]
+
+    def _matches_keyword(self, positions: np.ndarray, terms: Sequence[str]) -> np.ndarray:
+        chunk = self.df.iloc[positions]
+        text = (chunk["paragraphs"].astype(str) + " " + chunk["title"].astype(str)).str.lower()
+        mask = np.zeros(len(positions), dtype=bool)
+        for term in terms:
+            mask |= text.str.contains(term, regex=False).to_numpy()
+        return positions[mask]
+
+    def positions_for(self, article_ids: Sequence[str]) -> np.ndarray:
+        """Sorted positions of the given ids (unknown ids are dropped)."""
+        found = [self.positions_by_id[a] for a in article_ids if a in self.positions_by_id]
+        return np.unique(np.asarray(found, dtype=np.int64))
+
+    def page(self, filters: Dict[str, Tuple[str, ...]], start=None, end=None, keyword: Optional[str] = None,
+             cursor: Optional[Tuple[int, str]] = None, limit: int = 50,
+             restrict: Optional[np.ndarray] = None) -> Tuple[pd.DataFrame, Optional[Tuple[int, str]], Optional[int]]:
+        """Newest-first page after `cursor`. Returns (rows, next_cursor, total or None).
+
+        `restrict` limits results to precomputed positions (e.g. full-text
+        search hits) instead of scanning text for `keyword`.
+        """
+        candidates = self._candidates(filters, start, end)
+        if restrict is not None:
+            candidates = np.intersect1d(candidates, restrict, assume_unique=True)
+        stop = len(candidates)
+        if cursor is not None:
+            stop = int(np.searchsorted(candidates, self._position_before(cursor), side="left"))
+
+        terms = self._keyword_terms(keyword)
+        if not terms:
+            picked = candidates[max(0, stop - limit):stop][::-1]
+            total = len(candidates)
+        else:
+            # Walk backwards from the cursor in chunks until the page is full;
+            # deep pages cost the same as the first one.
+            found: List[np.ndarray] = []
+            n_found = 0
+            while stop > 0 and n_found < limit:
+                chunk = candidates[max(0, stop - KEYWORD_SCAN_CHUNK):stop][::-1]
+                hits = self._matches_keyword(chunk, terms)
+                found.append(hits)
+                n_found += len(hits)
+                stop -= len(chunk)
+            picked = np.concatenate(found)[:limit] if found else np.empty(0, dtype=np.int64)
+            total = None
+
+        rows = self.df.iloc[picked]
+        next_cursor = None
+        if len(picked) == limit:
+            last = picked[-1]
+            # Only hand out a cursor if something older could still match
+            if terms or int(np.searchsorted(candidates, last)) > 0:
+                next_cursor = (int(self.dates[last]), str(self.ids[last]))
+        return rows, next_cursor, total
+
+    def iter_positions(self, filters: Dict[str, Tuple[str, ...]], start=None, end=None,
+                       keyword: Optional[str] = None, restrict: Optional[np.ndarray] = None,
+                       batch_size: int = 10000) -> Iterator[np.ndarray]:
+        """Every matching position, newest first, in chunks of at most batch_size.
+
+        Only one chunk of rows is ever materialized, so exports of any size
+        run in bounded memory.
+        """
+        candidates = self._candidates(filters, start, end)
+        if restrict is not None:
+            candidates = np.intersect1d(candidates, restrict, assume_unique=True)
+        terms = self._keyword_terms(keyword)
+        for stop in range(len(candidates), 0, -batch_size):
+            chunk = candidates[max(0, stop - batch_size):stop][::-1]
+            if terms:
+                chunk = self._matches_keyword(chunk, terms)
+            if len(chunk):
+                yield chunk
+
+    def summary(self, filters: Dict[str, Tuple[str, ...]], start=None, end=None, keyword: Optional[str] = None,
+                restrict: Optional[np.ndarray] = None) -> dict:
+        """summarize() over the matching rows (for slices the monthly cube cannot express)."""
+        chunks = list(self.iter_positions(filters, start, end, keyword=keyword, restrict=restrict))
+        positions = np.concatenate(chunks) if chunks else np.empty(0, dtype=np.int64)
+        return summarize(self.df.iloc[positions][["yearmon", FACET_COLUMNS["source"], FACET_COLUMNS["label"]]])
+
+    def top_k(self, filters: Dict[str, Tuple[str, ...]], start=None, end=None, query: Optional[str] = None,
+              k: int = 15, keyword: Optional[str] = None, restrict: Optional[np.ndarray] = None) -> pd.DataFrame:
+        """The k best matching rows for `query`, ranked like the dashboard's retrieve_top_k.
+
+        Rows score the number of times query terms (3+ characters) occur in
+        title + text, newest first on ties; without terms the newest k win.
+        Text is scored one chunk at a time, keeping only the best k so far.
+        """
+        terms = [t.lower() for t in re.findall(r"[A-Za-z0-9_]+", query or "") if len(t) >= 3]
+        chunks = self.iter_positions(filters, start, end, keyword=keyword, restrict=restrict,
+                                     batch_size=KEYWORD_SCAN_CHUNK * 8)
+        best = np.empty(0, dtype=np.int64)
+        if not terms:
+            for chunk in chunks:
+                best = np.concatenate([best, chunk[:k - len(best)]])
+                if len(best) >= k:
+                    break
+            return self.df.iloc[best]
+        scores = np.empty(0, dtype=np.int64)
+        for chunk in chunks:
+            rows = self.df.iloc[chunk]
+            text = (rows["title"].astype(str) + " " + rows["paragraphs"].astype(str)).str.lower()
+            chunk_scores = sum(text.str.count(term).to_numpy(dtype=np.int64) for term in terms)
+            positions, combined = np.concatenate([best, chunk]), np.concatenate([scores, chunk_scores])
+            keep = np.lexsort((-positions, -combined))[:k]  # score, then (date, id), descending
+            best, scores = positions[keep], combined[keep]
+        return self.df.iloc[best]
+
+    def get(self, article_id: str) -> Optional[pd.Series]:
+        pos = self.positions_by_id.get(article_id)
+        return None if pos is None else self.df.iloc[pos]
+
+
+_index: Optional[ArticleIndex] = None
+_index_lock = threading.Lock()
+_last_check = 0.0
+VERSION_CHECK_SECONDS = 30
+
+
+def get_article_index(refresh: bool = False) -> ArticleIndex:
+    """Process-wide index, rebuilt when the dataset file changes.
+
+    The version is checked at most every VERSION_CHECK_SECONDS unless refresh is set.
+    """
+    global _index, _last_check
+    path = Path(settings.DATA_PATH)
+    now = time.monotonic()
+    if _index is not None and not refresh and now - _last_check < VERSION_CHECK_SECONDS:
+        return _index
+    with _index_lock:
+        _last_check = now
+        partitions = partition_paths()
+        version = dataset_version(path, partitions)
+        if _index is None or _index.version != version:
+            started = time.perf_counter()
+            _index = ArticleIndex(load_articles(path, partitions), version=version,
+                                  partitions=[p.name for p in partitions])
+            elapsed = time.perf_counter() - started
+            DATASET_LOAD_SECONDS.labels("index").observe(elapsed)
+            logger.info(f"Article index built: {_index.size:,} rows in {elapsed:.2f}s ({version})")
+        return _index
+
+
+def loaded_article_index() -> Optional[ArticleIndex]:
+    """The current index if one has been built, without checking the dataset version."""
+    return _index
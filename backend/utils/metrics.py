@@ -0,0 +1,97 @@
+"""
+Prometheus metrics for the API.
+
+Request latency and in-flight counts are recorded by a plain ASGI middleware:
+one histogram observation per request, labelled by route template so ids in
+paths do not multiply series. Cache, dataset and alert-feed figures are read
+from their owners only when /metrics is scraped, so they cost nothing on the
+request path. Process memory and CPU come from prometheus_client's default
+process collector, one set per worker process.
+"""
+import time
+
+from prometheus_client import REGISTRY, CONTENT_TYPE_LATEST, Gauge, Histogram, generate_latest
+from prometheus_client.core import CounterMetricFamily, GaugeMetricFamily
+from prometheus_client.registry import Collector
+
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+REQUEST_LATENCY = Histogram(
+    "api_request_duration_seconds", "Time to complete a request, including streamed bodies",
+    ["method", "route", "status"], buckets=LATENCY_BUCKETS,
+)
+REQUESTS_IN_PROGRESS = Gauge("api_requests_in_progress", "Requests currently being served", ["method"])
+DATASET_LOAD_SECONDS = Histogram(
+    "api_dataset_load_seconds", "Time to load the dataset into the article index or build aggregates",
+    ["stage"], buckets=(0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0),
+)
+
+
+class MetricsMiddleware:
+    """Times every HTTP request and tracks how many are in flight."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        method = scope["method"]
+        status = 500
+
+        async def send_with_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        in_progress = REQUESTS_IN_PROGRESS.labels(method)
+        in_progress.inc()
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            in_progress.dec()
+            # the router stores the matched route in the shared scope
+            route = getattr(scope.get("route"), "path", None) or "unmatched"
+            REQUEST_LATENCY.labels(method, route, str(status)).observe(time.perf_counter() - started)
+
+
+class AppCollector(Collector):
+    """Response cache, article index and alert feed state, read at scrape time."""
+
+    def describe(self):
+        return []  # keeps registration from collecting before the app modules are imported
+
+    def collect(self):
+        from utils.alert_feed import get_alert_feed
+        from utils.cache import get_cache
+        from utils.dataset import loaded_article_index
+
+        cache = get_cache()
+        stats = dict(cache.stats)
+        lookups = CounterMetricFamily("api_cache_lookups", "Response cache lookups by result", labels=["backend", "result"])
+        for result in ("hits", "coalesced", "misses"):
+            lookups.add_metric([cache.backend.name, result], stats[result])
+        yield lookups
+        yield CounterMetricFamily("api_cache_errors", "Response cache backend errors", value=stats["errors"])
+        total = stats["hits"] + stats["coalesced"] + stats["misses"]
+        yield GaugeMetricFamily("api_cache_hit_ratio", "Lookups served without computing (hits + coalesced)",
+                                value=(stats["hits"] + stats["coalesced"]) / total if total else 0.0)
+
+        index = loaded_article_index()
+        yield GaugeMetricFamily("api_dataset_rows", "Articles in the loaded index", value=index.size if index else 0)
+
+        feed = get_alert_feed().stats()
+        yield GaugeMetricFamily("api_alert_feed_subscribers", "Connected alert stream clients", value=feed["subscribers"])
+        yield CounterMetricFamily("api_alert_feed_events", "Alert transitions published", value=feed["published"])
+        yield CounterMetricFamily("api_alert_feed_dropped_subscribers", "Clients disconnected for falling behind",
+                                  value=feed["disconnected_slow"])
+
+
+REGISTRY.register(AppCollector())
+
+
+def render_metrics() -> bytes:
+    return generate_latest(REGISTRY)
@@ -0,0 +1,437 @@
+"""
+Async news scraper.
+
+Each source lists one or more feeds (RSS, Atom, sitemap or sitemap index).
+A cycle fetches the feeds with conditional requests (ETag / If-Modified-Since),
+diffs their entries against what earlier cycles saw (by URL and lastmod),
+and downloads only new or updated article pages. A feed's validators are
+stored only once everything new in it was fetched, so entries cut off by the
+per-source cap or whose download failed are retried next cycle rather than
+hidden behind a 304. All requests share one
+pooled aiohttp session with a per-host concurrency cap and politeness delay.
+Articles are appended as NDJSON under RAW_DATA_DIR/<source>/<date>.ndjson.
+"""
+import asyncio
+import json
+import logging
+import time
+import xml.etree.ElementTree as ET
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import urljoin, urlparse
+
+import aiohttp
+import yaml
+from bs4 import BeautifulSoup
+
+from utils.config import settings
+
+logger = logging.getLogger(__name__)
+
+STATE_FILE = "scraper_state.json"
+MAX_SEEN_PER_SOURCE = 20000
+MAX_CHILD_SITEMAPS = 20
+
+
+@dataclass
+class Source:
+    name: str
+    feeds: List[str]
+    max_articles: int = 0  # 0 = settings.MAX_ARTICLES_PER_SOURCE
+
+
+@dataclass
+class FeedEntry:
+    url: str
+    lastmod: Optional[str] = None
+    title: Optional[str] = None
+
+
+@dataclass
+class CycleStats:
+    started_at: str = ""
+    elapsed: float = 0.0
+    requests: int = 0
+    not_modified: int = 0
+    errors: int = 0
+    bytes: int = 0
+    feeds: int = 0
+    entries_seen: int = 0
+    articles: int = 0
+    per_source: Dict[str, int] = field(default_factory=dict)
+
+    @property
+    def articles_per_minute(self) -> float:
+        return self.articles / self.elapsed * 60 if self.elapsed else 0.0
+
+    def as_dict(self) -> dict:
+        return {**self.__dict__, "articles_per_minute": round(self.articles_per_minute, 1)}
+
+
+def load_sources(path: Optional[str] = None) -> List[Source]:
+    """Sources from a YAML file: a list of {name, feeds, max_articles}."""
+    path = Path(path or settings.SCRAPER_SOURCES_FILE)
+    if not path.exists():
+        logger.warning(f"No scraper sources file at {path}")
+        return []
+    entries = yaml.safe_load(path.read_text(encoding="utf-8")) or []
+    return [Source(name=e["name"], feeds=list(e["feeds"]), max_articles=int(e.get("max_articles", 0))) for e in entries]
+
+
+def _local(tag: str) -> str:
+    return tag.rsplit("}", 1)[-1].lower()
+
+
+def _child_text(element, name: str) -> Optional[str]:
+    for child in element:
+        if _local(child.tag) == name:
+            return (child.text or "").strip() or None
+    return None
+
+
+def parse_feed(body: bytes) -> Tuple[List[FeedEntry], List[FeedEntry]]:
+    """Parse RSS, Atom or sitemap XML into (article entries, child sitemaps)."""
+    root = ET.fromstring(body)
+    kind = _local(root.tag)
+    entries, children = [], []
+    if kind == "sitemapindex":
+        for sm in root:
+            loc = _child_text(sm, "loc")
+            if loc:
+                children.append(FeedEntry(loc, _child_text(sm, "lastmod")))
+    elif kind == "urlset":
+        for url in root:
+            loc = _child_text(url, "loc")
+            if loc:
+                entries.append(FeedEntry(loc, _child_text(url, "lastmod")))
+    elif kind == "feed":  # Atom
+        for entry in (e for e in root if _local(e.tag) == "entry"):
+            link = next((c.get("href") for c in entry if _local(c.tag) == "link" and c.get("href")), None)
+            if link:
+                entries.append(FeedEntry(link, _child_text(entry, "updated") or _child_text(entry, "published"),
+                                         _child_text(entry, "title")))
+    else:  # RSS 2.0 / RDF
+        for item in root.iter():
+            if _local(item.tag) != "item":
+                continue
+            link = _child_text(item, "link")
+            if link:
+                entries.append(FeedEntry(link, _child_text(item, "pubdate") or _child_text(item, "date"),
+                                         _child_text(item, "title")))
+    return entries, children
+
+
+def normalize_date(value: Optional[str]) -> Optional[str]:
+    """ISO date string from RFC 822 (RSS) or ISO 8601 (Atom/sitemaps) input."""
+    if not value:
+        return None
+    try:
+        parsed = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    except ValueError:
+        try:
+            parsed = parsedate_to_datetime(value)
+        except (TypeError, ValueError):
+            return None
+    if parsed.tzinfo is not None:
+        parsed = parsed.astimezone(timezone.utc).replace(tzinfo=None)
+    return parsed.isoformat(timespec="seconds")
+
+
+def utc_now() -> str:
+    """Current UTC time as naive ISO seconds, the format normalize_date produces."""
+    return datetime.now(timezone.utc).replace(tzinfo=None).isoformat(timespec="seconds")
+
+
+def parse_article(html: bytes, url: str, entry: FeedEntry) -> Optional[dict]:
+    """Title, publication date and paragraphs from an article page."""
+    try:
+        soup = BeautifulSoup(html, "lxml")
+    except Exception:
+        soup = BeautifulSoup(html, "html.parser")
+
+    def meta(prop):
+        tag = soup.find("meta", attrs={"property": prop}) or soup.find("meta", attrs={"name": prop})
+        return tag.get("content") if tag else None
+
+    title = meta("og:title") or (soup.h1.get_text(strip=True) if soup.h1 else None) or entry.title \
+        or (soup.title.get_text(strip=True) if soup.title else None)
+    time_tag = soup.find("time", attrs={"datetime": True})
+    published = normalize_date(meta("article:published_time") or (time_tag["datetime"] if time_tag else None)) \
+        or normalize_date(entry.lastmod)
+    container = soup.find("article") or soup
+    paragraphs = [p.get_text(" ", strip=True) for p in container.find_all("p")]
+    paragraphs = [p for p in paragraphs if len(p) > 30]
+    if not title or not paragraphs:
+        return None
+    return {"url": url, "title": title, "date": published, "paragraphs": "\n\n".join(paragraphs)}
+
+
+class ScrapeState:
+    """Validators per feed URL and lastmod per seen article URL, persisted as JSON."""
+
+    def __init__(self, path: Path):
+        self.path = path
+        data = json.loads(path.read_text(encoding="utf-8")) if path.exists() else {}
+        self.validators: Dict[str, dict] = data.get("validators", {})
+        self.seen: Dict[str, Dict[str, Optional[str]]] = data.get("seen", {})
+        # Child sitemaps with articles still to fetch, revisited even when their index is unchanged
+        self.backlog: Dict[str, Dict[str, Optional[str]]] = data.get("backlog", {})
+
+    def is_new(self, source: str, entry: FeedEntry) -> bool:
+        seen = self.seen.get(source, {})
+        return entry.url not in seen or (entry.lastmod is not None and seen[entry.url] != entry.lastmod)
+
+    def mark(self, source: str, entry: FeedEntry):
+        seen = self.seen.setdefault(source, {})
+        seen.pop(entry.url, None)
+        seen[entry.url] = entry.lastmod
+        while len(seen) > MAX_SEEN_PER_SOURCE:
+            seen.pop(next(iter(seen)))
+
+    def save(self):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_suffix(".json.tmp")
+        tmp.write_text(json.dumps({"validators": self.validators, "seen": self.seen, "backlog": self.backlog}),
+                       encoding="utf-8")
+        tmp.replace(self.path)
+
+
+class HostThrottle:
+    """Per-host concurrency cap plus a minimum delay between request starts."""
+
+    def __init__(self, concurrency: int, delay: float):
+        self.concurrency = concurrency
+        self.delay = delay
+        self._semaphores: Dict[str, asyncio.Semaphore] = {}
+        self._locks: Dict[str, asyncio.Lock] = {}
+        self._last_start: Dict[str, float] = {}
+
+    async def __call__(self, host: str):
+        semaphore = self._semaphores.setdefault(host, asyncio.Semaphore(self.concurrency))
+        await semaphore.acquire()
+        async with self._locks.setdefault(host, asyncio.Lock()):
+            wait = self._last_start.get(host, 0.0) + self.delay - time.monotonic()
+            if wait > 0:
+                await asyncio.sleep(wait)
+            self._last_start[host] = time.monotonic()
+        return semaphore
+
+
+class Scraper:
+    def __init__(self, sources: List[Source], raw_dir: Optional[str] = None, per_host: Optional[int] = None,
+                 delay: Optional[float] = None, total_connections: int = 64, timeout: float = 20.0):
+        self.sources = sources
+        self.raw_dir = Path(raw_dir or settings.RAW_DATA_DIR)
+        self.state = ScrapeState(self.raw_dir / STATE_FILE)
+        self.throttle = HostThrottle(per_host or settings.SCRAPER_PER_HOST_CONCURRENCY,
+                                     settings.SCRAPER_POLITENESS_DELAY if delay is None else delay)
+        self.total_connections = total_connections
+        self.timeout = timeout
+        self.stats = CycleStats()
+        self.fresh_validators: Dict[str, dict] = {}  # from this cycle's 200s, stored once the feed is done
+        self.failed: set = set()  # URLs whose request failed this cycle
+
+    async def _get(self, session: aiohttp.ClientSession, url: str, conditional: bool = False) -> Optional[bytes]:
+        """GET with throttling; returns None on 304 or error (and adds the URL to `failed` on error).
+
+        The validators of a conditional 200 are held in `fresh_validators` until
+        the caller has fetched what the feed lists.
+        """
+        headers = {}
+        validators = self.state.validators.get(url, {}) if conditional else {}
+        if validators.get("etag"):
+            headers["If-None-Match"] = validators["etag"]
+        if validators.get("last_modified"):
+            headers["If-Modified-Since"] = validators["last_modified"]
+
+        semaphore = await self.throttle(urlparse(url).netloc)
+        try:
+            self.stats.requests += 1
+            async with session.get(url, headers=headers) as resp:
+                if resp.status == 304:
+                    self.stats.not_modified += 1
+                    return None
+                body = await resp.read()
+                self.stats.bytes += len(body)
+                if resp.status != 200:
+                    self.stats.errors += 1
+                    self.failed.add(url)
+                    logger.warning(f"GET {url} -> {resp.status}")
+                    return None
+                if conditional:
+                    self.fresh_validators[url] = {
+                        "etag": resp.headers.get("ETag"), "last_modified": resp.headers.get("Last-Modified")
+                    }
+                return body
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            self.stats.errors += 1
+            self.failed.add(url)
+            logger.warning(f"GET {url} failed: {e}")
+            return None
+        finally:
+            semaphore.release()
+
+    async def _feed_entries(self, session, source: Source):
+        """Entries of all changed feeds, each fetched child sitemap with its entries, and the
+        entries of each fetched feed whose changed child sitemaps were all fetched too."""
+        entries: List[FeedEntry] = []
+        fetched_children: List[Tuple[FeedEntry, List[FeedEntry]]] = []
+        feed_entries: Dict[str, List[FeedEntry]] = {}
+        incomplete = set()  # sitemap indexes with changed children left unfetched
+        sitemaps_key = f"{source.name}:sitemaps"
+        # (url, child sitemap entry or None, parent index url or None)
+        pending: List[Tuple[str, Optional[FeedEntry], Optional[str]]] = [(url, None, None) for url in source.feeds]
+        pending += [(url, FeedEntry(url, lastmod), None)
+                    for url, lastmod in self.state.backlog.get(source.name, {}).items()]
+        visited = set()
+        while pending and len(visited) < len(source.feeds) + MAX_CHILD_SITEMAPS:
+            feed_url, child, parent = pending.pop(0)
+            if feed_url in visited:
+                continue
+            visited.add(feed_url)
+            # Backlogged sitemaps are fetched in full: a 304 would hide their unfetched entries
+            backlogged = feed_url in self.state.backlog.get(source.name, {})
+            body = await self._get(session, feed_url, conditional=not backlogged)
+            if body is None:
+                if parent and feed_url in self.failed:
+                    incomplete.add(parent)
+                continue
+            self.stats.feeds += 1
+            try:
+                found, children = parse_feed(body)
+            except ET.ParseError as e:
+                self.stats.errors += 1
+                logger.warning(f"Unparseable feed {feed_url}: {e}")
+                continue
+            found = [FeedEntry(urljoin(feed_url, e.url), e.lastmod, e.title) for e in found]
+            entries.extend(found)
+            feed_entries[feed_url] = found
+            if child is not None:
+                fetched_children.append((child, found))
+            # Only descend into child sitemaps whose lastmod changed since the last cycle
+            for c in children:
+                c = FeedEntry(urljoin(feed_url, c.url), c.lastmod)
+                if self.state.is_new(sitemaps_key, c):
+                    pending.append((c.url, c, feed_url))
+        incomplete.update(parent for url, _, parent in pending if parent and url not in visited)
+        for url in incomplete:
+            feed_entries.pop(url, None)
+        return entries, fetched_children, feed_entries
+
+    async def _scrape_source(self, session, source: Source) -> List[dict]:
+        entries, fetched_children, feed_entries = await self._feed_entries(session, source)
+        self.stats.entries_seen += len(entries)
+        unique = {e.url: e for e in entries}
+        new = [e for e in unique.values() if self.state.is_new(source.name, e)]
+        new.sort(key=lambda e: normalize_date(e.lastmod) or "", reverse=True)
+        new = new[:source.max_articles or settings.MAX_ARTICLES_PER_SOURCE]
+
+        async def fetch(entry: FeedEntry):
+            body = await self._get(session, entry.url)
+            if body is None:
+                return None
+            article = parse_article(body, entry.url, entry)
+            self.state.mark(source.name, entry)
+            return article
+
+        articles = [a for a in await asyncio.gather(*[fetch(e) for e in new]) if a]
+        # A child sitemap counts as seen only once every article in it was fetched,
+        # so a backlog cut off by max_articles is picked up in later cycles
+        backlog = self.state.backlog.setdefault(source.name, {})
+        for child, child_entries in fetched_children:
+            if any(self.state.is_new(source.name, e) for e in child_entries):
+                backlog[child.url] = child.lastmod
+            else:
+                backlog.pop(child.url, None)
+                self.state.mark(f"{source.name}:sitemaps", child)
+        # Likewise a feed's validators are stored only once nothing new in it is left to fetch;
+        # until then the next cycle gets the full feed instead of a 304
+        for feed_url, found in feed_entries.items():
+            validators = self.fresh_validators.pop(feed_url, None)
+            if validators and not any(self.state.is_new(source.name, e) for e in found):
+                self.state.validators[feed_url] = validators
+
+        scraped_at = utc_now()
+        for a in articles:
+            a["retrieve_source"] = source.name
+            a["scraped_at"] = scraped_at
+        self.stats.per_source[source.name] = len(articles)
+        return articles
+
+    def _write(self, articles: List[dict]) -> List[Path]:
+        by_file: Dict[Path, List[dict]] = {}
+        for a in articles:
+            day = (a.get("date") or a["scraped_at"])[:10]
+            by_file.setdefault(self.raw_dir / a["retrieve_source"] / f"{day}.ndjson", []).append(a)
+        for path, rows in by_file.items():
+            path.parent.mkdir(parents=True, exist_ok=True)
+            with open(path, "a", encoding="utf-8") as f:
+                f.writelines(json.dumps(r, ensure_ascii=False) + "\n" for r in rows)
+        return list(by_file)
+
+    async def run_cycle(self) -> Tuple[List[dict], CycleStats]:
+        """Scrape every source once; returns the new articles and cycle stats."""
+        self.stats = CycleStats(started_at=utc_now())
+        started = time.perf_counter()
+        connector = aiohttp.TCPConnector(limit=self.total_connections, ttl_dns_cache=300)
+        timeout = aiohttp.ClientTimeout(total=self.timeout)
+        async with aiohttp.ClientSession(connector=connector, timeout=timeout,
+                                         headers={"User-Agent": settings.USER_AGENT}) as session:
+            results = await asyncio.gather(*[self._scrape_source(session, s) for s in self.sources])
+        articles = [a for batch in results for a in batch]
+        self._write(articles)
+        self.state.save()
+        self.stats.articles = len(articles)
+        self.stats.elapsed = time.perf_counter() - started
+        return articles, self.stats
+
+
+class ScraperService:
+    """Runs one scrape cycle at a time for the API and keeps recent cycle stats."""
+
+    HISTORY = 20
+
+    def __init__(self):
+        self._task: Optional[asyncio.Task] = None
+        self.history: List[dict] = []
+        self.last_error: Optional[str] = None
+        # Manual and scheduled cycles share the state file, so they run one at a time
+        self.lock = asyncio.Lock()
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def start(self, sources: Optional[List[Source]] = None) -> bool:
+        """Start a cycle in the background; False if one is already running."""
+        if self.running:
+            return False
+        self._task = asyncio.create_task(self._run(sources), name="scrape-cycle")
+        return True
+
+    async def _run(self, sources: Optional[List[Source]]):
+        try:
+            async with self.lock:
+                _, stats = await Scraper(sources if sources is not None else load_sources()).run_cycle()
+            self.record(stats)
+        except Exception as e:
+            self.last_error = str(e)
+            logger.error(f"Scrape cycle failed: {e}", exc_info=True)
+
+    def record(self, stats: CycleStats):
+        self.history = (self.history + [stats.as_dict()])[-self.HISTORY:]
+        self.last_error = None
+        logger.info(f"Scrape cycle: {stats.articles} articles, {stats.bytes:,} bytes in {stats.elapsed:.1f}s")
+
+
+_service: Optional[ScraperService] = None
+
+
+def get_scraper_service() -> ScraperService:
+    global _service
+    if _service is None:
+        _service = ScraperService()
+    return _service
@@ -10,7 +10,10 @@ from pathlib import Path
 
 sys.path.insert(0, str(Path(__file__).parent))
 
-from utils.data_loader import load_data, get_taxonomy_table
+from utils.data_access import Filters, get_data_source
+from utils.data_loader import get_taxonomy_table
+from utils.metrics import page_timer
+from utils.tracing import span
 from utils.filters import render_date_filter, render_summary_metrics
 
 st.set_page_config(page_title="Dataset Overview - Improved", layout="wide")
@@ -18,28 +21,29 @@ st.set_page_config(page_title="Dataset Overview - Improved", layout="wide")
 st.title("Dataset Overview")
 st.markdown("High-level view of article volume, labels, and regional distribution over time.")
 
+timer = page_timer("overview")
+
 # Load data
-df = load_data()
+data = get_data_source()
+options = data.filter_options()
+timer.lap("load")
 
 # Sidebar filters (only date range, no source filter)
 st.sidebar.header("Filters")
-date_range = render_date_filter(df, "overview_new")
+date_range = render_date_filter(options, "overview_new")
 
 # Apply date filter only
-if date_range:
-    filtered_df = df[
-        (df["date"] >= pd.to_datetime(date_range[0])) & 
-        (df["date"] <= pd.to_datetime(date_range[1]))
-    ]
-else:
-    filtered_df = df.copy()
+filters = Filters.of(date_range=date_range)
+summary = data.summary(filters)
+
+timer.lap("filter")
 
 # Summary metrics
-render_summary_metrics(filtered_df)
+render_summary_metrics(summary)
 
 st.markdown("---")
 
-if filtered_df.empty:
+if summary["total"] == 0:
     st.warning("No articles match the current filters.")
 else:
     # 1. Total Article Counts Over Time BY SOURCE
@@ -47,7 +51,7 @@ else:
     st.caption("Each line represents a different news source")
     
     # Group by source and month
-    ts_by_source = filtered_df.groupby(["retrieve_source", "yearmon"]).size().reset_index(name="count")
+    ts_by_source = data.monthly_counts(filters, by="source").rename(columns={"source": "retrieve_source"})
     ts_by_source["yearmon_date"] = pd.to_datetime(ts_by_source["yearmon"])
     
     # Get unique sources and assign colors
@@ -83,16 +87,12 @@ else:
         ]
     ).properties(height=400).interactive()
     
-    st.altair_chart(chart_by_source, use_container_width=True)
+    with span("altair_chart", chart="by_source"):
+        st.altair_chart(chart_by_source, use_container_width=True)
     
     # Show source statistics
     st.markdown("### Source Statistics")
-    source_stats = filtered_df.groupby("retrieve_source").agg({
-        "title": "count",
-        "date": ["min", "max"]
-    }).reset_index()
-    source_stats.columns = ["Source", "Total Articles", "First Article", "Last Article"]
-    source_stats = source_stats.sort_values("Total Articles", ascending=False)
+    source_stats = data.source_stats(filters)
     
     st.dataframe(source_stats, use_container_width=True, hide_index=True)
     
@@ -102,7 +102,8 @@ else:
     st.subheader("2. Article Counts by Label Over Time")
     st.caption("Each label shown in its own subplot with a **12-month rolling mean** (orange dashed) and **full-span mean** (red dotted).")
     
-    all_labels = sorted([l for l in filtered_df["Label"].dropna().unique() if l != "Uncategorized"])
+    ts_by_label = data.monthly_counts(filters, by="label")
+    all_labels = sorted([l for l in ts_by_label["label"].dropna().unique() if l != "Uncategorized"])
     
     n_cols = 2
     rows = [all_labels[i:i + n_cols] for i in range(0, len(all_labels), n_cols)]
@@ -111,8 +112,7 @@ else:
         cols = st.columns(len(row_labels))
         for col, label_name in zip(cols, row_labels):
             with col:
-                label_ts = filtered_df[filtered_df["Label"] == label_name].copy()
-                label_ts = label_ts.groupby("yearmon").size().reset_index(name="count")
+                label_ts = ts_by_label[ts_by_label["label"] == label_name][["yearmon", "count"]].copy()
                 label_ts["yearmon_date"] = pd.to_datetime(label_ts["yearmon"])
                 label_ts = label_ts.sort_values("yearmon_date")
                 
@@ -154,7 +154,8 @@ else:
                     title=label_name
                 ).interactive()
                 
-                st.altair_chart(chart, use_container_width=True)
+                with span("altair_chart", chart=label_name):
+                    st.altair_chart(chart, use_container_width=True)
     
     # Legend
     st.markdown("""
@@ -168,11 +169,9 @@ else:
     # 3. Article Counts by Label x ADM1
     st.subheader("3. Article Counts by Label x ADM1 Region")
     
-    cross_adm1 = filtered_df.groupby(["adm1_name_final", "Label"]).size().reset_index(name="count")
-    
     top_n_adm1 = st.slider("Top N ADM1 Regions", 5, 20, 10, key="overview_new_topn_adm1")
-    top_adm1 = filtered_df["adm1_name_final"].value_counts().head(top_n_adm1).index.tolist()
-    cross_adm1 = cross_adm1[cross_adm1["adm1_name_final"].isin(top_adm1)]
+    top_adm1, cross_adm1 = data.crosstab("adm1", "label", filters, top_n=top_n_adm1, include_unknown=True)
+    cross_adm1 = cross_adm1.rename(columns={"adm1": "adm1_name_final", "label": "Label"})
     
     chart_heatmap_adm1 = alt.Chart(cross_adm1).mark_rect().encode(
         x=alt.X("Label:N", title="Article Label"),
@@ -185,18 +184,15 @@ else:
         ]
     ).properties(height=400)
     
-    st.altair_chart(chart_heatmap_adm1, use_container_width=True)
+    with span("altair_chart", chart="heatmap_adm1"):
+        st.altair_chart(chart_heatmap_adm1, use_container_width=True)
     
     # 4. Article Counts by Label x ADM2
     st.subheader("4. Article Counts by Label x ADM2 County")
     
-    cross_adm2 = filtered_df[filtered_df["adm2_name_final"] != "Unknown County"].copy()
-    cross_adm2 = cross_adm2.groupby(["adm2_name_final", "Label"]).size().reset_index(name="count")
-    
     top_n_adm2 = st.slider("Top N ADM2 Counties", 10, 50, 20, key="overview_new_topn_adm2")
-    adm2_counts = filtered_df[filtered_df["adm2_name_final"] != "Unknown County"]["adm2_name_final"].value_counts()
-    top_adm2 = adm2_counts.head(top_n_adm2).index.tolist()
-    cross_adm2 = cross_adm2[cross_adm2["adm2_name_final"].isin(top_adm2)]
+    top_adm2, cross_adm2 = data.crosstab("adm2", "label", filters, top_n=top_n_adm2)
+    cross_adm2 = cross_adm2.rename(columns={"adm2": "adm2_name_final", "label": "Label"})
     
     chart_heatmap_adm2 = alt.Chart(cross_adm2).mark_rect().encode(
         x=alt.X("Label:N", title="Article Label"),
@@ -209,7 +205,8 @@ else:
         ]
     ).properties(height=max(400, top_n_adm2 * 20))
     
-    st.altair_chart(chart_heatmap_adm2, use_container_width=True)
+    with span("altair_chart", chart="heatmap_adm2"):
+        st.altair_chart(chart_heatmap_adm2, use_container_width=True)
     
     # Taxonomy reference
     st.markdown("---")
@@ -220,3 +217,6 @@ else:
         include false positives or false negatives.
         """)
         st.dataframe(get_taxonomy_table(), use_container_width=True, hide_index=True)
+
+timer.lap("render")
+timer.done()
@@ -10,10 +10,13 @@ from pathlib import Path
 
 sys.path.insert(0, str(Path(__file__).parent))
 
-from utils.data_loader import load_data
+from utils.alert_helpers import dynamic_thresholds, static_thresholds
+from utils.data_access import Filters, get_data_source
+from utils.metrics import page_timer
+from utils.tracing import span
 from utils.filters import (
     render_source_filter, render_date_filter, render_sentiment_filter,
-    apply_filters, render_summary_metrics
+    render_dedup_toggle, render_summary_metrics
 )
 
 st.set_page_config(page_title="ADM2 Insights - Improved", layout="wide")
@@ -21,30 +24,37 @@ st.set_page_config(page_title="ADM2 Insights - Improved", layout="wide")
 st.title("ADM2 Insights (County Level)")
 st.markdown("Interactive line graphs showing article volume trends with **static** and **dynamic** thresholds for alert/alarm detection at the county level.")
 
+timer = page_timer("adm2_insights")
+
 # Load data
-df = load_data()
+data = get_data_source()
+options = data.filter_options()
+timer.lap("load")
 
 # Sidebar filters
 st.sidebar.header("Filters")
-sources = render_source_filter(df, "adm2_new", default=["radiotamazuj"])
-sentiments = render_sentiment_filter(df, "adm2_new", default=["Negative"])
+sources = render_source_filter(options, "adm2_new", default=["radiotamazuj"])
+sentiments = render_sentiment_filter(options, "adm2_new", default=["Negative"])
+dedup = render_dedup_toggle(options, "adm2_new")
 
 # Apply filters (no date range)
-filtered_df = apply_filters(
-    df, sources=sources, sentiments=sentiments
-)
+filters = Filters.of(sources=sources, sentiments=sentiments, one_per_cluster=dedup)
+summary = data.summary(filters)
+
+timer.lap("filter")
 
 # Summary metrics
-render_summary_metrics(filtered_df)
+render_summary_metrics(summary)
 
 st.markdown("---")
 
-if filtered_df.empty:
+if summary["total"] == 0:
     st.warning("No articles match the current filters.")
 else:
     # Get available regions and labels
-    all_regions = sorted(filtered_df["adm1_name_final"].unique())
-    all_labels = sorted([l for l in filtered_df["Label"].dropna().unique() if l != "Uncategorized"])
+    present_regions, region_labels = data.crosstab("adm1", "label", filters, include_unknown=True)
+    all_regions = sorted(present_regions)
+    all_labels = sorted([l for l in region_labels["label"].unique() if l != "Uncategorized"])
     
     # Region, County, and Topic selectors
     col1, col2, col3 = st.columns(3)
@@ -58,8 +68,8 @@ else:
         )
     
     # Filter counties by selected region
-    region_df = filtered_df[filtered_df["adm1_name_final"] == selected_region]
-    available_counties = sorted(region_df[region_df["adm2_name_final"] != "Unknown County"]["adm2_name_final"].unique())
+    region_filters = filters.narrow(adm1=(selected_region,))
+    available_counties = sorted(data.crosstab("adm2", "label", region_filters)[0])
     
     if not available_counties:
         st.warning(f"No county data available for **{selected_region}** with current filters.")
@@ -91,19 +101,16 @@ else:
         </div>
         """, unsafe_allow_html=True)
         
-        # Filter data for selected region, county, and label
-        county_label_df = region_df[
-            (region_df["adm2_name_final"] == selected_county) & 
-            (region_df["Label"] == selected_label)
-        ]
+        # Monthly counts for the selected region, county, and label
+        ts_data = data.monthly_counts(region_filters.narrow(adm2=(selected_county,), labels=(selected_label,)))
+        ts_data = ts_data.rename(columns={"count": "article_count"})
         
-        if county_label_df.empty:
+        if ts_data.empty:
             st.warning(f"No articles found for **{selected_region} > {selected_county}** with label **{selected_label}**. Try different filters.")
         else:
             st.subheader(f"📊 {selected_region} > {selected_county} - {selected_label}")
             
             # Prepare time series data
-            ts_data = county_label_df.groupby("yearmon").size().reset_index(name="article_count")
             ts_data["yearmon_date"] = pd.to_datetime(ts_data["yearmon"])
             ts_data = ts_data.sort_values("yearmon_date")
             
@@ -114,22 +121,10 @@ else:
                 st.caption("Thresholds calculated from the entire time period")
                 
                 # Calculate static thresholds
-                mean_val = ts_data["article_count"].mean()
-                std_val = ts_data["article_count"].std()
-                
-                threshold_1sd = mean_val + std_val
-                threshold_2sd = mean_val + 2 * std_val
-                
-                # Add threshold data
-                ts_static = ts_data.copy()
-                ts_static["mean"] = mean_val
-                ts_static["threshold_1sd"] = threshold_1sd
-                ts_static["threshold_2sd"] = threshold_2sd
-                
-                # Add alert status
-                ts_static["status"] = "Normal"
-                ts_static.loc[ts_static["article_count"] > threshold_1sd, "status"] = "Alert-high"
-                ts_static.loc[ts_static["article_count"] > threshold_2sd, "status"] = "Alarm-high"
+                ts_static = static_thresholds(ts_data)
+                mean_val = ts_static["mean"].iloc[0]
+                threshold_1sd = ts_static["threshold_1sd"].iloc[0]
+                threshold_2sd = ts_static["threshold_2sd"].iloc[0]
                 
                 # Article count line
                 line = alt.Chart(ts_static).mark_line(
@@ -191,7 +186,8 @@ else:
                     title=f"Article Volume Trend - Static Thresholds"
                 ).interactive()
                 
-                st.altair_chart(chart, use_container_width=True)
+                with span("altair_chart", chart="static_thresholds"):
+                    st.altair_chart(chart, use_container_width=True)
                 
                 # Show current status with descriptions
                 latest = ts_static.iloc[-1]
@@ -217,17 +213,7 @@ else:
                 st.caption("Thresholds calculated using 12-month rolling window")
                 
                 # Calculate dynamic thresholds
-                ts_dynamic = ts_data.copy()
-                ts_dynamic["rolling_mean"] = ts_dynamic["article_count"].rolling(window=12, min_periods=1).mean()
-                ts_dynamic["rolling_std"] = ts_dynamic["article_count"].rolling(window=12, min_periods=1).std()
-                
-                ts_dynamic["threshold_1sd"] = ts_dynamic["rolling_mean"] + ts_dynamic["rolling_std"]
-                ts_dynamic["threshold_2sd"] = ts_dynamic["rolling_mean"] + 2 * ts_dynamic["rolling_std"]
-                
-                # Add alert status
-                ts_dynamic["status"] = "Normal"
-                ts_dynamic.loc[ts_dynamic["article_count"] > ts_dynamic["threshold_1sd"], "status"] = "Alert-high"
-                ts_dynamic.loc[ts_dynamic["article_count"] > ts_dynamic["threshold_2sd"], "status"] = "Alarm-high"
+                ts_dynamic = dynamic_thresholds(ts_data)
                 
                 # Article count line
                 line = alt.Chart(ts_dynamic).mark_line(
@@ -292,7 +278,8 @@ else:
                     title=f"Article Volume Trend - Dynamic Thresholds (12-Month Rolling)"
                 ).interactive()
                 
-                st.altair_chart(chart, use_container_width=True)
+                with span("altair_chart", chart="dynamic_thresholds"):
+                    st.altair_chart(chart, use_container_width=True)
                 
                 # Show current status with descriptions
                 latest = ts_dynamic.iloc[-1]
@@ -313,3 +300,6 @@ else:
                 with col4:
                     st.metric("Alert / Alarm", f"{latest['threshold_1sd']:.1f} / {latest['threshold_2sd']:.1f}")
                     st.caption("Thresholds: 12M Mean+1SD / +2SD")
+
+timer.lap("render")
+timer.done()
@@ -12,29 +12,38 @@ from pathlib import Path
 
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
-from utils.data_loader import load_data
+from utils.api_client import API_BASE_URL, EXPORT_FORMATS, export_url
+from utils.data_access import Filters, get_data_source
+from utils.metrics import page_timer
 from utils.filters import (
     render_source_filter, render_date_filter, render_sentiment_filter,
     render_adm1_filter, render_adm2_filter,
-    render_keyword_filter, apply_filters, render_summary_metrics
+    render_keyword_filter, render_summary_metrics
 )
 
+PAGE_SIZE = 200
+LIST_FIELDS = ["article_id", "date", "title", "adm1_name_final"]
+
 st.set_page_config(page_title="Article Browser", layout="wide")
 
 st.title("Article Browser")
 st.markdown("Search and read individual articles with full metadata.")
 
+timer = page_timer("article_browser")
+
 # Load data
-df = load_data()
+data = get_data_source()
+options = data.filter_options()
+timer.lap("load")
 
 # Sidebar filters with defaults
 st.sidebar.header("Filters")
-sources = render_source_filter(df, "p4", default=["radiotamazuj"])
-sentiments = render_sentiment_filter(df, "p4", default=["Negative"])
-date_range = render_date_filter(df, "p4")
+sources = render_source_filter(options, "p4", default=["radiotamazuj"])
+sentiments = render_sentiment_filter(options, "p4", default=["Negative"])
+date_range = render_date_filter(options, "p4")
 
 # Label filter -- default to Political Instability
-all_labels = sorted([l for l in df["Label"].dropna().unique().tolist() if l != "Uncategorized"]) if "Label" in df.columns else []
+all_labels = options.labels
 default_labels = ["Political Instability"] if "Political Instability" in all_labels else all_labels
 labels = st.sidebar.multiselect(
     "Article Labels",
@@ -45,26 +54,53 @@ labels = st.sidebar.multiselect(
 
 st.sidebar.markdown("---")
 st.sidebar.subheader("Geographic Scope")
-adm1 = render_adm1_filter(df, "p4", default=["Central Equatoria"])
-adm2 = render_adm2_filter(df, adm1_selection=adm1, key_prefix="p4")
+adm1 = render_adm1_filter(options, "p4", default=["Central Equatoria"])
+adm2 = render_adm2_filter(options, adm1_selection=adm1, key_prefix="p4")
 
 keyword = render_keyword_filter("p4")
 
 # Apply filters
-filtered_df = apply_filters(
-    df, sources=sources, date_range=date_range,
+filters = Filters.of(
+    sources=sources, date_range=date_range,
     sentiments=sentiments, labels=labels, adm1=adm1, adm2=adm2, keyword=keyword
 )
+summary = data.summary(filters)
+total = summary["total"]
+
+timer.lap("filter")
 
 # Summary metrics
-render_summary_metrics(filtered_df)
+render_summary_metrics(summary)
+
+# Export: the browser downloads straight from the API, which streams the
+# slice in chunks, so large exports never load into this process
+with st.expander("Export filtered articles", expanded=False):
+    ecol1, ecol2 = st.columns([1, 3])
+    with ecol1:
+        export_format = st.selectbox("Format", list(EXPORT_FORMATS), key="p4_export_format")
+    with ecol2:
+        st.markdown("&nbsp;")
+        st.link_button(
+            f"Download {total:,} articles ({export_format})",
+            export_url(
+                EXPORT_FORMATS[export_format], sources=sources, date_range=date_range,
+                sentiments=sentiments, labels=labels, adm1=adm1, adm2=adm2, keyword=keyword,
+            ),
+            disabled=total == 0,
+        )
+    st.caption(f"Served by the API at {API_BASE_URL}. Set NEWS_API_BASE_URL to point elsewhere.")
 
 st.markdown("---")
 
-if filtered_df.empty:
+if total == 0:
     st.warning("No articles match the current filters. Try adjusting your filters.")
 else:
-    display_df = filtered_df.sort_values("date", ascending=False).reset_index(drop=True)
+    # Only the current page of results is fetched, newest first
+    n_pages = (total - 1) // PAGE_SIZE + 1
+    page = 1
+    if n_pages > 1:
+        page = st.number_input(f"Page (of {n_pages:,})", min_value=1, max_value=n_pages, value=1, key="p4_page")
+    display_df, _ = data.articles_page(filters, page=int(page), page_size=PAGE_SIZE, fields=LIST_FIELDS)
 
     display_df["display_title"] = (
         display_df["date"].dt.strftime("%Y-%m-%d") + " | " +
@@ -77,15 +113,18 @@ else:
     col1, col2 = st.columns([3, 1])
     with col1:
         selected_idx = st.selectbox(
-            "Choose from filtered articles",
+            f"Choose from filtered articles ({PAGE_SIZE} per page)" if n_pages > 1 else "Choose from filtered articles",
             range(len(display_df)),
             format_func=lambda x: display_df.iloc[x]["display_title"],
             key="p4_article_select"
         )
     with col2:
-        st.metric("Matching Articles", f"{len(display_df):,}")
+        st.metric("Matching Articles", f"{total:,}")
 
-    art = display_df.iloc[selected_idx]
+    # Full record, with text, for the selected article only
+    art = data.article(display_df.iloc[selected_idx]["article_id"])
+    if art is None:
+        art = display_df.iloc[selected_idx]
 
     st.markdown("---")
     st.subheader(f"{art['title']}")
@@ -104,6 +143,8 @@ else:
     mcol5, mcol6, mcol7, mcol8 = st.columns(4)
     with mcol5:
         st.markdown(f"**Label:** {art['Label']}")
+        if isinstance(art.get("Labels"), str) and art["Labels"] != art["Label"]:
+            st.caption(f"Also: {art['Labels'].split('; ', 1)[1]}")
     with mcol6:
         st.markdown(f"**Sentiment:** {art['sentiment_label']}")
     with mcol7:
@@ -124,3 +165,6 @@ else:
         {clean_text}
     </div>
     """, unsafe_allow_html=True)
+
+timer.lap("render")
+timer.done()
@@ -7,18 +7,27 @@ Summary includes bullet points with article links and a complete narrative.
 import streamlit as st
 import pandas as pd
 import numpy as np
-import re
-import os
 import sys
 from pathlib import Path
 
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
-from utils.data_loader import load_data
+from utils.data_access import Filters, get_data_source
+from utils.data_loader import get_dataset_version
+from utils.metrics import page_timer
+from utils.tracing import span
+from utils.llm_client import get_openai_client
+from utils.llm_gateway import GatewayError, current_user_id, get_llm_gateway
+from utils.rag import MODEL_PRICING, SYSTEM_PROMPT, estimate_tokens, build_prompt
+from utils.summary_store import find_latest_summary, load_summary
+from utils.map_reduce import (
+    MAP_BATCH_SIZE, MAX_CONCURRENCY, REDUCE_FAN_IN,
+    build_reduce_prompt, estimate_map_reduce_tokens, extract_citations, run_map_reduce_partials
+)
 from utils.filters import (
     render_source_filter, render_date_filter, render_sentiment_filter,
     render_label_filter, render_adm1_filter, render_adm2_filter,
-    apply_filters, render_summary_metrics
+    render_dedup_toggle, render_summary_metrics
 )
 
 st.set_page_config(page_title="RAG+LLM Summary", layout="wide")
@@ -26,191 +35,41 @@ st.set_page_config(page_title="RAG+LLM Summary", layout="wide")
 st.title("RAG+LLM Situation Summary")
 st.markdown("Generate AI-powered situation summaries in two steps: **estimate cost**, then **generate summary**.")
 
-# Pricing (per 1M tokens, USD)
-MODEL_PRICING = {
-    "gpt-4o-mini": {"input": 0.15, "output": 0.60},
-    "gpt-4o":      {"input": 2.50, "output": 10.00},
-    "gpt-3.5-turbo": {"input": 0.50, "output": 1.50},
-}
-
-
-def estimate_tokens(text):
-    """Rough token estimation (~4 chars per token for English)."""
-    return len(str(text)) // 4
-
-
-def get_openai_client(user_api_key=None):
-    """Initialize OpenAI client."""
-    api_key = user_api_key or os.getenv("OPENAI_API_KEY")
-    if not api_key:
-        return None, "Missing OpenAI API Key. Please provide one below or set it in your .env file."
-    try:
-        import openai
-        openai.api_key = api_key
-        return openai, None
-    except Exception as e:
-        return None, f"OpenAI init failed: {e}"
-
-
-def keyword_score(text, query_terms):
-    """Score text by keyword frequency."""
-    t = (text or "").lower()
-    return sum(t.count(q) for q in query_terms if q)
-
-
-def retrieve_top_k(df, query, top_k=15):
-    """Retrieve top-k relevant articles based on keyword matching."""
-    if df.empty:
-        return df
-    query = (query or "").strip()
-    if not query:
-        return df.sort_values("date", ascending=False).head(top_k)
-    q_terms = [t.lower() for t in re.findall(r"[A-Za-z0-9_]+", query) if len(t) >= 3]
-    if not q_terms:
-        return df.sort_values("date", ascending=False).head(top_k)
-    scored = df.copy()
-    scored["_score"] = scored.apply(
-        lambda r: keyword_score(
-            str(r.get("title", "")) + " " + str(r.get("paragraphs", "")),
-            q_terms
-        ),
-        axis=1
-    )
-    return scored.sort_values(["_score", "date"], ascending=[False, False]).head(top_k)
-
-
-def build_prompt(context_df, context_str, date_range, region_focus, topic_keyword):
-    """Build the LLM prompt from retrieved articles with strict filtering."""
-    docs = []
-    for i, (_, r) in enumerate(context_df.iterrows()):
-        url = r.get("url", "")
-        url_str = f" | URL: {url}" if url and not pd.isna(url) else ""
-        docs.append(
-            f"[{i+1}] Date: {r['date'].strftime('%Y-%m-%d')} | "
-            f"Region: {r['adm1_name_final']} | County: {r['adm2_name_final']} | "
-            f"Label: {r['Label']} | "
-            f"Title: {r['title']}{url_str}\n"
-            f"Text: {str(r.get('paragraphs', ''))}"
-        )
-    docs_text = "\n\n".join(docs)
-
-    # Build strict filtering instructions
-    filter_requirements = []
-    region_instruction_detail = ""
-    
-    if region_focus and region_focus.strip():
-        region_name = region_focus.strip()
-        
-        # Check if region_focus matches an ADM1 region (case-insensitive)
-        adm1_regions = context_df['adm1_name_final'].dropna().unique()
-        matching_adm1 = None
-        for adm1 in adm1_regions:
-            if adm1.lower() == region_name.lower():
-                matching_adm1 = adm1
-                break
-        
-        # If it's an ADM1 region, get all its ADM2 counties
-        if matching_adm1:
-            counties = context_df[context_df['adm1_name_final'] == matching_adm1]['adm2_name_final'].dropna().unique()
-            counties = [c for c in counties if c != "Unknown County"]
-            
-            if len(counties) > 0:
-                county_list = ", ".join(sorted(counties))
-                filter_requirements.append(f"Region/Location: **{matching_adm1}** (including counties: {county_list})")
-                region_instruction_detail = f"\nNOTE: Articles mentioning ANY of these counties should be included: {county_list}"
-            else:
-                filter_requirements.append(f"Region/Location: **{region_name}**")
-        else:
-            # Not an ADM1 region, treat as general location
-            filter_requirements.append(f"Region/Location: **{region_name}**")
-    
-    if topic_keyword and topic_keyword.strip():
-        filter_requirements.append(f"Topic/Keyword: **{topic_keyword.strip()}**")
-    
-    strict_filter_instruction = ""
-    if filter_requirements:
-        filter_list = "\n".join([f"  - {req}" for req in filter_requirements])
-        strict_filter_instruction = f"""
-🚨 STRICT FILTERING REQUIREMENTS 🚨
-You MUST ONLY include information that matches ALL of the following criteria:
-{filter_list}{region_instruction_detail}
-
-MATCHING RULES (FLEXIBLE):
-- Use CASE-INSENSITIVE matching (e.g., "Juba" matches "juba", "JUBA", "Juba")
-- Use PARTIAL matching (e.g., "Juba" matches "Juba County", "near Juba", "Juba area", "Juba region")
-- For regions: Check if the article text CONTAINS the region name OR any of the listed counties (case-insensitive)
-- For topics: Check if the article RELATES to the topic (keywords, themes, context)
-
-CRITICAL RULES:
-1. If an article does NOT contain the specified region/location name OR any listed counties (case-insensitive), EXCLUDE it entirely.
-2. If an article does NOT relate to the specified topic/keyword, EXCLUDE it entirely.
-3. Only use FACTS explicitly stated in the articles - NO speculation, NO inference, NO assumptions.
-4. If you exclude articles, you MUST list them at the end under "Excluded Articles" with brief reasons.
-5. If NO articles match the criteria, state clearly: "No articles match the specified region and topic criteria."
-"""
-    else:
-        strict_filter_instruction = """
-CRITICAL RULES:
-1. Only use FACTS explicitly stated in the articles - NO speculation, NO inference, NO assumptions.
-2. If information is limited or unclear, state this explicitly.
-"""
-
-    prompt = f"""You are a humanitarian crisis analyst. Based ONLY on the following news reports,
-provide a situation summary.
-
-Focus Context: {context_str}
-Time Period: {date_range[0]} to {date_range[1]}
-{strict_filter_instruction}
-REPORTS:
-{docs_text}
-
-INSTRUCTIONS:
-1. FIRST, review each article and determine if it matches the filtering requirements above.
-2. ONLY include articles that match ALL specified criteria (region AND topic if both provided).
-3. Provide 5-10 bullet points from MATCHING articles only, each summarizing a key finding or event.
-4. For EACH bullet point, cite the source article number(s) in square brackets, e.g. [1], [3,5].
-5. After the bullet points, provide a 2-3 sentence overall summary paragraph.
-6. Cite specific dates and locations when mentioned.
-7. Be factual - only state what is explicitly mentioned in the articles.
-8. At the END, list "Excluded Articles" - any articles that did not match the criteria with brief reasons.
-
-FORMAT:
-* **Key Finding**: Description... [article numbers]
-* ...
-
-**Overall Summary**: ...
-
-**Excluded Articles**: 
-- [article number]: Reason (e.g., "Does not mention {region_focus}", "Not related to {topic_keyword}")
-"""
-    return prompt, docs_text
-
+timer = page_timer("rag_summary")
 
 # Load data
-df = load_data()
+data = get_data_source()
+options = data.filter_options()
+timer.lap("load")
 
 # Sidebar filters
 st.sidebar.header("Scoping Filters")
 st.sidebar.info("These filters determine which articles the AI will analyze.")
 
-sources = render_source_filter(df, "p5")
-sentiments = render_sentiment_filter(df, "p5")
-date_range = render_date_filter(df, "p5")
-labels = render_label_filter(df, "p5")
+sources = render_source_filter(options, "p5")
+sentiments = render_sentiment_filter(options, "p5")
+date_range = render_date_filter(options, "p5")
+labels = render_label_filter(options, "p5")
 
 st.sidebar.markdown("---")
 st.sidebar.subheader("Geographic Scope")
-adm1 = render_adm1_filter(df, "p5")
-adm2 = render_adm2_filter(df, adm1_selection=adm1, key_prefix="p5")
+adm1 = render_adm1_filter(options, "p5")
+adm2 = render_adm2_filter(options, adm1_selection=adm1, key_prefix="p5")
+
+st.sidebar.markdown("---")
+skip_duplicates = render_dedup_toggle(options, "p5", default=True)
 
-# Apply filters
-filtered_df = apply_filters(
-    df, sources=sources, date_range=date_range,
+# Apply filters (duplicates are skipped at retrieval time)
+filters = Filters.of(
+    sources=sources, date_range=date_range,
     sentiments=sentiments, labels=labels, adm1=adm1, adm2=adm2
 )
+summary = data.summary(filters)
+
+timer.lap("filter")
 
 # Summary metrics
-render_summary_metrics(filtered_df)
+render_summary_metrics(summary)
 
 st.markdown("---")
 
@@ -231,9 +90,21 @@ with col2:
         key="p5_topic"
     )
 
+summary_mode = st.radio(
+    "Summarization mode",
+    ["Single prompt", "Map-reduce (large article sets)"],
+    horizontal=True,
+    help="Map-reduce summarizes articles in concurrent batches and merges the results, so it can cover hundreds of articles.",
+    key="p5_mode"
+)
+map_reduce_mode = summary_mode.startswith("Map-reduce")
+
 col3, col4, col5 = st.columns(3)
 with col3:
-    top_k = st.slider("Number of articles to analyze", 5, 50, 15, key="p5_topk")
+    if map_reduce_mode:
+        top_k = st.slider("Number of articles to analyze", 5, 500, 100, key="p5_topk_mr")
+    else:
+        top_k = st.slider("Number of articles to analyze", 5, 50, 15, key="p5_topk")
 with col4:
     model = st.selectbox(
         "Model",
@@ -249,16 +120,59 @@ with col5:
         key="p5_region_focus"
     )
 
+if map_reduce_mode:
+    col6, col7 = st.columns(2)
+    with col6:
+        batch_size = st.slider("Articles per batch", 5, 30, MAP_BATCH_SIZE, key="p5_batch_size")
+    with col7:
+        concurrency = st.slider("Concurrent LLM calls", 1, 16, MAX_CONCURRENCY, key="p5_concurrency",
+                                help="Also capped by the process-wide LLM gateway (LLM_GATEWAY_CONCURRENCY).")
+
 st.markdown("---")
 
+# Ready-made summary when the scope matches a pre-generated standard scope: one state x one topic
+# over all sources and counties (county box cleared) for the stored window (see scripts/pregenerate_summaries.py)
+all_sources = options.sources
+all_sentiments = options.sentiments
+standard_pair = (
+    len(adm1) == 1 and len(labels) == 1
+    and set(sources) == set(all_sources) and set(sentiments) == set(all_sentiments)
+    and (not topic_keyword.strip() or topic_keyword.strip().lower() == labels[0].lower())
+    and (not region_focus.strip() or region_focus.strip().lower() == adm1[0].lower())
+)
+ready_made = None
+if standard_pair and not adm2 and len(date_range) == 2:
+    ready_made = load_summary(adm1[0], labels[0], date_range[0], date_range[1])
+if standard_pair and ready_made is None:
+    latest = find_latest_summary(adm1[0], labels[0])
+    if latest:
+        st.caption(
+            f"A ready-made summary exists for {adm1[0]} / {labels[0]}, {latest['scope']['start']} to "
+            f"{latest['scope']['end']}. Clear the county filter and set the date range to that window to see it."
+        )
+if ready_made:
+    scope = ready_made["scope"]
+    st.subheader("Ready-made Summary")
+    st.caption(
+        f"Pre-generated for **{scope['adm1']}** / **{scope['label']}**, {scope['start']} to {scope['end']} "
+        f"({ready_made['model']}, {ready_made['generated_at']}). Use the steps below for a live summary of your exact filters."
+    )
+    if ready_made.get("dataset_version") != get_dataset_version():
+        st.warning("This summary was generated from an earlier data release.")
+    st.markdown(ready_made["summary"])
+    with st.expander(f"Source Article References ({len(ready_made['citations'])})", expanded=False):
+        st.dataframe(pd.DataFrame(ready_made["citations"]), use_container_width=True, hide_index=True)
+    st.markdown("---")
+
 # Step 1: Estimate Tokens and Cost
 st.subheader("Step 1: Estimate Tokens and Cost")
 
 if st.button("Estimate Input Tokens and Cost", key="p5_estimate"):
-    if filtered_df.empty:
+    if summary["total"] == 0:
         st.error("No articles match your filters.")
     else:
-        context_df = retrieve_top_k(filtered_df, topic_keyword, top_k)
+        # article text is only read for the top_k selected here (ranked by the backend in API mode)
+        context_df = data.top_articles(filters, topic_keyword, top_k, one_per_cluster=skip_duplicates)
 
         if context_df.empty:
             st.warning("Not enough articles found.")
@@ -272,10 +186,17 @@ if st.button("Estimate Input Tokens and Cost", key="p5_estimate"):
                 context_parts.append(f"Topic: {topic_keyword}")
             context_str = "; ".join(context_parts) if context_parts else "General coverage"
 
-            prompt, docs_text = build_prompt(context_df, context_str, date_range, region_focus, topic_keyword)
+            if map_reduce_mode:
+                prompt = ""
+                input_tokens, output_tokens_est, n_calls, n_rounds = estimate_map_reduce_tokens(
+                    context_df, context_str, date_range, region_focus, topic_keyword,
+                    batch_size=batch_size, fan_in=REDUCE_FAN_IN
+                )
+            else:
+                prompt, docs_text = build_prompt(context_df, context_str, date_range, region_focus, topic_keyword)
 
-            input_tokens = estimate_tokens(prompt) + 200  # Increased buffer for full text
-            output_tokens_est = 1500  # Increased for more comprehensive summaries
+                input_tokens = estimate_tokens(prompt) + 200  # Increased buffer for full text
+                output_tokens_est = 1500  # Increased for more comprehensive summaries
 
             pricing = MODEL_PRICING.get(model, {"input": 0, "output": 0})
             input_cost = (input_tokens / 1_000_000) * pricing["input"]
@@ -285,6 +206,8 @@ if st.button("Estimate Input Tokens and Cost", key="p5_estimate"):
             st.session_state["p5_context_df"] = context_df
             st.session_state["p5_prompt"] = prompt
             st.session_state["p5_context_str"] = context_str
+            st.session_state["p5_map_reduce"] = map_reduce_mode
+            st.session_state["p5_est_tokens"] = input_tokens + output_tokens_est
             st.session_state["p5_estimated"] = True
 
             st.success(f"Estimation complete -- {len(context_df)} articles selected.")
@@ -300,6 +223,9 @@ if st.button("Estimate Input Tokens and Cost", key="p5_estimate"):
                 st.metric("Est. Cost", f"${total_cost:.4f}")
 
             st.info(f"**Model**: {model}  |  **Pricing**: ${pricing['input']}/1M input, ${pricing['output']}/1M output")
+            if map_reduce_mode:
+                st.caption(f"Map-reduce plan: ~{n_calls} LLM calls in {n_rounds} sequential rounds "
+                           f"({batch_size} articles per batch, up to {concurrency} at a time).")
 
             with st.expander(f"Articles to be analyzed ({len(context_df)})", expanded=False):
                 for i, (_, r) in enumerate(context_df.iterrows()):
@@ -328,68 +254,126 @@ else:
             context_df = st.session_state.get("p5_context_df", pd.DataFrame())
             prompt = st.session_state.get("p5_prompt", "")
             context_str = st.session_state.get("p5_context_str", "")
+            use_map_reduce = st.session_state.get("p5_map_reduce", False)
 
-            if context_df.empty or not prompt:
+            if context_df.empty or (not prompt and not use_map_reduce):
                 st.error("No data available. Please re-run Step 1.")
             else:
-                with st.spinner("Generating summary from selected articles..."):
-                    try:
-                        response = client.ChatCompletion.create(
-                            model=model,
-                            messages=[
-                                {
-                                    "role": "system",
-                                    "content": "You are a careful crisis analyst. Provide factual, concise summaries based only on provided documents. When a specific region or district is provided as the focus, ensure all analysis centers on that location. Always cite article numbers in [brackets] for each bullet point."
-                                },
-                                {"role": "user", "content": prompt}
-                            ],
-                            max_tokens=1500,  # Increased for full article text
-                            temperature=0.3
+                gateway = get_llm_gateway()
+                user_id = current_user_id(api_key)
+                try:
+                    batch_stats = None
+                    if use_map_reduce:
+                        # Batches bypass single-flight but share the gateway's call slots and the user's budget
+                        reserved = st.session_state.get("p5_est_tokens", 0)
+                        gateway.reserve(user_id, reserved)
+                        # Map and intermediate reduce rounds run concurrently; the final merge is streamed below
+                        try:
+                            with st.status("Summarizing article batches...", expanded=False) as status, \
+                                    span("llm_map_reduce", model=model):
+                                partials, batch_stats = run_map_reduce_partials(
+                                    client, model, context_df, context_str, date_range, region_focus, topic_keyword,
+                                    batch_size=st.session_state.get("p5_batch_size", MAP_BATCH_SIZE),
+                                    concurrency=st.session_state.get("p5_concurrency", MAX_CONCURRENCY),
+                                    fan_in=REDUCE_FAN_IN,
+                                    on_progress=lambda msg: status.update(label=msg),
+                                    limiter=gateway.slot
+                                )
+                                status.update(
+                                    label=f"Summarized {batch_stats['batches']} batches in {batch_stats['rounds']} "
+                                          f"rounds ({batch_stats['elapsed']:.1f}s)",
+                                    state="complete"
+                                )
+                        finally:
+                            gateway.record_usage(
+                                user_id, model,
+                                batch_stats["prompt_tokens"] if batch_stats else 0,
+                                batch_stats["completion_tokens"] if batch_stats else 0,
+                                reserved=reserved
+                            )
+                        prompt = build_reduce_prompt(partials, context_str, date_range, region_focus, topic_keyword, final=True)
+
+                    messages = [
+                        {"role": "system", "content": SYSTEM_PROMPT},
+                        {"role": "user", "content": prompt}
+                    ]
+
+                    st.markdown("### Situation Summary")
+                    if region_focus:
+                        st.markdown(f"*Focused on: **{region_focus.strip()}***")
+
+                    # Stream tokens straight into the page so the first bullet shows up immediately
+                    # Identical in-flight requests from other sessions share one upstream call
+                    with span("llm_stream", model=model):
+                        summary = st.write_stream(
+                            gateway.stream(
+                                client, user_id,
+                                model=model,
+                                messages=messages,
+                                max_tokens=1500,  # Increased for full article text
+                                temperature=0.3
+                            )
                         )
-
-                        summary = response.choices[0].message.content
-
-                        usage = response.get("usage", {})
-                        if usage:
-                            ucol1, ucol2, ucol3, ucol4 = st.columns(4)
-                            actual_input = usage.get("prompt_tokens", 0)
-                            actual_output = usage.get("completion_tokens", 0)
-                            actual_total = usage.get("total_tokens", 0)
-                            pricing = MODEL_PRICING.get(model, {"input": 0, "output": 0})
-                            actual_cost = (actual_input / 1_000_000) * pricing["input"] + (actual_output / 1_000_000) * pricing["output"]
-
-                            with ucol1:
-                                st.metric("Prompt Tokens", f"{actual_input:,}")
-                            with ucol2:
-                                st.metric("Completion Tokens", f"{actual_output:,}")
-                            with ucol3:
-                                st.metric("Total Tokens", f"{actual_total:,}")
-                            with ucol4:
-                                st.metric("Actual Cost", f"${actual_cost:.4f}")
-
-                        st.success("Summary generated successfully.")
-
-                        st.markdown("### Situation Summary")
-                        if region_focus:
-                            st.markdown(f"*Focused on: **{region_focus.strip()}***")
-                        st.markdown(summary)
-
-                        st.markdown("### Source Article References")
-                        ref_data = []
-                        for i, (_, r) in enumerate(context_df.iterrows()):
-                            url = r.get("url", "")
-                            link = url if url and not pd.isna(url) else "N/A"
-                            ref_data.append({
-                                "#": i + 1,
-                                "Date": r["date"].strftime("%Y-%m-%d"),
-                                "Region": r["adm1_name_final"],
-                                "County": r["adm2_name_final"],
-                                "Label": r["Label"],
-                                "Title": r["title"][:60],
-                                "URL": link
-                            })
-                        ref_df = pd.DataFrame(ref_data)
-                        st.dataframe(ref_df, use_container_width=True, hide_index=True)
-
-                    except Exception as e:
-                        st.error(f"LLM Error: {e}")
+                    if not isinstance(summary, str):
+                        summary = "".join(str(part) for part in summary)
+
+                    # Streamed responses carry no usage block, so estimate it
+                    actual_input = sum(estimate_tokens(m["content"]) for m in messages)
+                    actual_output = estimate_tokens(summary)
+                    if batch_stats:
+                        actual_input += batch_stats["prompt_tokens"]
+                        actual_output += batch_stats["completion_tokens"]
+                    actual_total = actual_input + actual_output
+                    pricing = MODEL_PRICING.get(model, {"input": 0, "output": 0})
+                    actual_cost = (actual_input / 1_000_000) * pricing["input"] + (actual_output / 1_000_000) * pricing["output"]
+
+                    ucol1, ucol2, ucol3, ucol4 = st.columns(4)
+                    with ucol1:
+                        st.metric("Prompt Tokens (est.)", f"{actual_input:,}")
+                    with ucol2:
+                        st.metric("Completion Tokens (est.)", f"{actual_output:,}")
+                    with ucol3:
+                        st.metric("Total Tokens (est.)", f"{actual_total:,}")
+                    with ucol4:
+                        st.metric("Est. Cost", f"${actual_cost:.4f}")
+
+                    st.success("Summary generated successfully.")
+
+                    unknown_refs = [n for n in extract_citations(summary) if n > len(context_df)]
+                    if unknown_refs:
+                        st.warning(f"The summary cites article numbers that were not provided: {unknown_refs}")
+
+                    st.markdown("### Source Article References")
+                    ref_data = []
+                    for i, (_, r) in enumerate(context_df.iterrows()):
+                        url = r.get("url", "")
+                        link = url if url and not pd.isna(url) else "N/A"
+                        ref_data.append({
+                            "#": i + 1,
+                            "Date": r["date"].strftime("%Y-%m-%d"),
+                            "Region": r["adm1_name_final"],
+                            "County": r["adm2_name_final"],
+                            "Label": r["Label"],
+                            "Title": r["title"][:60],
+                            "URL": link
+                        })
+                    ref_df = pd.DataFrame(ref_data)
+                    st.dataframe(ref_df, use_container_width=True, hide_index=True)
+
+                except GatewayError as e:
+                    st.warning(str(e))
+                except Exception as e:
+                    st.error(f"LLM Error: {e}")
+
+# Shared LLM gateway status (process-wide)
+with st.sidebar.expander("LLM Gateway Status", expanded=False):
+    gw_stats = get_llm_gateway().stats()
+    st.metric("Queue Depth", f"{gw_stats['queue_depth']} / {gw_stats['max_queue']}")
+    st.metric("Active Calls", f"{gw_stats['active']} / {gw_stats['max_concurrency']}")
+    st.metric("Avg / p95 Wait", f"{gw_stats['wait_avg_s']:.1f}s / {gw_stats['wait_p95_s']:.1f}s")
+    st.metric("Coalesced Requests", f"{gw_stats['coalesced']:,} of {gw_stats['requests']:,}")
+    st.metric("Process Spend", f"${gw_stats['cost_usd']:.4f}")
+    st.caption(f"Your remaining token budget: {get_llm_gateway().remaining_budget(current_user_id(api_key)):,}")
+
+timer.lap("render")
+timer.done()
@@ -0,0 +1,122 @@
+"""
+Page 6: Memory Report
+Debug view of what this dashboard process holds in memory: the cached dataset by
+column, each session's state, filter-result copies and process RSS over time.
+"""
+
+import streamlit as st
+import pandas as pd
+import altair as alt
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from utils.data_access import get_data_source
+from utils.metrics import page_timer
+from utils.memory_report import (
+    active_sessions, current_rss, filter_results, fmt_bytes, frame_columns, get_rss_sampler, peak_rss,
+    standard_filter_sets, state_sizes
+)
+
+st.set_page_config(page_title="Memory Report", layout="wide")
+
+st.title("Memory Report")
+st.markdown("Where this dashboard process's memory goes: the cached dataset, session state and filter copies.")
+
+timer = page_timer("memory_report")
+
+sampler = get_rss_sampler()
+sampler.mark("memory page")
+data = get_data_source()
+df = data.df if data.name == "local" else None
+timer.lap("load")
+
+# 1. Process
+st.subheader("1. Process")
+sessions = active_sessions()
+col1, col2, col3 = st.columns(3)
+with col1:
+    st.metric("Resident Memory (RSS)", fmt_bytes(current_rss()))
+with col2:
+    st.metric("Peak RSS", fmt_bytes(peak_rss()))
+with col3:
+    st.metric("Active Sessions", f"{len(sessions):,}" if sessions else "N/A")
+
+rss = sampler.frame()
+if len(rss) > 1:
+    rss["rss_mb"] = rss["rss"] / (1024 * 1024)
+    rss["minutes"] = rss["seconds"] / 60
+    line = alt.Chart(rss).mark_line(color="#1f77b4").encode(
+        x=alt.X("minutes:Q", title="Minutes since first visit"),
+        y=alt.Y("rss_mb:Q", title="RSS (MB)"),
+        tooltip=[alt.Tooltip("minutes:Q", format=".1f"), alt.Tooltip("rss_mb:Q", title="RSS (MB)", format=",.1f")]
+    )
+    marks = alt.Chart(rss[rss["label"] != ""]).mark_point(color="#f44336").encode(
+        x="minutes:Q", y="rss_mb:Q", tooltip=["label:N", alt.Tooltip("rss_mb:Q", format=",.1f")]
+    )
+    st.altair_chart((line + marks).properties(height=250), use_container_width=True)
+st.caption(f"Sampled every {sampler.interval:g} s since this page was first opened in this process "
+           "(MEMORY_SAMPLE_SECONDS).")
+
+st.markdown("---")
+
+# 2. Cached dataset
+st.subheader("2. Cached Dataset")
+if df is None:
+    st.info("The dashboard reads through the API (DASHBOARD_DATA_BACKEND=api), so the dataset is held by the backend.")
+else:
+    columns = frame_columns(df)
+    total = int(columns["bytes"].sum())
+    dcol1, dcol2, dcol3 = st.columns(3)
+    with dcol1:
+        st.metric("Dataset Size", fmt_bytes(total))
+    with dcol2:
+        st.metric("Articles", f"{len(df):,}")
+    with dcol3:
+        st.metric("Per Article", fmt_bytes(total / max(len(df), 1)))
+
+    bars = alt.Chart(columns).mark_bar(color="#1f77b4").encode(
+        x=alt.X("bytes:Q", title="Bytes"),
+        y=alt.Y("column:N", title="", sort="-x"),
+        tooltip=["column:N", "dtype:N", alt.Tooltip("bytes:Q", format=",d"), alt.Tooltip("share:Q", format=".1%")]
+    ).properties(height=max(200, 22 * len(columns)))
+    st.altair_chart(bars, use_container_width=True)
+    display = columns.assign(size=columns["bytes"].map(fmt_bytes), share=(columns["share"] * 100).round(1))
+    st.dataframe(display[["column", "dtype", "size", "bytes_per_row", "share"]].round(1),
+                 use_container_width=True, hide_index=True)
+
+st.markdown("---")
+
+# 3. Session state
+st.subheader("3. Session State")
+mine = state_sizes(st.session_state)
+st.markdown(f"**This session**: {fmt_bytes(int(mine['bytes'].sum()))} in {len(mine)} keys")
+st.dataframe(mine.assign(size=mine["bytes"].map(fmt_bytes))[["key", "type", "size", "bytes"]],
+             use_container_width=True, hide_index=True)
+
+if sessions:
+    totals = pd.DataFrame([
+        {"session": sid[:8], "keys": len(state), "bytes": int(state_sizes(state)["bytes"].sum())}
+        for sid, state in sessions
+    ]).sort_values("bytes", ascending=False)
+    st.markdown(f"**All sessions**: {fmt_bytes(int(totals['bytes'].sum()))} across {len(totals)} sessions")
+    st.dataframe(totals.assign(size=totals["bytes"].map(fmt_bytes)), use_container_width=True, hide_index=True)
+
+st.markdown("---")
+
+# 4. Filter copies
+st.subheader("4. Filter Result Copies")
+if df is None:
+    st.info("Filtering runs on the backend in API mode.")
+else:
+    st.caption("apply_filters copies the frame before filtering, so each filtered view is a new frame. "
+               "Pages keep these for the length of a run.")
+    if st.button("Measure typical filter results", key="p6_filters"):
+        results = filter_results(df, standard_filter_sets(df))
+        results["size"] = results["bytes"].map(fmt_bytes)
+        results["ms"] = (results["seconds"] * 1000).round(1)
+        st.dataframe(results[["filters", "rows", "size", "bytes", "ms"]], use_container_width=True, hide_index=True)
+
+timer.lap("render")
+timer.done()
@@ -0,0 +1,152 @@
+"""
+Check that the API's alert statuses match the ADM1/ADM2 insight pages.
+
+Writes a small synthetic corpus to a temporary directory, serves the backend
+on it in a child process, and compares every (region, label) series of
+/analytics/alerts (ADM1 and ADM2, static and dynamic) with the page's own
+computation on the same corpus: LocalDataSource.monthly_counts for that
+region and label, then static_thresholds / dynamic_thresholds.
+
+Usage:
+    python scripts/check_alert_parity.py
+    python scripts/check_alert_parity.py --base-rows 20000 --seed 7
+"""
+
+import argparse
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+import requests
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from utils.alert_helpers import dynamic_thresholds, static_thresholds
+from utils.data_access import Filters, LocalDataSource
+from utils.data_loader import load_data
+from utils.synthetic_corpus import ensure_corpus
+
+BACKEND_DIR = Path(__file__).parent.parent / "backend"
+LEVELS = ["adm1", "adm2"]
+# API field -> page column, per method
+COLUMNS = {
+    "static": {"mean": "mean", "status": "status"},
+    "dynamic": {"mean": "rolling_mean", "sd": "rolling_std", "status": "status"},
+}
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def start_backend(corpus, workdir, port):
+    """uvicorn on the corpus alone: no sidecars, partitions, Redis or scraper state from data/."""
+    env = dict(
+        os.environ,
+        DATA_PATH=str(corpus),
+        PARTITIONS_DIR=str(workdir / "partitions"),
+        LABELS_PATH=str(workdir / "none.parquet"),
+        GEOTAGS_PATH=str(workdir / "none.parquet"),
+        SENTIMENT_PATH=str(workdir / "none.parquet"),
+        DATABASE_URL=f"sqlite:///{workdir / 'news.db'}",
+        ALERT_FEED_STATE_PATH=str(workdir / "alert_feed_state.json"),
+        REDIS_URL="",
+    )
+    return subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--host", "127.0.0.1", "--port", str(port),
+         "--log-level", "warning"],
+        cwd=BACKEND_DIR, env=env,
+    )
+
+
+def wait_for(url, timeout):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            if requests.get(url, timeout=5).status_code == 200:
+                return True
+        except requests.RequestException:
+            pass
+        time.sleep(0.5)
+    return False
+
+
+def compare(data, api_url, level, method):
+    """Mismatching months of every API series against the page computation."""
+    rows = requests.get(f"{api_url}/analytics/alerts", params={"level": level, "method": method},
+                        timeout=120).json()["statuses"]
+    by_series = {}
+    for row in rows:
+        by_series.setdefault((row["region"], row["label"]), []).append(row)
+
+    thresholds = static_thresholds if method == "static" else dynamic_thresholds
+    mismatches = []
+    for (region, label), series in by_series.items():
+        ts_data = data.monthly_counts(Filters.of().narrow(**{level: (region,)}, labels=(label,)))
+        ts_data = ts_data.rename(columns={"count": "article_count"}).sort_values("yearmon")
+        page = thresholds(ts_data).set_index("yearmon")
+        if sorted(page.index) != [row["yearmon"] for row in series]:
+            mismatches.append((region, label, "months differ"))
+            continue
+        for row in series:
+            expected = page.loc[row["yearmon"]]
+            for field, column in COLUMNS[method].items():
+                ok = (row[field] == expected[column] if field == "status"
+                      else np.isclose(np.nan if row[field] is None else row[field], expected[column],
+                                      atol=1e-3, equal_nan=True))
+                if not ok:
+                    mismatches.append((region, label, f"{row['yearmon']} {field}: api={row[field]} page={expected[column]}"))
+    return len(by_series), mismatches
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare API alert statuses with the insight pages")
+    parser.add_argument("--base-rows", type=int, default=5000, help="Rows in the fixture corpus")
+    parser.add_argument("--seed", type=int, default=20240601)
+    parser.add_argument("--timeout", type=float, default=120.0, help="Seconds to wait for the backend")
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print("Alert Parity Check (API vs insight pages)")
+    print("=" * 60)
+
+    success = True
+    with tempfile.TemporaryDirectory() as tmp:
+        workdir = Path(tmp)
+        corpus, _ = ensure_corpus("1x", args.base_rows, args.seed, workdir)
+        print(f"\n📦 Fixture corpus: {args.base_rows:,} rows -> {corpus.name}")
+        data = LocalDataSource(load_data(str(corpus)))
+
+        port = free_port()
+        api_url = f"http://127.0.0.1:{port}/api/v1"
+        server = start_backend(corpus, workdir, port)
+        try:
+            if not wait_for(f"{api_url}/health", args.timeout):
+                print("\n❌ Backend did not come up")
+                return False
+            for level in LEVELS:
+                for method in COLUMNS:
+                    series, mismatches = compare(data, api_url, level, method)
+                    mark = "✅" if not mismatches else "❌"
+                    print(f"   {mark} {level} {method}: {series} series, {len(mismatches)} mismatches")
+                    for region, label, detail in mismatches[:5]:
+                        print(f"      {region} / {label}: {detail}")
+                    success &= not mismatches and series > 0
+        finally:
+            server.terminate()
+            server.wait()
+
+    print("\n✅ API statuses match the pages" if success else "\n❌ API statuses differ from the pages")
+    return success
+
+
+if __name__ == "__main__":
+    success = main()
+    exit(0 if success else 1)
@@ -1,120 +1,121 @@
 """
 Convert CSV data to Parquet format for efficient deployment.
 
-This script converts the large CSV file to Parquet format, which:
-- Reduces file size by 80-90%
-- Improves read performance
-- Maintains all data integrity
+This script streams the large CSV into a Parquet file that:
+- Is zstd-compressed, with dictionary encoding on low-cardinality columns
+- Is sorted by date, with row-group statistics so date-range reads skip groups
+- Follows a declared schema (dates and scores parsed, everything else strings)
+- Is verified by streaming per-column checksums rather than a full re-read
+
+Memory stays flat as the CSV grows. The input is read in blocks and spilled
+by month (see utils/csv_to_parquet.py), so peak usage depends on the block,
+month and row-group sizes rather than on the file size.
 
 Usage:
     python scripts/convert_to_parquet.py
+    python scripts/convert_to_parquet.py --csv other.csv --output other.parquet --row-group-mb 32
 """
 
-import pandas as pd
-from pathlib import Path
+import argparse
+import sys
 import time
+from pathlib import Path
+
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
 
-def convert_to_parquet():
+from utils.csv_to_parquet import (
+    BLOCK_MB, ROW_GROUP_MB, ZSTD_LEVEL, convert, date_bounds, row_groups_for_range, verify
+)
+from utils.memory_report import peak_rss
+
+
+def convert_to_parquet(args):
     """Convert all_clean_df.csv to Parquet format."""
-    
-    # Paths
-    csv_path = Path('data/processed/all_clean_df.csv')
-    parquet_path = Path('data/processed/all_clean_df.parquet')
-    
+
+    csv_path = Path(args.csv)
+    parquet_path = Path(args.output)
+
     print("=" * 60)
     print("CSV to Parquet Conversion")
     print("=" * 60)
-    
+
     # Check if CSV exists
     if not csv_path.exists():
         print(f"❌ Error: CSV file not found at {csv_path}")
         return False
-    
-    # Get original file size
+
     original_size_mb = csv_path.stat().st_size / (1024 * 1024)
     print(f"\n📊 Original CSV size: {original_size_mb:.2f} MB")
-    
-    # Read CSV
-    print(f"\n⏳ Reading CSV file...")
-    start_time = time.time()
-    df = pd.read_csv(csv_path, low_memory=False)  # Handle mixed dtypes
-    read_time = time.time() - start_time
-    print(f"✅ CSV loaded in {read_time:.2f} seconds")
-    print(f"   Shape: {df.shape[0]:,} rows × {df.shape[1]} columns")
-    
-    # Display column info
-    print(f"\n📋 Columns ({len(df.columns)}):")
-    for col in df.columns[:10]:  # Show first 10 columns
-        print(f"   - {col} ({df[col].dtype})")
-    if len(df.columns) > 10:
-        print(f"   ... and {len(df.columns) - 10} more columns")
-    
-    # Convert to Parquet
-    print(f"\n⏳ Converting to Parquet format...")
+
+    # Convert: stream, spill by month, write sorted row groups
+    print(f"\n⏳ Converting to Parquet (blocks of {args.block_mb} MB, zstd level {args.zstd_level})...")
     start_time = time.time()
-    df.to_parquet(parquet_path, compression='gzip', index=False)
+    try:
+        result = convert(csv_path, parquet_path, block_mb=args.block_mb, row_group_mb=args.row_group_mb,
+                         zstd_level=args.zstd_level)
+    except ValueError as e:
+        print(f"❌ Error: {e}")
+        return False
     write_time = time.time() - start_time
-    print(f"✅ Parquet file created in {write_time:.2f} seconds")
-    
-    # Get new file size
+    print(f"✅ Parquet file created in {write_time:.2f} seconds ({original_size_mb / write_time:.1f} MB/s)")
+    print(f"   Shape: {result['rows']:,} rows × {result['columns']} columns, {result['months']} months")
+    print(f"   Row groups: {result['row_groups']} of up to {result['rows_per_group']:,} rows (~{args.row_group_mb} MB each)")
+    for column, count in result["coerced"].items():
+        if count:
+            print(f"   ⚠️  {count:,} values in '{column}' could not be parsed and were stored as null")
+
     new_size_mb = parquet_path.stat().st_size / (1024 * 1024)
-    reduction_pct = ((original_size_mb - new_size_mb) / original_size_mb) * 100
-    
+    reduction_pct = ((original_size_mb - new_size_mb) / original_size_mb) * 100 if original_size_mb else 0.0
+
     print(f"\n📊 Results:")
     print(f"   Original (CSV):  {original_size_mb:.2f} MB")
     print(f"   New (Parquet):   {new_size_mb:.2f} MB")
     print(f"   Reduction:       {reduction_pct:.1f}%")
     print(f"   Saved:           {original_size_mb - new_size_mb:.2f} MB")
-    
-    # Test reading Parquet
-    print(f"\n⏳ Testing Parquet read performance...")
-    start_time = time.time()
-    df_test = pd.read_parquet(parquet_path)
-    parquet_read_time = time.time() - start_time
-    
-    print(f"✅ Parquet loaded in {parquet_read_time:.2f} seconds")
-    print(f"   Speedup: {read_time / parquet_read_time:.1f}x faster than CSV")
-    
-    # Verify data integrity
+
+    # Verify data integrity by streaming the output back
     print(f"\n🔍 Verifying data integrity...")
-    if df.shape == df_test.shape:
-        print(f"✅ Shape matches: {df.shape[0]:,} rows × {df.shape[1]} columns")
-    else:
-        print(f"❌ Shape mismatch!")
+    start_time = time.time()
+    mismatched, ordered = verify(parquet_path, result["checksums"])
+    if mismatched:
+        print(f"❌ Checksum mismatch in: {', '.join(mismatched)}")
         return False
-    
-    # Check a few values (handle NaN properly)
-    print(f"✅ Checking sample data...")
-    
-    # Compare dtypes
-    dtype_match = all(df[col].dtype == df_test[col].dtype for col in df.columns)
-    if dtype_match:
-        print(f"   ✓ Column dtypes match")
-    
-    # Compare non-null counts
-    null_counts_match = (df.isnull().sum() == df_test.isnull().sum()).all()
-    if null_counts_match:
-        print(f"   ✓ Null value counts match")
-    
-    # Compare a sample of non-null values
-    sample_col = df.columns[4]  # Use 'title' column for comparison
-    sample_values_match = df[sample_col].head(10).equals(df_test[sample_col].head(10))
-    if sample_values_match:
-        print(f"   ✓ Sample values match (checked '{sample_col}' column)")
-    
+    print(f"   ✓ Row count and per-column null counts / value checksums match ({time.time() - start_time:.2f} s)")
+    if not ordered:
+        print(f"❌ Rows are not sorted by date")
+        return False
+    print(f"   ✓ Rows sorted by date")
+
+    # Show how much a one-month read can skip
+    _, latest = date_bounds(parquet_path)
+    if latest is not None and result["row_groups"] > 1:
+        hits, total = row_groups_for_range(parquet_path, latest - pd.Timedelta(days=30), latest)
+        print(f"   ✓ A read of the last 30 days touches {hits} of {total} row groups")
     print(f"✅ Data integrity verified")
-    
+    peak = peak_rss()
+    if peak:
+        print(f"\n💾 Peak memory: {peak / (1024 * 1024):.0f} MB")
+
     print(f"\n" + "=" * 60)
     print(f"✅ Conversion successful!")
     print(f"=" * 60)
-    print(f"\nNext steps:")
-    print(f"1. Update utils/data_loader.py to use Parquet format")
-    print(f"2. Test the dashboard locally with Parquet data")
-    print(f"3. Deploy to Streamlit Cloud (now fits within 1 GB limit!)")
     print(f"\nParquet file location: {parquet_path.absolute()}")
-    
+
     return True
 
+
+def main():
+    parser = argparse.ArgumentParser(description="Stream a CSV into date-sorted, zstd-compressed Parquet")
+    parser.add_argument("--csv", default="data/processed/all_clean_df.csv")
+    parser.add_argument("--output", default="data/processed/all_clean_df.parquet")
+    parser.add_argument("--block-mb", type=int, default=BLOCK_MB, help="CSV read block size")
+    parser.add_argument("--row-group-mb", type=int, default=ROW_GROUP_MB, help="Target uncompressed row-group size")
+    parser.add_argument("--zstd-level", type=int, default=ZSTD_LEVEL)
+    return convert_to_parquet(parser.parse_args())
+
+
 if __name__ == "__main__":
-    success = convert_to_parquet()
+    success = main()
     exit(0 if success else 1)
@@ -0,0 +1,103 @@
+"""
+Detect near-duplicate articles (the same wire story across sources).
+
+Builds MinHash signatures of `paragraphs_cleaned` over a process pool and
+clusters them with an LSH index. The index is saved, so later runs only
+sign and insert articles that are not indexed yet; a --threshold other than
+the saved index's rebuilds it, since clusters already merged at the old
+threshold cannot be split. Writes a cluster table
+(article_id, cluster_id, cluster_size) that load_data() picks up, letting
+alert pages and retrieval count or select one article per cluster.
+
+Usage:
+    python scripts/dedup_articles.py
+    python scripts/dedup_articles.py --rebuild --workers 8 --threshold 0.8
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from utils.data_loader import DATA_PATH, make_article_ids
+from utils.dedup import (
+    DEFAULT_CLUSTERS_PATH, DEFAULT_INDEX_PATH, JACCARD_THRESHOLD, NUM_BANDS, NUM_PERM, MinHashLSH, deduplicate
+)
+
+COLUMNS = ["date", "url", "title", "paragraphs_cleaned", "retrieve_source"]
+
+
+def read_articles(data_path):
+    if str(data_path).endswith(".csv"):
+        df = pd.read_csv(data_path, usecols=COLUMNS, low_memory=False)
+    else:
+        df = pd.read_parquet(data_path, columns=COLUMNS)
+    df["date"] = pd.to_datetime(df["date"], errors="coerce")
+    df["article_id"] = make_article_ids(df)
+    return df
+
+
+def main():
+    parser = argparse.ArgumentParser(description="MinHash/LSH near-duplicate detection")
+    parser.add_argument("--data-path", default=DATA_PATH)
+    parser.add_argument("--index-path", default=DEFAULT_INDEX_PATH)
+    parser.add_argument("--output", default=DEFAULT_CLUSTERS_PATH)
+    parser.add_argument("--workers", type=int, default=None, help="Process pool size (default: CPU count)")
+    parser.add_argument("--threshold", type=float, default=None,
+                        help=f"Jaccard similarity for a duplicate (default: the saved index's, else {JACCARD_THRESHOLD})")
+    parser.add_argument("--rebuild", action="store_true", help="Ignore the saved index and start over")
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print("Near-Duplicate Article Detection (MinHash/LSH)")
+    print("=" * 60)
+
+    start_time = time.time()
+    df = read_articles(args.data_path)
+    print(f"\n📊 Loaded {len(df):,} articles in {time.time() - start_time:.2f} seconds")
+
+    index = None
+    if Path(args.index_path).exists() and not args.rebuild:
+        index = MinHashLSH.load(args.index_path)
+        print(f"📂 Loaded index with {len(index):,} articles (threshold {index.threshold})")
+        if args.threshold is not None and args.threshold != index.threshold:
+            print(f"⚠️  --threshold {args.threshold} differs from the saved index's {index.threshold}; rebuilding")
+            index = None
+    if index is None:
+        threshold = JACCARD_THRESHOLD if args.threshold is None else args.threshold
+        index = MinHashLSH(num_perm=NUM_PERM, num_bands=NUM_BANDS, threshold=threshold)
+
+    start_time = time.time()
+    index, n_new = deduplicate(df, index=index, workers=args.workers)
+    elapsed = time.time() - start_time
+    rate = n_new / elapsed if elapsed > 0 else 0
+    print(f"✅ Indexed {n_new:,} new articles in {elapsed:.2f} seconds ({rate:,.0f} articles/s)")
+
+    index.save(args.index_path)
+    clusters = index.cluster_table()
+    Path(args.output).parent.mkdir(parents=True, exist_ok=True)
+    clusters.to_parquet(args.output, index=False)
+
+    dup_clusters = clusters[clusters["cluster_size"] > 1]
+    by_source = df.merge(clusters, on="article_id")
+    cross_source = by_source.groupby("cluster_id")["retrieve_source"].nunique()
+
+    print(f"\n📊 Results:")
+    print(f"   Articles indexed:        {len(clusters):,}")
+    print(f"   Clusters:                {clusters['cluster_id'].nunique():,}")
+    print(f"   Articles in duplicates:  {len(dup_clusters):,}")
+    print(f"   Redundant copies:        {len(clusters) - clusters['cluster_id'].nunique():,}")
+    print(f"   Cross-source clusters:   {(cross_source > 1).sum():,}")
+    print(f"   Largest cluster:         {clusters['cluster_size'].max() if len(clusters) else 0}")
+    print(f"\nIndex: {Path(args.index_path).absolute()}")
+    print(f"Clusters: {Path(args.output).absolute()}")
+    return True
+
+
+if __name__ == "__main__":
+    success = main()
+    exit(0 if success else 1)
@@ -1,63 +1,73 @@
-import pandas as pd
-import numpy as np
-
-def estimate_tokens(text):
-    if pd.isna(text): return 0
-    return len(str(text)) // 4
-
-def generate_report():
-    data_path = "data/processed/all_clean_df.csv"
-    df = pd.read_csv(data_path, low_memory=False)
-    df["date"] = pd.to_datetime(df["date"], errors="coerce")
-    df = df.dropna(subset=["date"])
-    df["quarter"] = df["date"].dt.to_period("Q").astype(str)
-    
-    # 1. Average tokens per article
-    df["tokens"] = df["paragraphs_cleaned"].apply(estimate_tokens)
-    avg_tokens = df["tokens"].mean()
-    
-    # 2. Counts for averages
-    # Group by Quarter, Source, Label, ADM2
-    # The 'grouped' variable is not used in the final report, so it can be removed or commented out if not needed.
-    # grouped = df.groupby(["quarter", "retrieve_source", "Label", "adm2_name_final"]).size().reset_index(name="count")
-    
-    # Average articles per quarter? Or per quarter-source-label-adm2 combo?
-    # Let's provide a breakdown of counts first.
-    
-    report = []
-    report.append("# South Sudan News Analytics Platform - Data Distribution Report\n")
-    report.append(f"## Global Statistics")
-    report.append(f"- **Total Articles**: {len(df):,}")
-    report.append(f"- **Average Tokens per Article**: {avg_tokens:.1f}\n")
-    
-    report.append(f"## Top 10 ADM2 Regions (Total Volume)")
-    report.append(df["adm2_name_final"].value_counts().head(10).to_string())
-    report.append("\n")
-    
-    report.append(f"## Article Counts by Source")
-    report.append(df["retrieve_source"].value_counts().to_string())
-    report.append("\n")
-    
-    report.append(f"## Average Articles by Quarter & Label (Top 5 Labels)")
-    top_labels = df["Label"].value_counts().head(5).index.tolist()
-    q_label_top = df[df["Label"].isin(top_labels)].groupby(["quarter", "Label"]).size().reset_index(name="count")
-    pivot_ql = q_label_top.pivot(index="quarter", columns="Label", values="count").fillna(0)
-    report.append(pivot_ql.to_string())
-    report.append("\n")
-    
-    report.append(f"## Token Cost Estimation Example")
-    sample_size = 15
-    total_input_tokens = avg_tokens * sample_size
-    # Pricing for gpt-4o-mini: 0.15 per 1M tokens
-    cost = (total_input_tokens / 1_000_000) * 0.15
-    report.append(f"Summarizing **{sample_size}** articles (avg {avg_tokens:.1f} tokens each):")
-    report.append(f"- **Estimated Input Tokens**: {total_input_tokens:,.1f}")
-    report.append(f"- **Estimated Cost (gpt-4o-mini)**: ${cost:.5f}")
-    
-    with open("deployment_report.md", "w", encoding="utf-8") as f:
-        f.write("\n".join(report))
-    
-    print("Report generated: deployment_report.md")
+"""
+Generate the data distribution report (Markdown + JSON) from the Parquet dataset.
+
+Row groups of the dataset and of any ingestion partitions are scanned in a
+process pool and aggregated column-wise (see utils/dataset_report.py), so
+the report works on datasets larger than RAM. The report covers counts by
+quarter × source × label × ADM2, token and text-length distributions, null
+rates and a cost example. Runtime is printed per section.
+
+Usage:
+    python scripts/generate_deployment_report.py
+    python scripts/generate_deployment_report.py --workers 8 --output reports/deployment_report.md
+"""
+
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from utils.data_loader import DATA_PATH, partition_paths
+from utils.dataset_report import build_report, render_markdown, scan
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Data distribution report")
+    parser.add_argument("--data-path", default=DATA_PATH, help="Parquet dataset (partitions are added automatically)")
+    parser.add_argument("--output", default="deployment_report.md", help="Markdown path; JSON is written alongside")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes (default: CPU count)")
+    parser.add_argument("--top", type=int, default=10, help="Rows in the top-N tables")
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print("Data Distribution Report")
+    print("=" * 60)
+
+    data_path = Path(args.data_path)
+    if data_path.suffix == ".csv":
+        print(f"❌ Error: {data_path} is a CSV. Convert it first: python scripts/convert_to_parquet.py")
+        return False
+    if not data_path.exists():
+        print(f"❌ Error: dataset not found at {data_path}")
+        return False
+    paths = [data_path] + partition_paths()
+    print(f"\n📂 {len(paths)} file(s): {data_path}" + (f" + {len(paths) - 1} partitions" if len(paths) > 1 else ""))
+
+    print(f"\n⏳ Scanning row groups...")
+    stats = scan(paths, workers=args.workers)
+    print(f"✅ {stats['rows']:,} rows in {stats['row_groups']} row groups scanned in {stats['scan_seconds']:.2f} s")
+    for section, seconds in stats["timings"].items():
+        print(f"   - {section}: {seconds:.2f} s worker CPU")
+
+    started = time.perf_counter()
+    report = build_report(stats, paths, top=args.top)
+    for section, seconds in report["timings"]["report_seconds"].items():
+        print(f"   - {section} (report): {seconds:.3f} s")
+
+    md_path = Path(args.output)
+    json_path = md_path.with_suffix(".json")
+    md_path.parent.mkdir(parents=True, exist_ok=True)
+    md_path.write_text(render_markdown(report, top=args.top), encoding="utf-8")
+    json_path.write_text(json.dumps(report, indent=2, default=str), encoding="utf-8")
+    print(f"   - render: {time.perf_counter() - started:.3f} s")
+
+    print(f"\n✅ Report generated: {md_path} and {json_path}")
+    return True
+
 
 if __name__ == "__main__":
-    generate_report()
+    success = main()
+    exit(0 if success else 1)
@@ -0,0 +1,64 @@
+"""
+Generate deterministic synthetic corpora at multiples of the current dataset size.
+
+The corpora have the dataset's schema and a realistic skew across sources,
+regions and labels (see utils/synthetic_corpus.py). The same seed and size
+always give the same file, so benchmark runs on different machines or
+commits measure the same data. Point DATA_PATH at a corpus to try the
+dashboard on it.
+
+Usage:
+    python scripts/generate_synthetic_corpus.py
+    python scripts/generate_synthetic_corpus.py --scale 1x 10x 100x --seed 7
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from utils.synthetic_corpus import BASE_ROWS, DEFAULT_SEED, SCALES, ensure_corpus
+
+
+def generate(scale, base_rows, seed, output_dir, force=False):
+    """Write one corpus unless it already exists; returns its path."""
+    rows = base_rows * SCALES[scale]
+
+    def progress(done, total):
+        if done == total or done % 24 == 0:
+            print(f"   ... {scale}: {done}/{total} months", flush=True)
+
+    start_time = time.time()
+    path, groups = ensure_corpus(scale, base_rows, seed, output_dir, force, progress=progress)
+    if groups is None:
+        print(f"   ✓ {scale}: {path} already exists (use --force to regenerate)")
+        return path
+    size_mb = path.stat().st_size / (1024 * 1024)
+    print(f"✅ {scale}: {rows:,} rows, {groups} row groups, {size_mb:.1f} MB in {time.time() - start_time:.1f} s -> {path}")
+    return path
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Deterministic synthetic news corpora")
+    parser.add_argument("--scale", nargs="+", choices=list(SCALES), default=["1x"])
+    parser.add_argument("--base-rows", type=int, default=BASE_ROWS, help="Rows at 1x")
+    parser.add_argument("--seed", type=int, default=DEFAULT_SEED)
+    parser.add_argument("--output-dir", default="data/synthetic")
+    parser.add_argument("--force", action="store_true", help="Regenerate corpora that already exist")
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print("Synthetic Corpus Generation")
+    print("=" * 60)
+    print(f"\n⚙️  Seed {args.seed}, {args.base_rows:,} rows at 1x\n")
+
+    for scale in args.scale:
+        generate(scale, args.base_rows, args.seed, args.output_dir, args.force)
+    return True
+
+
+if __name__ == "__main__":
+    success = main()
+    exit(0 if success else 1)
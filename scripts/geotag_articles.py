@@ -0,0 +1,90 @@
+"""
+Re-geotag the whole corpus against the gazetteer.
+
+Compiles the gazetteer CSV (states, counties, towns and alternate
+spellings) into one trie and scans every article's title and body over a
+process pool. Writes a table (article_id, adm1_name_final, adm2_name_final,
+geo_matches) that load_data() picks up wherever the gazetteer found a place,
+so a gazetteer edit is one command away from the dashboard.
+
+Usage:
+    python scripts/geotag_articles.py
+    python scripts/geotag_articles.py --gazetteer data/gazetteer.csv --workers 8
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from utils.data_loader import DATA_PATH, GEOTAGS_PATH, load_partitions, make_article_ids
+from utils.geotagger import GAZETTEER_PATH, UNKNOWN_ADM1, UNKNOWN_ADM2, geotag_frame, load_gazetteer
+
+COLUMNS = ["url", "title", "paragraphs", "adm1_name_final", "adm2_name_final"]
+
+
+def read_articles(data_path):
+    if str(data_path).endswith(".csv"):
+        df = pd.read_csv(data_path, usecols=COLUMNS, low_memory=False)
+    else:
+        df = pd.read_parquet(data_path, columns=COLUMNS)
+    partitions = load_partitions(columns=COLUMNS)
+    if partitions is not None:
+        df = pd.concat([df, partitions], ignore_index=True)
+    df["article_id"] = make_article_ids(df)
+    return df.drop_duplicates("article_id")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Geotag articles with the gazetteer")
+    parser.add_argument("--data-path", default=DATA_PATH)
+    parser.add_argument("--gazetteer", default=GAZETTEER_PATH)
+    parser.add_argument("--output", default=GEOTAGS_PATH)
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes (default: all cores)")
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print("Gazetteer Geotagging")
+    print("=" * 60)
+
+    for path in (args.data_path, args.gazetteer):
+        if not Path(path).exists():
+            print(f"❌ Error: file not found: {path}")
+            return False
+
+    gazetteer = load_gazetteer(args.gazetteer)
+    df = read_articles(args.data_path)
+    print(f"\n📰 {len(df):,} articles, {len(gazetteer):,} gazetteer names "
+          f"({gazetteer['adm1'].nunique()} ADM1, {gazetteer['adm2'].replace('', pd.NA).nunique()} ADM2)")
+
+    start_time = time.time()
+    geo = geotag_frame(df, gazetteer, workers=args.workers)
+    elapsed = time.time() - start_time
+    rate = len(df) / elapsed if elapsed > 0 else 0
+    print(f"✅ Geotagged {len(df):,} articles in {elapsed:.2f} seconds ({rate:,.0f} articles/s)")
+
+    Path(args.output).parent.mkdir(parents=True, exist_ok=True)
+    geo.to_parquet(args.output, index=False)
+
+    found1 = geo["adm1_name_final"] != UNKNOWN_ADM1
+    found2 = geo["adm2_name_final"] != UNKNOWN_ADM2
+    stored2 = df["adm2_name_final"].fillna(UNKNOWN_ADM2).values != UNKNOWN_ADM2
+    mentions = geo["geo_matches"].str.count(r"\[\d").sum()
+    agree = (geo["adm1_name_final"].values == df["adm1_name_final"].values) & found1.values
+    print(f"\n📊 Results:")
+    print(f"   ADM1 found:               {found1.sum():,} ({found1.mean():.1%})")
+    print(f"   ADM2 found:               {found2.sum():,} ({found2.mean():.1%})")
+    print(f"   Unknown County resolved:  {(found2.values & ~stored2).sum():,}")
+    print(f"   ADM1 agrees with stored:  {agree.sum():,} of {found1.sum():,}")
+    print(f"   Place mentions:           {mentions:,}")
+    print(f"\nGeotags: {Path(args.output).absolute()}")
+    return True
+
+
+if __name__ == "__main__":
+    success = main()
+    exit(0 if success else 1)
@@ -0,0 +1,180 @@
+"""
+Memory accounting for the dashboard: replay scripted page sessions and report
+what each one holds.
+
+Loads the dataset the way the dashboard does, sizes it by column and sizes
+typical filter results. It then replays --sessions browser sessions
+in-process with Streamlit's AppTest: Home, pages 1-4, then page 5 with a
+token estimate (which stores the retrieved context in session state). The
+sessions are kept alive so their state adds up as it would on a server.
+Each session's state is sized by key, and process RSS is sampled throughout.
+
+Use the totals to size containers. Use --max-session-mb to fail when a session
+grows past a budget.
+
+Usage:
+    python scripts/memory_report.py
+    python scripts/memory_report.py --data-path data/synthetic/corpus_500000_20240601.parquet --sessions 5
+    python scripts/memory_report.py --output data/memory_report.json --max-session-mb 50
+"""
+
+import argparse
+import json
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+
+ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(ROOT))
+
+import utils.data_loader as data_loader
+from utils.memory_report import (
+    RssSampler, filter_results, fmt_bytes, frame_columns, peak_rss, standard_filter_sets, state_sizes
+)
+
+PAGES = [
+    "pages/1_Dataset_Overview.py",
+    "pages/2_ADM1_Insights.py",
+    "pages/3_ADM2_Insights.py",
+    "pages/4_Article_Browser.py",
+    "pages/5_RAG_LLM_Summary.py",
+]
+
+
+def replay_session(sampler, index, timeout):
+    """Run one scripted session; returns the AppTest (kept alive by the caller) and any page errors."""
+    from streamlit.testing.v1 import AppTest
+
+    at = AppTest.from_file(str(ROOT / "Home.py"), default_timeout=timeout)
+    at.run()
+    errors = [f"Home: {e.value}" for e in at.exception]
+    sampler.mark(f"session {index}: Home")
+    for page in PAGES:
+        at.switch_page(str(ROOT / page))
+        at.run()
+        if page.startswith("pages/5_"):
+            at.button(key="p5_estimate").click()
+            at.run()
+        errors += [f"{Path(page).stem}: {e.value}" for e in at.exception]
+        sampler.mark(f"session {index}: {Path(page).stem}")
+    return at, errors
+
+
+def print_table(rows, columns):
+    for row in rows:
+        print("   " + " ".join(f"{row[c]:>{w}}" if isinstance(w, int) else f"{row[c]:<{w[0]}}"
+                               for c, w in columns))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Memory accounting for the dataset and replayed page sessions")
+    parser.add_argument("--data-path", help="Parquet dataset to load (default: the dashboard's dataset)")
+    parser.add_argument("--sessions", type=int, default=3, help="Sessions to replay and keep alive")
+    parser.add_argument("--interval", type=float, default=0.5, help="RSS sampling interval in seconds")
+    parser.add_argument("--timeout", type=float, default=120, help="Seconds allowed per page run")
+    parser.add_argument("--output", help="Write the report as JSON to this path")
+    parser.add_argument("--max-session-mb", type=float, help="Exit non-zero if a session's state exceeds this")
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print("Memory report")
+    print("=" * 60)
+
+    if args.data_path:
+        if not Path(args.data_path).exists():
+            print(f"❌ Not found: {args.data_path}")
+            return False
+        data_loader.DEFAULT_PARQUET_PATH = args.data_path  # what load_data() reads, in the sessions too
+
+    sampler = RssSampler(interval=args.interval).start()
+    sampler.mark("start")
+
+    # 1. Dataset
+    print(f"\n📂 Loading {data_loader.DEFAULT_PARQUET_PATH}...")
+    started = time.time()
+    df = data_loader.load_data()
+    sampler.mark("dataset loaded")
+    columns = frame_columns(df)
+    dataset_bytes = int(columns["bytes"].sum())
+    print(f"   {len(df):,} rows in {time.time() - started:.1f}s, {fmt_bytes(dataset_bytes)} "
+          f"({fmt_bytes(dataset_bytes / max(len(df), 1))} per row)")
+    print("\n📊 By column:")
+    print_table(
+        [{**r, "size": fmt_bytes(r["bytes"]), "pct": f"{r['share']:.1%}"} for r in columns.to_dict("records")],
+        [("column", (26,)), ("dtype", (16,)), ("size", 10), ("pct", 7)],
+    )
+
+    # 2. Filter results
+    filters = filter_results(df, standard_filter_sets(df))
+    sampler.mark("filters measured")
+    print("\n🔎 apply_filters results (each is a new frame):")
+    print_table(
+        [{**r, "size": fmt_bytes(r["bytes"]), "rows": f"{r['rows']:,}", "ms": f"{r['seconds'] * 1000:.0f}ms"}
+         for r in filters.to_dict("records")],
+        [("filters", (16,)), ("rows", 10), ("size", 10), ("ms", 8)],
+    )
+
+    # 3. Sessions
+    print(f"\n🧭 Replaying {args.sessions} session(s): Home, pages 1-5 with a token estimate")
+    sessions, kept = [], []
+    for i in range(1, args.sessions + 1):
+        sampler.mark(f"session {i}: start")
+        before = sampler.samples[-1]["rss"]
+        at, errors = replay_session(sampler, i, args.timeout)
+        kept.append(at)
+        sizes = state_sizes(at.session_state._state)
+        after = sampler.samples[-1]["rss"]
+        session = {
+            "session": i,
+            "state_bytes": int(sizes["bytes"].sum()),
+            "rss_delta": after - before,
+            "keys": sizes.to_dict("records"),
+            "errors": errors,
+        }
+        sessions.append(session)
+        print(f"   Session {i}: state {fmt_bytes(session['state_bytes'])} in {len(sizes)} keys, "
+              f"RSS {session['rss_delta'] / (1024 * 1024):+,.1f} MB")
+        for error in errors:
+            print(f"      ⚠️ {error}")
+
+    if sessions:
+        print("\n🔑 Largest keys (session 1):")
+        print_table(
+            [{**r, "size": fmt_bytes(r["bytes"])} for r in sessions[0]["keys"][:10]],
+            [("key", (26,)), ("type", (16,)), ("size", 10)],
+        )
+
+    sampler.stop()
+    samples = sampler.frame()
+    print(f"\n💾 RSS: {fmt_bytes(int(samples['rss'].iloc[-1]))} now, {fmt_bytes(peak_rss())} peak, "
+          f"{fmt_bytes(int(samples['rss'].iloc[0]))} at start")
+
+    report = {
+        "created_at": datetime.now().isoformat(timespec="seconds"),
+        "data_path": str(data_loader.DEFAULT_PARQUET_PATH),
+        "rows": len(df),
+        "dataset_bytes": dataset_bytes,
+        "columns": columns.to_dict("records"),
+        "filters": filters.to_dict("records"),
+        "sessions": sessions,
+        "peak_rss": peak_rss(),
+        "rss": samples.to_dict("records"),
+    }
+    if args.output:
+        Path(args.output).parent.mkdir(parents=True, exist_ok=True)
+        Path(args.output).write_text(json.dumps(report, indent=2, default=str), encoding="utf-8")
+        print(f"✅ Report written to {args.output}")
+
+    if args.max_session_mb is not None:
+        limit = args.max_session_mb * 1024 * 1024
+        over = [s for s in sessions if s["state_bytes"] > limit]
+        if over:
+            print(f"❌ {len(over)} session(s) over {args.max_session_mb:g} MB of state")
+            return False
+    return not any(s["errors"] for s in sessions)
+
+
+if __name__ == "__main__":
+    success = main()
+    exit(0 if success else 1)
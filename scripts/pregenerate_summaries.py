@@ -0,0 +1,158 @@
+"""
+Pre-generate standard regional situation summaries.
+
+Enumerates every ADM1 state x topic label over the last few months, runs the
+same retrieval and prompt building as the RAG+LLM page, calls the LLM with
+bounded concurrency and saves each summary with its citation table to the
+local summary store (data/summaries/ by default). Meant to run nightly or
+after a data refresh; the RAG page shows matching summaries instantly.
+
+Usage:
+    python scripts/pregenerate_summaries.py --months 3 --concurrency 4
+    python scripts/pregenerate_summaries.py --api-base http://127.0.0.1:8765/v1   # local stub
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from utils.data_loader import CATEGORIES, get_dataset_version, load_data
+from utils.llm_client import DEFAULT_API_BASE, LLMClient, with_pooled_session
+from utils.rag import SYSTEM_PROMPT, build_prompt, estimate_tokens, retrieve_top_k
+from utils.summary_store import (
+    STANDARD_WINDOW_MONTHS, SUMMARY_STORE_DIR, build_citation_table, load_summary, save_summary, standard_window
+)
+
+
+def enumerate_scopes(df, start, end, states=None, labels=None, min_articles=3):
+    """Yield (adm1, label, scope_df) for every standard scope with enough articles."""
+    window = df[(df["date"].dt.date >= start) & (df["date"].dt.date <= end)]
+    states = states or sorted(s for s in window["adm1_name_final"].unique() if s != "Unknown Region")
+    labels = labels or list(CATEGORIES.keys())
+    grouped = window.groupby(["adm1_name_final", "Label"])
+    for adm1 in states:
+        for label in labels:
+            try:
+                scope_df = grouped.get_group((adm1, label))
+            except KeyError:
+                continue
+            if len(scope_df) >= min_articles:
+                yield adm1, label, scope_df
+
+
+async def summarize_scope(client, model, adm1, label, scope_df, start, end, top_k, semaphore):
+    """Retrieve, prompt and summarize one scope. Returns (summary, context_df, usage)."""
+    context_df = retrieve_top_k(scope_df, label, top_k, one_per_cluster=True)
+    prompt, _ = build_prompt(context_df, f"Labels: {label}", (start, end), adm1, label)
+    messages = [
+        {"role": "system", "content": SYSTEM_PROMPT},
+        {"role": "user", "content": prompt},
+    ]
+    async with semaphore:
+        summary, usage = await client.achat(model, messages, max_tokens=1500, temperature=0.3)
+    usage = {
+        "prompt_tokens": usage.get("prompt_tokens") or estimate_tokens(prompt),
+        "completion_tokens": usage.get("completion_tokens") or estimate_tokens(summary),
+    }
+    return summary, context_df, usage
+
+
+async def run_batch(client, args, scopes, start, end, dataset_version):
+    semaphore = asyncio.Semaphore(args.concurrency)
+    results = {"generated": 0, "failed": 0, "prompt_tokens": 0, "completion_tokens": 0}
+
+    async def one(adm1, label, scope_df):
+        scope_started = time.perf_counter()
+        try:
+            summary, context_df, usage = await summarize_scope(
+                client, args.model, adm1, label, scope_df, start, end, args.top_k, semaphore
+            )
+        except Exception as e:
+            results["failed"] += 1
+            print(f"   ❌ {adm1} / {label}: {e}")
+            return
+        save_summary(
+            adm1, label, start, end, args.model, summary, build_citation_table(context_df), dataset_version,
+            stats={**usage, "articles_in_scope": len(scope_df), "articles_used": len(context_df),
+                   "seconds": round(time.perf_counter() - scope_started, 2)},
+            store_dir=args.store_dir,
+        )
+        results["generated"] += 1
+        results["prompt_tokens"] += usage["prompt_tokens"]
+        results["completion_tokens"] += usage["completion_tokens"]
+        print(f"   ✓ {adm1} / {label} ({len(context_df)} articles)")
+
+    await asyncio.gather(*[one(adm1, label, scope_df) for adm1, label, scope_df in scopes])
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Pre-generate standard ADM1 x topic situation summaries")
+    parser.add_argument("--data-path", default=None, help="Dataset path (defaults to the dashboard dataset)")
+    parser.add_argument("--months", type=int, default=STANDARD_WINDOW_MONTHS)
+    parser.add_argument("--states", nargs="*", default=None, help="ADM1 states (default: all)")
+    parser.add_argument("--labels", nargs="*", default=None, help="Topic labels (default: all taxonomy labels)")
+    parser.add_argument("--model", default="gpt-4o-mini")
+    parser.add_argument("--top-k", type=int, default=15)
+    parser.add_argument("--min-articles", type=int, default=3)
+    parser.add_argument("--concurrency", type=int, default=int(os.getenv("LLM_MAX_CONCURRENCY", "4")))
+    parser.add_argument("--api-base", default=DEFAULT_API_BASE)
+    parser.add_argument("--store-dir", default=SUMMARY_STORE_DIR)
+    parser.add_argument("--force", action="store_true", help="Regenerate scopes already stored for this data version")
+    parser.add_argument("--dry-run", action="store_true", help="List scopes without calling the LLM")
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print("Pre-generating Standard Situation Summaries")
+    print("=" * 60)
+
+    api_key = os.getenv("OPENAI_API_KEY")
+    if not api_key and not args.dry_run:
+        print("❌ Error: OPENAI_API_KEY is not set")
+        return False
+
+    df = load_data(args.data_path)
+    dataset_version = get_dataset_version(args.data_path)
+    start, end = standard_window(df, args.months)
+    print(f"\n📅 Window: {start} to {end}  |  Data version: {dataset_version}")
+
+    scopes = []
+    skipped = 0
+    for adm1, label, scope_df in enumerate_scopes(df, start, end, args.states, args.labels, args.min_articles):
+        existing = load_summary(adm1, label, start, end, store_dir=args.store_dir)
+        if existing and existing.get("dataset_version") == dataset_version and not args.force:
+            skipped += 1
+            continue
+        scopes.append((adm1, label, scope_df))
+    print(f"📋 {len(scopes)} scopes to generate, {skipped} already up to date")
+
+    if args.dry_run:
+        for adm1, label, scope_df in scopes:
+            print(f"   - {adm1} / {label} ({len(scope_df)} articles)")
+        return True
+
+    started = time.perf_counter()
+    client = LLMClient(api_key, api_base=args.api_base)
+    results = asyncio.run(with_pooled_session(
+        run_batch(client, args, scopes, start, end, dataset_version), args.concurrency
+    ))
+    elapsed = time.perf_counter() - started
+
+    print(f"\n📊 Results:")
+    print(f"   Generated:          {results['generated']}")
+    print(f"   Failed:             {results['failed']}")
+    print(f"   Prompt tokens:      {results['prompt_tokens']:,}")
+    print(f"   Completion tokens:  {results['completion_tokens']:,}")
+    print(f"   Elapsed:            {elapsed:.1f} s")
+    print(f"\nStore location: {Path(args.store_dir).absolute()}")
+    return results["failed"] == 0
+
+
+if __name__ == "__main__":
+    success = main()
+    exit(0 if success else 1)
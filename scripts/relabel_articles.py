@@ -0,0 +1,88 @@
+"""
+Relabel the whole corpus against the current keyword taxonomy.
+
+Compiles utils.data_loader.CATEGORIES into one keyword trie and counts
+category hits in `paragraphs_cleaned` over a process pool. Writes a label
+table (article_id, Label, Labels, one hit-count column per category) that
+load_data() picks up, so a taxonomy edit is one command away from the
+dashboard.
+
+Usage:
+    python scripts/relabel_articles.py
+    python scripts/relabel_articles.py --workers 8 --min-hits 3
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from utils.data_loader import CATEGORIES, DATA_PATH, LABELS_PATH, load_partitions, make_article_ids
+from utils.labeler import MIN_HITS, label_frame, taxonomy_version
+
+COLUMNS = ["url", "title", "paragraphs_cleaned", "Label"]
+
+
+def read_articles(data_path):
+    if str(data_path).endswith(".csv"):
+        df = pd.read_csv(data_path, usecols=COLUMNS, low_memory=False)
+    else:
+        df = pd.read_parquet(data_path, columns=COLUMNS)
+    partitions = load_partitions(columns=COLUMNS)
+    if partitions is not None:
+        df = pd.concat([df, partitions], ignore_index=True)
+    df["article_id"] = make_article_ids(df)
+    return df.drop_duplicates("article_id")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Relabel articles with the keyword taxonomy")
+    parser.add_argument("--data-path", default=DATA_PATH)
+    parser.add_argument("--output", default=LABELS_PATH)
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes (default: all cores)")
+    parser.add_argument("--min-hits", type=int, default=MIN_HITS, help="Hits a secondary category needs for the multi-label list")
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print("Taxonomy Relabeling")
+    print("=" * 60)
+
+    if not Path(args.data_path).exists():
+        print(f"❌ Error: data file not found: {args.data_path}")
+        return False
+
+    df = read_articles(args.data_path)
+    print(f"\n📰 {len(df):,} articles, {len(CATEGORIES)} categories, "
+          f"{sum(len(k) for k in CATEGORIES.values())} keywords (taxonomy {taxonomy_version()})")
+
+    start_time = time.time()
+    labels = label_frame(df, workers=args.workers, min_hits=args.min_hits)
+    elapsed = time.time() - start_time
+    rate = len(df) / elapsed if elapsed > 0 else 0
+    print(f"✅ Labeled {len(df):,} articles in {elapsed:.2f} seconds ({rate:,.0f} articles/s)")
+
+    Path(args.output).parent.mkdir(parents=True, exist_ok=True)
+    labels.to_parquet(args.output, index=False)
+
+    hits = labels[list(CATEGORIES)]
+    changed = (labels["Label"].values != df["Label"].fillna("Uncategorized").values).sum()
+    n_labels = labels["Labels"].str.count("; ") + 1
+    print(f"\n📊 Results:")
+    print(f"   Uncategorized:        {(labels['Label'] == 'Uncategorized').sum():,}")
+    print(f"   Label changed:        {changed:,}")
+    print(f"   Multi-label articles: {(n_labels > 1).sum():,} (avg {n_labels.mean():.2f} labels)")
+    print(f"\n   {'Category':<25} {'Label':>8} {'Any hit':>8} {'Hits':>9}")
+    label_counts = labels["Label"].value_counts()
+    for cat in CATEGORIES:
+        print(f"   {cat:<25} {label_counts.get(cat, 0):>8,} {(hits[cat] > 0).sum():>8,} {hits[cat].sum():>9,}")
+    print(f"\nLabels: {Path(args.output).absolute()}")
+    return True
+
+
+if __name__ == "__main__":
+    success = main()
+    exit(0 if success else 1)
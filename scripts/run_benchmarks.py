@@ -0,0 +1,109 @@
+"""
+Benchmark load_data, apply_filters, retrieve_top_k, build_prompt and the
+pages' aggregations and alert thresholds on a synthetic corpus.
+
+The corpus for the chosen scale is generated first if it does not exist.
+Results are saved as JSON under data/benchmarks/ and compared with the
+previous run on the same corpus. A benchmark whose best time is more than
+10% slower (--threshold) is reported as a regression. Use --fail-on-regression to exit
+non-zero in that case.
+
+Usage:
+    python scripts/run_benchmarks.py
+    python scripts/run_benchmarks.py --scale 10x --only apply_filters pages.
+    python scripts/run_benchmarks.py --compare data/benchmarks/<baseline>.json --fail-on-regression
+"""
+
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from utils.benchmarks import (
+    MAX_SECONDS, REGRESSION_RATIO, REPEAT, RESULTS_DIR, BenchContext, compare, latest_record, make_record, run,
+    save_record
+)
+from utils.synthetic_corpus import BASE_ROWS, DEFAULT_SEED, SCALES, ensure_corpus
+
+
+def print_comparison(baseline_path, baseline, record, threshold):
+    rows = compare(baseline, record, threshold)
+    print(f"\n📊 Compared with {baseline_path} (commit {(baseline.get('commit') or '?')[:8]})")
+    print(f"   {'benchmark':<36} {'before':>10} {'after':>10} {'ratio':>7}")
+    for name, before, after, ratio, verdict in rows:
+        mark = {"slower": "⚠️ ", "faster": "✅", "same": "  "}[verdict]
+        print(f"   {name:<36} {before * 1000:>8.1f}ms {after * 1000:>8.1f}ms {ratio:>6.2f}x {mark}")
+    return [name for name, *_, verdict in rows if verdict == "slower"]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Hot-path benchmarks on a synthetic corpus")
+    parser.add_argument("--scale", choices=list(SCALES), default="1x")
+    parser.add_argument("--base-rows", type=int, default=BASE_ROWS, help="Rows at 1x")
+    parser.add_argument("--seed", type=int, default=DEFAULT_SEED)
+    parser.add_argument("--corpus-dir", default="data/synthetic")
+    parser.add_argument("--only", nargs="+", help="Run benchmarks whose name contains any of these")
+    parser.add_argument("--repeat", type=int, default=REPEAT, help="Minimum timed runs per benchmark")
+    parser.add_argument("--max-seconds", type=float, default=MAX_SECONDS, help="Stop repeating a benchmark after this")
+    parser.add_argument("--results-dir", default=RESULTS_DIR)
+    parser.add_argument("--compare", default="latest", help="Baseline result file, 'latest' or 'none'")
+    parser.add_argument("--threshold", type=float, default=REGRESSION_RATIO, help="Slowdown ratio reported as a regression")
+    parser.add_argument("--fail-on-regression", action="store_true")
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print(f"Benchmarks ({args.scale} synthetic corpus)")
+    print("=" * 60)
+
+    start_time = time.time()
+    path, groups = ensure_corpus(args.scale, args.base_rows, args.seed, args.corpus_dir)
+    if groups is not None:
+        print(f"\n✅ Generated {path} in {time.time() - start_time:.1f} seconds")
+    print(f"\n📂 Corpus: {path}")
+
+    start_time = time.time()
+    ctx = BenchContext.load(path)
+    print(f"\n📊 Loaded {len(ctx.df):,} articles in {time.time() - start_time:.2f} seconds")
+
+    print(f"\n⏱️  Running benchmarks (at least {args.repeat} runs each, fewer for slow ones)...")
+
+    def progress(name, stats):
+        print(f"   {name:<36} best {stats['min'] * 1000:>9.1f} ms  median {stats['median'] * 1000:>9.1f} ms  "
+              f"(n={stats['samples']})", flush=True)
+
+    results = run(ctx, args.only, args.repeat, args.max_seconds, progress=progress)
+    if not results:
+        print(f"❌ No benchmark matches {args.only}")
+        return False
+
+    corpus = {"scale": args.scale, "rows": args.base_rows * SCALES[args.scale], "seed": args.seed,
+              "loaded_rows": len(ctx.df), "path": str(path)}
+    record = make_record(results, corpus)
+    saved = save_record(record, args.results_dir)
+    print(f"\n💾 Results saved to {saved}")
+
+    if args.compare == "none":
+        return True
+    if args.compare == "latest":
+        baseline_path, baseline = latest_record(corpus, args.results_dir, exclude=saved)
+    else:
+        baseline_path = Path(args.compare)
+        baseline = json.loads(baseline_path.read_text(encoding="utf-8"))
+    if baseline is None:
+        print(f"   (no earlier run on this corpus to compare with)")
+        return True
+
+    slower = print_comparison(baseline_path, baseline, record, args.threshold)
+    if slower:
+        print(f"\n⚠️  {len(slower)} benchmark(s) more than {(args.threshold - 1) * 100:.0f}% slower: {', '.join(slower)}")
+        return not args.fail_on_regression
+    print(f"\n✅ No regressions")
+    return True
+
+
+if __name__ == "__main__":
+    success = main()
+    exit(0 if success else 1)
@@ -0,0 +1,94 @@
+"""
+Ingest scraped articles: clean -> label -> geotag -> sentiment -> append.
+
+Reads the scraper's raw NDJSON from where the last run stopped, runs the
+stages concurrently with bounded queues between them, and appends the new
+articles as a Parquet partition that load_data() and the API pick up.
+Prints per-stage throughput and utilization so the bottleneck stage can be
+given more workers.
+
+Usage:
+    python scripts/run_pipeline.py
+    python scripts/run_pipeline.py --stage clean=4:process --stage label=4:process --batch-size 1000
+    python scripts/run_pipeline.py --raw-dir data/raw --max-records 5000
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from utils.data_loader import PARTITIONS_DIR
+from utils.ingest import DEFAULT_STAGE_CONFIG, RAW_DATA_DIR, run_ingest
+
+
+def parse_stage(value):
+    """Parse 'name=workers[:thread|process]'."""
+    try:
+        name, spec = value.split("=", 1)
+        workers, _, executor = spec.partition(":")
+        config = (int(workers), executor or DEFAULT_STAGE_CONFIG[name][1])
+    except (ValueError, KeyError):
+        raise argparse.ArgumentTypeError(f"expected name=workers[:thread|process] with name in {list(DEFAULT_STAGE_CONFIG)}")
+    if config[1] not in ("thread", "process"):
+        raise argparse.ArgumentTypeError("executor must be 'thread' or 'process'")
+    return name, config
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Streaming ingestion pipeline")
+    parser.add_argument("--raw-dir", default=RAW_DATA_DIR)
+    parser.add_argument("--partitions-dir", default=PARTITIONS_DIR)
+    parser.add_argument("--batch-size", type=int, default=500)
+    parser.add_argument("--queue-size", type=int, default=4, help="Batches buffered between stages")
+    parser.add_argument("--stage", type=parse_stage, action="append", default=[],
+                        help="Stage workers, e.g. label=4:process (repeatable)")
+    parser.add_argument("--max-records", type=int, default=None)
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print("Ingestion Pipeline")
+    print("=" * 60)
+
+    if not Path(args.raw_dir).exists():
+        print(f"❌ Error: raw directory not found: {args.raw_dir}")
+        return False
+
+    start_time = time.time()
+    summary, pipeline = run_ingest(
+        raw_dir=args.raw_dir, partitions_dir=args.partitions_dir, batch_size=args.batch_size,
+        stage_config=dict(args.stage), queue_size=args.queue_size, max_records=args.max_records,
+    )
+    elapsed = time.time() - start_time
+
+    if summary["orphans_removed"]:
+        print(f"🧹 Removed {len(summary['orphans_removed'])} uncommitted partition(s) from an interrupted run")
+    rate = summary["read"] / pipeline.elapsed if pipeline.elapsed > 0 else 0
+
+    print(f"\n📊 Results:")
+    print(f"   Records read:       {summary['read']:,}  ({rate:,.0f}/s)")
+    print(f"   Passed cleaning:    {summary['processed']:,}")
+    print(f"   Duplicates skipped: {summary['duplicates']:,}")
+    print(f"   Appended:           {summary['appended']:,}")
+
+    if summary["read"]:
+        print(f"\n⚙️  Stages:")
+        with pd.option_context("display.width", 120, "display.max_columns", None):
+            print(pipeline.report().to_string(index=False))
+        print(f"\n🐢 Bottleneck: {summary['bottleneck']}")
+
+    if summary["partition"]:
+        print(f"\nPartition: {(Path(args.partitions_dir) / summary['partition']).absolute()}")
+    else:
+        print(f"\nℹ️  No new articles to append")
+    print(f"✅ Done in {elapsed:.2f} seconds")
+    return True
+
+
+if __name__ == "__main__":
+    success = main()
+    exit(0 if success else 1)
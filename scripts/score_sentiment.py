@@ -0,0 +1,120 @@
+"""
+Rescore sentiment for the whole corpus.
+
+Scores every article's title and body with the configured scorer (NLTK
+VADER by default) over a process pool, skipping articles whose text is
+already in the content-hash cache. Writes a table (article_id,
+sentiment_label, sentiment_score as float32) that load_data() picks up.
+With --benchmark, times uncached scoring at several worker counts and
+projects full-corpus rescoring time.
+
+Usage:
+    python scripts/score_sentiment.py
+    python scripts/score_sentiment.py --scorer transformers:/models/sentiment --workers 2
+    python scripts/score_sentiment.py --benchmark --sample 2000
+"""
+
+import argparse
+import os
+import sys
+import time
+from pathlib import Path
+
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from utils.data_loader import DATA_PATH, SENTIMENT_PATH, load_partitions, make_article_ids
+from utils.sentiment import DEFAULT_SCORER, SENTIMENT_CACHE_PATH, SentimentCache, score_frame, score_texts, sentiment_text
+
+COLUMNS = ["url", "title", "paragraphs", "sentiment_label"]
+
+
+def read_articles(data_path):
+    if str(data_path).endswith(".csv"):
+        df = pd.read_csv(data_path, usecols=COLUMNS, low_memory=False)
+    else:
+        df = pd.read_parquet(data_path, columns=COLUMNS)
+    partitions = load_partitions(columns=COLUMNS)
+    if partitions is not None:
+        df = pd.concat([df, partitions], ignore_index=True)
+    df["article_id"] = make_article_ids(df)
+    return df.drop_duplicates("article_id")
+
+
+def benchmark(df, scorer, sample, max_workers):
+    texts = [sentiment_text(t, p) for t, p in df[["title", "paragraphs"]].head(sample).itertuples(index=False)]
+    chars = sum(len(t) for t in texts) / max(len(texts), 1)
+    print(f"\n⏱️  Benchmark: {len(texts):,} articles (avg {chars:,.0f} chars), scorer '{scorer}'")
+    print(f"   {'Workers':>7} {'Seconds':>9} {'Articles/s':>11} {'Full corpus':>12}")
+    workers = 1
+    while True:
+        start_time = time.time()
+        score_texts(texts, scorer, workers=workers, batch_size=max(1, len(texts) // (workers * 4)))
+        elapsed = time.time() - start_time
+        rate = len(texts) / elapsed if elapsed > 0 else 0
+        full = len(df) / rate if rate else 0
+        print(f"   {workers:>7} {elapsed:>9.2f} {rate:>11,.0f} {full:>11.1f}s")
+        if workers >= max_workers:
+            break
+        workers = min(workers * 2, max_workers)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Rescore article sentiment")
+    parser.add_argument("--data-path", default=DATA_PATH)
+    parser.add_argument("--output", default=SENTIMENT_PATH)
+    parser.add_argument("--cache", default=SENTIMENT_CACHE_PATH)
+    parser.add_argument("--scorer", default=DEFAULT_SCORER, help="vader or transformers:<model>")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes (default: all cores)")
+    parser.add_argument("--benchmark", action="store_true", help="Time uncached scoring at 1..N workers instead")
+    parser.add_argument("--sample", type=int, default=2000, help="Articles used by --benchmark")
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print("Sentiment Scoring")
+    print("=" * 60)
+
+    if not Path(args.data_path).exists():
+        print(f"❌ Error: data file not found: {args.data_path}")
+        return False
+
+    df = read_articles(args.data_path)
+    print(f"\n📰 {len(df):,} articles")
+
+    try:
+        if args.benchmark:
+            benchmark(df, args.scorer, args.sample, args.workers or os.cpu_count() or 1)
+            return True
+
+        cache = SentimentCache(args.cache)
+        print(f"💾 Cache: {len(cache):,} scored texts")
+        start_time = time.time()
+        scored, n_scored = score_frame(df, args.scorer, workers=args.workers, cache=cache)
+        elapsed = time.time() - start_time
+    except (ImportError, RuntimeError, ValueError) as e:
+        print(f"❌ Error: {e}")
+        return False
+
+    rate = n_scored / elapsed if elapsed > 0 else 0
+    print(f"✅ Scored {n_scored:,} articles in {elapsed:.2f} seconds ({rate:,.0f} articles/s), "
+          f"{len(df) - n_scored:,} from cache")
+
+    cache.save()
+    Path(args.output).parent.mkdir(parents=True, exist_ok=True)
+    scored.to_parquet(args.output, index=False)
+
+    changed = (scored["sentiment_label"].values != df["sentiment_label"].values).sum()
+    print(f"\n📊 Results:")
+    for label, count in scored["sentiment_label"].value_counts().items():
+        print(f"   {label:<10} {count:>8,}")
+    print(f"   Mean score: {scored['sentiment_score'].mean():+.3f}")
+    print(f"   Label changed vs stored: {changed:,}")
+    print(f"\nScores: {Path(args.output).absolute()}")
+    print(f"Cache: {Path(args.cache).absolute()}")
+    return True
+
+
+if __name__ == "__main__":
+    success = main()
+    exit(0 if success else 1)
@@ -0,0 +1,168 @@
+"""
+Local stub of the OpenAI chat completions endpoint for offline testing.
+
+Speaks just enough of the API for the RAG+LLM page: plain and streamed
+(server-sent events) completions. The reply is a bulleted summary citing the
+article numbers found in the prompt, so citation handling can be checked
+end to end without an API key or network access.
+
+Usage:
+    python scripts/stub_llm_server.py --port 8765 --token-delay 0.02 --fail-rate 0.2
+
+Then point the dashboard at it:
+    OPENAI_API_BASE=http://127.0.0.1:8765/v1 OPENAI_API_KEY=stub streamlit run Home.py
+"""
+
+import argparse
+import json
+import random
+import re
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+ARTICLE_REF = re.compile(r"^\[(\d+)\] Date:", re.MULTILINE)
+CITATION = re.compile(r"\[(\d+(?:,\s*\d+)*)\]")
+
+
+def build_reply(prompt):
+    """Compose a deterministic summary citing the articles in the prompt."""
+    refs = ARTICLE_REF.findall(prompt)
+    if not refs and "PARTIAL SUMMARIES:" in prompt:
+        # Reduce prompts: re-cite whatever the partial summaries cited
+        partials = prompt.split("PARTIAL SUMMARIES:", 1)[1].split("INSTRUCTIONS:", 1)[0]
+        cited = set()
+        for group in CITATION.findall(partials):
+            cited.update(n.strip() for n in group.split(","))
+        refs = sorted(cited, key=int)
+    if not refs:
+        return "* **Stub Finding**: No numbered reports were provided. []\n\n**Overall Summary**: Nothing to summarize."
+    lines = []
+    for i in range(0, len(refs), 3):
+        group = refs[i:i + 3]
+        lines.append(f"* **Stub Finding {i // 3 + 1}**: Reported events from articles {', '.join(group)}. [{','.join(group)}]")
+    lines.append("")
+    lines.append(f"**Overall Summary**: Stub summary over {len(refs)} articles.")
+    return "\n".join(lines)
+
+
+def split_tokens(text):
+    """Split text into small pieces that mimic streamed tokens."""
+    return re.findall(r"\S+\s*|\s+", text)
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, fmt, *args):
+        if self.server.verbose:
+            super().log_message(fmt, *args)
+
+    def _send_json(self, status, payload, extra_headers=None):
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        for k, v in (extra_headers or {}).items():
+            self.send_header(k, v)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_POST(self):
+        if not self.path.rstrip("/").endswith("/chat/completions"):
+            self._send_json(404, {"error": {"message": f"Unknown path {self.path}", "type": "invalid_request_error"}})
+            return
+
+        length = int(self.headers.get("Content-Length", 0))
+        request = json.loads(self.rfile.read(length) or b"{}")
+
+        if random.random() < self.server.fail_rate:
+            self._send_json(
+                429,
+                {"error": {"message": "Rate limit reached (stub)", "type": "rate_limit_error"}},
+                extra_headers={"Retry-After": "0.1"},
+            )
+            return
+
+        time.sleep(self.server.latency)
+
+        prompt = "\n".join(str(m.get("content", "")) for m in request.get("messages", []))
+        reply = build_reply(prompt)
+        model = request.get("model", "stub-model")
+        completion_id = f"chatcmpl-{uuid.uuid4().hex[:12]}"
+        prompt_tokens = len(prompt) // 4
+        completion_tokens = len(reply) // 4
+
+        if not request.get("stream"):
+            self._send_json(200, {
+                "id": completion_id,
+                "object": "chat.completion",
+                "created": int(time.time()),
+                "model": model,
+                "choices": [{"index": 0, "message": {"role": "assistant", "content": reply}, "finish_reason": "stop"}],
+                "usage": {
+                    "prompt_tokens": prompt_tokens,
+                    "completion_tokens": completion_tokens,
+                    "total_tokens": prompt_tokens + completion_tokens,
+                },
+            })
+            return
+
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Cache-Control", "no-cache")
+        self.send_header("Connection", "close")
+        self.end_headers()
+        self.close_connection = True
+
+        def send_event(payload):
+            self.wfile.write(f"data: {payload}\n\n".encode("utf-8"))
+            self.wfile.flush()
+
+        for i, piece in enumerate(split_tokens(reply)):
+            delta = {"content": piece} if i else {"role": "assistant", "content": piece}
+            send_event(json.dumps({
+                "id": completion_id,
+                "object": "chat.completion.chunk",
+                "created": int(time.time()),
+                "model": model,
+                "choices": [{"index": 0, "delta": delta, "finish_reason": None}],
+            }))
+            time.sleep(self.server.token_delay)
+        send_event(json.dumps({
+            "id": completion_id,
+            "object": "chat.completion.chunk",
+            "created": int(time.time()),
+            "model": model,
+            "choices": [{"index": 0, "delta": {}, "finish_reason": "stop"}],
+        }))
+        send_event("[DONE]")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local stub OpenAI chat completions server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", type=float, default=0.2, help="Seconds before the first token")
+    parser.add_argument("--token-delay", type=float, default=0.01, help="Seconds between streamed tokens")
+    parser.add_argument("--fail-rate", type=float, default=0.0, help="Fraction of requests answered with HTTP 429")
+    parser.add_argument("--verbose", action="store_true")
+    args = parser.parse_args()
+
+    server = ThreadingHTTPServer((args.host, args.port), StubHandler)
+    server.latency = args.latency
+    server.token_delay = args.token_delay
+    server.fail_rate = args.fail_rate
+    server.verbose = args.verbose
+
+    print(f"Stub LLM server listening on http://{args.host}:{args.port}/v1")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -7,7 +7,10 @@ import pandas as pd
 import numpy as np
 import altair as alt
 
+from utils.tracing import traced
 
+
+@traced("add_sd_flags_static")
 def add_sd_flags_static(df_in, group_col, value_col):
     """
     STATIC threshold: Mean/SD computed over the entire time span per group.
@@ -35,6 +38,7 @@ def add_sd_flags_static(df_in, group_col, value_col):
     return out
 
 
+@traced("add_sd_flags_dynamic")
 def add_sd_flags_dynamic(df_in, group_col, value_col, time_col="yearmon_date", window_months=12):
     """
     DYNAMIC threshold: Mean/SD computed over the trailing `window_months` months
@@ -98,6 +102,49 @@ def add_sd_flags_dynamic(df_in, group_col, value_col, time_col="yearmon_date", w
     return pd.concat(results, ignore_index=True)
 
 
+@traced("static_thresholds")
+def static_thresholds(ts, value_col="article_count"):
+    """
+    STATIC thresholds for one monthly series, as drawn on the insight pages:
+    mean + 1/2 sample SD over the whole span, flagged when the count is above them.
+    """
+    out = ts.copy()
+    mean_val = out[value_col].mean()
+    std_val = out[value_col].std()
+    
+    out["mean"] = mean_val
+    out["threshold_1sd"] = mean_val + std_val
+    out["threshold_2sd"] = mean_val + 2 * std_val
+    
+    out["status"] = "Normal"
+    out.loc[out[value_col] > out["threshold_1sd"], "status"] = "Alert-high"
+    out.loc[out[value_col] > out["threshold_2sd"], "status"] = "Alarm-high"
+    
+    return out
+
+
+@traced("dynamic_thresholds")
+def dynamic_thresholds(ts, value_col="article_count", window=12):
+    """
+    DYNAMIC thresholds for one monthly series (sorted by month), as drawn on the
+    insight pages: rolling mean + 1/2 sample SD over the last `window` rows,
+    including the current month, flagged when the count is above them.
+    """
+    out = ts.copy()
+    rolling = out[value_col].rolling(window=window, min_periods=1)
+    out["rolling_mean"] = rolling.mean()
+    out["rolling_std"] = rolling.std()
+    
+    out["threshold_1sd"] = out["rolling_mean"] + out["rolling_std"]
+    out["threshold_2sd"] = out["rolling_mean"] + 2 * out["rolling_std"]
+    
+    out["status"] = "Normal"
+    out.loc[out[value_col] > out["threshold_1sd"], "status"] = "Alert-high"
+    out.loc[out[value_col] > out["threshold_2sd"], "status"] = "Alarm-high"
+    
+    return out
+
+
 def get_status_color_scale():
     """Return consistent color scale for status."""
     return alt.Scale(
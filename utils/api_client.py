@@ -0,0 +1,38 @@
+"""
+Helpers for linking the dashboard to the backend API.
+
+The dashboard builds URLs and lets the browser talk to the API directly,
+so large responses (exports) never pass through the Streamlit process.
+"""
+
+import os
+from urllib.parse import urlencode
+
+API_BASE_URL = os.getenv("NEWS_API_BASE_URL", "http://localhost:8000/api/v1").rstrip("/")
+
+EXPORT_FORMATS = {
+    "Parquet": "parquet",
+    "Arrow IPC": "arrow",
+    "CSV": "csv",
+}
+
+
+def filter_params(sources=None, date_range=None, sentiments=None, labels=None, adm1=None, adm2=None, keyword=None):
+    """Sidebar filter selections as API query parameters (same semantics as apply_filters)."""
+    params = []
+    for name, values in (("source", sources), ("sentiment", sentiments), ("label", labels),
+                         ("adm1", adm1), ("adm2", adm2)):
+        params.extend((name, v) for v in values or [])
+    if date_range and len(date_range) == 2:
+        params += [("start_date", str(date_range[0])), ("end_date", str(date_range[1]))]
+    if keyword and keyword.strip():
+        params.append(("keyword", keyword.strip()))
+    return params
+
+
+def export_url(fmt="parquet", fields=None, **filters):
+    """Streaming export URL for the filtered articles."""
+    params = [("format", fmt)] + filter_params(**filters)
+    if fields:
+        params.append(("fields", ",".join(fields)))
+    return f"{API_BASE_URL}/articles/export?{urlencode(params)}"
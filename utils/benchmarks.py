@@ -0,0 +1,309 @@
+"""
+Benchmark suite for the dashboard's hot paths.
+
+Benchmarks are registered with @benchmark(name). Each one gets a
+BenchContext (the loaded corpus plus filter selections derived from it).
+It does its setup and returns a zero-argument callable, and only that
+callable is timed, as in asv's setup/time_ split. The callable runs once to
+warm up and then repeatedly: at least `repeat` times, and fast ones until
+MIN_SECONDS have passed (at most MAX_SAMPLES times). Slow ones stop after
+`max_seconds`, with at least MIN_SAMPLES samples.
+
+Results are plain JSON: the commit, the machine, the corpus (scale, rows,
+seed) and per-benchmark timing statistics. compare() matches two result
+files by benchmark name, so runs on the same corpus can be tracked over
+time.
+"""
+
+import json
+import platform
+import statistics
+import subprocess
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from datetime import date, datetime
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+import utils.data_loader as data_loader
+from utils.alert_helpers import dynamic_thresholds, static_thresholds
+from utils.data_access import Filters, LocalDataSource
+from utils.filters import apply_filters
+from utils.rag import build_prompt, retrieve_top_k
+
+RESULTS_DIR = "data/benchmarks"
+REPEAT = 7
+MIN_SAMPLES = 3
+MAX_SAMPLES = 100
+MIN_SECONDS = 1.0
+MAX_SECONDS = 30.0
+REGRESSION_RATIO = 1.10  # slower than this (by best time) is reported as a regression
+QUERY = "flood displacement Juba"
+KEYWORD = "flood OR cholera"
+TOP_K = 15
+
+BENCHMARKS = {}
+
+
+def benchmark(name):
+    def register(fn):
+        BENCHMARKS[name] = fn
+        return fn
+    return register
+
+
+@contextmanager
+def isolated_loader(missing="/nonexistent"):
+    """Point load_data() away from partitions and derived tables so only the corpus is read."""
+    names = ["PARTITIONS_DIR", "DEDUP_CLUSTERS_PATH", "LABELS_PATH", "GEOTAGS_PATH", "SENTIMENT_PATH"]
+    saved = {name: getattr(data_loader, name) for name in names}
+    try:
+        for name in names:
+            setattr(data_loader, name, missing)
+        yield
+    finally:
+        for name, value in saved.items():
+            setattr(data_loader, name, value)
+
+
+def load_corpus(path):
+    """load_data() without Streamlit's cache, so every call does the full read and preprocessing."""
+    with isolated_loader():
+        return data_loader.load_data.__wrapped__(path)
+
+
+@dataclass
+class BenchContext:
+    """The loaded corpus and typical sidebar selections on it (busiest source, region, label; last year)."""
+
+    path: Path
+    df: pd.DataFrame
+    sources: list = field(default_factory=list)
+    adm1: str = None
+    label: str = None
+    last_year: tuple = ()
+
+    @classmethod
+    def load(cls, path):
+        df = load_corpus(path)
+        end = df["date"].max().date()
+        return cls(
+            path=Path(path),
+            df=df,
+            sources=df["retrieve_source"].value_counts().index[:3].tolist(),
+            adm1=df.loc[df["adm1_name_final"] != "Unknown Region", "adm1_name_final"].value_counts().idxmax(),
+            label=df.loc[df["Label"] != "Uncategorized", "Label"].value_counts().idxmax(),
+            last_year=(date(end.year - 1, end.month, 1), end),
+        )
+
+
+# -- benchmarks ------------------------------------------------------------------
+
+@benchmark("load_data")
+def bench_load_data(ctx):
+    return lambda: load_corpus(ctx.path)
+
+
+@benchmark("apply_filters.sources_last_year")
+def bench_filter_sources(ctx):
+    return lambda: apply_filters(ctx.df, sources=ctx.sources, date_range=ctx.last_year)
+
+
+@benchmark("apply_filters.region_label")
+def bench_filter_region(ctx):
+    return lambda: apply_filters(ctx.df, adm1=[ctx.adm1], labels=[ctx.label])
+
+
+@benchmark("apply_filters.keyword")
+def bench_filter_keyword(ctx):
+    return lambda: apply_filters(ctx.df, date_range=ctx.last_year, keyword=KEYWORD)
+
+
+@benchmark("retrieve_top_k")
+def bench_retrieve(ctx):
+    rows = apply_filters(ctx.df, date_range=ctx.last_year)
+    return lambda: retrieve_top_k(rows, QUERY, TOP_K)
+
+
+@benchmark("build_prompt")
+def bench_build_prompt(ctx):
+    context = retrieve_top_k(apply_filters(ctx.df, date_range=ctx.last_year), QUERY, TOP_K)
+    return lambda: build_prompt(context, f"Region: {ctx.adm1}", ctx.last_year, ctx.adm1, "flood")
+
+
+# Page aggregations go through a fresh LocalDataSource, as each page run does
+
+@benchmark("pages.filter_options")
+def bench_filter_options(ctx):
+    return lambda: LocalDataSource(ctx.df).filter_options()
+
+
+@benchmark("pages.summary")
+def bench_summary(ctx):
+    return lambda: LocalDataSource(ctx.df).summary(Filters())
+
+
+@benchmark("pages.monthly_by_source")
+def bench_monthly_by_source(ctx):
+    def run():
+        data = LocalDataSource(ctx.df)
+        return data.monthly_counts(Filters(), by="source"), data.source_stats(Filters())
+    return run
+
+
+@benchmark("pages.monthly_by_label")
+def bench_monthly_by_label(ctx):
+    return lambda: LocalDataSource(ctx.df).monthly_counts(Filters.of(date_range=ctx.last_year), by="label")
+
+
+@benchmark("pages.crosstab_adm1_label")
+def bench_crosstab_adm1(ctx):
+    return lambda: LocalDataSource(ctx.df).crosstab("adm1", "label", Filters(), top_n=10, include_unknown=True)
+
+
+@benchmark("pages.crosstab_adm2_label")
+def bench_crosstab_adm2(ctx):
+    return lambda: LocalDataSource(ctx.df).crosstab("adm2", "label", Filters.of(adm1=[ctx.adm1]), top_n=20)
+
+
+def _page_thresholds(ctx, filters):
+    """The insight pages' series for one region and label, with both threshold tabs."""
+    def run():
+        ts = LocalDataSource(ctx.df).monthly_counts(filters).rename(columns={"count": "article_count"})
+        ts["yearmon_date"] = pd.to_datetime(ts["yearmon"])
+        ts = ts.sort_values("yearmon_date")
+        return static_thresholds(ts), dynamic_thresholds(ts)
+    return run
+
+
+@benchmark("pages.thresholds_adm1")
+def bench_thresholds_adm1(ctx):
+    return _page_thresholds(ctx, Filters.of(adm1=[ctx.adm1], labels=[ctx.label]))
+
+
+@benchmark("pages.thresholds_adm2")
+def bench_thresholds_adm2(ctx):
+    counties = ctx.df.loc[(ctx.df["adm1_name_final"] == ctx.adm1) & (ctx.df["adm2_name_final"] != "Unknown County"),
+                          "adm2_name_final"]
+    return _page_thresholds(ctx, Filters.of(adm1=[ctx.adm1], adm2=[counties.value_counts().idxmax()],
+                                            labels=[ctx.label]))
+
+
+@benchmark("pages.articles_page")
+def bench_articles_page(ctx):
+    fields = ["date", "title", "retrieve_source", "adm1_name_final", "adm2_name_final", "Label"]
+    return lambda: LocalDataSource(ctx.df).articles_page(Filters.of(sources=ctx.sources), page=3, page_size=200,
+                                                         fields=fields)
+
+
+# -- running and comparing -----------------------------------------------------------
+
+def time_callable(fn, repeat=REPEAT, max_seconds=MAX_SECONDS):
+    """Warm up once, then time `fn` `repeat` times or more (fast callables) or fewer (slow ones)."""
+    fn()
+    samples = []
+    started = time.perf_counter()
+    while len(samples) < MAX_SAMPLES:
+        t0 = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - t0)
+        elapsed = time.perf_counter() - started
+        if len(samples) >= repeat and elapsed >= MIN_SECONDS:
+            break
+        if len(samples) >= MIN_SAMPLES and elapsed > max_seconds:
+            break
+    return {
+        "median": statistics.median(samples),
+        "min": min(samples),
+        "mean": statistics.fmean(samples),
+        "stdev": statistics.stdev(samples) if len(samples) > 1 else 0.0,
+        "samples": len(samples),
+    }
+
+
+def run(ctx, names=None, repeat=REPEAT, max_seconds=MAX_SECONDS, progress=None):
+    """Time the selected benchmarks (all by default); returns {name: stats}."""
+    results = {}
+    for name, make in BENCHMARKS.items():
+        if names and not any(n in name for n in names):
+            continue
+        results[name] = time_callable(make(ctx), repeat, max_seconds)
+        if progress:
+            progress(name, results[name])
+    return results
+
+
+def git_revision():
+    try:
+        commit = subprocess.run(["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True).stdout.strip()
+        dirty = bool(subprocess.run(["git", "status", "--porcelain", "--untracked-files=no"],
+                                    capture_output=True, text=True, check=True).stdout.strip())
+    except (OSError, subprocess.CalledProcessError):
+        return None, False
+    return commit, dirty
+
+
+def machine_info():
+    import pyarrow
+    return {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "processor": platform.processor() or platform.machine(),
+        "pandas": pd.__version__,
+        "numpy": np.__version__,
+        "pyarrow": pyarrow.__version__,
+    }
+
+
+def make_record(results, corpus):
+    commit, dirty = git_revision()
+    return {
+        "created_at": datetime.now().isoformat(timespec="seconds"),
+        "commit": commit,
+        "dirty": dirty,
+        "machine": machine_info(),
+        "corpus": corpus,
+        "results": results,
+    }
+
+
+def save_record(record, results_dir=RESULTS_DIR):
+    """Write a run as <timestamp>_<commit>_<scale>.json; returns the path."""
+    stamp = record["created_at"].replace(":", "").replace("-", "")
+    name = f"{stamp}_{(record['commit'] or 'nogit')[:8]}_{record['corpus']['scale']}.json"
+    path = Path(results_dir) / name
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(record, indent=2), encoding="utf-8")
+    return path
+
+
+def latest_record(corpus, results_dir=RESULTS_DIR, exclude=None):
+    """Most recent saved run on the same corpus (scale, rows, seed), or None."""
+    key = (corpus["scale"], corpus["rows"], corpus["seed"])
+    for path in sorted(Path(results_dir).glob("*.json"), reverse=True):
+        if exclude and path.resolve() == Path(exclude).resolve():
+            continue
+        record = json.loads(path.read_text(encoding="utf-8"))
+        c = record.get("corpus", {})
+        if (c.get("scale"), c.get("rows"), c.get("seed")) == key:
+            return path, record
+    return None, None
+
+
+def compare(baseline, current, threshold=REGRESSION_RATIO):
+    """Per-benchmark (name, baseline best, current best, ratio, verdict) for benchmarks in both runs.
+
+    Best (minimum) times are compared: they are the least affected by other load on the machine.
+    """
+    rows = []
+    for name, stats in current["results"].items():
+        before = baseline["results"].get(name)
+        if not before:
+            continue
+        ratio = stats["min"] / before["min"] if before["min"] else float("inf")
+        verdict = "slower" if ratio > threshold else "faster" if ratio < 1 / threshold else "same"
+        rows.append((name, before["min"], stats["min"], ratio, verdict))
+    return rows
@@ -0,0 +1,280 @@
+"""
+Streaming CSV -> Parquet conversion with bounded memory.
+
+The CSV is read in blocks by pyarrow's streaming reader and conformed to a
+declared schema: dates and scores are parsed the way load_data() coerces
+them, and every other column stays a string. Rows are spilled to one Arrow
+file per month. Each month is then read back in order, sorted by date and
+appended to the Parquet file in row groups of about ROW_GROUP_MB uncompressed.
+Memory is bounded by the reader's readahead (a few dozen blocks, hence the
+small BLOCK_MB), one SPILL_MB slice, one month and one row group. None of
+these grow with the input size.
+
+The output uses zstd, with dictionary encoding on the low-cardinality
+columns and min/max statistics on every row group. Because the rows are
+sorted, a date-range read can skip the row groups outside the range.
+Per-column checksums are computed on the way in and again by streaming the
+output, so checking the result never loads the whole file either.
+"""
+
+import csv
+import tempfile
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.csv as pacsv
+import pyarrow.ipc as ipc
+import pyarrow.parquet as pq
+
+BLOCK_MB = 4
+ROW_GROUP_MB = 64
+MIN_ROW_GROUP_ROWS = 1024
+SPILL_MB = 64  # conformed rows gathered before being split into month files
+ZSTD_LEVEL = 3
+VERIFY_BATCH_ROWS = 8192
+
+# Declared types; any other column is kept as a string
+COLUMN_TYPES = {
+    "date": pa.timestamp("us"),
+    "sentiment_score": pa.float64(),
+}
+REQUIRED_COLUMNS = ["date", "title", "url", "adm1_name_final", "adm2_name_final", "Label", "sentiment_score"]
+# Long free text: dictionary pages would only be discarded for plain ones
+PLAIN_COLUMNS = ["title", "url", "paragraphs", "paragraphs_cleaned", "sentiment_score"]
+# Strings read_csv treats as missing
+NULL_VALUES = ["", "#N/A", "#N/A N/A", "#NA", "-1.#IND", "-1.#QNAN", "-NaN", "-nan", "1.#IND", "1.#QNAN",
+               "<NA>", "N/A", "NA", "NULL", "NaN", "None", "n/a", "nan", "null"]
+UNDATED = "undated"
+
+
+def read_header(csv_path):
+    """Column names as read_csv would give them (an unnamed index column becomes 'Unnamed: 0')."""
+    with open(csv_path, newline="", encoding="utf-8") as f:
+        names = next(csv.reader(f), [])
+    return [name or f"Unnamed: {i}" for i, name in enumerate(names)]
+
+
+def declared_schema(columns):
+    missing = [c for c in REQUIRED_COLUMNS if c not in columns]
+    if missing:
+        raise ValueError(f"CSV is missing required columns: {', '.join(missing)}")
+    return pa.schema([(c, COLUMN_TYPES.get(c, pa.string())) for c in columns])
+
+
+def open_csv(csv_path, columns, block_mb=BLOCK_MB):
+    """Streaming reader yielding record batches of strings, about `block_mb` of CSV each."""
+    return pacsv.open_csv(
+        csv_path,
+        read_options=pacsv.ReadOptions(column_names=columns, skip_rows=1, block_size=block_mb << 20, use_threads=True),
+        parse_options=pacsv.ParseOptions(newlines_in_values=True),
+        convert_options=pacsv.ConvertOptions(
+            column_types={c: pa.string() for c in columns}, null_values=NULL_VALUES,
+            strings_can_be_null=True, quoted_strings_can_be_null=True,
+        ),
+    )
+
+
+def _parse_dates(values):
+    parsed = pd.to_datetime(values, errors="coerce", format="ISO8601")
+    retry = parsed.isna() & values.notna()
+    if retry.any():
+        parsed[retry] = pd.to_datetime(values[retry], errors="coerce", format="mixed")
+    return parsed
+
+
+def conform(batch, schema):
+    """Cast a batch of strings to `schema`; returns it with the count of unparseable values per column."""
+    arrays, coerced = [], {}
+    for field in schema:
+        column = batch.column(field.name)
+        if pa.types.is_timestamp(field.type):
+            values = _parse_dates(column.to_pandas())
+        elif pa.types.is_floating(field.type):
+            values = pd.to_numeric(column.to_pandas(), errors="coerce")
+        else:
+            arrays.append(column)
+            continue
+        array = pa.Array.from_pandas(values, type=field.type)
+        coerced[field.name] = array.null_count - column.null_count
+        arrays.append(array)
+    return pa.RecordBatch.from_arrays(arrays, schema=schema), coerced
+
+
+class ColumnChecksums:
+    """Order-independent digest of a table: rows, plus nulls and a wrapping sum of value hashes per column."""
+
+    def __init__(self, columns):
+        self.rows = 0
+        self.nulls = dict.fromkeys(columns, 0)
+        self.sums = dict.fromkeys(columns, 0)
+
+    def update(self, batch):
+        self.rows += batch.num_rows
+        for name in self.sums:
+            column = batch.column(name)
+            self.nulls[name] += column.null_count
+            hashes = pd.util.hash_pandas_object(column.to_pandas(), index=False).to_numpy()
+            self.sums[name] = (self.sums[name] + int(hashes.sum(dtype=np.uint64))) % (1 << 64)
+
+    def mismatches(self, other):
+        """Columns whose digest differs (['<rows>'] when the row counts do)."""
+        if self.rows != other.rows:
+            return ["<rows>"]
+        return [c for c in self.sums if (self.nulls[c], self.sums[c]) != (other.nulls.get(c), other.sums.get(c))]
+
+
+def _month_keys(dates):
+    """Month bucket of each row ('YYYY-MM', or UNDATED for a null date)."""
+    months = dates.to_numpy(zero_copy_only=False).astype("datetime64[M]")
+    return np.where(np.isnat(months), UNDATED, months.astype(str))
+
+
+def spill_by_month(reader, schema, spill_dir):
+    """Pass 1: conform each block, checksum it and append its rows to per-month Arrow files."""
+    writers = {}
+    checksums = ColumnChecksums(schema.names)
+    coerced = {name: 0 for name in schema.names if name in COLUMN_TYPES}
+    nbytes = 0
+    options = ipc.IpcWriteOptions(compression="lz4")
+    gathered, gathered_bytes = [], 0
+
+    def spill():
+        table = pa.Table.from_batches(gathered, schema=schema).combine_chunks()
+        keys = _month_keys(table.column("date"))
+        for key in np.unique(keys):
+            if key not in writers:
+                writers[key] = ipc.new_file(str(Path(spill_dir) / f"{key}.arrow"), schema, options=options)
+            writers[key].write_table(table.filter(pa.array(keys == key)))
+        gathered.clear()
+
+    try:
+        for raw in reader:
+            batch, bad = conform(raw, schema)
+            for name, count in bad.items():
+                coerced[name] += count
+            checksums.update(batch)
+            nbytes += batch.nbytes
+            # Split by month in larger slices, so month files are not made of tiny batches
+            gathered.append(batch)
+            gathered_bytes += batch.nbytes
+            if gathered_bytes >= SPILL_MB << 20:
+                spill()
+                gathered_bytes = 0
+        if gathered:
+            spill()
+    finally:
+        for writer in writers.values():
+            writer.close()
+    months = sorted(k for k in writers if k != UNDATED) + ([UNDATED] if UNDATED in writers else [])
+    return months, checksums, coerced, nbytes
+
+
+def row_group_rows(nbytes, rows, target_mb=ROW_GROUP_MB):
+    """Rows per row group so each holds about `target_mb` of uncompressed data."""
+    if not rows:
+        return MIN_ROW_GROUP_ROWS
+    return max(MIN_ROW_GROUP_ROWS, int((target_mb << 20) / (nbytes / rows)))
+
+
+def write_sorted(months, schema, spill_dir, parquet_path, rows_per_group, zstd_level=ZSTD_LEVEL):
+    """Pass 2: sort each month by date and write fixed-size row groups; returns the row-group count."""
+    options = {}
+    if hasattr(pq, "SortingColumn"):  # pyarrow >= 13 records the sort order in the footer
+        options["sorting_columns"] = [pq.SortingColumn(schema.get_field_index("date"), nulls_first=False)]
+    dictionary = [name for name in schema.names if name not in PLAIN_COLUMNS]
+    groups = 0
+    pending, pending_rows = [], 0
+    with pq.ParquetWriter(parquet_path, schema, compression="zstd", compression_level=zstd_level,
+                          use_dictionary=dictionary, write_statistics=True, **options) as writer:
+
+        def flush(final=False):
+            nonlocal pending, pending_rows, groups
+            table = pa.concat_tables(pending)
+            full = table.num_rows if final else table.num_rows - table.num_rows % rows_per_group
+            for start in range(0, full, rows_per_group):
+                writer.write_table(table.slice(start, rows_per_group), row_group_size=rows_per_group)
+                groups += 1
+            pending = [table.slice(full)] if full < table.num_rows else []
+            pending_rows = table.num_rows - full
+
+        for key in months:
+            with pa.OSFile(str(Path(spill_dir) / f"{key}.arrow")) as source:
+                month = ipc.open_file(source).read_all()
+            if key != UNDATED:
+                month = month.sort_by("date")
+            pending.append(month)
+            pending_rows += month.num_rows
+            if pending_rows >= rows_per_group:
+                flush()
+        if pending_rows:
+            flush(final=True)
+    return groups
+
+
+def verify(parquet_path, expected, batch_rows=VERIFY_BATCH_ROWS):
+    """Stream the Parquet file back; returns (mismatched columns, whether dates are non-decreasing)."""
+    parquet = pq.ParquetFile(parquet_path)
+    actual = ColumnChecksums(parquet.schema_arrow.names)
+    last, ordered, seen_null = None, True, False
+    for batch in parquet.iter_batches(batch_size=batch_rows):
+        actual.update(batch)
+        dates = batch.column("date").to_numpy(zero_copy_only=False)
+        valid = dates[~np.isnat(dates)]
+        if len(valid):
+            # dated rows come first, in order; undated rows only at the end
+            ordered &= not seen_null and bool((valid[1:] >= valid[:-1]).all()) and (last is None or valid[0] >= last)
+            last = valid[-1]
+        seen_null |= bool(np.isnat(dates).any())
+    return expected.mismatches(actual), ordered
+
+
+def _date_stats(parquet_path):
+    """(min, max) of the date column per row group, from the footer; None where a group has no stats."""
+    metadata = pq.ParquetFile(parquet_path).metadata
+    index = metadata.schema.to_arrow_schema().get_field_index("date")
+    out = []
+    for i in range(metadata.num_row_groups):
+        stats = metadata.row_group(i).column(index).statistics
+        out.append((pd.Timestamp(stats.min), pd.Timestamp(stats.max)) if stats is not None and stats.has_min_max else None)
+    return out
+
+
+def date_bounds(parquet_path):
+    """Earliest and latest date in the file, read from row-group statistics alone."""
+    stats = [s for s in _date_stats(parquet_path) if s is not None]
+    if not stats:
+        return None, None
+    return min(s[0] for s in stats), max(s[1] for s in stats)
+
+
+def row_groups_for_range(parquet_path, start, end):
+    """Row groups whose date statistics overlap [start, end], out of all row groups."""
+    stats = _date_stats(parquet_path)
+    start, end = pd.Timestamp(start), pd.Timestamp(end)
+    hits = sum(1 for s in stats if s is None or (s[0] <= end and s[1] >= start))
+    return hits, len(stats)
+
+
+def convert(csv_path, parquet_path, block_mb=BLOCK_MB, row_group_mb=ROW_GROUP_MB, zstd_level=ZSTD_LEVEL):
+    """Convert a CSV to date-sorted Parquet; returns a dict of counts and checksums for reporting."""
+    columns = read_header(csv_path)
+    schema = declared_schema(columns)
+    parquet_path = Path(parquet_path)
+    tmp = parquet_path.with_suffix(".parquet.tmp")
+    with tempfile.TemporaryDirectory(prefix="csv2parquet-", dir=parquet_path.parent) as spill_dir:
+        months, checksums, coerced, nbytes = spill_by_month(open_csv(csv_path, columns, block_mb), schema, spill_dir)
+        rows_per_group = row_group_rows(nbytes, checksums.rows, row_group_mb)
+        groups = write_sorted(months, schema, spill_dir, tmp, rows_per_group, zstd_level)
+    tmp.replace(parquet_path)
+    return {
+        "rows": checksums.rows,
+        "columns": len(columns),
+        "months": len(months),
+        "row_groups": groups,
+        "rows_per_group": rows_per_group,
+        "uncompressed_bytes": nbytes,
+        "coerced": coerced,
+        "checksums": checksums,
+    }
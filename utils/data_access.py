@@ -0,0 +1,370 @@
+"""
+Data access for dashboard pages.
+
+Pages ask for what they show ("monthly counts by source for these filters",
+"page 3 of the matching articles") instead of filtering the whole corpus
+themselves. Two implementations answer the same questions:
+
+- LocalDataSource (DASHBOARD_DATA_BACKEND=local, the default) works on the
+  frame from load_data(), as the pages always have.
+- ApiDataSource (DASHBOARD_DATA_BACKEND=api) calls the FastAPI backend at
+  NEWS_API_BASE_URL over one pooled httpx client, so the dashboard process
+  never holds the corpus and can be scaled out separately from the data tier.
+
+Differences in API mode: date filters on monthly series and cross-tabs
+apply at month granularity (they come from the backend's monthly cube),
+per-source first/last dates are months rather than article dates, and
+near-duplicate collapsing (one_per_cluster) is not available.
+"""
+
+import os
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field, replace
+from datetime import date, datetime
+
+import pandas as pd
+import streamlit as st
+
+from utils.api_client import API_BASE_URL, filter_params
+from utils.tracing import span, traced
+
+DATA_BACKEND = os.getenv("DASHBOARD_DATA_BACKEND", "local").lower()
+API_TIMEOUT_SECONDS = float(os.getenv("NEWS_API_TIMEOUT", "30"))
+API_MAX_CONNECTIONS = int(os.getenv("NEWS_API_MAX_CONNECTIONS", "20"))
+API_CACHE_SECONDS = float(os.getenv("NEWS_API_CACHE_SECONDS", "60"))
+
+# Filter dimensions and the columns they select on (same names as the API)
+DIMENSIONS = {
+    "source": "retrieve_source",
+    "sentiment": "sentiment_label",
+    "label": "Label",
+    "adm1": "adm1_name_final",
+    "adm2": "adm2_name_final",
+}
+UNKNOWN_REGIONS = {"Unknown Region", "Unknown County"}
+# Columns the RAG prompts and the article list on the summary page use
+RETRIEVAL_FIELDS = ["title", "url", "retrieve_source", "adm1_name_final", "adm2_name_final", "Label", "paragraphs"]
+
+
+@dataclass(frozen=True)
+class Filters:
+    """Sidebar selections; empty values mean "no restriction", as in apply_filters."""
+
+    sources: tuple = ()
+    date_range: tuple = ()
+    sentiments: tuple = ()
+    labels: tuple = ()
+    adm1: tuple = ()
+    adm2: tuple = ()
+    keyword: str = ""
+    one_per_cluster: bool = False
+
+    @classmethod
+    def of(cls, sources=None, date_range=None, sentiments=None, labels=None, adm1=None, adm2=None, keyword=None,
+           one_per_cluster=False):
+        return cls(tuple(sources or ()), tuple(date_range or ()), tuple(sentiments or ()), tuple(labels or ()),
+                   tuple(adm1 or ()), tuple(adm2 or ()), (keyword or "").strip(), bool(one_per_cluster))
+
+    def narrow(self, **changes):
+        """Copy with some selections replaced, e.g. narrow(adm1=("Jonglei",))."""
+        return replace(self, **{k: tuple(v) if isinstance(v, list) else v for k, v in changes.items()})
+
+    def apply(self, df):
+        from utils.filters import apply_filters
+        return apply_filters(df, sources=self.sources, date_range=self.date_range, sentiments=self.sentiments,
+                             labels=self.labels, adm1=self.adm1, adm2=self.adm2, keyword=self.keyword,
+                             one_per_cluster=self.one_per_cluster)
+
+    def params(self):
+        return filter_params(sources=self.sources, date_range=self.date_range, sentiments=self.sentiments,
+                             labels=self.labels, adm1=self.adm1, adm2=self.adm2, keyword=self.keyword)
+
+
+@dataclass
+class FilterOptions:
+    """Values offered by the sidebar filters."""
+
+    sources: list = field(default_factory=list)
+    sentiments: list = field(default_factory=list)
+    labels: list = field(default_factory=list)
+    adm1: list = field(default_factory=list)
+    adm2_by_adm1: dict = field(default_factory=dict)
+    min_date: date = None
+    max_date: date = None
+    has_clusters: bool = False
+
+    def values(self, column):
+        return {"retrieve_source": self.sources, "sentiment_label": self.sentiments, "Label": self.labels,
+                "adm1_name_final": self.adm1}.get(column, [])
+
+    def counties(self, adm1_selection=None):
+        regions = adm1_selection or list(self.adm2_by_adm1)
+        return sorted({c for r in regions for c in self.adm2_by_adm1.get(r, [])})
+
+
+def empty_summary():
+    return {"total": 0, "first_month": None, "last_month": None, "top_source": None, "top_label": None}
+
+
+# -- in-process ---------------------------------------------------------------
+
+class LocalDataSource:
+    """Answers from the full frame loaded into this process."""
+
+    name = "local"
+
+    def __init__(self, df=None):
+        self._df = df
+        self._filtered = {}
+
+    @property
+    def df(self):
+        if self._df is None:
+            from utils.data_loader import load_data
+            with span("load_data"):
+                self._df = load_data()
+        return self._df
+
+    def frame(self, filters):
+        """Filtered rows (memoized per filter set for this page run)."""
+        if filters not in self._filtered:
+            self._filtered[filters] = filters.apply(self.df)
+        return self._filtered[filters]
+
+    @traced("local.filter_options")
+    def filter_options(self):
+        df = self.df
+        pairs = df[["adm1_name_final", "adm2_name_final"]].dropna().drop_duplicates()
+        return FilterOptions(
+            sources=_sorted_values(df, "retrieve_source"),
+            sentiments=_sorted_values(df, "sentiment_label"),
+            labels=[l for l in _sorted_values(df, "Label") if l != "Uncategorized"],
+            adm1=_sorted_values(df, "adm1_name_final"),
+            adm2_by_adm1=pairs.groupby("adm1_name_final")["adm2_name_final"].agg(lambda s: sorted(set(s))).to_dict(),
+            min_date=df["date"].min().date() if not df.empty else datetime.today().date(),
+            max_date=df["date"].max().date() if not df.empty else datetime.today().date(),
+            has_clusters="cluster_id" in df.columns,
+        )
+
+    @traced("local.summary")
+    def summary(self, filters):
+        rows = self.frame(filters)
+        if rows.empty:
+            return empty_summary()
+        return {
+            "total": len(rows),
+            "first_month": rows["date"].min().strftime("%Y-%m"),
+            "last_month": rows["date"].max().strftime("%Y-%m"),
+            "top_source": rows["retrieve_source"].value_counts().idxmax() if "retrieve_source" in rows else None,
+            "top_label": rows["Label"].value_counts().idxmax() if "Label" in rows else None,
+        }
+
+    @traced("local.monthly_counts")
+    def monthly_counts(self, filters, by=None):
+        rows = self.frame(filters)
+        keys = ["yearmon"] + ([DIMENSIONS[by]] if by else [])
+        out = rows.groupby(keys).size().reset_index(name="count")
+        return out.rename(columns={DIMENSIONS[by]: by}) if by else out
+
+    @traced("local.source_stats")
+    def source_stats(self, filters):
+        """Articles and first/last article date per source, largest first."""
+        stats = self.frame(filters).groupby("retrieve_source").agg({
+            "title": "count",
+            "date": ["min", "max"]
+        }).reset_index()
+        stats.columns = ["Source", "Total Articles", "First Article", "Last Article"]
+        return stats.sort_values("Total Articles", ascending=False)
+
+    @traced("local.crosstab")
+    def crosstab(self, rows, cols, filters, top_n=None, include_unknown=False):
+        frame = self.frame(filters)
+        row_col, col_col = DIMENSIONS[rows], DIMENSIONS[cols]
+        if not include_unknown:
+            frame = frame[~frame[row_col].isin(UNKNOWN_REGIONS)]
+        order = frame[row_col].value_counts()
+        if top_n:
+            order = order.head(top_n)
+        frame = frame[frame[row_col].isin(order.index)]
+        table = frame.groupby([row_col, col_col]).size().reset_index(name="count")
+        return order.index.tolist(), table.rename(columns={row_col: rows, col_col: cols})
+
+    @traced("local.articles_page")
+    def articles_page(self, filters, page=1, page_size=50, fields=None):
+        rows = self.frame(filters).sort_values("date", ascending=False, kind="stable")
+        start = (page - 1) * page_size
+        out = rows.iloc[start:start + page_size]
+        return (out[[f for f in fields if f in out.columns]] if fields else out).reset_index(drop=True), len(rows)
+
+    @traced("local.article")
+    def article(self, article_id):
+        match = self.df[self.df["article_id"] == article_id]
+        return None if match.empty else match.iloc[0]
+
+    @traced("local.top_articles")
+    def top_articles(self, filters, query, top_k=15, one_per_cluster=False):
+        from utils.rag import retrieve_top_k
+        return retrieve_top_k(self.frame(filters), query, top_k, one_per_cluster=one_per_cluster)
+
+
+def _sorted_values(df, column):
+    return sorted(df[column].dropna().unique().tolist()) if column in df.columns else []
+
+
+# -- backend API ----------------------------------------------------------------
+
+class ApiDataSource:
+    """Answers from the FastAPI backend over a pooled HTTP client."""
+
+    name = "api"
+    PAGE_LIMIT = 500  # the API's maximum page size
+
+    def __init__(self, base_url=API_BASE_URL, timeout=API_TIMEOUT_SECONDS, max_connections=API_MAX_CONNECTIONS,
+                 cache_seconds=API_CACHE_SECONDS, cache_entries=512):
+        import httpx
+
+        self.base_url = base_url.rstrip("/")
+        self._client = httpx.Client(
+            base_url=self.base_url, timeout=timeout,
+            limits=httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_connections),
+        )
+        self._cache_seconds = cache_seconds
+        self._cache_entries = cache_entries
+        self._cache = OrderedDict()
+        self._cursors = OrderedDict()  # (filters, page_size) -> [cursor for page 1, page 2, ...]
+        self._lock = threading.Lock()
+
+    def get_json(self, path, params=()):
+        """GET a JSON document; identical requests within cache_seconds share one response."""
+        key = (path, tuple(params))
+        now = time.monotonic()
+        with self._lock:
+            hit = self._cache.get(key)
+            if hit is not None and now - hit[0] < self._cache_seconds:
+                self._cache.move_to_end(key)
+                return hit[1]
+        with span("http_get", path=path):
+            response = self._client.get(path, params=list(params))
+        response.raise_for_status()
+        body = response.json()
+        with self._lock:
+            self._cache[key] = (now, body)
+            self._cache.move_to_end(key)
+            while len(self._cache) > self._cache_entries:
+                self._cache.popitem(last=False)
+        return body
+
+    @traced("api.filter_options")
+    def filter_options(self):
+        facets = self.get_json("/articles/facets")
+        pairs = self.get_json("/analytics/crosstab", [("rows", "adm1"), ("cols", "adm2"), ("include_unknown", "true")])
+        adm2_by_adm1 = {}
+        for cell in pairs["cells"]:
+            adm2_by_adm1.setdefault(cell["adm1"], set()).add(cell["adm2"])
+        dates = facets["date_range"]
+        return FilterOptions(
+            sources=facets["facets"].get("source", []),
+            sentiments=facets["facets"].get("sentiment", []),
+            labels=[l for l in facets["facets"].get("label", []) if l != "Uncategorized"],
+            adm1=facets["facets"].get("adm1", []),
+            adm2_by_adm1={r: sorted(c) for r, c in adm2_by_adm1.items()},
+            min_date=date.fromisoformat(dates["min"]) if dates["min"] else datetime.today().date(),
+            max_date=date.fromisoformat(dates["max"]) if dates["max"] else datetime.today().date(),
+            has_clusters=False,
+        )
+
+    @traced("api.summary")
+    def summary(self, filters):
+        return self.get_json("/analytics/summary", filters.params())["summary"]
+
+    @traced("api.monthly_counts")
+    def monthly_counts(self, filters, by=None):
+        params = filters.params() + ([("group_by", by)] if by else [])
+        series = pd.DataFrame(self.get_json("/analytics/timeseries", params)["series"])
+        columns = ["yearmon"] + ([by] if by else []) + ["count"]
+        return series[columns] if not series.empty else pd.DataFrame(columns=columns)
+
+    @traced("api.source_stats")
+    def source_stats(self, filters):
+        """Articles and first/last month per source, largest first (the API counts by month)."""
+        stats = self.monthly_counts(filters, by="source").groupby("source").agg({
+            "count": "sum",
+            "yearmon": ["min", "max"]
+        }).reset_index()
+        stats.columns = ["Source", "Total Articles", "First Month", "Last Month"]
+        return stats.sort_values("Total Articles", ascending=False)
+
+    @traced("api.crosstab")
+    def crosstab(self, rows, cols, filters, top_n=None, include_unknown=False):
+        params = filters.params() + [("rows", rows), ("cols", cols), ("include_unknown", str(include_unknown).lower())]
+        if top_n:
+            params.append(("top_n", top_n))
+        body = self.get_json("/analytics/crosstab", params)
+        table = pd.DataFrame(body["cells"], columns=[rows, cols, "count"])
+        return body["rows"], table
+
+    @traced("api.articles_page")
+    def articles_page(self, filters, page=1, page_size=50, fields=None):
+        """Newest-first page; follows the API's keyset cursors, remembering them per filter set."""
+        page_size = min(page_size, self.PAGE_LIMIT)
+        base = filters.params() + [("limit", page_size)] + ([("fields", ",".join(fields))] if fields else [])
+        key = (filters, page_size)
+        with self._lock:
+            cursors = self._cursors.setdefault(key, [None])
+            self._cursors.move_to_end(key)
+            while len(self._cursors) > self._cache_entries:
+                self._cursors.popitem(last=False)
+        body = None
+        for number in range(min(page, len(cursors)), page + 1):
+            cursor = cursors[number - 1]
+            body = self.get_json("/articles", base + ([("cursor", cursor)] if cursor else []))
+            if number == len(cursors):
+                if body["next_cursor"] is None:
+                    break
+                cursors.append(body["next_cursor"])
+        if len(cursors) < page:
+            return pd.DataFrame(), body["total"] if body else 0
+        return _article_frame(body["items"]), body["total"]
+
+    @traced("api.article")
+    def article(self, article_id):
+        import httpx
+
+        try:
+            record = self.get_json(f"/articles/{article_id}")
+        except httpx.HTTPStatusError as e:
+            if e.response.status_code == 404:
+                return None
+            raise
+        return _article_frame([record]).iloc[0]
+
+    @traced("api.top_articles")
+    def top_articles(self, filters, query, top_k=15, one_per_cluster=False):
+        """The top_k articles for `query`, ranked by the backend; only those rows and the fields prompts use are sent."""
+        params = filters.params() + [("query", query or ""), ("top_k", top_k), ("fields", ",".join(RETRIEVAL_FIELDS))]
+        return _article_frame(self.get_json("/articles/top", params)["items"])
+
+
+def _article_frame(items):
+    df = pd.DataFrame(items)
+    if "date" in df.columns:
+        df["date"] = pd.to_datetime(df["date"])
+    return df
+
+
+@st.cache_resource(show_spinner=False)
+def _api_data_source(base_url):
+    """One pooled client per process, shared by every session."""
+    return ApiDataSource(base_url)
+
+
+def get_data_source(backend=None):
+    """Data source for this page run, chosen by DASHBOARD_DATA_BACKEND."""
+    backend = (backend or DATA_BACKEND).lower()
+    if backend == "api":
+        return _api_data_source(API_BASE_URL)
+    if backend != "local":
+        raise ValueError(f"Unknown DASHBOARD_DATA_BACKEND '{backend}' (use local or api)")
+    return LocalDataSource()
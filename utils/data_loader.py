@@ -3,12 +3,15 @@ Shared data loading utilities for the News Analytics Platform.
 Downloads data from GitHub Releases on first run.
 """
 
+import json
 import os
 import streamlit as st
 import pandas as pd
 from pathlib import Path
 from dotenv import load_dotenv
 
+from utils.tracing import span
+
 load_dotenv()
 
 CORE_COLUMNS = [
@@ -22,6 +25,21 @@ CORE_COLUMNS = [
 DEFAULT_CSV_PATH = "data/processed/all_clean_df.csv"
 DEFAULT_PARQUET_PATH = "data/processed/all_clean_df.parquet"
 
+# Near-duplicate clusters written by scripts/dedup_articles.py (optional)
+DEDUP_CLUSTERS_PATH = os.getenv("DEDUP_CLUSTERS_PATH", "data/processed/dedup_clusters.parquet")
+
+# Taxonomy relabeling written by scripts/relabel_articles.py (optional)
+LABELS_PATH = os.getenv("LABELS_PATH", "data/processed/article_labels.parquet")
+
+# Gazetteer geotagging written by scripts/geotag_articles.py (optional)
+GEOTAGS_PATH = os.getenv("GEOTAGS_PATH", "data/processed/article_geotags.parquet")
+
+# Sentiment rescoring written by scripts/score_sentiment.py (optional)
+SENTIMENT_PATH = os.getenv("SENTIMENT_PATH", "data/processed/article_sentiment.parquet")
+
+# Partitions appended by the ingestion pipeline (utils/ingest.py)
+PARTITIONS_DIR = os.getenv("PARTITIONS_DIR", "data/processed/partitions")
+
 # External data URL (GitHub Releases)
 DATA_URL = "https://github.com/mnmx0101/ipc_news_monitoring_prototype/releases/download/v1.0-data/all_clean_df.parquet"
 
@@ -134,16 +152,17 @@ def load_data(data_path=None):
     try:
         # Auto-detect format based on file extension
         data_path_str = str(data_path)
-        if data_path_str.endswith('.parquet'):
-            df = pd.read_parquet(data_path)
-        elif data_path_str.endswith('.csv'):
-            df = pd.read_csv(data_path, low_memory=False)
-        else:
-            # Try Parquet first, then CSV
-            try:
+        with span("read_dataset", path=data_path_str):
+            if data_path_str.endswith('.parquet'):
                 df = pd.read_parquet(data_path)
-            except:
+            elif data_path_str.endswith('.csv'):
                 df = pd.read_csv(data_path, low_memory=False)
+            else:
+                # Try Parquet first, then CSV
+                try:
+                    df = pd.read_parquet(data_path)
+                except:
+                    df = pd.read_csv(data_path, low_memory=False)
     except FileNotFoundError:
         st.error(f"❌ Data file not found at: `{data_path}`")
         st.info("💡 Tip: If deploying, convert CSV to Parquet using `python scripts/convert_to_parquet.py`")
@@ -156,6 +175,11 @@ def load_data(data_path=None):
         st.code(traceback.format_exc())
         st.stop()
 
+    with span("load_partitions"):
+        partitions = load_partitions()
+    if partitions is not None:
+        df = pd.concat([df, partitions], ignore_index=True)
+
     df["date"] = pd.to_datetime(df["date"], errors="coerce")
     df["adm1_name_final"] = df["adm1_name_final"].fillna("Unknown Region")
     df["adm2_name_final"] = df["adm2_name_final"].fillna("Unknown County")
@@ -163,10 +187,79 @@ def load_data(data_path=None):
     df["yearmon"] = df["date"].dt.to_period("M").astype(str)
     df["sentiment_score"] = pd.to_numeric(df["sentiment_score"], errors="coerce")
     df = df.dropna(subset=["date", "sentiment_score"])
+    df["article_id"] = make_article_ids(df)
+
+    # Attach near-duplicate cluster ids when the dedup stage has been run
+    if Path(DEDUP_CLUSTERS_PATH).exists():
+        clusters = pd.read_parquet(DEDUP_CLUSTERS_PATH, columns=["article_id", "cluster_id"])
+        df = df.merge(clusters, on="article_id", how="left")
+        df["cluster_id"] = df["cluster_id"].fillna(df["article_id"])
+
+    # Prefer labels from the latest taxonomy run over the stored ones
+    if Path(LABELS_PATH).exists():
+        labels = pd.read_parquet(LABELS_PATH, columns=["article_id", "Label", "Labels"])
+        df = df.drop(columns=["Labels"], errors="ignore").merge(labels, on="article_id", how="left", suffixes=("", "_new"))
+        df["Label"] = df.pop("Label_new").fillna(df["Label"])
+        df["Labels"] = df["Labels"].fillna(df["Label"])
+
+    # Gazetteer locations replace stored ones wherever the gazetteer found a state. State and
+    # county are replaced together, so a stored county never ends up under another state.
+    if Path(GEOTAGS_PATH).exists():
+        geo = pd.read_parquet(GEOTAGS_PATH, columns=["article_id", "adm1_name_final", "adm2_name_final"])
+        df = df.merge(geo, on="article_id", how="left", suffixes=("", "_geo"))
+        found = df["adm1_name_final_geo"].notna() & (df["adm1_name_final_geo"] != "Unknown Region")
+        df["adm1_name_final"] = df["adm1_name_final"].where(~found, df["adm1_name_final_geo"])
+        df["adm2_name_final"] = df["adm2_name_final"].where(~found, df["adm2_name_final_geo"].fillna("Unknown County"))
+        df = df.drop(columns=["adm1_name_final_geo", "adm2_name_final_geo"])
+
+    # Rescored sentiment replaces the stored scores
+    if Path(SENTIMENT_PATH).exists():
+        scored = pd.read_parquet(SENTIMENT_PATH, columns=["article_id", "sentiment_label", "sentiment_score"])
+        df = df.merge(scored, on="article_id", how="left", suffixes=("", "_new"))
+        for col in ("sentiment_label", "sentiment_score"):
+            df[col] = df.pop(f"{col}_new").fillna(df[col])
     
     return df
 
 
+def partition_paths(partitions_dir=None):
+    """Committed ingestion partitions, oldest first, then those written by the API's bulk ingestion."""
+    partitions_dir = Path(partitions_dir or PARTITIONS_DIR)
+    checkpoint = partitions_dir / "_checkpoint.json"
+    names = json.loads(checkpoint.read_text(encoding="utf-8")).get("partitions", []) if checkpoint.exists() else []
+    paths = [partitions_dir / name for name in names if (partitions_dir / name).exists()]
+    return paths + sorted(partitions_dir.glob("bulk-*.parquet"))
+
+
+def load_partitions(partitions_dir=None, columns=None):
+    """Concatenate ingestion partitions, or None when there are none."""
+    paths = partition_paths(partitions_dir)
+    if not paths:
+        return None
+    return pd.concat([pd.read_parquet(p, columns=columns) for p in paths], ignore_index=True)
+
+
+def make_article_ids(df):
+    """Stable 16-hex-digit article ids hashed from URL and title."""
+    hashed = pd.util.hash_pandas_object(
+        df[["url", "title"]].astype(str), index=False
+    )
+    return hashed.map("{:016x}".format)
+
+
+def get_dataset_version(data_path=None):
+    """Fingerprint of the data file (name, size, mtime) and ingested partitions, used to tag derived artifacts."""
+    path = Path(data_path or DATA_PATH)
+    if not path.exists():
+        return "missing"
+    stat = path.stat()
+    version = f"{path.name}:{stat.st_size}:{int(stat.st_mtime)}"
+    partitions = partition_paths()
+    if partitions:
+        version += f"+{len(partitions)}p:{partitions[-1].stem}"
+    return version
+
+
 def get_taxonomy_table():
     """Return taxonomy as a DataFrame for display."""
     rows = []
@@ -0,0 +1,307 @@
+"""
+Data distribution report over the Parquet dataset, one row group at a time.
+
+Each row group is read on its own in a worker process and reduced to small,
+mergeable partial aggregates:
+- article counts by quarter x source x label x ADM2
+- null counts per column
+- fixed-width histograms of text lengths, plus exact sums and maxima
+
+The parent merges the partials as they arrive. Memory therefore depends on
+the row-group size and the number of distinct cells, not on the dataset
+size. Percentiles come from the histograms, so they are accurate to
+LENGTH_BIN characters. Each worker also times its sections; the report
+includes those CPU seconds alongside the wall-clock time of the scan.
+"""
+
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+import pyarrow.compute as pc
+import pyarrow.parquet as pq
+
+from utils.rag import MODEL_PRICING
+
+CUBE_KEYS = ["quarter", "retrieve_source", "Label", "adm2_name_final"]
+# Missing values in the cube keys, as load_data() fills them
+KEY_FILLS = {"retrieve_source": "(none)", "Label": "Uncategorized", "adm2_name_final": "Unknown County"}
+TEXT_COLUMNS = ["title", "paragraphs", "paragraphs_cleaned"]
+TOKEN_COLUMN = "paragraphs_cleaned"
+CHARS_PER_TOKEN = 4  # as utils.rag.estimate_tokens
+LENGTH_BIN = 16  # characters per histogram bin (4 tokens)
+LENGTH_BINS = (1 << 18) // LENGTH_BIN  # lengths beyond 256k characters share the last bin
+TOKEN_BUCKETS = [0, 100, 250, 500, 1000, 2000, 4000]
+PERCENTILES = [10, 50, 90, 99]
+
+
+def scan_tasks(paths):
+    """(path, row group) pairs covering every file."""
+    return [(str(p), i) for p in paths for i in range(pq.ParquetFile(p).metadata.num_row_groups)]
+
+
+def empty_partial():
+    return {
+        "row_groups": 0, "rows": 0, "undated": 0, "first_date": None, "last_date": None,
+        "nulls": Counter(), "cube": Counter(),
+        "lengths": {}, "length_sums": Counter(), "length_max": Counter(), "token_sum": 0,
+        "timings": Counter(),
+    }
+
+
+def aggregate_row_group(task):
+    """Partial aggregates of one row group (runs in a worker process)."""
+    path, index = task
+    out = empty_partial()
+    clock = time.perf_counter()
+
+    def lap(section):
+        nonlocal clock
+        now = time.perf_counter()
+        out["timings"][section] += now - clock
+        clock = now
+
+    table = pq.ParquetFile(path).read_row_group(index)
+    out["row_groups"] = 1
+    out["rows"] = table.num_rows
+    lap("read")
+
+    for name in table.column_names:
+        out["nulls"][name] += table.column(name).null_count
+    lap("null_rates")
+
+    dates = pd.to_datetime(table.column("date").to_pandas(), errors="coerce")
+    dated = dates.notna().to_numpy()
+    out["undated"] = int((~dated).sum())
+    if dated.any():
+        out["first_date"], out["last_date"] = dates[dated].min(), dates[dated].max()
+    keys = pd.DataFrame({"quarter": dates[dated].dt.to_period("Q").astype(str).to_numpy()})
+    for column in CUBE_KEYS[1:]:
+        values = table.column(column).to_pandas()[dated] if column in table.column_names else pd.Series(index=keys.index)
+        keys[column] = values.fillna(KEY_FILLS[column]).astype(str).to_numpy()
+    out["cube"].update(keys.groupby(CUBE_KEYS, sort=False).size().to_dict())
+    lap("counts")
+
+    for column in TEXT_COLUMNS:
+        if column not in table.column_names:
+            continue
+        lengths = pc.utf8_length(table.column(column)).to_numpy(zero_copy_only=False)
+        lengths = np.nan_to_num(lengths.astype(float)[dated], nan=-1).astype(np.int64)
+        present = lengths[lengths >= 0]
+        out["lengths"][column] = np.bincount(np.minimum(present // LENGTH_BIN, LENGTH_BINS - 1), minlength=LENGTH_BINS)
+        out["length_sums"][column] = int(present.sum())
+        out["length_max"][column] = int(present.max()) if present.size else 0
+        if column == TOKEN_COLUMN:
+            out["token_sum"] = int((present // CHARS_PER_TOKEN).sum())
+    lap("text_lengths")
+    return out
+
+
+def merge(total, part):
+    for key in ("row_groups", "rows", "undated", "token_sum"):
+        total[key] += part[key]
+    if part["first_date"] is not None:
+        total["first_date"] = min(d for d in (total["first_date"], part["first_date"]) if d is not None)
+        total["last_date"] = max(d for d in (total["last_date"], part["last_date"]) if d is not None)
+    for key in ("nulls", "cube", "length_sums", "timings"):
+        total[key].update(part[key])
+    for column, value in part["length_max"].items():
+        total["length_max"][column] = max(total["length_max"][column], value)
+    for column, hist in part["lengths"].items():
+        total["lengths"][column] = total["lengths"][column] + hist if column in total["lengths"] else hist
+    return total
+
+
+def scan(paths, workers=None):
+    """Merged aggregates of every row group in `paths`; rows are only ever held one row group per worker."""
+    tasks = scan_tasks(paths)
+    total = empty_partial()
+    started = time.perf_counter()
+    if workers == 1 or len(tasks) <= 1:
+        for task in tasks:
+            merge(total, aggregate_row_group(task))
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            for part in pool.map(aggregate_row_group, tasks):
+                merge(total, part)
+    total["scan_seconds"] = time.perf_counter() - started
+    return total
+
+
+def _percentile(hist, q, maximum):
+    """Largest length in the histogram bin holding the q-th percentile (capped at the exact maximum)."""
+    n = hist.sum()
+    if not n:
+        return 0
+    return min(maximum, int((np.searchsorted(np.cumsum(hist), q / 100 * n) + 1) * LENGTH_BIN - 1))
+
+
+def _top(counter, n=None):
+    return [{"value": k, "count": int(v)} for k, v in counter.most_common(n)]
+
+
+def build_report(stats, paths, top=10, sample_size=15, model="gpt-4o-mini"):
+    """Machine-readable report; every number the Markdown shows comes from here."""
+    sections = Counter()
+    started = time.perf_counter()
+    dated = stats["rows"] - stats["undated"]
+    cube = stats["cube"]
+    by = {k: Counter() for k in CUBE_KEYS}
+    quarter_source, quarter_label = Counter(), Counter()
+    for (quarter, source, label, adm2), count in cube.items():
+        by["quarter"][quarter] += count
+        by["retrieve_source"][source] += count
+        by["Label"][label] += count
+        by["adm2_name_final"][adm2] += count
+        quarter_source[quarter, source] += count
+        quarter_label[quarter, label] += count
+    sections["counts"] += time.perf_counter() - started
+
+    started = time.perf_counter()
+    text = {}
+    for column, hist in stats["lengths"].items():
+        n, maximum = int(hist.sum()), stats["length_max"][column]
+        text[column] = {
+            "articles": n,
+            "mean": stats["length_sums"][column] / n if n else 0.0,
+            "max": maximum,
+            **{f"p{q}": _percentile(hist, q, maximum) for q in PERCENTILES},
+        }
+    tokens = {}
+    hist = stats["lengths"].get(TOKEN_COLUMN)
+    if hist is not None:
+        edges = [b * CHARS_PER_TOKEN // LENGTH_BIN for b in TOKEN_BUCKETS] + [LENGTH_BINS]
+        tokens = {
+            "mean_per_article": stats["token_sum"] / dated if dated else 0.0,
+            **{f"p{q}": text[TOKEN_COLUMN][f"p{q}"] // CHARS_PER_TOKEN for q in PERCENTILES},
+            "max": stats["length_max"][TOKEN_COLUMN] // CHARS_PER_TOKEN,
+            "buckets": [
+                {"from": lo, "to": hi, "articles": int(hist[edges[i]:edges[i + 1]].sum())}
+                for i, (lo, hi) in enumerate(zip(TOKEN_BUCKETS, TOKEN_BUCKETS[1:] + [None]))
+            ],
+        }
+    sections["text_lengths"] += time.perf_counter() - started
+
+    avg_tokens = tokens.get("mean_per_article", 0.0)
+    pricing = MODEL_PRICING.get(model, {"input": 0.0})
+    return {
+        "generated_at": datetime.now().isoformat(timespec="seconds"),
+        "dataset": {
+            "files": [str(p) for p in paths],
+            "row_groups": stats["row_groups"],
+            "rows": stats["rows"],
+            "dated_rows": dated,
+            "undated_rows": stats["undated"],
+            "first_date": stats["first_date"].date().isoformat() if stats["first_date"] is not None else None,
+            "last_date": stats["last_date"].date().isoformat() if stats["last_date"] is not None else None,
+        },
+        "counts": {
+            "by_source": _top(by["retrieve_source"]),
+            "by_label": _top(by["Label"]),
+            "by_quarter": [{"value": q, "count": by["quarter"][q]} for q in sorted(by["quarter"])],
+            "top_adm2": _top(by["adm2_name_final"], top),
+            "quarter_source": [{"quarter": q, "source": s, "count": c} for (q, s), c in sorted(quarter_source.items())],
+            "quarter_label": [{"quarter": q, "label": l, "count": c} for (q, l), c in sorted(quarter_label.items())],
+            "cube_cells": len(cube),
+            "mean_per_cell": dated / len(cube) if cube else 0.0,
+            "cube": [dict(zip(CUBE_KEYS, k), count=c) for k, c in sorted(cube.items())],
+        },
+        "null_rates": {c: n / stats["rows"] if stats["rows"] else 0.0 for c, n in stats["nulls"].items()},
+        "text_lengths": text,
+        "tokens": tokens,
+        "cost_example": {
+            "model": model,
+            "articles": sample_size,
+            "input_tokens": avg_tokens * sample_size,
+            "input_cost_usd": avg_tokens * sample_size / 1_000_000 * pricing["input"],
+        },
+        "timings": {
+            "scan_wall_seconds": stats["scan_seconds"],
+            "worker_cpu_seconds": dict(stats["timings"]),
+            "report_seconds": dict(sections),
+        },
+    }
+
+
+def _table(headers, rows):
+    lines = ["| " + " | ".join(headers) + " |", "|" + "|".join("---" for _ in headers) + "|"]
+    lines += ["| " + " | ".join(str(v) for v in row) + " |" for row in rows]
+    return "\n".join(lines)
+
+
+def _pivot(records, row_key, col_key, columns):
+    grid = {}
+    for r in records:
+        if r[col_key] in columns:
+            grid.setdefault(r[row_key], {})[r[col_key]] = r["count"]
+    return [[row] + [f"{grid[row].get(c, 0):,}" for c in columns] for row in sorted(grid)]
+
+
+def render_markdown(report, top=10):
+    """Markdown rendering of build_report()'s output."""
+    d, counts, tokens = report["dataset"], report["counts"], report["tokens"]
+    out = ["# South Sudan News Analytics Platform - Data Distribution Report\n",
+           f"_Generated {report['generated_at']} from {len(d['files'])} file(s), {d['row_groups']} row groups._\n"]
+
+    out.append("## Global Statistics")
+    out.append(f"- **Total Articles**: {d['dated_rows']:,} (plus {d['undated_rows']:,} without a usable date)")
+    out.append(f"- **Date Range**: {d['first_date']} to {d['last_date']}")
+    if tokens:
+        out.append(f"- **Average Tokens per Article**: {tokens['mean_per_article']:.1f}")
+    out.append(f"- **Quarter × Source × Label × ADM2 cells**: {counts['cube_cells']:,} "
+               f"(mean {counts['mean_per_cell']:.1f} articles per cell; full table in the JSON report)\n")
+
+    out.append(f"## Top {top} ADM2 Regions (Total Volume)")
+    out.append(_table(["ADM2", "Articles"], [[r["value"], f"{r['count']:,}"] for r in counts["top_adm2"]]) + "\n")
+
+    out.append("## Article Counts by Source")
+    out.append(_table(["Source", "Articles"], [[r["value"], f"{r['count']:,}"] for r in counts["by_source"]]) + "\n")
+
+    sources = [r["value"] for r in counts["by_source"]]
+    out.append("## Articles by Quarter & Source")
+    out.append(_table(["Quarter"] + sources, _pivot(counts["quarter_source"], "quarter", "source", sources)) + "\n")
+
+    labels = [r["value"] for r in counts["by_label"][:5]]
+    out.append("## Articles by Quarter & Label (Top 5 Labels)")
+    out.append(_table(["Quarter"] + labels, _pivot(counts["quarter_label"], "quarter", "label", labels)) + "\n")
+
+    out.append(f"## Largest Quarter × Source × Label × ADM2 Cells (Top {top})")
+    largest = sorted(counts["cube"], key=lambda r: -r["count"])[:top]
+    out.append(_table(["Quarter", "Source", "Label", "ADM2", "Articles"],
+                      [[r["quarter"], r["retrieve_source"], r["Label"], r["adm2_name_final"], f"{r['count']:,}"]
+                       for r in largest]) + "\n")
+
+    if tokens:
+        out.append(f"## Token Distribution ({TOKEN_COLUMN})")
+        out.append(_table(["Mean"] + [f"p{q}" for q in PERCENTILES] + ["Max"],
+                          [[f"{tokens['mean_per_article']:.1f}"] + [f"{tokens[f'p{q}']:,}" for q in PERCENTILES]
+                           + [f"{tokens['max']:,}"]]))
+        out.append("")
+        out.append(_table(["Tokens", "Articles"],
+                          [[f"{b['from']:,}+" if b["to"] is None else f"{b['from']:,}–{b['to'] - 1:,}", f"{b['articles']:,}"]
+                           for b in tokens["buckets"]]) + "\n")
+
+    out.append(f"## Text Length Percentiles (characters, ±{LENGTH_BIN})")
+    out.append(_table(["Column", "Articles", "Mean"] + [f"p{q}" for q in PERCENTILES] + ["Max"],
+                      [[c, f"{t['articles']:,}", f"{t['mean']:,.0f}"] + [f"{t[f'p{q}']:,}" for q in PERCENTILES]
+                       + [f"{t['max']:,}"] for c, t in report["text_lengths"].items()]) + "\n")
+
+    out.append("## Null Rates")
+    out.append(_table(["Column", "Null Rate"], [[c, f"{r:.2%}"] for c, r in report["null_rates"].items()]) + "\n")
+
+    cost = report["cost_example"]
+    out.append("## Token Cost Estimation Example")
+    out.append(f"Summarizing **{cost['articles']}** articles (avg {tokens.get('mean_per_article', 0.0):.1f} tokens each):")
+    out.append(f"- **Estimated Input Tokens**: {cost['input_tokens']:,.1f}")
+    out.append(f"- **Estimated Cost ({cost['model']})**: ${cost['input_cost_usd']:.5f}\n")
+
+    timings = report["timings"]
+    out.append("## Section Runtimes")
+    rows = [["scan (wall clock)", f"{timings['scan_wall_seconds']:.2f}"]]
+    rows += [[f"{s} (worker CPU)", f"{v:.2f}"] for s, v in timings["worker_cpu_seconds"].items()]
+    rows += [[f"{s} (report)", f"{v:.3f}"] for s, v in timings["report_seconds"].items()]
+    out.append(_table(["Section", "Seconds"], rows))
+    return "\n".join(out) + "\n"
@@ -0,0 +1,194 @@
+"""
+Near-duplicate article detection with MinHash signatures and an LSH index.
+
+The same wire story is often published by several sources. Each article's
+`paragraphs_cleaned` is reduced to a MinHash signature over word shingles;
+signatures are bucketed by band (LSH) so only articles sharing a bucket are
+compared, and candidates above the Jaccard threshold are merged into a
+cluster. The index is persisted so new articles can be added incrementally.
+"""
+
+import hashlib
+import pickle
+import re
+import zlib
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+SHINGLE_SIZE = 5
+NUM_PERM = 128
+NUM_BANDS = 16
+JACCARD_THRESHOLD = 0.8
+SEED = 1
+
+DEFAULT_INDEX_PATH = "data/processed/dedup_index.pkl"
+DEFAULT_CLUSTERS_PATH = "data/processed/dedup_clusters.parquet"
+
+# Prime just above 2**32; with a, b, x < 2**32 the hash a*x + b fits in uint64
+_PRIME = np.uint64(4294967311)
+_MAX_HASH = np.uint32(0xFFFFFFFF)
+_TOKEN = re.compile(r"\w+")
+
+
+def _permutations(num_perm=NUM_PERM, seed=SEED):
+    rng = np.random.default_rng(seed)
+    a = rng.integers(1, 2 ** 32, num_perm, dtype=np.uint64)
+    b = rng.integers(0, 2 ** 32, num_perm, dtype=np.uint64)
+    return a, b
+
+
+def shingle_hashes(text, shingle_size=SHINGLE_SIZE):
+    """Unique 32-bit hashes of the word shingles in text."""
+    tokens = _TOKEN.findall(str(text).lower()) if text is not None and not pd.isna(text) else []
+    if not tokens:
+        return np.empty(0, dtype=np.uint64)
+    if len(tokens) < shingle_size:
+        grams = [" ".join(tokens)]
+    else:
+        grams = (" ".join(tokens[i:i + shingle_size]) for i in range(len(tokens) - shingle_size + 1))
+    return np.unique(np.fromiter((zlib.crc32(g.encode("utf-8")) for g in grams), dtype=np.uint64))
+
+
+def minhash_signatures(texts, num_perm=NUM_PERM, seed=SEED, shingle_size=SHINGLE_SIZE):
+    """MinHash signatures as an (n, num_perm) uint32 array; empty texts get all-max rows."""
+    a, b = _permutations(num_perm, seed)
+    out = np.full((len(texts), num_perm), _MAX_HASH, dtype=np.uint32)
+    for i, text in enumerate(texts):
+        hashes = shingle_hashes(text, shingle_size)
+        if hashes.size:
+            sig = ((np.outer(hashes, a) + b) % _PRIME).min(axis=0)
+            out[i] = np.minimum(sig, np.uint64(_MAX_HASH)).astype(np.uint32)
+    return out
+
+
+def parallel_signatures(texts, workers=None, chunk_size=1000, num_perm=NUM_PERM, seed=SEED):
+    """Compute signatures across a process pool, preserving input order."""
+    texts = list(texts)
+    chunks = [texts[i:i + chunk_size] for i in range(0, len(texts), chunk_size)]
+    if not chunks:
+        return np.empty((0, num_perm), dtype=np.uint32)
+    if workers == 1 or len(chunks) == 1:
+        return np.vstack([minhash_signatures(c, num_perm, seed) for c in chunks])
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        parts = pool.map(minhash_signatures, chunks, [num_perm] * len(chunks), [seed] * len(chunks))
+        return np.vstack(list(parts))
+
+
+class MinHashLSH:
+    """Banded LSH index with union-find clustering of verified near-duplicates.
+
+    A cluster's id is the id of its earliest-indexed member, so ids stay
+    stable when later articles join an existing cluster.
+    """
+
+    def __init__(self, num_perm=NUM_PERM, num_bands=NUM_BANDS, threshold=JACCARD_THRESHOLD, seed=SEED):
+        if num_perm % num_bands:
+            raise ValueError("num_perm must be divisible by num_bands")
+        self.num_perm = num_perm
+        self.num_bands = num_bands
+        self.rows = num_perm // num_bands
+        self.threshold = threshold
+        self.seed = seed
+        self.buckets = [defaultdict(list) for _ in range(num_bands)]
+        self.signatures = {}
+        self.order = {}
+        self.parent = {}
+
+    def __len__(self):
+        return len(self.signatures)
+
+    def __contains__(self, article_id):
+        return article_id in self.signatures
+
+    def _band_keys(self, sig):
+        for band in range(self.num_bands):
+            chunk = sig[band * self.rows:(band + 1) * self.rows].tobytes()
+            yield band, hashlib.blake2b(chunk, digest_size=8).digest()
+
+    def find(self, article_id):
+        root = article_id
+        while self.parent[root] != root:
+            root = self.parent[root]
+        while self.parent[article_id] != root:
+            self.parent[article_id], article_id = root, self.parent[article_id]
+        return root
+
+    def _union(self, x, y):
+        rx, ry = self.find(x), self.find(y)
+        if rx == ry:
+            return
+        if self.order[ry] < self.order[rx]:
+            rx, ry = ry, rx
+        self.parent[ry] = rx
+
+    def add(self, article_id, sig):
+        """Index one signature and merge it with verified near-duplicates."""
+        if article_id in self.signatures:
+            return
+        self.order[article_id] = len(self.order)
+        self.parent[article_id] = article_id
+        self.signatures[article_id] = sig
+        if (sig == _MAX_HASH).all():
+            return  # no text: never a duplicate of anything
+
+        candidates = set()
+        for band, key in self._band_keys(sig):
+            bucket = self.buckets[band][key]
+            candidates.update(bucket)
+            bucket.append(article_id)
+        for other in candidates:
+            if np.mean(self.signatures[other] == sig) >= self.threshold:
+                self._union(article_id, other)
+
+    def add_many(self, article_ids, signatures):
+        for article_id, sig in zip(article_ids, signatures):
+            self.add(article_id, sig)
+
+    def cluster_table(self):
+        """DataFrame of article_id, cluster_id and cluster_size for every indexed article."""
+        ids = list(self.signatures)
+        table = pd.DataFrame({"article_id": ids, "cluster_id": [self.find(i) for i in ids]})
+        table["cluster_size"] = table.groupby("cluster_id")["article_id"].transform("size").astype("int32")
+        return table
+
+    def save(self, path=DEFAULT_INDEX_PATH):
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(path.suffix + ".tmp")
+        with open(tmp, "wb") as f:
+            pickle.dump(self, f, protocol=pickle.HIGHEST_PROTOCOL)
+        tmp.replace(path)
+
+    @staticmethod
+    def load(path=DEFAULT_INDEX_PATH):
+        with open(path, "rb") as f:
+            return pickle.load(f)
+
+
+def deduplicate(df, index=None, workers=None, text_col="paragraphs_cleaned"):
+    """Add any articles of df not yet in the index and return (index, n_new).
+
+    Articles are indexed in date order so the earliest report of a story
+    becomes its cluster id.
+    """
+    index = index if index is not None else MinHashLSH()
+    new = df[~df["article_id"].isin(index.signatures.keys())]
+    if "date" in new.columns:
+        new = new.sort_values("date", kind="stable")
+    if new.empty:
+        return index, 0
+    sigs = parallel_signatures(new[text_col].tolist(), workers=workers,
+                               num_perm=index.num_perm, seed=index.seed)
+    index.add_many(new["article_id"].tolist(), sigs)
+    return index, len(new)
+
+
+def one_per_cluster(df):
+    """Keep the earliest article of each near-duplicate cluster."""
+    if "cluster_id" not in df.columns:
+        return df
+    return df.sort_values("date", kind="stable").drop_duplicates("cluster_id").sort_index()
@@ -7,10 +7,20 @@ import pandas as pd
 from datetime import datetime
 import re
 
+from utils.dedup import one_per_cluster as _one_per_cluster
+from utils.tracing import traced
+
+
+def _values(df, column):
+    """Distinct values of a column, from a loaded frame or a data source's FilterOptions."""
+    if not isinstance(df, pd.DataFrame):
+        return df.values(column)
+    return sorted(df[column].dropna().unique().tolist()) if column in df.columns else []
+
 
 def render_source_filter(df, key_prefix="", default=None):
     """Render source multi-select filter."""
-    sources = sorted(df["retrieve_source"].dropna().unique().tolist()) if "retrieve_source" in df.columns else []
+    sources = _values(df, "retrieve_source")
     if default is None:
         default = sources
     else:
@@ -25,8 +35,11 @@ def render_source_filter(df, key_prefix="", default=None):
 
 def render_date_filter(df, key_prefix=""):
     """Render date range filter."""
-    min_date = df["date"].min().date() if not df.empty else datetime.today().date()
-    max_date = df["date"].max().date() if not df.empty else datetime.today().date()
+    if not isinstance(df, pd.DataFrame):
+        min_date, max_date = df.min_date, df.max_date
+    else:
+        min_date = df["date"].min().date() if not df.empty else datetime.today().date()
+        max_date = df["date"].max().date() if not df.empty else datetime.today().date()
     return st.sidebar.date_input(
         "Date Range",
         value=(min_date, max_date),
@@ -38,7 +51,7 @@ def render_date_filter(df, key_prefix=""):
 
 def render_sentiment_filter(df, key_prefix="", default=None):
     """Render sentiment type multi-select filter."""
-    sentiments = sorted(df["sentiment_label"].dropna().unique().tolist()) if "sentiment_label" in df.columns else []
+    sentiments = _values(df, "sentiment_label")
     if default is None:
         default = sentiments
     else:
@@ -53,7 +66,7 @@ def render_sentiment_filter(df, key_prefix="", default=None):
 
 def render_label_filter(df, key_prefix=""):
     """Render article label multi-select filter."""
-    labels = sorted([l for l in df["Label"].dropna().unique().tolist() if l != "Uncategorized"]) if "Label" in df.columns else []
+    labels = [l for l in _values(df, "Label") if l != "Uncategorized"]
     return st.sidebar.multiselect(
         "Article Labels",
         options=labels,
@@ -64,7 +77,7 @@ def render_label_filter(df, key_prefix=""):
 
 def render_adm1_filter(df, key_prefix="", default=None):
     """Render ADM1 region multi-select filter."""
-    regions = sorted(df["adm1_name_final"].dropna().unique().tolist()) if "adm1_name_final" in df.columns else []
+    regions = _values(df, "adm1_name_final")
     if default is None:
         default = regions
     else:
@@ -79,10 +92,11 @@ def render_adm1_filter(df, key_prefix="", default=None):
 
 def render_adm2_filter(df, adm1_selection=None, key_prefix=""):
     """Render ADM2 county multi-select filter, filtered by ADM1."""
-    pool = df.copy()
-    if adm1_selection:
-        pool = pool[pool["adm1_name_final"].isin(adm1_selection)]
-    counties = sorted(pool["adm2_name_final"].dropna().unique().tolist()) if "adm2_name_final" in pool.columns else []
+    if not isinstance(df, pd.DataFrame):
+        counties = df.counties(adm1_selection)
+    else:
+        pool = df[df["adm1_name_final"].isin(adm1_selection)] if adm1_selection else df
+        counties = sorted(pool["adm2_name_final"].dropna().unique().tolist()) if "adm2_name_final" in pool.columns else []
     counties = [c for c in counties if c != "Unknown County"]
     return st.sidebar.multiselect(
         "ADM2 Counties",
@@ -101,7 +115,21 @@ def render_keyword_filter(key_prefix=""):
     )
 
 
-def apply_filters(df, sources=None, date_range=None, sentiments=None, labels=None, adm1=None, adm2=None, keyword=None):
+def render_dedup_toggle(df, key_prefix="", default=False):
+    """Render toggle to count each near-duplicate cluster once (needs dedup stage output)."""
+    if not (df.has_clusters if not isinstance(df, pd.DataFrame) else "cluster_id" in df.columns):
+        return False
+    return st.sidebar.checkbox(
+        "Count duplicate stories once",
+        value=default,
+        help="The same wire story published by several sources is counted as one article.",
+        key=f"{key_prefix}_dedup"
+    )
+
+
+@traced("apply_filters")
+def apply_filters(df, sources=None, date_range=None, sentiments=None, labels=None, adm1=None, adm2=None, keyword=None,
+                  one_per_cluster=False):
     """Apply all selected filters to dataframe."""
     filtered = df.copy()
     
@@ -139,12 +167,17 @@ def apply_filters(df, sources=None, date_range=None, sentiments=None, labels=Non
                 )
                 mask = mask | match
         filtered = filtered[mask]
+
+    if one_per_cluster:
+        filtered = _one_per_cluster(filtered)
     
     return filtered
 
 
 def render_summary_metrics(df):
-    """Display summary metrics row."""
+    """Display summary metrics row, from a filtered frame or a data source summary dict."""
+    if isinstance(df, dict):
+        return _render_summary(df)
     col1, col2, col3, col4 = st.columns(4)
     
     with col1:
@@ -170,3 +203,16 @@ def render_summary_metrics(df):
         else:
             top_label = "N/A"
         st.metric("Top Label", top_label)
+
+
+def _render_summary(summary):
+    col1, col2, col3, col4 = st.columns(4)
+    with col1:
+        st.metric("Total Articles", f"{summary['total']:,}")
+    with col2:
+        span = f"{summary['first_month']} to {summary['last_month']}" if summary["total"] else "N/A"
+        st.metric("Date Span", span)
+    with col3:
+        st.metric("Top Source", summary["top_source"] or "N/A")
+    with col4:
+        st.metric("Top Label", summary["top_label"] or "N/A")
@@ -0,0 +1,172 @@
+"""
+Gazetteer-driven ADM1/ADM2 geotagging.
+
+A gazetteer CSV (name, adm1, adm2, kind) of states, counties, towns and
+alternate spellings is compiled into one token trie. Article text is
+scanned once, taking the longest gazetteer name at each position. Names
+listed under more than one state are resolved by the states the rest of
+the article points to. Each article gets the ADM1 and ADM2 it mentions
+most, plus the character offsets of every match.
+"""
+
+import json
+import os
+import re
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+
+GAZETTEER_PATH = os.getenv("GAZETTEER_PATH", "data/gazetteer.csv")
+
+UNKNOWN_ADM1 = "Unknown Region"
+UNKNOWN_ADM2 = "Unknown County"
+BATCH_SIZE = 1000
+
+_TOKEN = re.compile(r"[A-Za-z0-9]+")
+_END = ""  # trie key marking the end of a name (tokens are never empty)
+
+
+def load_gazetteer(path=None):
+    """Read the gazetteer CSV; blank adm2 means the name only identifies a state."""
+    gazetteer = pd.read_csv(path or GAZETTEER_PATH, dtype=str, keep_default_na=False)
+    missing = {"name", "adm1", "adm2"} - set(gazetteer.columns)
+    if missing:
+        raise ValueError(f"Gazetteer is missing columns: {sorted(missing)}")
+    gazetteer = gazetteer[gazetteer["name"].str.strip() != ""]
+    return gazetteer.drop_duplicates(["name", "adm1", "adm2"]).reset_index(drop=True)
+
+
+def article_text(title, paragraphs):
+    """Text that match offsets refer to: title, newline, body."""
+    return f"{title if isinstance(title, str) else ''}\n{paragraphs if isinstance(paragraphs, str) else ''}"
+
+
+class GeoTagger:
+    """Token trie over gazetteer names mapping to (adm1, adm2) candidates."""
+
+    def __init__(self, gazetteer=None):
+        if gazetteer is None:
+            gazetteer = load_gazetteer()
+        self.root = {}
+        for name, adm1, adm2 in gazetteer[["name", "adm1", "adm2"]].itertuples(index=False):
+            tokens = _TOKEN.findall(name.lower())
+            if not tokens:
+                continue
+            node = self.root
+            for token in tokens:
+                node = node.setdefault(token, {})
+            node.setdefault(_END, []).append((adm1, adm2 or None))
+
+    def find(self, text):
+        """Leftmost-longest gazetteer matches: [(start, end, surface, candidates)].
+
+        Matches must start with a capital letter unless the text is all
+        lowercase, so place names that are also common words are skipped
+        in running prose.
+        """
+        if not isinstance(text, str) or not text:
+            return []
+        spans = [(m.start(), m.end(), m.group().lower()) for m in _TOKEN.finditer(text)]
+        cased = not text.islower()
+        matches = []
+        i, n = 0, len(spans)
+        while i < n:
+            node = self.root.get(spans[i][2])
+            best = None
+            j = i
+            while node is not None:
+                if _END in node:
+                    best = (j, node[_END])
+                j += 1
+                if j == n:
+                    break
+                node = node.get(spans[j][2])
+            start = spans[i][0]
+            if best is not None and (not cased or text[start].isupper() or text[start].isdigit()):
+                end = spans[best[0]][1]
+                matches.append((start, end, text[start:end], best[1]))
+                i = best[0] + 1
+            else:
+                i += 1
+        return matches
+
+    def tag(self, text):
+        """(adm1, adm2, matches) for one article.
+
+        matches is a list of [start, end, surface, adm1, adm2] for every
+        resolved mention; ambiguous mentions the context cannot settle are
+        left out.
+        """
+        found = self.find(text)
+        context = Counter()
+        for _, _, _, candidates in found:
+            states = {adm1 for adm1, _ in candidates}
+            if len(states) == 1:
+                context[next(iter(states))] += 1
+
+        resolved = []
+        for start, end, surface, candidates in found:
+            states = {adm1 for adm1, _ in candidates}
+            if len(states) > 1:
+                ranked = sorted(states, key=lambda s: -context[s])
+                if context[ranked[0]] == 0 or context[ranked[0]] == context[ranked[1]]:
+                    continue
+                candidates = [c for c in candidates if c[0] == ranked[0]]
+            counties = {adm2 for _, adm2 in candidates if adm2}
+            adm2 = next(iter(counties)) if len(counties) == 1 else None
+            resolved.append([start, end, surface, candidates[0][0], adm2])
+
+        if not resolved:
+            return UNKNOWN_ADM1, UNKNOWN_ADM2, []
+        # Most mentioned state, ties to the earliest; then its most mentioned county
+        adm1_counts = Counter(m[3] for m in resolved)
+        adm1 = max(adm1_counts, key=lambda s: (adm1_counts[s], -_first(resolved, 3, s)))
+        adm2_counts = Counter(m[4] for m in resolved if m[3] == adm1 and m[4])
+        adm2 = max(adm2_counts, key=lambda c: (adm2_counts[c], -_first(resolved, 4, c))) if adm2_counts else UNKNOWN_ADM2
+        return adm1, adm2, resolved
+
+    def tag_many(self, texts):
+        return [self.tag(t) for t in texts]
+
+
+def _first(matches, field, value):
+    return next(i for i, m in enumerate(matches) if m[field] == value)
+
+
+_worker_tagger = None
+
+
+def _init_worker(gazetteer):
+    global _worker_tagger
+    _worker_tagger = GeoTagger(gazetteer)
+
+
+def _tag_chunk(texts):
+    return _worker_tagger.tag_many(texts)
+
+
+def geotag_texts(texts, gazetteer=None, workers=None, batch_size=BATCH_SIZE):
+    """Tag many texts, batched over a process pool."""
+    gazetteer = load_gazetteer() if gazetteer is None else gazetteer
+    texts = list(texts)
+    workers = workers or os.cpu_count() or 1
+    if workers <= 1 or len(texts) <= batch_size:
+        return GeoTagger(gazetteer).tag_many(texts)
+    chunks = [texts[i:i + batch_size] for i in range(0, len(texts), batch_size)]
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(gazetteer,)) as pool:
+        return [result for chunk in pool.map(_tag_chunk, chunks) for result in chunk]
+
+
+def geotag_frame(df, gazetteer=None, workers=None):
+    """Geotag every row: article_id, adm1_name_final, adm2_name_final, geo_matches (JSON)."""
+    texts = [article_text(t, p) for t, p in zip(df["title"], df["paragraphs"])]
+    results = geotag_texts(texts, gazetteer, workers)
+    out = pd.DataFrame({
+        "adm1_name_final": [r[0] for r in results],
+        "adm2_name_final": [r[1] for r in results],
+        "geo_matches": [json.dumps(r[2]) for r in results],
+    }, index=df.index)
+    if "article_id" in df.columns:
+        out.insert(0, "article_id", df["article_id"].values)
+    return out
@@ -0,0 +1,257 @@
+"""
+Ingestion of raw scraped articles into the dashboard dataset.
+
+Raw NDJSON files written by the scraper (data/raw/<source>/<date>.ndjson)
+are read from their last checkpointed byte offsets and run through the
+clean -> label -> geotag -> sentiment stages. Each output batch is appended
+to a new Parquet partition next to the main dataset as soon as it leaves the
+pipeline, so memory stays bounded by the queues rather than the run. The
+checkpoint is committed only after the partition is closed, and partitions
+missing from the checkpoint are removed on the next run, so an interrupted
+run can simply be repeated.
+"""
+
+import json
+import os
+import re
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from utils.data_loader import CORE_COLUMNS, DATA_PATH, PARTITIONS_DIR, make_article_ids, partition_paths
+from utils.geotagger import GAZETTEER_PATH, UNKNOWN_ADM1, UNKNOWN_ADM2, GeoTagger, article_text
+from utils.labeler import TaxonomyMatcher, assign_labels
+from utils.pipeline import Pipeline, Stage
+from utils.sentiment import score_records
+
+RAW_DATA_DIR = os.getenv("RAW_DATA_DIR", "data/raw")
+CHECKPOINT_FILE = "_checkpoint.json"
+PARTITION_COLUMNS = CORE_COLUMNS + ["Labels", "geo_matches", "article_id"]
+# Fixed so every batch appends to the same file, whichever columns it happened to fill
+PARTITION_SCHEMA = pa.schema(
+    [(col, pa.timestamp("ns") if col == "date" else pa.float32() if col == "sentiment_score" else pa.string())
+     for col in PARTITION_COLUMNS]
+)
+
+DEFAULT_STAGE_CONFIG = {
+    "clean": (2, "process"),
+    "label": (2, "process"),
+    "geotag": (2, "process"),
+    "sentiment": (2, "process"),
+}
+
+_URL = re.compile(r"https?://\S+|www\.\S+")
+_NON_ALPHA = re.compile(r"[^a-z\s]+")
+_SPACES = re.compile(r"\s+")
+
+
+def clean_text(text):
+    """Lowercase, strip URLs, digits and punctuation, collapse whitespace."""
+    if text is None or (isinstance(text, float) and np.isnan(text)):
+        return ""
+    text = _URL.sub(" ", str(text).lower())
+    return _SPACES.sub(" ", _NON_ALPHA.sub(" ", text)).strip()
+
+
+# -- stages (module-level so they can run in process pools) -------------------
+
+def clean_batch(records):
+    """Drop records without URL/title/date; add cleaned text and derived date columns."""
+    out = []
+    for r in records:
+        date = pd.to_datetime(r.get("date") or r.get("scraped_at"), errors="coerce")
+        if not r.get("url") or not r.get("title") or pd.isna(date):
+            continue
+        r = dict(r)
+        r["date"] = date.tz_localize(None) if date.tzinfo else date
+        r["paragraphs_cleaned"] = clean_text(r.get("paragraphs"))
+        r["yearmon"] = r["date"].strftime("%Y-%m")
+        r["year_quarter"] = f"{r['date'].year}Q{(r['date'].month - 1) // 3 + 1}"
+        out.append(r)
+    return out
+
+
+_matcher = None
+
+
+def label_batch(records):
+    """Taxonomy `Label` and multi-label `Labels` from keyword hit counts."""
+    global _matcher
+    if _matcher is None:
+        _matcher = TaxonomyMatcher()
+    counts = _matcher.count_many([r.get("paragraphs_cleaned", "") for r in records])
+    single, multi = assign_labels(counts)
+    for r, label, labels in zip(records, single, multi):
+        r["Label"], r["Labels"] = label, labels
+    return records
+
+
+_geotagger = None
+
+
+def geotag_batch(records):
+    """Keep locations supplied by the source; otherwise geotag with the gazetteer."""
+    global _geotagger
+    if _geotagger is None:
+        _geotagger = GeoTagger() if Path(GAZETTEER_PATH).exists() else False
+    for r in records:
+        if r.get("adm1_name_final"):
+            r["adm2_name_final"] = r.get("adm2_name_final") or UNKNOWN_ADM2
+            continue
+        if _geotagger:
+            adm1, adm2, matches = _geotagger.tag(article_text(r.get("title"), r.get("paragraphs")))
+            r["adm1_name_final"], r["adm2_name_final"], r["geo_matches"] = adm1, adm2, json.dumps(matches)
+        else:
+            r["adm1_name_final"], r["adm2_name_final"] = UNKNOWN_ADM1, UNKNOWN_ADM2
+    return records
+
+
+STAGE_FUNCS = {
+    "clean": clean_batch,
+    "label": label_batch,
+    "geotag": geotag_batch,
+    "sentiment": score_records,
+}
+
+
+def build_stages(config=None):
+    """Stages in pipeline order; config maps stage name -> (workers, 'thread'|'process')."""
+    config = {**DEFAULT_STAGE_CONFIG, **(config or {})}
+    return [Stage(name, func, *config[name]) for name, func in STAGE_FUNCS.items()]
+
+
+# -- checkpointed input and partitioned output ----------------------------------
+
+def load_checkpoint(partitions_dir):
+    path = Path(partitions_dir) / CHECKPOINT_FILE
+    if path.exists():
+        return json.loads(path.read_text(encoding="utf-8"))
+    return {"offsets": {}, "partitions": [], "runs": []}
+
+
+def save_checkpoint(partitions_dir, checkpoint):
+    path = Path(partitions_dir) / CHECKPOINT_FILE
+    tmp = path.with_suffix(".json.tmp")
+    tmp.write_text(json.dumps(checkpoint, indent=2), encoding="utf-8")
+    os.replace(tmp, path)
+
+
+def remove_orphan_partitions(partitions_dir, checkpoint):
+    """Delete partitions written by a run that died before committing its checkpoint."""
+    committed = set(checkpoint["partitions"])
+    removed = []
+    for path in Path(partitions_dir).glob("part-*.parquet"):
+        if path.name not in committed:
+            path.unlink()
+            removed.append(path.name)
+    return removed
+
+
+def read_raw_batches(raw_dir, offsets, batch_size, new_offsets, max_records=None):
+    """Yield record batches from NDJSON files past their checkpointed offsets.
+
+    new_offsets is filled with the byte offset after the last complete line read.
+    """
+    batch, total = [], 0
+    for path in sorted(Path(raw_dir).glob("*/*.ndjson")):
+        key = str(path.relative_to(raw_dir))
+        offset = offsets.get(key, 0)
+        if path.stat().st_size <= offset:
+            continue
+        with open(path, "rb") as f:
+            f.seek(offset)
+            for line in f:
+                if not line.endswith(b"\n"):
+                    break  # partial line still being written
+                offset += len(line)
+                if line.strip():
+                    batch.append(json.loads(line))
+                    total += 1
+                if len(batch) >= batch_size:
+                    new_offsets[key] = offset
+                    yield batch
+                    batch = []
+                if max_records and total >= max_records:
+                    new_offsets[key] = offset
+                    if batch:
+                        yield batch
+                    return
+        new_offsets[key] = offset
+    if batch:
+        yield batch
+
+
+def known_article_ids(partitions_dir, data_path=None):
+    """Ids already in the main dataset or committed partitions."""
+    ids = set()
+    data_path = Path(data_path or DATA_PATH)
+    if data_path.exists():
+        if str(data_path).endswith(".csv"):
+            base = pd.read_csv(data_path, usecols=["url", "title"], low_memory=False)
+        else:
+            base = pd.read_parquet(data_path, columns=["url", "title"])
+        ids.update(make_article_ids(base))
+    for path in partition_paths(partitions_dir):
+        ids.update(pd.read_parquet(path, columns=["article_id"])["article_id"])
+    return ids
+
+
+def partition_table(df):
+    """A batch of fresh rows as an Arrow table with the partition schema."""
+    df = df.reindex(columns=PARTITION_COLUMNS)
+    df["sentiment_score"] = pd.to_numeric(df["sentiment_score"], errors="coerce").astype("float32")
+    return pa.Table.from_pandas(df, schema=PARTITION_SCHEMA, preserve_index=False)
+
+
+def run_ingest(raw_dir=RAW_DATA_DIR, partitions_dir=PARTITIONS_DIR, batch_size=500, stage_config=None,
+               queue_size=4, max_records=None, data_path=None):
+    """Ingest new raw articles; returns (summary dict, pipeline)."""
+    partitions_dir = Path(partitions_dir)
+    partitions_dir.mkdir(parents=True, exist_ok=True)
+    checkpoint = load_checkpoint(partitions_dir)
+    orphans = remove_orphan_partitions(partitions_dir, checkpoint)
+
+    new_offsets = {}
+    pipeline = Pipeline(build_stages(stage_config), queue_size=queue_size)
+    source = read_raw_batches(raw_dir, checkpoint["offsets"], batch_size, new_offsets, max_records)
+    known = known_article_ids(partitions_dir, data_path)
+    name = f"part-{datetime.now().strftime('%Y%m%dT%H%M%S')}-{len(checkpoint['partitions']):05d}.parquet"
+
+    processed = appended = 0
+    writer = None
+    try:
+        for batch in pipeline.run(source):
+            processed += len(batch)
+            if not batch:
+                continue
+            df = pd.DataFrame(batch)
+            df["article_id"] = make_article_ids(df)
+            fresh = df[~df["article_id"].isin(known)].drop_duplicates("article_id")
+            if fresh.empty:
+                continue
+            known.update(fresh["article_id"])
+            if writer is None:
+                writer = pq.ParquetWriter(partitions_dir / name, PARTITION_SCHEMA)
+            writer.write_table(partition_table(fresh))
+            appended += len(fresh)
+    finally:
+        if writer is not None:
+            writer.close()  # an unfinished partition stays out of the checkpoint and is removed next run
+
+    summary = {"read": pipeline.stages[0].metrics["items_in"], "processed": processed, "appended": appended,
+               "duplicates": processed - appended, "partition": name if appended else None,
+               "orphans_removed": orphans, "elapsed": round(pipeline.elapsed, 2), "bottleneck": pipeline.bottleneck()}
+    if appended:
+        checkpoint["partitions"].append(name)
+
+    checkpoint["offsets"].update(new_offsets)
+    checkpoint["runs"] = (checkpoint["runs"] + [{
+        "finished_at": datetime.now().isoformat(timespec="seconds"),
+        **{k: summary[k] for k in ("read", "appended", "duplicates", "partition", "elapsed")},
+    }])[-50:]
+    save_checkpoint(partitions_dir, checkpoint)
+    return summary, pipeline
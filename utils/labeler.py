@@ -0,0 +1,172 @@
+"""
+Keyword taxonomy labeling against utils.data_loader.CATEGORIES.
+
+All category keywords, including multi-word ones such as "red cross", are
+compiled into one token trie, so a document is labeled in a single pass
+over its tokens however large the taxonomy grows. Per-category hit counts
+give the single dashboard `Label` (most hits, ties to the earlier category)
+and a multi-label list of every category with enough hits.
+"""
+
+import hashlib
+import json
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from utils.data_loader import CATEGORIES
+
+MIN_HITS = 2  # hits a secondary category needs to appear in the multi-label list
+LABEL_SEPARATOR = "; "
+BATCH_SIZE = 2000
+
+_TOKEN = re.compile(r"[a-z]+")
+_END = ""  # trie key marking the end of a keyword (tokens are never empty)
+
+
+def _wordnet_lemmatizer():
+    """WordNet lemmatizer when NLTK and its corpus are installed, else None."""
+    try:
+        from nltk.stem import WordNetLemmatizer
+        lemmatizer = WordNetLemmatizer()
+        lemmatizer.lemmatize("tests")
+        return lemmatizer.lemmatize
+    except (ImportError, LookupError):
+        return None
+
+
+def taxonomy_version(categories=None):
+    """Short hash of the taxonomy, stored with labels to spot stale ones."""
+    payload = json.dumps(categories or CATEGORIES, sort_keys=True)
+    return hashlib.sha1(payload.encode()).hexdigest()[:12]
+
+
+class TaxonomyMatcher:
+    """Token trie over every keyword of every category."""
+
+    def __init__(self, categories=None, lemmatize=True):
+        categories = categories or CATEGORIES
+        self.categories = list(categories)
+        self._lemmatize = _wordnet_lemmatizer() if lemmatize else None
+        self._lemmas = {}
+        self.root = {}
+        for idx, keywords in enumerate(categories.values()):
+            for keyword in keywords:
+                tokens = self.tokenize(keyword)
+                if not tokens:
+                    continue
+                node = self.root
+                for token in tokens:
+                    node = node.setdefault(token, {})
+                node.setdefault(_END, set()).add(idx)
+
+    def tokenize(self, text):
+        if not isinstance(text, str):
+            return []
+        tokens = _TOKEN.findall(text.lower())
+        if self._lemmatize is None:
+            return tokens
+        lemmas = self._lemmas
+        out = []
+        for token in tokens:
+            lemma = lemmas.get(token)
+            if lemma is None:
+                lemma = lemmas[token] = self._lemmatize(token)
+            out.append(lemma)
+        return out
+
+    def count(self, text):
+        """Hit count per category (in taxonomy order) for one document."""
+        counts = [0] * len(self.categories)
+        tokens = self.tokenize(text)
+        root = self.root
+        n = len(tokens)
+        for i in range(n):
+            node = root.get(tokens[i])
+            j = i + 1
+            while node is not None:
+                for idx in node.get(_END, ()):
+                    counts[idx] += 1
+                if j == n:
+                    break
+                node = node.get(tokens[j])
+                j += 1
+        return counts
+
+    def count_many(self, texts):
+        if not len(texts):
+            return np.zeros((0, len(self.categories)), dtype=np.int32)
+        return np.array([self.count(t) for t in texts], dtype=np.int32)
+
+
+_worker_matcher = None
+
+
+def _init_worker(categories, lemmatize):
+    global _worker_matcher
+    _worker_matcher = TaxonomyMatcher(categories, lemmatize)
+
+
+def _count_chunk(texts):
+    return _worker_matcher.count_many(texts)
+
+
+def label_counts(texts, categories=None, workers=None, batch_size=BATCH_SIZE, lemmatize=True):
+    """Hit-count matrix (documents x categories), batched over a process pool."""
+    categories = categories or CATEGORIES
+    texts = list(texts)
+    workers = workers or os.cpu_count() or 1
+    if workers <= 1 or len(texts) <= batch_size:
+        return TaxonomyMatcher(categories, lemmatize).count_many(texts)
+    chunks = [texts[i:i + batch_size] for i in range(0, len(texts), batch_size)]
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                             initargs=(categories, lemmatize)) as pool:
+        return np.vstack(list(pool.map(_count_chunk, chunks)))
+
+
+def assign_labels(counts, categories=None, min_hits=MIN_HITS):
+    """Single label and multi-label strings from a hit-count matrix.
+
+    The single label is the category with most hits ("Uncategorized" when
+    none match). The multi-label list starts with it and adds every other
+    category with at least `min_hits` hits, most hits first.
+    """
+    names = np.array(list(categories or CATEGORIES), dtype=object)
+    if not len(counts):
+        return np.array([], dtype=object), np.array([], dtype=object)
+    has_hits = counts.max(axis=1) > 0
+    single = np.where(has_hits, names[counts.argmax(axis=1)], "Uncategorized")
+
+    multi = []
+    order = np.argsort(-counts, axis=1, kind="stable")
+    for row, ranked, label, hit in zip(counts, order, single, has_hits):
+        if not hit:
+            multi.append("Uncategorized")
+            continue
+        extra = [names[i] for i in ranked[1:] if row[i] >= min_hits]
+        multi.append(LABEL_SEPARATOR.join([label] + extra))
+    return single, np.array(multi, dtype=object)
+
+
+def label_frame(df, text_column="paragraphs_cleaned", categories=None, workers=None, min_hits=MIN_HITS):
+    """Label every row: article_id, Label, Labels, one hit-count column per category."""
+    categories = categories or CATEGORIES
+    counts = label_counts(df[text_column].tolist(), categories, workers=workers)
+    single, multi = assign_labels(counts, categories, min_hits)
+    out = pd.DataFrame(counts.astype(np.int16), columns=list(categories), index=df.index)
+    out.insert(0, "Labels", multi)
+    out.insert(0, "Label", single)
+    if "article_id" in df.columns:
+        out.insert(0, "article_id", df["article_id"].values)
+    out["taxonomy_version"] = taxonomy_version(categories)
+    return out
+
+
+def split_labels(value):
+    """List form of a `Labels` string."""
+    if not isinstance(value, str) or not value:
+        return []
+    return value.split(LABEL_SEPARATOR)
@@ -0,0 +1,209 @@
+"""
+Shared OpenAI client for the RAG+LLM pages.
+Streams completions token by token, retries transient failures with
+exponential backoff, and is cached across Streamlit reruns.
+"""
+
+import asyncio
+import os
+import random
+import time
+
+import streamlit as st
+from dotenv import load_dotenv
+
+from utils.metrics import record_llm_call
+from utils.rag import estimate_tokens
+
+load_dotenv()
+
+# Point this at a local stub (e.g. scripts/stub_llm_server.py) for offline testing
+DEFAULT_API_BASE = os.getenv("OPENAI_API_BASE", "https://api.openai.com/v1")
+
+MAX_RETRIES = int(os.getenv("LLM_MAX_RETRIES", "5"))
+BACKOFF_BASE_SECONDS = float(os.getenv("LLM_BACKOFF_BASE", "1.0"))
+BACKOFF_MAX_SECONDS = float(os.getenv("LLM_BACKOFF_MAX", "30.0"))
+REQUEST_TIMEOUT_SECONDS = float(os.getenv("LLM_REQUEST_TIMEOUT", "120"))
+
+
+def _retryable_errors():
+    """Return the openai exception types worth retrying."""
+    from openai import error
+    return (
+        error.RateLimitError,
+        error.ServiceUnavailableError,
+        error.APIConnectionError,
+        error.Timeout,
+        error.TryAgain,
+        error.APIError,
+    )
+
+
+def _backoff_delay(attempt, exc=None):
+    """Exponential backoff with full jitter, honouring Retry-After when sent."""
+    headers = getattr(exc, "headers", None) or {}
+    retry_after = headers.get("retry-after") or headers.get("Retry-After")
+    if retry_after:
+        try:
+            return min(float(retry_after), BACKOFF_MAX_SECONDS)
+        except ValueError:
+            pass
+    ceiling = min(BACKOFF_MAX_SECONDS, BACKOFF_BASE_SECONDS * (2 ** attempt))
+    return random.uniform(0, ceiling)
+
+
+class LLMClient:
+    """Thin wrapper around the legacy (0.28.x) openai module.
+
+    The API key and base URL are passed per request, so several clients with
+    different keys can coexist in one Streamlit process.
+    """
+
+    def __init__(self, api_key, api_base=None, max_retries=MAX_RETRIES,
+                 request_timeout=REQUEST_TIMEOUT_SECONDS):
+        import openai
+        import requests
+
+        self._openai = openai
+        self.api_key = api_key
+        self.api_base = (api_base or DEFAULT_API_BASE).rstrip("/")
+        self.max_retries = max_retries
+        self.request_timeout = request_timeout
+
+        # The legacy SDK keeps one requests.Session per thread and Streamlit runs
+        # every rerun on a fresh thread, so share one pooled session instead.
+        if not isinstance(openai.requestssession, requests.Session):
+            openai.requestssession = requests.Session()
+
+    def _request_kwargs(self, model, messages, max_tokens, temperature, stream):
+        return dict(
+            model=model,
+            messages=messages,
+            max_tokens=max_tokens,
+            temperature=temperature,
+            stream=stream,
+            api_key=self.api_key,
+            api_base=self.api_base,
+            request_timeout=self.request_timeout,
+        )
+
+    def chat(self, model, messages, max_tokens=1500, temperature=0.3):
+        """Blocking completion. Returns (text, usage dict)."""
+        kwargs = self._request_kwargs(model, messages, max_tokens, temperature, stream=False)
+        retryable = _retryable_errors()
+        started = time.perf_counter()
+        usage = {}
+        outcome = "error"
+        try:
+            for attempt in range(self.max_retries + 1):
+                try:
+                    response = self._openai.ChatCompletion.create(**kwargs)
+                    usage = dict(response.get("usage", {}) or {})
+                    outcome = "ok"
+                    return response.choices[0].message.content, usage
+                except retryable as e:
+                    if attempt >= self.max_retries:
+                        raise
+                    time.sleep(_backoff_delay(attempt, e))
+        finally:
+            record_llm_call(model, "chat", time.perf_counter() - started, outcome,
+                            prompt_tokens=usage.get("prompt_tokens", 0),
+                            completion_tokens=usage.get("completion_tokens", 0))
+
+    def stream_chat(self, model, messages, max_tokens=1500, temperature=0.3):
+        """Yield completion text deltas as they arrive.
+
+        Failures before the first token are retried with backoff; once output
+        has been shown to the user a failure is raised rather than replayed.
+        """
+        kwargs = self._request_kwargs(model, messages, max_tokens, temperature, stream=True)
+        retryable = _retryable_errors()
+        started = time.perf_counter()
+        first_token = None
+        pieces = []
+        outcome = "error"
+        try:
+            for attempt in range(self.max_retries + 1):
+                try:
+                    for chunk in self._openai.ChatCompletion.create(**kwargs):
+                        choices = chunk.get("choices") or []
+                        if not choices:
+                            continue
+                        delta = choices[0].get("delta", {}).get("content")
+                        if delta:
+                            if first_token is None:
+                                first_token = time.perf_counter() - started
+                            pieces.append(delta)
+                            yield delta
+                    outcome = "ok"
+                    return
+                except retryable as e:
+                    if pieces or attempt >= self.max_retries:
+                        raise
+                    time.sleep(_backoff_delay(attempt, e))
+        except GeneratorExit:
+            outcome = "cancelled"
+            raise
+        finally:
+            record_llm_call(model, "stream", time.perf_counter() - started, outcome,
+                            prompt_tokens=sum(estimate_tokens(m.get("content", "")) for m in messages),
+                            completion_tokens=estimate_tokens("".join(pieces)), first_token=first_token)
+
+
+    async def achat(self, model, messages, max_tokens=1500, temperature=0.3):
+        """Async completion for concurrent callers. Returns (text, usage dict)."""
+        kwargs = self._request_kwargs(model, messages, max_tokens, temperature, stream=False)
+        retryable = _retryable_errors()
+        started = time.perf_counter()
+        usage = {}
+        outcome = "error"
+        try:
+            for attempt in range(self.max_retries + 1):
+                try:
+                    response = await self._openai.ChatCompletion.acreate(**kwargs)
+                    usage = dict(response.get("usage", {}) or {})
+                    outcome = "ok"
+                    return response.choices[0].message.content, usage
+                except retryable as e:
+                    if attempt >= self.max_retries:
+                        raise
+                    await asyncio.sleep(_backoff_delay(attempt, e))
+        except asyncio.CancelledError:
+            outcome = "cancelled"
+            raise
+        finally:
+            record_llm_call(model, "achat", time.perf_counter() - started, outcome,
+                            prompt_tokens=usage.get("prompt_tokens", 0),
+                            completion_tokens=usage.get("completion_tokens", 0))
+
+
+
+async def with_pooled_session(coro, concurrency=4):
+    """Await `coro` with one pooled aiohttp session shared by all its LLM calls."""
+    import aiohttp
+    import openai
+
+    connector = aiohttp.TCPConnector(limit=max(1, int(concurrency)))
+    async with aiohttp.ClientSession(connector=connector) as session:
+        token = openai.aiosession.set(session)
+        try:
+            return await coro
+        finally:
+            openai.aiosession.reset(token)
+
+
+@st.cache_resource(show_spinner=False)
+def _cached_client(api_key, api_base):
+    """One client per (key, base URL), shared by all sessions and reruns."""
+    return LLMClient(api_key, api_base=api_base)
+
+
+def get_openai_client(user_api_key=None, api_base=None):
+    """Return a cached LLMClient, or (None, error message)."""
+    api_key = user_api_key or os.getenv("OPENAI_API_KEY")
+    if not api_key:
+        return None, "Missing OpenAI API Key. Please provide one below or set it in your .env file."
+    try:
+        return _cached_client(api_key, (api_base or DEFAULT_API_BASE).rstrip("/")), None
+    except Exception as e:
+        return None, f"OpenAI init failed: {e}"
@@ -0,0 +1,333 @@
+"""
+Process-wide gateway in front of the LLM client.
+
+Every Streamlit session in the process shares one gateway, which
+- coalesces identical in-flight prompts sent with the same API key into a
+  single upstream call whose streamed output fans out to every waiting
+  session (single flight),
+- caps concurrent upstream calls, streamed or map-reduce batches alike,
+  behind a bounded queue, and
+- enforces a rolling per-user token budget, which sessions that joined a
+  coalesced call are charged against too.
+Queue depth, wait times and spend are exposed via `stats()`.
+"""
+
+import asyncio
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import defaultdict, deque
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+
+import streamlit as st
+
+from utils.rag import MODEL_PRICING, estimate_tokens
+
+GATEWAY_CONCURRENCY = int(os.getenv("LLM_GATEWAY_CONCURRENCY", "4"))
+GATEWAY_MAX_QUEUE = int(os.getenv("LLM_GATEWAY_MAX_QUEUE", "32"))
+USER_TOKEN_BUDGET = int(os.getenv("LLM_USER_TOKEN_BUDGET", "500000"))
+BUDGET_WINDOW_SECONDS = int(os.getenv("LLM_BUDGET_WINDOW_SECONDS", "86400"))
+
+
+class GatewayError(Exception):
+    """Base class for requests the gateway refuses."""
+
+
+class QueueFullError(GatewayError):
+    """Raised when the pending queue is at capacity."""
+
+
+class BudgetExceededError(GatewayError):
+    """Raised when a request would exceed the user's token budget."""
+
+
+def key_fingerprint(api_key):
+    """Short, non-reversible id for an API key."""
+    return hashlib.sha256((api_key or "").encode("utf-8")).hexdigest()[:12]
+
+
+def request_key(model, messages, max_tokens, temperature, api_base="", api_key=""):
+    """Stable hash identifying an LLM request for coalescing.
+
+    The API key's fingerprint is part of the key, so a call is only shared by
+    requests that would have been billed to the same key.
+    """
+    payload = json.dumps(
+        {"model": model, "messages": messages, "max_tokens": max_tokens,
+         "temperature": temperature, "api_base": api_base, "api_key": key_fingerprint(api_key)},
+        sort_keys=True,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class _Flight:
+    """One upstream call. Chunks are buffered so late joiners replay them."""
+
+    def __init__(self, key, user, model, prompt_tokens, reserved, clock):
+        self.key = key
+        self.user = user
+        self.model = model
+        self.prompt_tokens = prompt_tokens
+        self.reserved = reserved
+        self.submitted_at = clock()
+        self.started_at = None
+        self.waiters = 1
+        self.followers = []  # (user, reserved) for each session that joined this call
+        self.chunks = []
+        self.done = False
+        self.error = None
+        self._cond = threading.Condition()
+
+    def append(self, chunk):
+        with self._cond:
+            self.chunks.append(chunk)
+            self._cond.notify_all()
+
+    def finish(self, error=None):
+        with self._cond:
+            self.error = error
+            self.done = True
+            self._cond.notify_all()
+
+    def iter_chunks(self):
+        """Yield every chunk from the start, blocking until the call finishes."""
+        i = 0
+        while True:
+            with self._cond:
+                while i >= len(self.chunks) and not self.done:
+                    self._cond.wait()
+                pending = self.chunks[i:]
+                finished, error = self.done, self.error
+            for chunk in pending:
+                yield chunk
+            i += len(pending)
+            if finished and i >= len(self.chunks):
+                if error is not None:
+                    raise error
+                return
+
+
+class LLMGateway:
+    """Single-flight, queue-bounded, budgeted access to an LLMClient."""
+
+    def __init__(self, max_concurrency=GATEWAY_CONCURRENCY, max_queue=GATEWAY_MAX_QUEUE,
+                 user_budget=USER_TOKEN_BUDGET, budget_window=BUDGET_WINDOW_SECONDS, clock=time.monotonic):
+        self.max_concurrency = max_concurrency
+        self.max_queue = max_queue
+        self.user_budget = user_budget
+        self.budget_window = budget_window
+        self._clock = clock
+        self._executor = ThreadPoolExecutor(max_workers=max_concurrency, thread_name_prefix="llm-gateway")
+        self._slots = threading.BoundedSemaphore(max_concurrency)  # upstream calls of any kind
+        self._lock = threading.Lock()
+        self._inflight = {}
+        self._queued = 0
+        self._active = 0
+        self._reserved = defaultdict(int)
+        self._spend = defaultdict(deque)  # user -> deque[(timestamp, tokens)]
+        self._waits = deque(maxlen=500)
+        self._totals = {"requests": 0, "coalesced": 0, "upstream_calls": 0, "rejected": 0,
+                        "errors": 0, "prompt_tokens": 0, "completion_tokens": 0, "cost_usd": 0.0}
+        self._user_cost = defaultdict(float)
+
+    # -- budget -------------------------------------------------------------
+
+    def _window_spend(self, user, now):
+        spend = self._spend[user]
+        while spend and now - spend[0][0] > self.budget_window:
+            spend.popleft()
+        return sum(tokens for _, tokens in spend)
+
+    def remaining_budget(self, user):
+        """Tokens the user may still spend in the current window."""
+        with self._lock:
+            used = self._window_spend(user, self._clock()) + self._reserved[user]
+        return max(0, self.user_budget - used)
+
+    def _check_budget(self, user, tokens):
+        used = self._window_spend(user, self._clock()) + self._reserved[user]
+        if used + tokens > self.user_budget:
+            self._totals["rejected"] += 1
+            raise BudgetExceededError(
+                f"Token budget exceeded: {used:,} of {self.user_budget:,} tokens used in the current window, "
+                f"this request needs ~{tokens:,}."
+            )
+
+    def _check_queue(self):
+        if self._queued >= self.max_queue:
+            self._totals["rejected"] += 1
+            raise QueueFullError(
+                f"The LLM queue is full ({self._queued} requests waiting). Please try again shortly."
+            )
+
+    def reserve(self, user, tokens):
+        """Hold budget for work run through `slot()` rather than `stream()` (e.g. map-reduce batches)."""
+        with self._lock:
+            self._check_queue()
+            self._check_budget(user, tokens)
+            self._reserved[user] += tokens
+
+    def record_usage(self, user, model, prompt_tokens, completion_tokens, reserved=0, upstream=True):
+        """Charge actual usage to the user's budget and release the matching reservation.
+
+        `upstream=False` charges a session that shared another's call: its budget
+        is used, but process totals only count the call once.
+        """
+        pricing = MODEL_PRICING.get(model, {"input": 0, "output": 0})
+        cost = (prompt_tokens / 1_000_000) * pricing["input"] + (completion_tokens / 1_000_000) * pricing["output"]
+        with self._lock:
+            self._reserved[user] = max(0, self._reserved[user] - reserved)
+            self._spend[user].append((self._clock(), prompt_tokens + completion_tokens))
+            self._user_cost[user] += cost
+            if upstream:
+                self._totals["prompt_tokens"] += prompt_tokens
+                self._totals["completion_tokens"] += completion_tokens
+                self._totals["cost_usd"] += cost
+
+    # -- concurrency ----------------------------------------------------------
+
+    def _call_started(self, submitted_at):
+        with self._lock:
+            self._active += 1
+            self._totals["upstream_calls"] += 1
+            self._waits.append(self._clock() - submitted_at)
+
+    def _call_finished(self):
+        with self._lock:
+            self._active -= 1
+        self._slots.release()
+
+    @asynccontextmanager
+    async def slot(self):
+        """Hold one of the gateway's upstream call slots from async code (map-reduce batches).
+
+        Waiting counts towards the queue depth. The semaphore is polled rather
+        than acquired in a thread, so a cancelled wait cannot leak a slot.
+        """
+        submitted_at = self._clock()
+        with self._lock:
+            self._queued += 1
+        try:
+            while not self._slots.acquire(blocking=False):
+                await asyncio.sleep(0.05)
+        finally:
+            with self._lock:
+                self._queued -= 1
+        self._call_started(submitted_at)
+        try:
+            yield
+        finally:
+            self._call_finished()
+
+    # -- requests -----------------------------------------------------------
+
+    def stream(self, client, user, model, messages, max_tokens=1500, temperature=0.3):
+        """Stream a completion, joining an identical in-flight call if one exists.
+
+        Raises QueueFullError or BudgetExceededError before any work is queued.
+        """
+        key = request_key(model, messages, max_tokens, temperature,
+                          getattr(client, "api_base", ""), getattr(client, "api_key", ""))
+        prompt_tokens = sum(estimate_tokens(m.get("content", "")) for m in messages)
+        reserved = prompt_tokens + max_tokens
+        with self._lock:
+            self._totals["requests"] += 1
+            flight = self._inflight.get(key)
+            if flight is not None:
+                self._check_budget(user, reserved)
+                self._reserved[user] += reserved
+                flight.waiters += 1
+                flight.followers.append((user, reserved))
+                self._totals["coalesced"] += 1
+                return flight.iter_chunks()
+
+            self._check_queue()
+            self._check_budget(user, reserved)
+            self._reserved[user] += reserved
+
+            flight = _Flight(key, user, model, prompt_tokens, reserved, self._clock)
+            self._inflight[key] = flight
+            self._queued += 1
+
+        self._executor.submit(self._run, client, flight, messages, max_tokens, temperature)
+        return flight.iter_chunks()
+
+    def complete(self, client, user, model, messages, max_tokens=1500, temperature=0.3):
+        """Blocking variant of `stream`; returns the full text."""
+        return "".join(self.stream(client, user, model, messages, max_tokens, temperature))
+
+    def _run(self, client, flight, messages, max_tokens, temperature):
+        self._slots.acquire()
+        with self._lock:
+            self._queued -= 1
+        flight.started_at = self._clock()
+        self._call_started(flight.submitted_at)
+
+        try:
+            for delta in client.stream_chat(model=flight.model, messages=messages,
+                                            max_tokens=max_tokens, temperature=temperature):
+                flight.append(delta)
+        except Exception as e:
+            with self._lock:
+                self._totals["errors"] += 1
+            flight.finish(e)
+        else:
+            flight.finish()
+        finally:
+            with self._lock:
+                self._inflight.pop(flight.key, None)  # no one can join from here on
+            self._call_finished()
+            completion_tokens = estimate_tokens("".join(flight.chunks))
+            self.record_usage(flight.user, flight.model, flight.prompt_tokens, completion_tokens,
+                              reserved=flight.reserved)
+            for user, reserved in flight.followers:
+                self.record_usage(user, flight.model, flight.prompt_tokens, completion_tokens,
+                                  reserved=reserved, upstream=False)
+
+    # -- observability --------------------------------------------------------
+
+    def stats(self):
+        """Snapshot of queue depth, wait times and spend."""
+        with self._lock:
+            waits = sorted(self._waits)
+            now = self._clock()
+            per_user = {
+                user: {"window_tokens": self._window_spend(user, now), "cost_usd": round(self._user_cost[user], 6)}
+                for user in list(self._spend)
+            }
+            return {
+                "queue_depth": self._queued,
+                "active": self._active,
+                "inflight": len(self._inflight),
+                "max_concurrency": self.max_concurrency,
+                "max_queue": self.max_queue,
+                "wait_avg_s": (sum(waits) / len(waits)) if waits else 0.0,
+                "wait_p95_s": waits[int(0.95 * (len(waits) - 1))] if waits else 0.0,
+                **self._totals,
+                "users": per_user,
+            }
+
+
+@st.cache_resource(show_spinner=False)
+def get_llm_gateway():
+    """The single gateway shared by every session in this process."""
+    return LLMGateway()
+
+
+def current_user_id(user_api_key=None):
+    """Identify the caller for budgeting: own API key, then client address, then session."""
+    if user_api_key:
+        return "key:" + hashlib.sha256(user_api_key.encode("utf-8")).hexdigest()[:12]
+    try:
+        headers = st.context.headers
+        forwarded = headers.get("X-Forwarded-For") or headers.get("X-Real-Ip")
+        if forwarded:
+            return "ip:" + forwarded.split(",")[0].strip()
+    except Exception:
+        pass
+    from streamlit.runtime.scriptrunner import get_script_run_ctx
+    ctx = get_script_run_ctx()
+    return "session:" + (ctx.session_id if ctx else "local")
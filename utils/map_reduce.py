@@ -0,0 +1,288 @@
+"""
+Map-reduce summarization for article sets too large for a single prompt.
+
+Retrieved articles are split into batches that are summarized concurrently
+(map), then the partial summaries are merged in rounds of `fan_in` (reduce)
+until one bulleted summary remains. Articles keep their global numbers in
+every prompt, so citations in the final output point back to the same
+[n] as the reference table on the page. Wall-clock time therefore grows with
+the number of rounds rather than the number of articles.
+"""
+
+import asyncio
+import math
+import os
+import re
+import time
+from contextlib import asynccontextmanager
+
+from utils.llm_client import with_pooled_session
+from utils.rag import SYSTEM_PROMPT, build_filter_instructions, estimate_tokens, format_documents
+from utils.tracing import traced
+
+MAP_BATCH_SIZE = int(os.getenv("MAP_REDUCE_BATCH_SIZE", "15"))
+MAX_CONCURRENCY = int(os.getenv("LLM_MAX_CONCURRENCY", "4"))
+REDUCE_FAN_IN = int(os.getenv("MAP_REDUCE_FAN_IN", "6"))
+PARTIAL_MAX_TOKENS = 700
+FINAL_MAX_TOKENS = 1500
+
+CITATION_PATTERN = re.compile(r"\[(\d+(?:\s*[,\-–]\s*\d+)*)\]")
+
+
+def check_fan_in(fan_in):
+    """Reduce rounds only shrink the partials with a fan-in of at least 2."""
+    fan_in = int(fan_in)
+    if fan_in < 2:
+        raise ValueError(f"MAP_REDUCE_FAN_IN must be at least 2, got {fan_in}")
+    return fan_in
+
+
+REDUCE_FAN_IN = check_fan_in(REDUCE_FAN_IN)
+
+
+def extract_citations(text):
+    """Return the sorted article numbers cited as [n], [n,m] or [n-m] in text."""
+    cited = set()
+    for group in CITATION_PATTERN.findall(text or ""):
+        for part in re.split(r"\s*,\s*", group):
+            bounds = re.split(r"\s*[\-–]\s*", part)
+            if len(bounds) == 2:
+                lo, hi = int(bounds[0]), int(bounds[1])
+                if 0 < hi - lo <= 100:
+                    cited.update(range(lo, hi + 1))
+                    continue
+            cited.update(int(b) for b in bounds if b)
+    return sorted(cited)
+
+
+def split_batches(context_df, batch_size=MAP_BATCH_SIZE):
+    """Split articles into (first_index, batch_df) pairs; numbering is 1-based."""
+    batch_size = max(1, int(batch_size))
+    return [
+        (start + 1, context_df.iloc[start:start + batch_size])
+        for start in range(0, len(context_df), batch_size)
+    ]
+
+
+def count_rounds(n_batches, fan_in=REDUCE_FAN_IN):
+    """Number of sequential LLM rounds: map, intermediate reduces, final reduce."""
+    fan_in = check_fan_in(fan_in)
+    rounds, remaining = 2, n_batches
+    while remaining > fan_in:
+        remaining = math.ceil(remaining / fan_in)
+        rounds += 1
+    return rounds
+
+
+def build_map_prompt(batch_df, first_index, filter_instruction, context_str, date_range):
+    """Prompt summarizing one batch, citing articles by their global numbers."""
+    last_index = first_index + len(batch_df) - 1
+    return f"""You are a humanitarian crisis analyst. Based ONLY on the following news reports,
+extract the key findings. This is one batch (articles {first_index}-{last_index}) of a larger set.
+
+Focus Context: {context_str}
+Time Period: {date_range[0]} to {date_range[1]}
+{filter_instruction}
+REPORTS:
+{format_documents(batch_df, first_index=first_index)}
+
+INSTRUCTIONS:
+1. ONLY include articles that match ALL specified criteria (region AND topic if both provided).
+2. Provide up to 6 bullet points, each summarizing a key finding or event.
+3. For EACH bullet point, cite the source article number(s) EXACTLY as numbered above, e.g. [{first_index}], [{first_index},{last_index}].
+4. Cite specific dates and locations when mentioned. Be factual - no speculation.
+5. At the END, list "Excluded Articles" with brief reasons.
+
+FORMAT:
+* **Key Finding**: Description... [article numbers]
+
+**Excluded Articles**:
+- [article number]: Reason
+"""
+
+
+def build_reduce_prompt(partials, context_str, date_range, region_focus, topic_keyword, final=True):
+    """Prompt merging partial summaries; `final` asks for the full page format."""
+    parts_text = "\n\n".join(f"--- Partial summary {i + 1} ---\n{p.strip()}" for i, p in enumerate(partials))
+    focus = []
+    if region_focus and region_focus.strip():
+        focus.append(f"Region/Location: {region_focus.strip()}")
+    if topic_keyword and topic_keyword.strip():
+        focus.append(f"Topic/Keyword: {topic_keyword.strip()}")
+    focus_line = "; ".join(focus) if focus else "None"
+
+    if final:
+        instructions = """INSTRUCTIONS:
+1. Merge the partial summaries into 5-10 bullet points covering the most important findings.
+2. Merge overlapping findings into one bullet and combine their citations, e.g. [3,17,42].
+3. Keep every article number EXACTLY as cited in the partial summaries - never renumber or invent citations.
+4. After the bullet points, provide a 2-3 sentence overall summary paragraph.
+5. At the END, combine the "Excluded Articles" lists from the partial summaries.
+
+FORMAT:
+* **Key Finding**: Description... [article numbers]
+* ...
+
+**Overall Summary**: ...
+
+**Excluded Articles**:
+- [article number]: Reason
+"""
+    else:
+        instructions = """INSTRUCTIONS:
+1. Merge the partial summaries into at most 8 bullet points, keeping the most important findings.
+2. Merge overlapping findings into one bullet and combine their citations, e.g. [3,17,42].
+3. Keep every article number EXACTLY as cited in the partial summaries - never renumber or invent citations.
+4. Do NOT write an overall summary paragraph.
+5. At the END, combine the "Excluded Articles" lists from the partial summaries.
+
+FORMAT:
+* **Key Finding**: Description... [article numbers]
+
+**Excluded Articles**:
+- [article number]: Reason
+"""
+
+    return f"""You are a humanitarian crisis analyst. The following partial summaries were each
+written from a batch of numbered news reports. Combine them.
+
+Focus Context: {context_str}
+Focus Filters: {focus_line}
+Time Period: {date_range[0]} to {date_range[1]}
+Only use facts stated in the partial summaries - NO speculation.
+
+PARTIAL SUMMARIES:
+{parts_text}
+
+{instructions}"""
+
+
+def estimate_map_reduce_tokens(context_df, context_str, date_range, region_focus, topic_keyword,
+                               batch_size=MAP_BATCH_SIZE, fan_in=REDUCE_FAN_IN):
+    """Rough (input_tokens, output_tokens, llm_calls, rounds) for a map-reduce run."""
+    fan_in = check_fan_in(fan_in)
+    filter_instruction = build_filter_instructions(context_df, region_focus, topic_keyword)
+    batches = split_batches(context_df, batch_size)
+    input_tokens = sum(
+        estimate_tokens(build_map_prompt(b, first, filter_instruction, context_str, date_range))
+        for first, b in batches
+    )
+    output_tokens = len(batches) * PARTIAL_MAX_TOKENS
+    calls = len(batches)
+
+    # Each reduce call reads its partials plus ~400 tokens of instructions
+    remaining = len(batches)
+    while remaining > fan_in:
+        groups = math.ceil(remaining / fan_in)
+        input_tokens += remaining * PARTIAL_MAX_TOKENS + groups * 400
+        output_tokens += groups * PARTIAL_MAX_TOKENS
+        calls += groups
+        remaining = groups
+    input_tokens += remaining * PARTIAL_MAX_TOKENS + 400
+    output_tokens += FINAL_MAX_TOKENS
+    calls += 1
+    return input_tokens, output_tokens, calls, count_rounds(len(batches), fan_in)
+
+
+def _new_stats():
+    return {"batches": 0, "rounds": 0, "calls": 0, "prompt_tokens": 0, "completion_tokens": 0, "elapsed": 0.0}
+
+
+@asynccontextmanager
+async def _unlimited():
+    yield
+
+
+async def _complete(client, model, prompt, max_tokens, semaphore, stats, limiter=None):
+    """One bounded-concurrency LLM call; accumulates usage into stats.
+
+    `limiter` is an optional async context manager factory (e.g. LLMGateway.slot)
+    held around the call on top of the run's own semaphore.
+    """
+    messages = [
+        {"role": "system", "content": SYSTEM_PROMPT},
+        {"role": "user", "content": prompt},
+    ]
+    async with semaphore, (limiter or _unlimited)():
+        text, usage = await client.achat(model, messages, max_tokens=max_tokens, temperature=0.3)
+    stats["calls"] += 1
+    stats["prompt_tokens"] += usage.get("prompt_tokens") or estimate_tokens(prompt)
+    stats["completion_tokens"] += usage.get("completion_tokens") or estimate_tokens(text)
+    return text
+
+
+async def map_reduce_partials(client, model, context_df, context_str, date_range, region_focus, topic_keyword,
+                              batch_size=MAP_BATCH_SIZE, concurrency=MAX_CONCURRENCY, fan_in=REDUCE_FAN_IN,
+                              on_progress=None, limiter=None):
+    """Map all batches, then reduce until at most `fan_in` partials remain.
+
+    Returns (partials, stats). The caller runs the final reduce, which lets the
+    page stream it while batch scripts can await it directly.
+    """
+    fan_in = check_fan_in(fan_in)
+    started = time.perf_counter()
+    stats = _new_stats()
+    semaphore = asyncio.Semaphore(max(1, int(concurrency)))
+    filter_instruction = build_filter_instructions(context_df, region_focus, topic_keyword)
+    batches = split_batches(context_df, batch_size)
+    stats["batches"] = len(batches)
+
+    if on_progress:
+        on_progress(f"Summarizing {len(context_df)} articles in {len(batches)} batches...")
+    partials = await asyncio.gather(*[
+        _complete(client, model,
+                  build_map_prompt(b, first, filter_instruction, context_str, date_range),
+                  PARTIAL_MAX_TOKENS, semaphore, stats, limiter)
+        for first, b in batches
+    ])
+    stats["rounds"] = 1
+
+    while len(partials) > fan_in:
+        groups = [partials[i:i + fan_in] for i in range(0, len(partials), fan_in)]
+        if on_progress:
+            on_progress(f"Merging {len(partials)} partial summaries into {len(groups)}...")
+        partials = await asyncio.gather(*[
+            _complete(client, model,
+                      build_reduce_prompt(g, context_str, date_range, region_focus, topic_keyword, final=False),
+                      PARTIAL_MAX_TOKENS, semaphore, stats, limiter)
+            for g in groups
+        ])
+        stats["rounds"] += 1
+
+    stats["elapsed"] = time.perf_counter() - started
+    return list(partials), stats
+
+
+async def map_reduce_summarize(client, model, context_df, context_str, date_range, region_focus, topic_keyword,
+                               batch_size=MAP_BATCH_SIZE, concurrency=MAX_CONCURRENCY, fan_in=REDUCE_FAN_IN,
+                               on_progress=None, limiter=None):
+    """Full map-reduce run. Returns (summary, stats)."""
+    started = time.perf_counter()
+    partials, stats = await map_reduce_partials(
+        client, model, context_df, context_str, date_range, region_focus, topic_keyword,
+        batch_size=batch_size, concurrency=concurrency, fan_in=fan_in, on_progress=on_progress, limiter=limiter
+    )
+    if on_progress:
+        on_progress("Writing final summary...")
+    final_prompt = build_reduce_prompt(partials, context_str, date_range, region_focus, topic_keyword, final=True)
+    summary = await _complete(client, model, final_prompt, FINAL_MAX_TOKENS, asyncio.Semaphore(1), stats, limiter)
+    stats["rounds"] += 1
+    stats["elapsed"] = time.perf_counter() - started
+    return summary, stats
+
+
+@traced("map_reduce_partials")
+def run_map_reduce_partials(client, model, context_df, context_str, date_range, region_focus, topic_keyword, **kwargs):
+    """Synchronous entry point for Streamlit pages. Returns (partials, stats)."""
+    return asyncio.run(with_pooled_session(
+        map_reduce_partials(client, model, context_df, context_str, date_range, region_focus, topic_keyword, **kwargs),
+        kwargs.get("concurrency", MAX_CONCURRENCY)
+    ))
+
+
+def run_map_reduce(client, model, context_df, context_str, date_range, region_focus, topic_keyword, **kwargs):
+    """Synchronous entry point for scripts. Returns (summary, stats)."""
+    return asyncio.run(with_pooled_session(
+        map_reduce_summarize(client, model, context_df, context_str, date_range, region_focus, topic_keyword, **kwargs),
+        kwargs.get("concurrency", MAX_CONCURRENCY)
+    ))
@@ -0,0 +1,232 @@
+"""
+Memory accounting for the dashboard process.
+
+Reports the deep size of the cached dataset (by column), of each session's
+st.session_state (by key) and of the frames apply_filters returns. It also
+samples process RSS over time. Used by the Memory page
+(pages/6_Memory_Report.py) and by scripts/memory_report.py, which replays a
+scripted session to size containers and catch regressions.
+
+Frames are measured with memory_usage(deep=True) and other objects with a
+recursive getsizeof. Buffers shared between frames (views, copy-on-write)
+are counted for each frame that holds them, so totals are upper bounds.
+"""
+
+import os
+import sys
+import threading
+import time
+import types
+from collections import deque
+
+import numpy as np
+import pandas as pd
+
+RSS_SAMPLE_SECONDS = float(os.getenv("MEMORY_SAMPLE_SECONDS", "5"))
+RSS_MAX_SAMPLES = 2000
+MAX_DEPTH = 8  # deeper references (client objects and the like) count only their own size
+
+_sampler_lock = threading.Lock()
+_sampler = None
+
+
+def fmt_bytes(n):
+    for unit in ("B", "KB", "MB", "GB"):
+        if abs(n) < 1024 or unit == "GB":
+            return f"{n:,.0f} {unit}" if unit == "B" else f"{n:,.1f} {unit}"
+        n /= 1024
+
+
+# -- sizes -------------------------------------------------------------------------
+
+def deep_size(obj, seen=None, depth=0):
+    """Bytes held by `obj` and what it references (frames and arrays by their buffers), MAX_DEPTH levels down."""
+    seen = set() if seen is None else seen
+    if id(obj) in seen:
+        return 0
+    seen.add(id(obj))
+    if depth > MAX_DEPTH or isinstance(obj, (type, types.ModuleType, types.FunctionType, types.MethodType)):
+        return sys.getsizeof(obj)
+    if isinstance(obj, pd.DataFrame):
+        return int(obj.memory_usage(deep=True, index=True).sum())
+    if isinstance(obj, (pd.Series, pd.Index)):
+        return int(obj.memory_usage(deep=True))
+    if isinstance(obj, np.ndarray):
+        size = obj.nbytes
+        if obj.dtype == object:
+            size += sum(deep_size(v, seen, depth + 1) for v in obj.ravel())
+        return size
+    size = sys.getsizeof(obj)
+    if isinstance(obj, dict):
+        size += sum(deep_size(k, seen, depth + 1) + deep_size(v, seen, depth + 1) for k, v in obj.items())
+    elif isinstance(obj, (list, tuple, set, frozenset, deque)):
+        size += sum(deep_size(v, seen, depth + 1) for v in obj)
+    elif hasattr(obj, "__dict__") and not isinstance(obj, type):
+        size += deep_size(vars(obj), seen, depth + 1)
+    return size
+
+
+def frame_columns(df):
+    """Deep bytes per column of a frame, largest first, with bytes per row and share of the total."""
+    usage = df.memory_usage(deep=True, index=False)
+    out = pd.DataFrame({
+        "column": usage.index,
+        "dtype": [str(df[c].dtype) for c in usage.index],
+        "bytes": usage.to_numpy(dtype="int64"),
+    })
+    total = out["bytes"].sum()
+    out["bytes_per_row"] = out["bytes"] / max(len(df), 1)
+    out["share"] = out["bytes"] / total if total else 0.0
+    return out.sort_values("bytes", ascending=False, ignore_index=True)
+
+
+def session_state_dict(state):
+    """User-visible keys of st.session_state, Streamlit's SessionState, or a plain mapping."""
+    if hasattr(state, "to_dict"):
+        return state.to_dict()
+    if hasattr(state, "filtered_state"):
+        return dict(state.filtered_state)
+    return dict(state)
+
+
+def state_sizes(state):
+    """Deep bytes per session-state key, largest first."""
+    items = session_state_dict(state)
+    out = pd.DataFrame(
+        [(str(k), type(v).__name__, deep_size(v)) for k, v in items.items()],
+        columns=["key", "type", "bytes"],
+    )
+    return out.sort_values("bytes", ascending=False, ignore_index=True)
+
+
+def active_sessions():
+    """(session id, state dict) for each connected session; [] outside a running Streamlit server."""
+    try:
+        from streamlit.runtime import Runtime
+        manager = Runtime.instance()._session_mgr  # no public API lists other sessions
+        return [(info.session.id, session_state_dict(info.session.session_state))
+                for info in manager.list_active_sessions()]
+    except Exception:
+        return []
+
+
+def filter_results(df, filter_sets):
+    """Rows and deep bytes of apply_filters' result for each {name: Filters}."""
+    rows = []
+    for name, filters in filter_sets.items():
+        started = time.perf_counter()
+        result = filters.apply(df)
+        rows.append({
+            "filters": name,
+            "rows": len(result),
+            "bytes": deep_size(result),
+            "seconds": time.perf_counter() - started,
+        })
+    return pd.DataFrame(rows)
+
+
+def standard_filter_sets(df):
+    """Filter selections a typical session makes: everything, the last year, the busiest source and region."""
+    from datetime import date
+    from utils.data_access import Filters
+
+    end = df["date"].max().date()
+    regions = df.loc[df["adm1_name_final"] != "Unknown Region", "adm1_name_final"]
+    return {
+        "all articles": Filters(),
+        "last 12 months": Filters.of(date_range=(date(end.year - 1, end.month, 1), end)),
+        "busiest source": Filters.of(sources=[df["retrieve_source"].value_counts().idxmax()]),
+        "busiest region": Filters.of(adm1=[regions.value_counts().idxmax()] if len(regions) else []),
+    }
+
+
+# -- process RSS ---------------------------------------------------------------------
+
+def _windows_memory():
+    """(working set, peak working set) in bytes from GetProcessMemoryInfo, or None."""
+    import ctypes
+    from ctypes import wintypes
+
+    class Counters(ctypes.Structure):
+        _fields_ = [("cb", wintypes.DWORD), ("PageFaultCount", wintypes.DWORD)] + [
+            (name, ctypes.c_size_t) for name in (
+                "PeakWorkingSetSize", "WorkingSetSize", "QuotaPeakPagedPoolUsage", "QuotaPagedPoolUsage",
+                "QuotaPeakNonPagedPoolUsage", "QuotaNonPagedPoolUsage", "PagefileUsage", "PeakPagefileUsage",
+            )
+        ]
+
+    counters = Counters(cb=ctypes.sizeof(Counters))
+    process = ctypes.windll.kernel32.GetCurrentProcess()
+    if not ctypes.windll.psapi.GetProcessMemoryInfo(process, ctypes.byref(counters), counters.cb):
+        return None
+    return counters.WorkingSetSize, counters.PeakWorkingSetSize
+
+
+def current_rss():
+    """Resident set size in bytes (VmRSS on Linux, the working set on Windows, the peak elsewhere)."""
+    try:
+        with open("/proc/self/status", encoding="ascii") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    if sys.platform == "win32":
+        counters = _windows_memory()
+        if counters:
+            return counters[0]
+    return peak_rss()
+
+
+def peak_rss():
+    """Peak resident set size in bytes, or 0 where the platform reports none."""
+    try:
+        import resource  # Unix only
+    except ImportError:
+        counters = _windows_memory() if sys.platform == "win32" else None
+        return counters[1] if counters else 0
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == "darwin" else peak * 1024  # bytes on macOS, KiB on Linux
+
+
+class RssSampler:
+    """Background thread sampling RSS every `interval` seconds; mark(label) adds a labelled sample."""
+
+    def __init__(self, interval=RSS_SAMPLE_SECONDS, max_samples=RSS_MAX_SAMPLES):
+        self.interval = interval
+        self.started = time.time()
+        self.samples = deque(maxlen=max_samples)
+        self._stop = threading.Event()
+        self._thread = None
+
+    def mark(self, label=""):
+        self.samples.append({"seconds": time.time() - self.started, "rss": current_rss(), "label": label})
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="rss-sampler", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def _run(self):
+        while not self._stop.is_set():
+            self.mark()
+            self._stop.wait(self.interval)
+
+    def frame(self):
+        return pd.DataFrame(list(self.samples), columns=["seconds", "rss", "label"])
+
+
+def get_rss_sampler():
+    """Process-wide sampler, started on first use."""
+    global _sampler
+    with _sampler_lock:
+        if _sampler is None:
+            _sampler = RssSampler().start()
+    return _sampler
@@ -0,0 +1,111 @@
+"""
+Prometheus metrics for the dashboard process.
+
+Pages time their render phases with a lap timer, and the LLM client counts
+tokens, request latency and time to first token. The lap timer also starts
+and finishes the run's span trace when tracing is on (utils/tracing.py). Metrics live in
+prometheus_client's default registry and are served in the same text format
+as the API's /metrics, on DASHBOARD_METRICS_PORT (started once per Streamlit
+process). Without prometheus_client installed every call is a no-op.
+"""
+
+import os
+import threading
+import time
+import warnings
+
+from utils.tracing import finish_trace, start_trace
+
+try:
+    from prometheus_client import REGISTRY, Counter, Histogram, start_http_server
+except ImportError:  # pragma: no cover - metrics are optional on the dashboard
+    REGISTRY = Counter = Histogram = None
+
+METRICS_PORT = int(os.getenv("DASHBOARD_METRICS_PORT", "9464"))
+
+_server_lock = threading.Lock()
+_server_started = False
+
+
+def _metric(cls, name, documentation, labels, **kwargs):
+    """Create a metric, or return the existing one if Streamlit re-imported this module."""
+    if REGISTRY is None:
+        return None
+    try:
+        return cls(name, documentation, labels, **kwargs)
+    except ValueError:
+        return REGISTRY._names_to_collectors[name]
+
+
+RENDER_PHASE_SECONDS = _metric(
+    Histogram, "dashboard_render_phase_seconds", "Time spent in each page render phase",
+    ["page", "phase"], buckets=(0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0),
+)
+LLM_REQUEST_SECONDS = _metric(
+    Histogram, "llm_request_duration_seconds", "LLM call time including retries",
+    ["model", "mode", "outcome"], buckets=(0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 20.0, 40.0, 80.0, 160.0),
+)
+LLM_FIRST_TOKEN_SECONDS = _metric(
+    Histogram, "llm_time_to_first_token_seconds", "Time to the first streamed token",
+    ["model"], buckets=(0.1, 0.25, 0.5, 1.0, 2.0, 4.0, 8.0, 16.0, 32.0),
+)
+LLM_TOKENS = _metric(
+    Counter, "llm_tokens", "LLM tokens (estimated for streamed calls)", ["model", "kind"],
+)
+
+
+def start_metrics_server(port=METRICS_PORT):
+    """Serve the registry over HTTP once per process; returns whether it is running."""
+    global _server_started
+    if REGISTRY is None:
+        return False
+    with _server_lock:
+        if not _server_started:
+            try:
+                start_http_server(port)
+                _server_started = True
+            except OSError as e:
+                warnings.warn(f"Dashboard metrics server not started on port {port}: {e}")
+                _server_started = None  # don't retry on every rerun
+    return bool(_server_started)
+
+
+class PageTimer:
+    """Lap timer: each lap(phase) records the time since the previous lap."""
+
+    def __init__(self, page):
+        self.page = page
+        self.trace = start_trace(page)
+        self._last = time.perf_counter()
+
+    def lap(self, phase):
+        now = time.perf_counter()
+        if RENDER_PHASE_SECONDS is not None:
+            RENDER_PHASE_SECONDS.labels(self.page, phase).observe(now - self._last)
+        if self.trace is not None:
+            self.trace.phase(phase, self._last, now)
+        self._last = now
+
+    def done(self):
+        """End of the page run: close the trace and show its waterfall in the sidebar."""
+        finish_trace(self.trace)
+        self.trace = None
+
+
+def page_timer(page):
+    """Start timing a page run (and the metrics server, if it isn't up yet)."""
+    start_metrics_server()
+    return PageTimer(page)
+
+
+def record_llm_call(model, mode, seconds, outcome="ok", prompt_tokens=0, completion_tokens=0, first_token=None):
+    """Record one LLM call: latency, token counts and (for streams) time to first token."""
+    if REGISTRY is None:
+        return
+    LLM_REQUEST_SECONDS.labels(model, mode, outcome).observe(seconds)
+    if prompt_tokens:
+        LLM_TOKENS.labels(model, "prompt").inc(prompt_tokens)
+    if completion_tokens:
+        LLM_TOKENS.labels(model, "completion").inc(completion_tokens)
+    if first_token is not None:
+        LLM_FIRST_TOKEN_SECONDS.labels(model).observe(first_token)
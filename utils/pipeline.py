@@ -0,0 +1,168 @@
+"""
+Staged batch pipeline with bounded queues and per-stage metrics.
+
+Batches flow from a source generator through a chain of stages. Each stage
+runs its function on a thread or process pool and hands results to the next
+stage through a bounded queue, so a slow stage applies backpressure instead
+of letting work pile up in memory. Output order matches input order.
+Per-stage busy time and queue backlog show which stage is the bottleneck.
+"""
+
+import queue
+import threading
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+import pandas as pd
+
+_DONE = object()
+
+
+def _timed(func, batch):
+    started = time.perf_counter()
+    out = func(batch)
+    return out, time.perf_counter() - started
+
+
+class Stage:
+    """A named batch function run on `workers` threads or processes.
+
+    Process stages need a module-level (picklable) function.
+    """
+
+    def __init__(self, name, func, workers=1, executor="thread"):
+        if executor not in ("thread", "process"):
+            raise ValueError("executor must be 'thread' or 'process'")
+        self.name = name
+        self.func = func
+        self.workers = max(1, int(workers))
+        self.executor = executor
+        self.metrics = {
+            "batches": 0, "items_in": 0, "items_out": 0, "busy_seconds": 0.0,
+            "backlog_sum": 0, "backlog_max": 0,
+        }
+
+    def _pool(self):
+        if self.executor == "process":
+            return ProcessPoolExecutor(max_workers=self.workers)
+        return ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix=f"stage-{self.name}")
+
+
+class Pipeline:
+    def __init__(self, stages, queue_size=4):
+        self.stages = list(stages)
+        self.queue_size = queue_size
+        self.elapsed = 0.0
+        self._error = None
+        self._stop = threading.Event()
+
+    def _fail(self, error):
+        self._error = self._error or error
+        self._stop.set()
+
+    def _feed(self, source, out_q):
+        try:
+            for batch in source:
+                if self._stop.is_set():
+                    break
+                out_q.put(batch)
+        except BaseException as e:
+            self._fail(e)
+        finally:
+            out_q.put(_DONE)
+
+    def _run_stage(self, stage, in_q, out_q):
+        m = stage.metrics
+        inflight = deque()
+        upstream_done = False
+
+        def emit(future):
+            out, seconds = future.result()
+            m["busy_seconds"] += seconds
+            m["items_out"] += len(out)
+            out_q.put(out)
+
+        try:
+            with stage._pool() as pool:
+                while not self._stop.is_set():
+                    backlog = in_q.qsize()
+                    batch = in_q.get()
+                    if batch is _DONE:
+                        upstream_done = True
+                        break
+                    m["batches"] += 1
+                    m["items_in"] += len(batch)
+                    m["backlog_sum"] += backlog
+                    m["backlog_max"] = max(m["backlog_max"], backlog)
+                    inflight.append(pool.submit(_timed, stage.func, batch))
+                    # Keep every worker busy while preserving order
+                    while len(inflight) > stage.workers or (inflight and inflight[0].done()):
+                        emit(inflight.popleft())
+                while inflight and not self._stop.is_set():
+                    emit(inflight.popleft())
+                for f in inflight:
+                    f.cancel()
+        except BaseException as e:
+            self._fail(e)
+        finally:
+            # Drain upstream so its threads never block on a full queue
+            while not upstream_done:
+                upstream_done = in_q.get() is _DONE
+            out_q.put(_DONE)
+
+    def run(self, source):
+        """Generator of output batches; raises the first stage error after shutdown."""
+        started = time.perf_counter()
+        queues = [queue.Queue(maxsize=self.queue_size) for _ in range(len(self.stages) + 1)]
+        threads = [threading.Thread(target=self._feed, args=(source, queues[0]), daemon=True, name="pipeline-feed")]
+        for i, stage in enumerate(self.stages):
+            threads.append(threading.Thread(target=self._run_stage, args=(stage, queues[i], queues[i + 1]),
+                                            daemon=True, name=f"pipeline-{stage.name}"))
+        for t in threads:
+            t.start()
+        finished = False
+        try:
+            while True:
+                batch = queues[-1].get()
+                if batch is _DONE:
+                    finished = True
+                    break
+                yield batch
+        finally:
+            if not finished:
+                # Consumer stopped early: shut the stages down and drain their output
+                self._stop.set()
+                while queues[-1].get() is not _DONE:
+                    pass
+            for t in threads:
+                t.join()
+            self.elapsed = time.perf_counter() - started
+        if self._error is not None:
+            raise self._error
+
+    def report(self):
+        """Per-stage metrics; utilization near 1.0 marks the bottleneck."""
+        rows = []
+        for stage in self.stages:
+            m = stage.metrics
+            capacity = stage.workers * self.elapsed
+            rows.append({
+                "stage": stage.name,
+                "executor": f"{stage.executor} x{stage.workers}",
+                "batches": m["batches"],
+                "items_in": m["items_in"],
+                "items_out": m["items_out"],
+                "busy_s": round(m["busy_seconds"], 3),
+                "items_per_s": round(m["items_in"] / m["busy_seconds"] * stage.workers, 1) if m["busy_seconds"] else None,
+                "utilization": round(m["busy_seconds"] / capacity, 3) if capacity else None,
+                "backlog_avg": round(m["backlog_sum"] / m["batches"], 2) if m["batches"] else 0,
+                "backlog_max": m["backlog_max"],
+            })
+        return pd.DataFrame(rows)
+
+    def bottleneck(self):
+        report = self.report()
+        if report.empty or report["utilization"].isna().all():
+            return None
+        return report.loc[report["utilization"].idxmax(), "stage"]
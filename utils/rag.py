@@ -0,0 +1,182 @@
+"""
+Retrieval and prompt construction for RAG+LLM situation summaries.
+Shared by the summary page and the batch/map-reduce summarizers.
+"""
+
+import re
+import pandas as pd
+
+from utils.tracing import traced
+
+SYSTEM_PROMPT = (
+    "You are a careful crisis analyst. Provide factual, concise summaries based only on provided documents. "
+    "When a specific region or district is provided as the focus, ensure all analysis centers on that location. "
+    "Always cite article numbers in [brackets] for each bullet point."
+)
+
+# Pricing (per 1M tokens, USD)
+MODEL_PRICING = {
+    "gpt-4o-mini": {"input": 0.15, "output": 0.60},
+    "gpt-4o":      {"input": 2.50, "output": 10.00},
+    "gpt-3.5-turbo": {"input": 0.50, "output": 1.50},
+}
+
+
+def estimate_tokens(text):
+    """Rough token estimation (~4 chars per token for English)."""
+    return len(str(text)) // 4
+
+
+def keyword_score(text, query_terms):
+    """Score text by keyword frequency."""
+    t = (text or "").lower()
+    return sum(t.count(q) for q in query_terms if q)
+
+
+@traced("retrieve_top_k")
+def retrieve_top_k(df, query, top_k=15, one_per_cluster=False):
+    """Retrieve top-k relevant articles based on keyword matching.
+
+    With `one_per_cluster`, only the best-ranked copy of each near-duplicate
+    cluster is kept so the prompt does not carry the same wire text twice.
+    """
+    if df.empty:
+        return df
+
+    def top(ranked):
+        if one_per_cluster and "cluster_id" in ranked.columns:
+            ranked = ranked.drop_duplicates("cluster_id")
+        return ranked.head(top_k)
+
+    query = (query or "").strip()
+    if not query:
+        return top(df.sort_values("date", ascending=False))
+    q_terms = [t.lower() for t in re.findall(r"[A-Za-z0-9_]+", query) if len(t) >= 3]
+    if not q_terms:
+        return top(df.sort_values("date", ascending=False))
+    scored = df.copy()
+    scored["_score"] = scored.apply(
+        lambda r: keyword_score(
+            str(r.get("title", "")) + " " + str(r.get("paragraphs", "")),
+            q_terms
+        ),
+        axis=1
+    )
+    return top(scored.sort_values(["_score", "date"], ascending=[False, False]))
+
+
+def format_documents(context_df, first_index=1):
+    """Render articles as numbered report blocks, numbering from `first_index`."""
+    docs = []
+    for i, (_, r) in enumerate(context_df.iterrows()):
+        url = r.get("url", "")
+        url_str = f" | URL: {url}" if url and not pd.isna(url) else ""
+        docs.append(
+            f"[{i+first_index}] Date: {r['date'].strftime('%Y-%m-%d')} | "
+            f"Region: {r['adm1_name_final']} | County: {r['adm2_name_final']} | "
+            f"Label: {r['Label']} | "
+            f"Title: {r['title']}{url_str}\n"
+            f"Text: {str(r.get('paragraphs', ''))}"
+        )
+    return "\n\n".join(docs)
+
+
+def build_filter_instructions(context_df, region_focus, topic_keyword):
+    """Build the strict region/topic filtering block of the prompt."""
+    filter_requirements = []
+    region_instruction_detail = ""
+    
+    if region_focus and region_focus.strip():
+        region_name = region_focus.strip()
+        
+        # Check if region_focus matches an ADM1 region (case-insensitive)
+        adm1_regions = context_df['adm1_name_final'].dropna().unique()
+        matching_adm1 = None
+        for adm1 in adm1_regions:
+            if adm1.lower() == region_name.lower():
+                matching_adm1 = adm1
+                break
+        
+        # If it's an ADM1 region, get all its ADM2 counties
+        if matching_adm1:
+            counties = context_df[context_df['adm1_name_final'] == matching_adm1]['adm2_name_final'].dropna().unique()
+            counties = [c for c in counties if c != "Unknown County"]
+            
+            if len(counties) > 0:
+                county_list = ", ".join(sorted(counties))
+                filter_requirements.append(f"Region/Location: **{matching_adm1}** (including counties: {county_list})")
+                region_instruction_detail = f"\nNOTE: Articles mentioning ANY of these counties should be included: {county_list}"
+            else:
+                filter_requirements.append(f"Region/Location: **{region_name}**")
+        else:
+            # Not an ADM1 region, treat as general location
+            filter_requirements.append(f"Region/Location: **{region_name}**")
+    
+    if topic_keyword and topic_keyword.strip():
+        filter_requirements.append(f"Topic/Keyword: **{topic_keyword.strip()}**")
+    
+    strict_filter_instruction = ""
+    if filter_requirements:
+        filter_list = "\n".join([f"  - {req}" for req in filter_requirements])
+        strict_filter_instruction = f"""
+🚨 STRICT FILTERING REQUIREMENTS 🚨
+You MUST ONLY include information that matches ALL of the following criteria:
+{filter_list}{region_instruction_detail}
+
+MATCHING RULES (FLEXIBLE):
+- Use CASE-INSENSITIVE matching (e.g., "Juba" matches "juba", "JUBA", "Juba")
+- Use PARTIAL matching (e.g., "Juba" matches "Juba County", "near Juba", "Juba area", "Juba region")
+- For regions: Check if the article text CONTAINS the region name OR any of the listed counties (case-insensitive)
+- For topics: Check if the article RELATES to the topic (keywords, themes, context)
+
+CRITICAL RULES:
+1. If an article does NOT contain the specified region/location name OR any listed counties (case-insensitive), EXCLUDE it entirely.
+2. If an article does NOT relate to the specified topic/keyword, EXCLUDE it entirely.
+3. Only use FACTS explicitly stated in the articles - NO speculation, NO inference, NO assumptions.
+4. If you exclude articles, you MUST list them at the end under "Excluded Articles" with brief reasons.
+5. If NO articles match the criteria, state clearly: "No articles match the specified region and topic criteria."
+"""
+    else:
+        strict_filter_instruction = """
+CRITICAL RULES:
+1. Only use FACTS explicitly stated in the articles - NO speculation, NO inference, NO assumptions.
+2. If information is limited or unclear, state this explicitly.
+"""
+    return strict_filter_instruction
+
+
+@traced("build_prompt")
+def build_prompt(context_df, context_str, date_range, region_focus, topic_keyword):
+    """Build the LLM prompt from retrieved articles with strict filtering."""
+    docs_text = format_documents(context_df)
+    strict_filter_instruction = build_filter_instructions(context_df, region_focus, topic_keyword)
+
+    prompt = f"""You are a humanitarian crisis analyst. Based ONLY on the following news reports,
+provide a situation summary.
+
+Focus Context: {context_str}
+Time Period: {date_range[0]} to {date_range[1]}
+{strict_filter_instruction}
+REPORTS:
+{docs_text}
+
+INSTRUCTIONS:
+1. FIRST, review each article and determine if it matches the filtering requirements above.
+2. ONLY include articles that match ALL specified criteria (region AND topic if both provided).
+3. Provide 5-10 bullet points from MATCHING articles only, each summarizing a key finding or event.
+4. For EACH bullet point, cite the source article number(s) in square brackets, e.g. [1], [3,5].
+5. After the bullet points, provide a 2-3 sentence overall summary paragraph.
+6. Cite specific dates and locations when mentioned.
+7. Be factual - only state what is explicitly mentioned in the articles.
+8. At the END, list "Excluded Articles" - any articles that did not match the criteria with brief reasons.
+
+FORMAT:
+* **Key Finding**: Description... [article numbers]
+* ...
+
+**Overall Summary**: ...
+
+**Excluded Articles**: 
+- [article number]: Reason (e.g., "Does not mention {region_focus}", "Not related to {topic_keyword}")
+"""
+    return prompt, docs_text
@@ -0,0 +1,189 @@
+"""
+Batched sentiment scoring for sentiment_label / sentiment_score.
+
+Scorers are pluggable: NLTK's VADER lexicon by default, or a local
+Hugging Face model ("transformers:<model name or path>"). Articles are
+scored in batches over a process pool, scores are float32 in [-1, 1], and
+results are cached by content hash so unchanged articles are never
+re-scored.
+"""
+
+import hashlib
+import os
+import warnings
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+SENTIMENT_CACHE_PATH = os.getenv("SENTIMENT_CACHE_PATH", "data/processed/sentiment_cache.parquet")
+DEFAULT_SCORER = os.getenv("SENTIMENT_SCORER", "vader")
+
+NEUTRAL_BAND = 0.05  # |score| below this is Neutral (VADER's usual cut-off)
+BATCH_SIZE = 500
+
+
+class VaderScorer:
+    """NLTK VADER compound score of the whole text."""
+
+    name = "vader"
+
+    def __init__(self):
+        from nltk.sentiment import SentimentIntensityAnalyzer
+        try:
+            self._analyzer = SentimentIntensityAnalyzer()
+        except LookupError:
+            raise RuntimeError("VADER lexicon not found. Run: python -c \"import nltk; nltk.download('vader_lexicon')\"")
+
+    def score(self, texts):
+        return [self._analyzer.polarity_scores(t)["compound"] for t in texts]
+
+
+class TransformersScorer:
+    """Local text-classification model; score = P(positive) - P(negative)."""
+
+    def __init__(self, model="cardiffnlp/twitter-roberta-base-sentiment-latest"):
+        from transformers import pipeline
+        self.name = f"transformers:{model}"
+        self._pipe = pipeline("text-classification", model=model, top_k=None, truncation=True)
+
+    def score(self, texts):
+        scores = []
+        for result in self._pipe(list(texts), batch_size=16):
+            probs = {r["label"].lower(): r["score"] for r in result}
+            pos = probs.get("positive", probs.get("label_2", 0.0))
+            neg = probs.get("negative", probs.get("label_0", 0.0))
+            scores.append(pos - neg)
+        return scores
+
+
+SCORERS = {"vader": VaderScorer, "transformers": TransformersScorer}
+
+
+def get_scorer(spec=None):
+    """Scorer from a spec such as "vader" or "transformers:<model>"."""
+    name, _, arg = (spec or DEFAULT_SCORER).partition(":")
+    if name not in SCORERS:
+        raise ValueError(f"Unknown scorer '{name}'. Choose from: {', '.join(SCORERS)}")
+    return SCORERS[name](arg) if arg else SCORERS[name]()
+
+
+def sentiment_text(title, paragraphs):
+    return f"{title if isinstance(title, str) else ''}\n{paragraphs if isinstance(paragraphs, str) else ''}"
+
+
+def content_hash(text):
+    return hashlib.blake2b(text.encode("utf-8"), digest_size=8).hexdigest()
+
+
+def score_labels(scores, neutral_band=NEUTRAL_BAND):
+    """Positive / Negative / Neutral from scores."""
+    scores = np.asarray(scores, dtype=np.float32)
+    return np.where(scores >= neutral_band, "Positive", np.where(scores <= -neutral_band, "Negative", "Neutral"))
+
+
+class SentimentCache:
+    """Scores keyed by (scorer, content hash), stored as Parquet."""
+
+    def __init__(self, path=SENTIMENT_CACHE_PATH):
+        self.path = Path(path)
+        self._scores = {}
+        self._dirty = False
+        if self.path.exists():
+            table = pd.read_parquet(self.path)
+            self._scores = dict(zip(zip(table["scorer"], table["content_hash"]), table["sentiment_score"]))
+
+    def __len__(self):
+        return len(self._scores)
+
+    def get(self, scorer, hashes):
+        """Cached scores (NaN where missing)."""
+        return np.array([self._scores.get((scorer, h), np.nan) for h in hashes], dtype=np.float32)
+
+    def put(self, scorer, hashes, scores):
+        self._scores.update(((scorer, h), s) for h, s in zip(hashes, scores))
+        self._dirty = True
+
+    def save(self):
+        if not self._dirty:
+            return
+        keys = list(self._scores)
+        table = pd.DataFrame({
+            "scorer": [k[0] for k in keys],
+            "content_hash": [k[1] for k in keys],
+            "sentiment_score": np.array(list(self._scores.values()), dtype=np.float32),
+        })
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_suffix(".parquet.tmp")
+        table.to_parquet(tmp, index=False)
+        os.replace(tmp, self.path)
+        self._dirty = False
+
+
+_worker_scorer = None
+
+
+def _init_worker(spec):
+    global _worker_scorer
+    _worker_scorer = get_scorer(spec)
+
+
+def _score_chunk(texts):
+    return _worker_scorer.score(texts)
+
+
+def score_texts(texts, scorer=None, workers=None, batch_size=BATCH_SIZE):
+    """float32 scores for texts, batched over a process pool."""
+    texts = list(texts)
+    spec = scorer or DEFAULT_SCORER
+    workers = workers or os.cpu_count() or 1
+    if workers <= 1 or len(texts) <= batch_size:
+        return np.array(get_scorer(spec).score(texts), dtype=np.float32)
+    chunks = [texts[i:i + batch_size] for i in range(0, len(texts), batch_size)]
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(spec,)) as pool:
+        return np.array([s for chunk in pool.map(_score_chunk, chunks) for s in chunk], dtype=np.float32)
+
+
+def score_frame(df, scorer=None, workers=None, cache=None):
+    """Score every row; returns (article_id/sentiment_label/sentiment_score frame, number scored).
+
+    Rows whose text is already in the cache for this scorer are not re-scored.
+    """
+    spec = scorer or DEFAULT_SCORER
+    texts = [sentiment_text(t, p) for t, p in zip(df["title"], df["paragraphs"])]
+    hashes = [content_hash(t) for t in texts]
+    scores = cache.get(spec, hashes) if cache is not None else np.full(len(texts), np.nan, dtype=np.float32)
+    todo = np.flatnonzero(np.isnan(scores))
+    if len(todo):
+        scores[todo] = score_texts([texts[i] for i in todo], spec, workers)
+        if cache is not None:
+            cache.put(spec, [hashes[i] for i in todo], scores[todo])
+    out = pd.DataFrame({"sentiment_label": score_labels(scores), "sentiment_score": scores}, index=df.index)
+    if "article_id" in df.columns:
+        out.insert(0, "article_id", df["article_id"].values)
+    return out, len(todo)
+
+
+_stage_scorer = None
+
+
+def score_records(records):
+    """Ingestion stage: score records without source-supplied sentiment."""
+    global _stage_scorer
+    if _stage_scorer is None:
+        try:
+            _stage_scorer = get_scorer()
+        except (ImportError, RuntimeError) as e:
+            warnings.warn(f"Sentiment scorer unavailable, marking articles Neutral: {e}")
+            _stage_scorer = False
+    todo = [r for r in records if r.get("sentiment_score") is None]
+    if todo:
+        if _stage_scorer:
+            scores = np.array(_stage_scorer.score([sentiment_text(r.get("title"), r.get("paragraphs")) for r in todo]),
+                              dtype=np.float32)
+        else:
+            scores = np.zeros(len(todo), dtype=np.float32)
+        for r, score, label in zip(todo, scores, score_labels(scores)):
+            r["sentiment_score"], r["sentiment_label"] = float(score), str(label)
+    return records
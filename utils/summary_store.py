@@ -0,0 +1,92 @@
+"""
+Local store of pre-generated situation summaries.
+
+Standard scopes (ADM1 state x topic label x recent months) are summarized in
+batch by scripts/pregenerate_summaries.py and saved here as one JSON file per
+scope, including the citation table, so the RAG page can show them instantly.
+"""
+
+import json
+import os
+import re
+from datetime import datetime
+from pathlib import Path
+
+import pandas as pd
+
+SUMMARY_STORE_DIR = os.getenv("SUMMARY_STORE_DIR", "data/summaries")
+STANDARD_WINDOW_MONTHS = 3
+
+
+def _slug(value):
+    return re.sub(r"[^a-z0-9]+", "-", str(value).lower()).strip("-") or "none"
+
+
+def standard_window(df, months=STANDARD_WINDOW_MONTHS):
+    """The last `months` calendar months ending with the latest article date."""
+    end = df["date"].max().date()
+    start = (pd.Timestamp(end).to_period("M") - (months - 1)).to_timestamp().date()
+    return start, end
+
+
+def scope_key(adm1, label, start, end):
+    """File-safe identifier for a (state, topic, window) scope."""
+    return f"{_slug(adm1)}__{_slug(label)}__{start}_{end}"
+
+
+def build_citation_table(context_df):
+    """Reference rows matching the [n] numbering used in the prompt."""
+    rows = []
+    for i, (_, r) in enumerate(context_df.iterrows()):
+        url = r.get("url", "")
+        rows.append({
+            "#": i + 1,
+            "Date": r["date"].strftime("%Y-%m-%d"),
+            "Region": r["adm1_name_final"],
+            "County": r["adm2_name_final"],
+            "Label": r["Label"],
+            "Title": str(r["title"])[:60],
+            "URL": url if url and not pd.isna(url) else "N/A",
+        })
+    return rows
+
+
+def save_summary(adm1, label, start, end, model, summary, citations, dataset_version, stats=None,
+                 store_dir=SUMMARY_STORE_DIR):
+    """Write a summary record atomically and return its path."""
+    store = Path(store_dir)
+    store.mkdir(parents=True, exist_ok=True)
+    record = {
+        "scope": {"adm1": adm1, "label": label, "start": str(start), "end": str(end)},
+        "model": model,
+        "generated_at": datetime.now().isoformat(timespec="seconds"),
+        "dataset_version": dataset_version,
+        "summary": summary,
+        "citations": citations,
+        "stats": stats or {},
+    }
+    path = store / f"{scope_key(adm1, label, start, end)}.json"
+    tmp = path.with_suffix(".json.tmp")
+    tmp.write_text(json.dumps(record, ensure_ascii=False, indent=2), encoding="utf-8")
+    os.replace(tmp, path)
+    return path
+
+
+def load_summary(adm1, label, start, end, store_dir=SUMMARY_STORE_DIR):
+    """Return the stored record for an exact scope, or None."""
+    path = Path(store_dir) / f"{scope_key(adm1, label, start, end)}.json"
+    if not path.exists():
+        return None
+    return json.loads(path.read_text(encoding="utf-8"))
+
+
+def find_latest_summary(adm1, label, store_dir=SUMMARY_STORE_DIR):
+    """Return the most recent stored window for a (state, topic) pair, or None."""
+    store = Path(store_dir)
+    if not store.exists():
+        return None
+    candidates = sorted(store.glob(f"{_slug(adm1)}__{_slug(label)}__*.json"))
+    if not candidates:
+        return None
+    # Window dates are ISO formatted, so the last file name is the newest window
+    return json.loads(candidates[-1].read_text(encoding="utf-8"))
@@ -0,0 +1,234 @@
+"""
+Deterministic synthetic corpora for benchmarking.
+
+Generates articles with the dataset's schema (CORE_COLUMNS) at a multiple of
+BASE_ROWS. The skew is meant to look like the real corpus:
+
+- A few sources publish most articles (Zipf weights).
+- Coverage concentrates on a few counties from the gazetteer. Many articles
+  have no region or no county.
+- Conflict and humanitarian labels dominate, and monthly volume grows over
+  time with bursts.
+- Article lengths are log-normal. Sentiment leans negative for conflict
+  topics, and a share of stories are reprinted by a second source.
+
+Rows are generated month by month. Each month uses its own random stream,
+seeded from (seed, month), so the output for a given seed and size does not
+depend on the chunking. Months are written in date order as row groups of a
+zstd Parquet file, so memory stays at about one month even at 100x.
+"""
+
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from utils.data_loader import CATEGORIES, CORE_COLUMNS
+from utils.geotagger import GAZETTEER_PATH, load_gazetteer
+from utils.ingest import clean_text
+from utils.sentiment import score_labels
+
+BASE_ROWS = 50_000  # approximate size of the current dataset
+SCALES = {"1x": 1, "10x": 10, "100x": 100}
+DEFAULT_SEED = 20240601
+START_MONTH = "2013-01"
+END_MONTH = "2025-06"
+
+SOURCES = ["radiotamazuj", "eyeradio", "sudanspost", "allafrica", "reliefweb", "sudantribune",
+           "xinhua", "theeastafrican", "cityreview", "nyamilepedia", "unmiss", "ocha"]
+SOURCE_SKEW = 1.1
+COUNTY_SKEW = 1.2
+UNKNOWN_REGION_RATE = 0.15
+UNKNOWN_COUNTY_RATE = 0.25  # of articles with a region
+UNCATEGORIZED_RATE = 0.08
+REPRINT_RATE = 0.05
+MONTHLY_GROWTH = 0.012
+BURST_SIGMA = 0.35
+WORDS_MEDIAN = 140
+WORDS_SIGMA = 0.7
+SENTENCES_PER_LABEL = 256
+ROW_GROUP_ROWS = 65_536  # whole months are gathered until a row group has at least this many rows
+
+LABEL_WEIGHTS = {
+    "Conflict and Violence": 0.24, "Humanitarian Aid": 0.16, "Political Instability": 0.13,
+    "Food Crisis": 0.10, "Forced Displacements": 0.09, "Economic Issues": 0.08, "Weather Conditions": 0.06,
+    "Pests and Diseases": 0.05, "Production Shortage": 0.04, "Environment Issues": 0.03,
+    "Land-related issues": 0.02,
+}
+# Mean sentiment per label; everything else is slightly negative
+LABEL_SENTIMENT = {"Conflict and Violence": -0.55, "Forced Displacements": -0.45, "Food Crisis": -0.4,
+                   "Humanitarian Aid": 0.15, "Economic Issues": -0.1}
+
+FILLER = ("the of and in to a on for with said by officials local residents state county government "
+          "report week according people area community authorities continue new after two since").split()
+VERBS = ["reported", "warned of", "confirmed", "described", "responded to", "raised concerns about"]
+HEADLINES = ["{} reported in {}", "{} rises in {}", "New {} in {}", "{} continues in {}", "Officials warn of {} in {}"]
+
+
+def zipf_weights(n, skew):
+    weights = 1.0 / np.arange(1, n + 1) ** skew
+    return weights / weights.sum()
+
+
+def month_range(start=START_MONTH, end=END_MONTH):
+    return pd.period_range(start, end, freq="M")
+
+
+def month_counts(rows, seed=DEFAULT_SEED, start=START_MONTH, end=END_MONTH):
+    """Articles per month: steady growth with log-normal bursts, summing to `rows`."""
+    months = month_range(start, end)
+    rng = np.random.default_rng([seed, 0])
+    weights = np.exp(MONTHLY_GROWTH * np.arange(len(months))) * rng.lognormal(0, BURST_SIGMA, len(months))
+    return months, rng.multinomial(rows, weights / weights.sum())
+
+
+def counties(gazetteer_path=None):
+    """(adm1, adm2) pairs from the gazetteer, in file order (the order of the Zipf weights)."""
+    gazetteer = load_gazetteer(gazetteer_path or GAZETTEER_PATH)
+    pairs = gazetteer.loc[gazetteer["kind"] == "adm2", ["adm1", "adm2"]].drop_duplicates()
+    return list(pairs.itertuples(index=False, name=None))
+
+
+def sentence_pool(seed=DEFAULT_SEED):
+    """A fixed set of keyword-bearing sentences per label, so text matches the taxonomy and keyword search."""
+    rng = np.random.default_rng([seed, 1])
+    pool = {}
+    for label, keywords in CATEGORIES.items():
+        sentences = []
+        for _ in range(SENTENCES_PER_LABEL):
+            words = list(rng.choice(FILLER, rng.integers(6, 14)))
+            for k in rng.choice(keywords, rng.integers(1, 3)):
+                words.insert(rng.integers(0, len(words) + 1), k)
+            words.insert(0, rng.choice(VERBS))
+            sentences.append(" ".join(words))
+        pool[label] = np.array(sentences, dtype=object)
+    return pool
+
+
+class CorpusGenerator:
+    """Month-by-month generator; `month(i)` is a DataFrame with CORE_COLUMNS."""
+
+    def __init__(self, rows, seed=DEFAULT_SEED, start=START_MONTH, end=END_MONTH, gazetteer_path=None):
+        self.rows = rows
+        self.seed = seed
+        self.months, self.counts = month_counts(rows, seed, start, end)
+        self.places = counties(gazetteer_path)
+        self.pool = sentence_pool(seed)
+        self.labels = list(LABEL_WEIGHTS)
+        self.label_weights = np.array(list(LABEL_WEIGHTS.values())) / sum(LABEL_WEIGHTS.values())
+        self.source_weights = zipf_weights(len(SOURCES), SOURCE_SKEW)
+        self.county_weights = zipf_weights(len(self.places), COUNTY_SKEW)
+        self._cleaned_places = {}
+
+    def _clean(self, place):
+        if place not in self._cleaned_places:
+            self._cleaned_places[place] = clean_text(place)
+        return self._cleaned_places[place]
+
+    def __len__(self):
+        return len(self.months)
+
+    def month(self, i):
+        n = int(self.counts[i])
+        rng = np.random.default_rng([self.seed, 2, i])
+        period = self.months[i]
+        dates = period.start_time + pd.to_timedelta(np.sort(rng.integers(0, period.days_in_month * 86400, n)), unit="s")
+        dates = dates.floor("D")
+
+        label_idx = rng.choice(len(self.labels), n, p=self.label_weights)
+        place_idx = rng.choice(len(self.places), n, p=self.county_weights)
+        adm1 = np.array([self.places[j][0] for j in place_idx], dtype=object)
+        adm2 = np.array([self.places[j][1] for j in place_idx], dtype=object)
+        no_region = rng.random(n) < UNKNOWN_REGION_RATE
+        no_county = no_region | (rng.random(n) < UNKNOWN_COUNTY_RATE)
+
+        words = np.maximum(20, rng.lognormal(np.log(WORDS_MEDIAN), WORDS_SIGMA, n)).astype(int)
+        off_topic = rng.random(n) < 0.2
+        other_idx = rng.choice(len(self.labels), n, p=self.label_weights)
+        picks = rng.integers(0, SENTENCES_PER_LABEL, (n, 2))
+        lengths = np.maximum(1, words // 12)
+        sentence_idx = np.split(rng.integers(0, SENTENCES_PER_LABEL, lengths.sum()), np.cumsum(lengths)[:-1])
+        keyword_pos, headline_idx = rng.random(n), rng.integers(0, len(HEADLINES), n)
+        paragraphs, cleaned, titles = [], [], []
+        for r in range(n):
+            label = self.labels[label_idx[r]]
+            place = "the country" if no_region[r] else adm2[r]
+            sentences = list(self.pool[label][sentence_idx[r]])
+            if off_topic[r]:
+                sentences[-1] = self.pool[self.labels[other_idx[r]]][picks[r, 0]]
+            paragraphs.append(f"Officials in {place} " + ". ".join(sentences) + ".")
+            # The pool is already lowercase words, so only the place needs cleaning
+            cleaned.append(f"officials in {self._clean(place)} " + " ".join(sentences))
+            keywords = CATEGORIES[label]
+            headline = HEADLINES[headline_idx[r]].format(keywords[int(keyword_pos[r] * len(keywords))], place)
+            titles.append(headline[0].upper() + headline[1:])
+
+        mean = np.array([LABEL_SENTIMENT.get(self.labels[j], -0.05) for j in label_idx])
+        scores = np.clip(rng.normal(mean, 0.35), -1, 1).round(4)
+        sources = np.array(SOURCES, dtype=object)[rng.choice(len(SOURCES), n, p=self.source_weights)]
+
+        df = pd.DataFrame({
+            "date": dates,
+            "title": titles,
+            "paragraphs": paragraphs,
+            "paragraphs_cleaned": cleaned,
+            "retrieve_source": sources,
+            "adm1_name_final": np.where(no_region, None, adm1),
+            "adm2_name_final": np.where(no_county, None, adm2),
+            "Label": np.where(rng.random(n) < UNCATEGORIZED_RATE, None, np.array(self.labels, dtype=object)[label_idx]),
+            "sentiment_score": scores,
+        })
+        # Wire stories: another source reprints an article from the same month
+        reprint = np.flatnonzero(rng.random(n) < REPRINT_RATE)
+        if n and len(reprint):
+            original = rng.integers(0, n, len(reprint))
+            for col in ("title", "paragraphs", "paragraphs_cleaned", "adm1_name_final", "adm2_name_final", "Label"):
+                df.loc[reprint, col] = df[col].to_numpy()[original]
+            df.loc[reprint, "retrieve_source"] = np.array(SOURCES, dtype=object)[rng.integers(0, len(SOURCES), len(reprint))]
+
+        df["url"] = [f"https://{s}.example/{period.year}/{period.month:02d}/{i:04d}-{r:07d}"
+                     for r, s in enumerate(df["retrieve_source"])]
+        df["sentiment_label"] = score_labels(df["sentiment_score"].to_numpy())
+        df["yearmon"] = str(period)
+        df["year_quarter"] = f"{period.year}Q{period.quarter}"
+        return df[CORE_COLUMNS]
+
+
+def corpus_path(scale, output_dir="data/synthetic", seed=DEFAULT_SEED, base_rows=BASE_ROWS):
+    return Path(output_dir) / f"corpus_{base_rows * SCALES[scale]}_{seed}.parquet"
+
+
+def write_corpus(output_path, rows, seed=DEFAULT_SEED, progress=None):
+    """Write a synthetic corpus of `rows` articles to Parquet; returns the number of row groups."""
+    generator = CorpusGenerator(rows, seed)
+    schema = pa.schema([(c, pa.timestamp("us") if c == "date" else pa.float64() if c == "sentiment_score" else pa.string())
+                        for c in CORE_COLUMNS])
+    output_path = Path(output_path)
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = output_path.with_suffix(".parquet.tmp")
+    groups = 0
+    pending, pending_rows = [], 0
+    with pq.ParquetWriter(tmp, schema, compression="zstd") as writer:
+        for i in range(len(generator)):
+            month = generator.month(i)
+            pending.append(pa.Table.from_pandas(month, schema=schema, preserve_index=False))
+            pending_rows += len(month)
+            if pending_rows >= ROW_GROUP_ROWS or i == len(generator) - 1:
+                writer.write_table(pa.concat_tables(pending), row_group_size=max(pending_rows, 1))
+                pending, pending_rows = [], 0
+                groups += 1
+            if progress:
+                progress(i + 1, len(generator))
+    tmp.replace(output_path)
+    return groups
+
+
+def ensure_corpus(scale, base_rows=BASE_ROWS, seed=DEFAULT_SEED, output_dir="data/synthetic", force=False,
+                  progress=None):
+    """Path to the corpus for `scale`, generating it first if needed; returns (path, row groups or None if reused)."""
+    path = corpus_path(scale, output_dir, seed, base_rows)
+    if path.exists() and not force:
+        return path, None
+    return path, write_corpus(path, base_rows * SCALES[scale], seed, progress=progress)
@@ -0,0 +1,292 @@
+"""
+Span tracing and per-rerun profiling for dashboard pages.
+
+With DASHBOARD_TRACING=1 (or ?trace=1 in the page URL), every script run
+records a tree of timed spans. The page phases come from PageTimer, and
+utils/ adds spans around data loading, filtering, aggregation, alert
+thresholds, retrieval, prompt building, chart rendering and LLM calls. At
+the end of the run they are shown as a timing waterfall in a collapsed
+sidebar expander.
+
+DASHBOARD_PROFILE=cprofile (or pyinstrument, if installed) also profiles
+each traced run. One file per rerun is written to DASHBOARD_PROFILE_DIR.
+
+A trace belongs to the thread that started it, which is Streamlit's script
+thread. Spans opened on worker threads (gateway, map-reduce pool) are not
+recorded, so those calls are spanned where the page waits for them. With no
+active trace, span() returns a shared no-op context manager and @traced
+calls straight through, so disabled tracing costs a thread-local lookup.
+"""
+
+import functools
+import os
+import threading
+import time
+import warnings
+from contextlib import nullcontext
+from datetime import datetime
+from pathlib import Path
+
+TRACING_ENABLED = os.getenv("DASHBOARD_TRACING", "").lower() in ("1", "true", "yes")
+PROFILER = os.getenv("DASHBOARD_PROFILE", "").lower()  # "", "cprofile" or "pyinstrument"
+PROFILE_DIR = os.getenv("DASHBOARD_PROFILE_DIR", "data/profiles")
+MAX_SPANS = 5000  # per run; a runaway loop of spans should not eat memory
+
+class _Local(threading.local):
+    trace = None  # class default, so a thread that never traced needs no failed lookup
+
+
+_local = _Local()
+_NOOP = nullcontext()
+
+
+class Span:
+    """One timed section; `depth` is its nesting level within the run."""
+
+    __slots__ = ("name", "attrs", "depth", "start", "end", "_trace")
+
+    def __init__(self, trace, name, attrs):
+        self._trace = trace
+        self.name = name
+        self.attrs = attrs
+        self.depth = 0
+        self.start = self.end = None
+
+    def __enter__(self):
+        self._trace._open(self)
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is not None:
+            self.attrs["error"] = exc_type.__name__
+        self._trace._close(self)
+        return False
+
+    @property
+    def seconds(self):
+        return (self.end or time.perf_counter()) - self.start
+
+
+class Trace:
+    """Spans recorded during one script run of a page, in start order."""
+
+    def __init__(self, page):
+        self.page = page
+        self.started = time.perf_counter()
+        self.started_at = datetime.now()
+        self.ended = None
+        self.spans = []
+        self.dropped = 0
+        self.profile_path = None
+        self._stack = []
+        self._phase_start = 0  # index of the first span not yet inside a phase
+        self._profiler = None
+
+    def span(self, name, attrs):
+        return Span(self, name, attrs)
+
+    def _open(self, span):
+        span.depth = len(self._stack)
+        span.start = time.perf_counter()
+        self._stack.append(span)
+        if len(self.spans) < MAX_SPANS:
+            self.spans.append(span)
+        else:
+            self.dropped += 1
+
+    def _close(self, span):
+        span.end = time.perf_counter()
+        if self._stack and self._stack[-1] is span:
+            self._stack.pop()
+
+    def phase(self, name, start, end):
+        """Record a page phase after the fact; top-level spans since the last phase become its children."""
+        if self._stack:
+            return
+        phase = Span(self, name, {"phase": True})
+        phase.start, phase.end = start, end
+        children = self.spans[self._phase_start:]
+        for child in children:
+            child.depth += 1
+        self.spans.insert(self._phase_start, phase)
+        self._phase_start = len(self.spans)
+
+    @property
+    def seconds(self):
+        return (self.ended or time.perf_counter()) - self.started
+
+    def rows(self):
+        """Span table: name, depth, start/duration/self time in ms relative to the run start."""
+        rows = []
+        for i, span in enumerate(self.spans):
+            end = span.end or self.ended or time.perf_counter()
+            child_ms = 0.0
+            for child in self.spans[i + 1:]:
+                if child.depth <= span.depth:
+                    break
+                if child.depth == span.depth + 1:
+                    child_ms += ((child.end or end) - child.start) * 1000
+            duration_ms = (end - span.start) * 1000
+            rows.append({
+                "span": span.name,
+                "depth": span.depth,
+                "start_ms": (span.start - self.started) * 1000,
+                "end_ms": (end - self.started) * 1000,
+                "duration_ms": duration_ms,
+                "self_ms": max(0.0, duration_ms - child_ms),
+                "attrs": ", ".join(f"{k}={v}" for k, v in span.attrs.items() if k != "phase"),
+            })
+        return rows
+
+
+def current_trace():
+    return _local.trace
+
+
+def span(name, **attrs):
+    """Context manager timing a section of the current run (a no-op when not tracing)."""
+    trace = _local.trace
+    if trace is None:
+        return _NOOP
+    return trace.span(name, attrs)
+
+
+def traced(name=None):
+    """Decorator spanning each call; use as @traced or @traced("name")."""
+    def decorate(fn):
+        label = name or fn.__qualname__
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            trace = _local.trace
+            if trace is None:
+                return fn(*args, **kwargs)
+            with trace.span(label, {}):
+                return fn(*args, **kwargs)
+        return wrapper
+
+    if callable(name):
+        fn, name = name, None
+        return decorate(fn)
+    return decorate
+
+
+def tracing_requested():
+    if TRACING_ENABLED:
+        return True
+    try:
+        import streamlit as st
+        return st.query_params.get("trace") in ("1", "true")
+    except Exception:  # no script run context (imported from a script or test)
+        return False
+
+
+# -- per-run lifecycle -----------------------------------------------------------
+
+def start_trace(page):
+    """Start tracing (and profiling, if configured) this run; returns the Trace or None."""
+    stale = _local.trace
+    if stale is not None:  # the previous run on this thread stopped early (st.stop, exception)
+        finish_trace(stale, render=False)
+    if not tracing_requested():
+        _local.trace = None
+        return None
+    trace = Trace(page)
+    trace._profiler = _start_profiler()
+    _local.trace = trace
+    return trace
+
+
+def finish_trace(trace, render=True):
+    """Stop the trace, write the profile and show the sidebar waterfall."""
+    if trace is None:
+        return
+    trace.ended = time.perf_counter()
+    if _local.trace is trace:
+        _local.trace = None
+    if trace._profiler is not None:
+        trace.profile_path = _stop_profiler(trace._profiler, trace)
+        trace._profiler = None
+    if render:
+        render_trace_panel(trace)
+
+
+def _start_profiler():
+    if PROFILER == "cprofile":
+        import cProfile
+        profiler = cProfile.Profile()
+        try:
+            profiler.enable()
+        except ValueError as e:  # another profiler is active on this interpreter
+            warnings.warn(f"Run not profiled: {e}")
+            return None
+        return profiler
+    if PROFILER == "pyinstrument":
+        try:
+            from pyinstrument import Profiler
+        except ImportError:
+            warnings.warn("DASHBOARD_PROFILE=pyinstrument but pyinstrument is not installed")
+            return None
+        profiler = Profiler()
+        try:
+            profiler.start()
+        except RuntimeError as e:
+            warnings.warn(f"Run not profiled: {e}")
+            return None
+        return profiler
+    return None
+
+
+def _stop_profiler(profiler, trace):
+    out_dir = Path(PROFILE_DIR)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    stem = f"{trace.page}-{trace.started_at.strftime('%Y%m%d-%H%M%S-%f')}"
+    if PROFILER == "cprofile":
+        profiler.disable()
+        path = out_dir / f"{stem}.prof"
+        profiler.dump_stats(path)
+    else:
+        profiler.stop()
+        path = out_dir / f"{stem}.html"
+        path.write_text(profiler.output_html(), encoding="utf-8")
+    return path
+
+
+# -- sidebar panel -----------------------------------------------------------------
+
+def render_trace_panel(trace):
+    """Collapsed sidebar expander with the run's span waterfall and table."""
+    import altair as alt
+    import pandas as pd
+    import streamlit as st
+
+    rows = pd.DataFrame(trace.rows())
+    with st.sidebar.expander(f"⏱️ Render trace: {trace.seconds * 1000:,.0f} ms", expanded=False):
+        if rows.empty:
+            st.caption("No spans recorded.")
+            return
+        rows["order"] = range(len(rows))
+        rows["label"] = ["  " * d + name for d, name in zip(rows["depth"], rows["span"])]
+        chart = alt.Chart(rows).mark_bar().encode(
+            x=alt.X("start_ms:Q", title="ms"),
+            x2="end_ms:Q",
+            y=alt.Y("label:N", title=None, sort=alt.SortField("order")),
+            color=alt.Color("depth:O", legend=None),
+            tooltip=[
+                alt.Tooltip("span:N"),
+                alt.Tooltip("duration_ms:Q", title="Total (ms)", format=",.1f"),
+                alt.Tooltip("self_ms:Q", title="Self (ms)", format=",.1f"),
+                alt.Tooltip("attrs:N"),
+            ],
+        ).properties(height=max(120, 18 * len(rows)))
+        st.altair_chart(chart, use_container_width=True)
+        st.dataframe(
+            rows[["label", "duration_ms", "self_ms", "attrs"]].rename(
+                columns={"label": "Span", "duration_ms": "Total (ms)", "self_ms": "Self (ms)", "attrs": "Details"}
+            ).round(1),
+            hide_index=True, use_container_width=True,
+        )
+        if trace.dropped:
+            st.caption(f"{trace.dropped:,} spans beyond the first {MAX_SPANS:,} were not recorded.")
+        if trace.profile_path:
+            st.caption(f"Profile: `{trace.profile_path}`")